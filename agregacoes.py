@@ -0,0 +1,84 @@
+import numpy as np
+import pandas as pd
+
+from tipos_compactos import e_compacto, CHAVE_AUSENTE
+
+FREQUENCIAS = ('D', 'M')  # dia, mês
+
+
+def chaves_periodo(df, frequencia='D'):
+    """
+    Início do período (dia ou mês) de cada linha, como datetime64, calculado de
+    uma só vez sobre a coluna de datas. Aceita o formato compacto (dias
+    inteiros) ou o expandido.
+
+    Args:
+        df: DataFrame com a coluna data
+        frequencia: 'D' (dia) ou 'M' (mês)
+
+    Returns:
+        numpy.ndarray: datetime64[ns] com o início do período de cada linha
+    """
+    if frequencia not in FREQUENCIAS:
+        raise ValueError(f"Frequência inválida: {frequencia}")
+    if e_compacto(df):
+        # CHAVE_AUSENTE coincide com a representação inteira de NaT
+        dias = df['data'].to_numpy(dtype=np.int64, na_value=CHAVE_AUSENTE).astype('datetime64[D]')
+    else:
+        dias = pd.to_datetime(df['data']).to_numpy().astype('datetime64[D]')
+    if frequencia == 'M':
+        dias = dias.astype('datetime64[M]')
+    return dias.astype('datetime64[ns]')
+
+
+def totais_por_periodo(df, frequencia='D'):
+    """
+    Soma dos valores por dia ou por mês (um único group-by)
+
+    Args:
+        df: DataFrame com as colunas data e valor (formato compacto ou expandido)
+        frequencia: 'D' (dia) ou 'M' (mês)
+
+    Returns:
+        pd.Series: Totais em Kz indexados pelo início do período, por ordem
+    """
+    if df is None or df.empty:
+        return pd.Series(dtype=float, index=pd.DatetimeIndex([], name='periodo'), name='valor')
+    valores = df['valor'].to_numpy(dtype=float, na_value=np.nan)
+    if e_compacto(df):
+        valores = valores / 100.0
+    totais = pd.Series(valores, index=pd.DatetimeIndex(chaves_periodo(df, frequencia), name='periodo'),
+                       name='valor').groupby(level=0).sum()
+    return totais.sort_index()
+
+
+def juntar_totais(totais_banco, totais_livro, tolerancia=0.01):
+    """
+    Junta os totais do banco e do livro pelo período (outer join: períodos só
+    com movimentos de um dos lados ficam com zero no outro)
+
+    Returns:
+        pd.DataFrame: Colunas banco, livro, diferenca e conciliado, por ordem do período
+    """
+    comparativo = pd.concat([totais_banco.rename('banco'), totais_livro.rename('livro')],
+                            axis=1, join='outer').fillna(0.0).sort_index()
+    comparativo['diferenca'] = comparativo['banco'] - comparativo['livro']
+    comparativo['conciliado'] = np.abs(comparativo['diferenca'].to_numpy()) < tolerancia
+    return comparativo
+
+
+def comparar_por_periodo(dados_banco, dados_livro, frequencia='D', tolerancia=0.01):
+    """
+    Totais do banco e do livro por dia ou por mês, lado a lado
+
+    Args:
+        dados_banco: Extrato bancário (colunas data e valor)
+        dados_livro: Livro contábil (colunas data e valor)
+        frequencia: 'D' (dia) ou 'M' (mês)
+        tolerancia: Diferença abaixo da qual o período é considerado conciliado
+
+    Returns:
+        pd.DataFrame: Ver juntar_totais
+    """
+    return juntar_totais(totais_por_periodo(dados_banco, frequencia),
+                         totais_por_periodo(dados_livro, frequencia), tolerancia)
@@ -0,0 +1,169 @@
+import numpy as np
+
+METODOS = ('linear', 'degressivo')
+
+
+def coeficiente_degressivo(vida_util):
+    """Coeficiente do método degressivo conforme a vida útil (1,5 / 2 / 2,5)"""
+    if vida_util < 5:
+        return 1.5
+    if vida_util <= 6:
+        return 2.0
+    return 2.5
+
+
+class MotorAmortizacoes:
+    """
+    Planos de amortização de todos os bens calculados de uma só vez, em
+    matrizes numpy (bem x ano civil). A amortização começa no mês de aquisição
+    (primeiro ano proporcional aos meses) e termina quando o valor amortizável
+    (valor - valor residual) está esgotado.
+
+    Métodos:
+        linear      quotas constantes por mês de utilização
+        degressivo  taxa linear x coeficiente sobre o valor líquido, passando
+                    a quotas constantes quando estas forem maiores
+
+    Os planos ficam em cache até a lista de bens (ou os seus dados) mudar.
+    """
+
+    def __init__(self):
+        self._chave = None
+        self._plano = None
+
+    @staticmethod
+    def _chave_bens(bens):
+        return tuple(
+            (bem['codigo'], bem['valor'], bem['valor_residual'], bem['data'], bem['vida_util'],
+             bem.get('metodo', 'linear'))
+            for bem in bens
+        )
+
+    def plano(self, bens):
+        """
+        Plano de amortização de todos os bens
+
+        Args:
+            bens: Lista de bens amortizáveis
+
+        Returns:
+            dict: 'ano_inicial' (ano de aquisição de cada bem), 'mes_inicial',
+                  'meses' (meses de utilização por bem e ano), 'valores'
+                  (amortização por bem e ano); as colunas são anos a partir
+                  do ano de aquisição de cada bem
+        """
+        chave = self._chave_bens(bens)
+        if chave != self._chave:
+            self._plano = self._calcular_plano(bens)
+            self._chave = chave
+        return self._plano
+
+    def _calcular_plano(self, bens):
+        total = len(bens)
+        vida_util = np.array([bem['vida_util'] for bem in bens], dtype=float)
+        anos = int(np.ceil(vida_util.max())) + 1 if total else 1
+
+        amortizavel = np.array([bem['valor'] - bem['valor_residual'] for bem in bens], dtype=float)
+        ano_inicial = np.array([bem['data'].year for bem in bens], dtype=np.int64)
+        mes_inicial = np.array([bem['data'].month for bem in bens], dtype=np.int64)
+        degressivo = np.array([bem.get('metodo', 'linear') == 'degressivo' for bem in bens], dtype=bool)
+
+        # Meses de utilização em cada ano: primeiro ano a partir do mês de
+        # aquisição, depois 12 por ano até esgotar a vida útil
+        meses_totais = np.round(vida_util * 12).astype(np.int64)
+        meses = np.zeros((total, anos), dtype=np.int64)
+        restantes = meses_totais.copy()
+        meses[:, 0] = np.minimum(13 - mes_inicial, restantes)
+        restantes -= meses[:, 0]
+        for ano in range(1, anos):
+            meses[:, ano] = np.minimum(12, restantes)
+            restantes -= meses[:, ano]
+
+        # Método linear: quota mensal constante
+        with np.errstate(divide='ignore', invalid='ignore'):
+            quota_mensal = np.where(meses_totais > 0, amortizavel / meses_totais, 0.0)
+        valores = quota_mensal[:, None] * meses
+
+        # Método degressivo: ano a ano, vetorizado sobre os bens
+        if degressivo.any():
+            taxa = np.array([coeficiente_degressivo(v) for v in vida_util]) / np.maximum(vida_util, 1)
+            valor_liquido = amortizavel.copy()
+            meses_por_usar = meses_totais.copy()
+            for ano in range(anos):
+                usados = meses[:, ano]
+                with np.errstate(divide='ignore', invalid='ignore'):
+                    quota_degressiva = valor_liquido * taxa * usados / 12
+                    quota_linear = np.where(meses_por_usar > 0,
+                                            valor_liquido * usados / meses_por_usar, 0.0)
+                quota = np.minimum(np.maximum(quota_degressiva, quota_linear), valor_liquido)
+                valores[degressivo, ano] = quota[degressivo]
+                valor_liquido -= quota
+                meses_por_usar -= usados
+
+        return {
+            'ano_inicial': ano_inicial,
+            'mes_inicial': mes_inicial,
+            'meses': meses,
+            'valores': np.round(valores, 2)
+        }
+
+    def devido_ate(self, bens, data_referencia):
+        """
+        Amortização devida por bem e ano até à data de referência. O ano da
+        data de referência é proporcional aos meses já decorridos.
+
+        Returns:
+            tuple: (plano, matriz de valores devidos bem x ano)
+        """
+        plano = self.plano(bens)
+        meses = plano['meses']
+        anos_civis = plano['ano_inicial'][:, None] + np.arange(meses.shape[1])
+
+        # Meses de utilização decorridos até à data de referência em cada ano
+        mes_final = np.where(anos_civis < data_referencia.year, 12,
+                             np.where(anos_civis == data_referencia.year, data_referencia.month, 0))
+        mes_primeiro = np.ones_like(anos_civis)
+        mes_primeiro[:, 0] = plano['mes_inicial']
+        decorridos = np.clip(mes_final - mes_primeiro + 1, 0, meses)
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            fracao = np.where(meses > 0, decorridos / meses, 0.0)
+        return plano, np.round(plano['valores'] * fracao, 2)
+
+    def registado(self, bens, plano):
+        """Amortizações já registadas por bem e ano (mesma forma que o plano)"""
+        registado = np.zeros(plano['meses'].shape, dtype=float)
+        linhas, colunas, valores = [], [], []
+        for i, bem in enumerate(bens):
+            for amort in bem.get('amortizacoes', []):
+                coluna = amort['data'].year - bem['data'].year
+                if 0 <= coluna < registado.shape[1]:
+                    linhas.append(i)
+                    colunas.append(coluna)
+                    valores.append(amort['valor'])
+        if linhas:
+            np.add.at(registado, (np.array(linhas), np.array(colunas)), np.array(valores, dtype=float))
+        return registado
+
+    def em_falta(self, bens, data_referencia):
+        """
+        Amortizações em falta até à data de referência: anos sem registo e
+        diferenças em anos registados parcialmente
+
+        Returns:
+            list: Tuplos (posição do bem, ano civil, valor, acumulada até esse ano)
+        """
+        if not bens:
+            return []
+        plano, devido = self.devido_ate(bens, data_referencia)
+        registado = self.registado(bens, plano)
+        falta = np.round(devido - registado, 2)
+
+        # Acumulada depois de registar o que falta
+        acumulada = np.cumsum(np.maximum(devido, registado), axis=1)
+
+        resultado = []
+        for i, coluna in zip(*np.nonzero(falta >= 0.01)):
+            resultado.append((int(i), int(plano['ano_inicial'][i] + coluna), float(falta[i, coluna]),
+                              float(acumulada[i, coluna])))
+        return resultado
@@ -0,0 +1,145 @@
+import os
+
+try:
+    import pyarrow as pa
+    import pyarrow.ipc as ipc
+    PYARROW_DISPONIVEL = True
+except ImportError:
+    PYARROW_DISPONIVEL = False
+
+# Pasta dos dados importados, relativa ao diretório da entidade
+DIRETORIO_PADRAO = 'dados_importados'
+
+
+class ArmazenamentoArrow:
+    """
+    Guarda os dados importados (extrato e livro) em arquivos Arrow IPC e
+    abre-os com memory-map, para que a sessão anterior seja recuperada
+    sem nova importação e os módulos partilhem os mesmos buffers.
+
+    Cada gravação cria um arquivo numerado novo ('banco.3.arrow') em vez de
+    substituir o anterior: os DataFrames sem cópia ainda podem ter o arquivo
+    antigo mapeado, e no Windows um arquivo mapeado não pode ser substituído
+    nem apagado. As versões antigas são apagadas quando deixam de estar em uso.
+    """
+
+    def __init__(self, diretorio=DIRETORIO_PADRAO):
+        """
+        Args:
+            diretorio: Pasta onde os arquivos .arrow são guardados
+        """
+        self.diretorio = diretorio
+        self._tabelas = {}  # Tabelas mapeadas em memória, partilhadas entre módulos
+
+    @property
+    def disponivel(self):
+        return PYARROW_DISPONIVEL
+
+    def versoes(self, nome):
+        """
+        Arquivos gravados de `nome`, da versão mais antiga para a mais recente
+        ('banco.arrow', de versões anteriores do programa, conta como versão 0)
+
+        Returns:
+            list: [(versao, caminho), ...]
+        """
+        if not os.path.isdir(self.diretorio):
+            return []
+        versoes = []
+        for arquivo in os.listdir(self.diretorio):
+            if not (arquivo.startswith(nome + '.') and arquivo.endswith('.arrow')):
+                continue
+            numero = arquivo[len(nome) + 1:-len('.arrow')]
+            if numero == '' or numero.isdigit():
+                versoes.append((int(numero or 0), os.path.join(self.diretorio, arquivo)))
+        return sorted(versoes)
+
+    def caminho(self, nome):
+        """Arquivo da versão mais recente de `nome`, ou None se não existir"""
+        versoes = self.versoes(nome)
+        return versoes[-1][1] if versoes else None
+
+    def _apagar_versoes_antigas(self, nome, atual):
+        """Apaga as versões anteriores a `atual`; as que ainda estão mapeadas ficam para depois"""
+        for versao, caminho in self.versoes(nome):
+            if versao >= atual:
+                continue
+            try:
+                os.remove(caminho)
+            except OSError:
+                pass
+
+    def salvar(self, nome, df):
+        """
+        Grava um DataFrame como uma nova versão em Arrow IPC. Um DataFrame None
+        grava uma versão vazia (sem colunas), que carregar devolve como None.
+
+        Args:
+            nome: Nome lógico dos dados ('banco', 'livro', ...)
+            df: DataFrame a gravar
+
+        Returns:
+            bool: True se os dados foram gravados; em caso de erro a versão
+            anterior continua a ser a atual
+        """
+        if not PYARROW_DISPONIVEL:
+            return False
+
+        self._tabelas.pop(nome, None)
+        versoes = self.versoes(nome)
+        versao = versoes[-1][0] + 1 if versoes else 1
+        caminho = os.path.join(self.diretorio, f"{nome}.{versao}.arrow")
+        temporario = caminho + '.tmp'
+
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            tabela = pa.table({}) if df is None else pa.Table.from_pandas(df, preserve_index=False)
+            with pa.OSFile(temporario, 'wb') as destino:
+                with ipc.new_file(destino, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+            # O destino é um nome novo, que nenhum DataFrame tem mapeado
+            os.replace(temporario, caminho)
+        except Exception as e:
+            print(f"Erro ao salvar dados em Arrow: {str(e)}")
+            if os.path.exists(temporario):
+                os.remove(temporario)
+            return False
+
+        self._apagar_versoes_antigas(nome, versao)
+        return True
+
+    def tabela(self, nome):
+        """
+        Devolve a tabela Arrow mapeada em memória (sem cópia), ou None se não existir
+        """
+        if not PYARROW_DISPONIVEL:
+            return None
+
+        if nome not in self._tabelas:
+            caminho = self.caminho(nome)
+            if caminho is None:
+                return None
+            try:
+                origem = pa.memory_map(caminho, 'r')
+                self._tabelas[nome] = ipc.open_file(origem).read_all()
+            except Exception as e:
+                print(f"Erro ao abrir dados em Arrow: {str(e)}")
+                return None
+
+        # Versão vazia: dados removidos
+        if self._tabelas[nome].num_columns == 0:
+            return None
+        return self._tabelas[nome]
+
+    def carregar(self, nome):
+        """
+        Carrega os dados gravados como DataFrame. As colunas numéricas sem nulos
+        são convertidas sem cópia a partir do arquivo mapeado.
+
+        Returns:
+            DataFrame ou None
+        """
+        tabela = self.tabela(nome)
+        if tabela is None:
+            return None
+        return tabela.to_pandas(split_blocks=True)
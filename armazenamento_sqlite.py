@@ -0,0 +1,337 @@
+import json
+import sqlite3
+import threading
+import zlib
+from datetime import datetime
+from itertools import groupby
+
+from diario_contabil import serializar_valor, restaurar_bem
+from razao_colunar import em_centavos, limites_periodo
+
+# Campos do lançamento com coluna própria; os restantes vão para `extra` (JSON)
+CAMPOS_LANCAMENTO = ('id', 'data', 'descricao', 'origem', 'movimentos')
+
+# Versão do esquema (PRAGMA user_version): 1 = débitos e créditos em centavos (INTEGER)
+VERSAO_ESQUEMA = 1
+
+
+class ArmazenamentoSQLite:
+    """
+    Armazenamento dos lançamentos e bens amortizáveis numa base SQLite embutida.
+    Os lançamentos ficam indexados por data e os movimentos por conta, e os
+    saldos são agregados diretamente em SQL. Débitos e créditos são guardados
+    em centavos inteiros, como no razão colunar do armazenamento JSON, para
+    que as somas dos dois armazenamentos coincidam.
+
+    A conexão é partilhada entre threads (carregamento em segundo plano,
+    interface, geração de relatórios): todas as utilizações passam pelo
+    mesmo bloqueio.
+    """
+
+    def __init__(self, arquivo='contabilidade.db'):
+        """
+        Args:
+            arquivo: Caminho do arquivo da base de dados
+        """
+        self.arquivo = arquivo
+        self._bloqueio = threading.RLock()
+        self.conexao = sqlite3.connect(arquivo, check_same_thread=False)
+        self.conexao.execute("PRAGMA journal_mode=WAL")
+        self.conexao.execute("PRAGMA synchronous=NORMAL")
+        self.conexao.execute("PRAGMA foreign_keys=ON")
+        self._criar_tabelas()
+
+    def _criar_tabelas(self):
+        versao = self.conexao.execute("PRAGMA user_version").fetchone()[0]
+        existia = self.conexao.execute(
+            "SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = 'movimentos'").fetchone()[0]
+        with self.conexao:
+            self.conexao.executescript("""
+                CREATE TABLE IF NOT EXISTS lancamentos (
+                    indice INTEGER PRIMARY KEY,
+                    id TEXT,
+                    data TEXT NOT NULL,
+                    descricao TEXT,
+                    origem TEXT,
+                    extra TEXT
+                );
+                CREATE TABLE IF NOT EXISTS movimentos (
+                    lancamento INTEGER NOT NULL REFERENCES lancamentos(indice) ON DELETE CASCADE,
+                    ordem INTEGER NOT NULL,
+                    conta TEXT NOT NULL,
+                    debito INTEGER NOT NULL DEFAULT 0,
+                    credito INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (lancamento, ordem)
+                );
+                CREATE TABLE IF NOT EXISTS bens_amortizaveis (
+                    codigo TEXT PRIMARY KEY,
+                    dados TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_lancamentos_data ON lancamentos(data);
+                CREATE INDEX IF NOT EXISTS idx_movimentos_conta ON movimentos(conta, lancamento);
+            """)
+        if existia and versao < 1:
+            self._migrar_centavos()
+        if versao < VERSAO_ESQUEMA:
+            self.conexao.execute(f"PRAGMA user_version = {VERSAO_ESQUEMA}")
+
+    def _migrar_centavos(self):
+        """Converte uma base antiga (débitos e créditos REAL em Kz) para centavos inteiros"""
+        with self.conexao:
+            self.conexao.executescript("""
+                CREATE TABLE movimentos_centavos (
+                    lancamento INTEGER NOT NULL REFERENCES lancamentos(indice) ON DELETE CASCADE,
+                    ordem INTEGER NOT NULL,
+                    conta TEXT NOT NULL,
+                    debito INTEGER NOT NULL DEFAULT 0,
+                    credito INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (lancamento, ordem)
+                );
+                INSERT INTO movimentos_centavos (lancamento, ordem, conta, debito, credito)
+                    SELECT lancamento, ordem, conta,
+                           CAST(ROUND(debito * 100) AS INTEGER), CAST(ROUND(credito * 100) AS INTEGER)
+                    FROM movimentos;
+                DROP TABLE movimentos;
+                ALTER TABLE movimentos_centavos RENAME TO movimentos;
+                CREATE INDEX IF NOT EXISTS idx_movimentos_conta ON movimentos(conta, lancamento);
+            """)
+
+    def _consultar(self, sql, parametros=()):
+        """Executa uma consulta e lê todas as linhas, com a conexão bloqueada"""
+        with self._bloqueio:
+            return self.conexao.execute(sql, parametros).fetchall()
+
+    def _percorrer(self, sql, parametros=(), bloco=2000):
+        """
+        Percorre as linhas de uma consulta em blocos: a conexão só fica
+        bloqueada enquanto cada bloco é lido, não enquanto é consumido
+        """
+        with self._bloqueio:
+            cursor = self.conexao.execute(sql, parametros)
+            linhas = cursor.fetchmany(bloco)
+        while linhas:
+            yield from linhas
+            with self._bloqueio:
+                linhas = cursor.fetchmany(bloco)
+
+    def vazio(self):
+        """Indica se a base ainda não tem lançamentos nem bens"""
+        linhas = self._consultar(
+            "SELECT (SELECT COUNT(*) FROM lancamentos) + (SELECT COUNT(*) FROM bens_amortizaveis)")
+        return linhas[0][0] == 0
+
+    def gravar_lancamentos(self, lancamentos_indexados):
+        """
+        Insere ou substitui lançamentos numa única transação
+
+        Args:
+            lancamentos_indexados: Lista de tuplos (posição na lista, lançamento)
+        """
+        if not lancamentos_indexados:
+            return
+
+        linhas_lancamentos = []
+        linhas_movimentos = []
+        for indice, lanc in lancamentos_indexados:
+            extra = {k: v for k, v in lanc.items() if k not in CAMPOS_LANCAMENTO}
+            linhas_lancamentos.append((
+                indice, lanc.get('id'), lanc['data'].isoformat(), lanc.get('descricao'),
+                lanc.get('origem'),
+                json.dumps(extra, ensure_ascii=False, default=serializar_valor) if extra else None
+            ))
+            for ordem, mov in enumerate(lanc['movimentos']):
+                linhas_movimentos.append((indice, ordem, str(mov['conta']),
+                                          em_centavos(mov['debito']), em_centavos(mov['credito'])))
+
+        with self._bloqueio, self.conexao:
+            # Remover os movimentos anteriores dos lançamentos substituídos
+            self.conexao.executemany("DELETE FROM movimentos WHERE lancamento = ?",
+                                     [(linha[0],) for linha in linhas_lancamentos])
+            self.conexao.executemany(
+                "INSERT OR REPLACE INTO lancamentos (indice, id, data, descricao, origem, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?)", linhas_lancamentos)
+            self.conexao.executemany(
+                "INSERT INTO movimentos (lancamento, ordem, conta, debito, credito) "
+                "VALUES (?, ?, ?, ?, ?)", linhas_movimentos)
+
+    def gravar_bens(self, bens):
+        """Insere ou substitui bens amortizáveis numa única transação"""
+        if not bens:
+            return
+        with self._bloqueio, self.conexao:
+            self.conexao.executemany(
+                "INSERT OR REPLACE INTO bens_amortizaveis (codigo, dados) VALUES (?, ?)",
+                [(bem['codigo'], json.dumps(bem, ensure_ascii=False, default=serializar_valor))
+                 for bem in bens])
+
+    def carregar_lancamentos(self, data_inicio=None, data_fim=None):
+        """
+        Lê os lançamentos (com os movimentos), opcionalmente só de um período
+
+        Returns:
+            list: Lançamentos ordenados pela posição original
+        """
+        condicoes, parametros = self._filtro_periodo('l.data', data_inicio, data_fim)
+        cursor = self._consultar(
+            "SELECT l.indice, l.id, l.data, l.descricao, l.origem, l.extra, "
+            "m.conta, m.debito, m.credito "
+            "FROM lancamentos l LEFT JOIN movimentos m ON m.lancamento = l.indice "
+            f"{condicoes} ORDER BY l.indice, m.ordem", parametros)
+
+        lancamentos = []
+        indice_atual = None
+        for indice, id_lanc, data, descricao, origem, extra, conta, debito, credito in cursor:
+            if indice != indice_atual:
+                lanc = {'id': id_lanc, 'data': datetime.fromisoformat(data),
+                        'descricao': descricao, 'origem': origem, 'movimentos': []}
+                if extra:
+                    lanc.update(json.loads(extra))
+                lancamentos.append(lanc)
+                indice_atual = indice
+            if conta is not None:
+                lanc['movimentos'].append({'conta': conta, 'debito': debito / 100, 'credito': credito / 100})
+        return lancamentos
+
+    def carregar_bens(self):
+        cursor = self._consultar("SELECT dados FROM bens_amortizaveis ORDER BY rowid")
+        return [restaurar_bem(json.loads(dados)) for (dados,) in cursor]
+
+    def saldos(self, data_inicio=None, data_fim=None, contas=None):
+        """
+        Saldo (débitos - créditos) por conta, agregado em SQL
+
+        Args:
+            data_inicio: Dia inicial (inclusive), ou None
+            data_fim: Dia final (inclusive), ou None
+            contas: Lista de códigos de conta a considerar, ou None para todas
+
+        Returns:
+            dict: {conta: saldo}
+        """
+        condicoes, parametros = self._filtro_periodo('l.data', data_inicio, data_fim)
+        if contas:
+            condicoes += (" AND " if condicoes else "WHERE ") + \
+                f"m.conta IN ({', '.join('?' * len(contas))})"
+            parametros += [str(c) for c in contas]
+
+        cursor = self._consultar(
+            "SELECT m.conta, SUM(m.debito - m.credito) "
+            "FROM movimentos m JOIN lancamentos l ON l.indice = m.lancamento "
+            f"{condicoes} GROUP BY m.conta", parametros)
+        return {conta: saldo / 100 for conta, saldo in cursor}
+
+    def movimentos_por_conta(self, data_inicio=None, data_fim=None, contas=None):
+        """
+        Movimentos do período agrupados por conta, ordenados por data (para o livro razão)
+
+        Returns:
+            dict: {conta: [{'data', 'descricao', 'lancamento_id', 'debito', 'credito'}, ...]}
+        """
+        condicoes, parametros = self._filtro_periodo('l.data', data_inicio, data_fim)
+        if contas:
+            condicoes += (" AND " if condicoes else "WHERE ") + \
+                f"m.conta IN ({', '.join('?' * len(contas))})"
+            parametros += [str(c) for c in contas]
+
+        cursor = self._consultar(
+            "SELECT m.conta, l.data, l.descricao, l.id, m.debito, m.credito "
+            "FROM movimentos m JOIN lancamentos l ON l.indice = m.lancamento "
+            f"{condicoes} ORDER BY l.data, l.indice, m.ordem", parametros)
+
+        contas_movimentos = {}
+        for conta, data, descricao, id_lanc, debito, credito in cursor:
+            contas_movimentos.setdefault(conta, []).append({
+                'data': datetime.fromisoformat(data),
+                'descricao': descricao,
+                'lancamento_id': id_lanc,
+                'debito': debito / 100,
+                'credito': credito / 100
+            })
+        return contas_movimentos
+
+    def percorrer_movimentos(self, data_inicio=None, data_fim=None, contas=None):
+        """
+        Percorre os movimentos do período conta a conta (por ordem de código) e
+        por ordem de data, lendo o cursor à medida que são consumidos
+
+        Yields:
+            tuple: (conta, iterador de {'data', 'descricao', 'lancamento_id', 'debito', 'credito'})
+        """
+        condicoes, parametros = self._filtro_periodo('l.data', data_inicio, data_fim)
+        if contas:
+            condicoes += (" AND " if condicoes else "WHERE ") + \
+                f"m.conta IN ({', '.join('?' * len(contas))})"
+            parametros += [str(c) for c in contas]
+
+        cursor = self._percorrer(
+            "SELECT m.conta, l.data, l.descricao, l.id, m.debito, m.credito "
+            "FROM movimentos m JOIN lancamentos l ON l.indice = m.lancamento "
+            f"{condicoes} ORDER BY m.conta, l.data, l.indice, m.ordem", parametros)
+
+        for conta, linhas in groupby(cursor, key=lambda linha: linha[0]):
+            yield conta, ({
+                'data': datetime.fromisoformat(data),
+                'descricao': descricao,
+                'lancamento_id': id_lanc,
+                'debito': debito / 100,
+                'credito': credito / 100
+            } for _, data, descricao, id_lanc, debito, credito in linhas)
+
+    def impressao_periodo(self, data_inicio=None, data_fim=None, descricoes=False):
+        """
+        Impressão dos movimentos do período: muda quando um movimento do
+        período é acrescentado, removido ou alterado
+
+        Args:
+            descricoes: Incluir também os identificadores e descrições dos lançamentos
+
+        Returns:
+            tuple: (número de movimentos, maior posição de lançamento, soma de verificação)
+        """
+        condicoes, parametros = self._filtro_periodo('l.data', data_inicio, data_fim)
+        # Cada movimento mistura posição, data, conta e valores em cadeia (módulo
+        # um primo, sem exceder os inteiros de 64 bits) e o resultado é elevado
+        # ao quadrado antes da soma: sem este passo não linear, trocar as contas
+        # ou os valores entre movimentos deixaria a soma igual
+        (total, maior, soma), = self._consultar(
+            "SELECT COUNT(*), MAX(lancamento), SUM(mistura * mistura % 2147483647) FROM ("
+            "  SELECT m.lancamento AS lancamento,"
+            "  (((((m.lancamento * 1000003 + m.ordem) % 2147483647"
+            "  * 1000003 + CAST(julianday(l.data) * 86400 AS INTEGER) % 2147483647) % 2147483647"
+            "  * 1000003 + (CAST(m.conta AS INTEGER) * 131 + LENGTH(m.conta)) % 2147483647) % 2147483647"
+            "  * 1000003 + m.debito % 2147483647) % 2147483647"
+            "  * 1000003 + m.credito % 2147483647) % 2147483647 AS mistura"
+            "  FROM movimentos m JOIN lancamentos l ON l.indice = m.lancamento "
+            f"{condicoes})", parametros)
+        soma = soma or 0
+        if descricoes:
+            cursor = self._percorrer(
+                f"SELECT l.id, l.descricao FROM lancamentos l {condicoes} ORDER BY l.indice", parametros)
+            crc = 0
+            for id_lanc, descricao in cursor:
+                crc = zlib.crc32(f"{id_lanc}\x1f{descricao}\x1e".encode('utf-8'), crc)
+            soma = (soma, crc)
+        return total, -1 if maior is None else maior, soma
+
+    @staticmethod
+    def _filtro_periodo(coluna, data_inicio, data_fim):
+        """
+        Condição SQL de um período de dias inteiros (ver limites_periodo). As
+        datas estão guardadas em ISO ('AAAA-MM-DDTHH:MM:SS'): comparar com o
+        dia sem hora inclui todas as horas do primeiro dia e exclui o dia
+        seguinte ao último
+        """
+        inicio, fim = limites_periodo(data_inicio, data_fim)
+        condicoes = []
+        parametros = []
+        if inicio is not None:
+            condicoes.append(f"{coluna} >= ?")
+            parametros.append(inicio.date().isoformat())
+        if fim is not None:
+            condicoes.append(f"{coluna} < ?")
+            parametros.append(fim.date().isoformat())
+        return ("WHERE " + " AND ".join(condicoes)) if condicoes else "", parametros
+
+    def fechar(self):
+        with self._bloqueio:
+            self.conexao.close()
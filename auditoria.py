@@ -3,11 +3,10 @@ import os
 import logging
 from datetime import datetime
 import pandas as pd
-from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
 from reportlab.lib.units import cm
+from tema_relatorios import estilo_tabela, estilos as estilos_relatorio
 
 class SistemaAuditoria:
     def __init__(self, contabilidade):
@@ -310,7 +309,7 @@ class SistemaAuditoria:
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
@@ -361,16 +360,7 @@ class SistemaAuditoria:
                     dados_tipos.append([tipo.replace('_', ' ').title(), str(quantidade)])
                 
                 tabela_tipos = Table(dados_tipos, colWidths=[10*cm, 7*cm])
-                tabela_tipos.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 12),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
+                tabela_tipos.setStyle(estilo_tabela((((1, 1), (1, -1), 'RIGHT'),)))
                 elementos.append(tabela_tipos)
             
             elementos.append(Spacer(1, 0.5*cm))
@@ -391,18 +381,7 @@ class SistemaAuditoria:
                     ])
                 
                 tabela_registros = Table(dados_registros, colWidths=[1.5*cm, 3.5*cm, 3.5*cm, 3*cm, 6*cm])
-                tabela_registros.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-                    ('ALIGN', (1, 1), (1, -1), 'CENTER'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
+                tabela_registros.setStyle(estilo_tabela((((0, 1), (0, -1), 'CENTER'), ((1, 1), (1, -1), 'CENTER')), tamanho_cabecalho=10, zebrado=True))
                 elementos.append(tabela_registros)
                 
                 # Detalhes dos 10 registros mais recentes
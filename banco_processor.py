@@ -1,26 +1,90 @@
 import pandas as pd
 from datetime import datetime
 from config import CONFIGURACOES
+from leitor_xlsx import LeitorXlsxStreaming, OPENPYXL_DISPONIVEL, converter_bloco
+from validacao_importacao import ValidadorImportacao
 
 class ProcessadorBanco:
     @staticmethod
-    def processar_extrato(arquivo, banco):
+    def processar_extrato(arquivo, banco, validador=None):
+        blocos = list(ProcessadorBanco.processar_extrato_em_blocos(arquivo, banco, validador=validador))
+        if not blocos:
+            return pd.DataFrame(columns=['data', 'descricao', 'valor'])
+        return pd.concat(blocos, ignore_index=True)
+
+    @staticmethod
+    def processar_extrato_em_blocos(arquivo, banco, tamanho_bloco=None, validador=None):
+        """
+        Lê o extrato em blocos, lendo apenas as colunas mapeadas para o banco
+
+        Args:
+            validador: ValidadorImportacao que recebe as linhas inválidas
+                       (por omissão, quarentena ao lado do arquivo)
+
+        Yields:
+            DataFrame: Bloco padronizado com as colunas data, descricao e valor
+        """
         config_banco = CONFIGURACOES['BANCOS'][banco]
-        
-        if arquivo.endswith('.xlsx'):
-            df = pd.read_excel(arquivo)
-        else:
-            df = pd.read_csv(arquivo, encoding='utf-8')
-            
-        # Padronização das colunas
-        df = df.rename(columns={
+        mapeamento = {
             config_banco['colunas'][0]: 'data',
             config_banco['colunas'][1]: 'descricao',
             config_banco['colunas'][2]: 'valor'
-        })
-        
-        # Tratamento de data e valor
-        df['data'] = pd.to_datetime(df['data'])
-        df['valor'] = pd.to_numeric(df['valor'].astype(str).str.replace(',', '.'))
-        
-        return df[['data', 'descricao', 'valor']]
+        }
+        if config_banco.get('coluna_referencia'):
+            mapeamento[config_banco['coluna_referencia']] = 'referencia'
+        yield from ProcessadorBanco._ler_em_blocos(
+            arquivo, mapeamento, config_banco.get('formato_data'), tamanho_bloco, validador)
+
+    @staticmethod
+    def processar_livro(arquivo, validador=None):
+        blocos = list(ProcessadorBanco.processar_livro_em_blocos(arquivo, validador=validador))
+        if not blocos:
+            return pd.DataFrame(columns=['data', 'descricao', 'valor'])
+        return pd.concat(blocos, ignore_index=True)
+
+    @staticmethod
+    def processar_livro_em_blocos(arquivo, tamanho_bloco=None, validador=None):
+        """Lê o livro contábil em blocos com as colunas data, descricao e valor"""
+        config_livro = CONFIGURACOES['LIVRO']
+        mapeamento = {coluna: coluna for coluna in config_livro['colunas']}
+        yield from ProcessadorBanco._ler_em_blocos(
+            arquivo, mapeamento, config_livro.get('formato_data'), tamanho_bloco, validador)
+
+    @staticmethod
+    def _ler_em_blocos(arquivo, mapeamento, formato_data, tamanho_bloco, validador=None):
+        tamanho_bloco = tamanho_bloco or CONFIGURACOES['IMPORTACAO']['tamanho_bloco']
+        formato_data = formato_data or '%d/%m/%Y'
+        if validador is None:
+            validador = ValidadorImportacao(ValidadorImportacao.arquivo_quarentena_para(arquivo))
+
+        colunas = ['data', 'descricao', 'valor']
+        if 'referencia' in mapeamento.values():
+            colunas.append('referencia')
+
+        for bruto in ProcessadorBanco._ler_blocos_brutos(arquivo, mapeamento, tamanho_bloco):
+            # Linhas inválidas vão para a quarentena em vez de interromper a importação
+            convertido = converter_bloco(bruto, formato_data)
+            validos = validador.validar(bruto, convertido)
+            if len(validos):
+                yield validos[colunas]
+
+    @staticmethod
+    def _ler_blocos_brutos(arquivo, mapeamento, tamanho_bloco):
+        """Lê os blocos sem conversão, com as colunas padronizadas e o número da linha"""
+        if arquivo.endswith('.xlsx') and OPENPYXL_DISPONIVEL:
+            leitor = LeitorXlsxStreaming(arquivo, mapeamento, tamanho_bloco)
+            yield from leitor.ler_blocos_brutos()
+            return
+
+        if arquivo.endswith('.xlsx'):
+            blocos = [pd.read_excel(arquivo, usecols=list(mapeamento), dtype=object)]
+        else:
+            blocos = pd.read_csv(arquivo, encoding='utf-8', usecols=list(mapeamento),
+                                 dtype=str, chunksize=tamanho_bloco)
+
+        for df in blocos:
+            # Padronização das colunas
+            df = df.rename(columns=mapeamento)
+            # Número da linha no arquivo (a linha 1 é o cabeçalho)
+            df['linha'] = df.index + 2
+            yield df
@@ -0,0 +1,61 @@
+"""
+Compara os totais diários banco/livro calculados com um filtro por dia (como
+antes nos relatórios e no dashboard) e com comparar_por_periodo (um group-by
+por origem e junção pelas datas).
+
+Uso:
+    python benchmarks/bench_agregacoes.py [numero_linhas] [numero_dias]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agregacoes import comparar_por_periodo
+
+
+def criar_dados(numero_linhas, numero_dias):
+    rng = np.random.default_rng(42)
+    banco = pd.DataFrame({
+        'data': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, numero_dias, numero_linhas), 'D'),
+        'descricao': 'Movimento',
+        'valor': rng.integers(-100000, 100000, numero_linhas) / 100
+    })
+    livro = banco.sample(frac=0.95, random_state=42)
+    return banco, livro
+
+
+def filtro_por_dia(banco, livro):
+    linhas = []
+    for data in sorted(set(banco['data'].dt.date)):
+        banco_dia = banco[banco['data'].dt.date == data]['valor'].sum()
+        livro_dia = livro[livro['data'].dt.date == data]['valor'].sum()
+        linhas.append((data, banco_dia, livro_dia))
+    return linhas
+
+
+def main():
+    numero_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    numero_dias = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    banco, livro = criar_dados(numero_linhas, numero_dias)
+
+    inicio = time.perf_counter()
+    antes = filtro_por_dia(banco, livro)
+    tempo_filtro = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    depois = comparar_por_periodo(banco, livro, 'D')
+    tempo_agregado = time.perf_counter() - inicio
+
+    iguais = np.allclose([banco_dia for _, banco_dia, _ in antes], depois['banco'].to_numpy())
+    print(f"{numero_linhas} linhas, {numero_dias} dias (resultados iguais: {'sim' if iguais else 'não'})")
+    print(f"{'filtro por dia':<22}{tempo_filtro:>8.3f} s")
+    print(f"{'comparar_por_periodo':<22}{tempo_agregado:>8.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,69 @@
+"""
+Mede o tempo até ContabilidadeAvancada ficar disponível (a janela pode abrir)
+com o carregamento síncrono e com o carregamento em segundo plano, e o tempo
+até os lançamentos estarem prontos.
+
+Uso:
+    python benchmarks/bench_arranque_contabilidade.py [numero_lancamentos]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contabilidade import ContabilidadeAvancada
+from diario_contabil import ORJSON_DISPONIVEL, gravar_snapshot
+
+
+def criar_snapshot(numero_lancamentos):
+    data_base = datetime(2023, 1, 1)
+    lancamentos = []
+    for i in range(numero_lancamentos):
+        valor = float((i % 1000) + 1)
+        lancamentos.append({
+            'id': f"L{i + 1}",
+            'data': data_base + timedelta(days=i % 365),
+            'descricao': f"Lançamento {i}",
+            'origem': 'MANUAL',
+            'movimentos': [
+                {'conta': '62', 'debito': valor, 'credito': 0},
+                {'conta': '43', 'debito': 0, 'credito': valor}
+            ]
+        })
+    gravar_snapshot('lancamentos_contabeis.json', lancamentos)
+    # Índice de impressões já existente, como numa instalação em uso
+    ContabilidadeAvancada()
+
+
+def medir(em_segundo_plano):
+    inicio = time.perf_counter()
+    contabilidade = ContabilidadeAvancada(carregar_em_segundo_plano=em_segundo_plano)
+    disponivel = time.perf_counter() - inicio
+    total = len(contabilidade.lancamentos)
+    pronto = time.perf_counter() - inicio
+    return disponivel, pronto, total
+
+
+def main():
+    numero_lancamentos = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            criar_snapshot(numero_lancamentos)
+            resultados = [("síncrono",) + medir(False), ("segundo plano",) + medir(True)]
+        finally:
+            os.chdir(diretorio_original)
+
+    print(f"{numero_lancamentos} lançamentos (orjson: {'sim' if ORJSON_DISPONIVEL else 'não'})")
+    print(f"{'carregamento':<16}{'disponível':>12}{'pronto':>10}")
+    for nome, disponivel, pronto, _ in resultados:
+        print(f"{nome:<16}{disponivel:>10.3f} s{pronto:>8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,58 @@
+"""
+Mede o tempo da exportação do livro razão de um ano completo em CSV, XLSX
+(openpyxl em modo write-only) e Parquet, comparado com o PDF.
+
+Uso:
+    python benchmarks/bench_exportacao_tabular.py [numero_lancamentos]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contabilidade import ContabilidadeAvancada
+
+
+def criar_contabilidade(numero_lancamentos):
+    contabilidade = ContabilidadeAvancada()
+    data_base = datetime(2024, 1, 1)
+    with contabilidade.lote():
+        for i in range(numero_lancamentos):
+            valor = float((i % 1000) + 1)
+            contabilidade.registrar_lancamento(
+                data_base + timedelta(days=i % 366),
+                f"Venda {i}",
+                [{'conta': '45', 'debito': valor, 'credito': 0},
+                 {'conta': '71', 'debito': 0, 'credito': valor}])
+    return contabilidade
+
+
+def main():
+    numero_lancamentos = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    inicio_ano, fim_ano = datetime(2024, 1, 1), datetime(2024, 12, 31)
+
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            contabilidade = criar_contabilidade(numero_lancamentos)
+            print(f"Livro razão de {numero_lancamentos} lançamentos ({2 * numero_lancamentos} movimentos)")
+            print(f"{'formato':<10}{'tempo':>10}{'tamanho':>12}")
+            for formato in ('csv', 'xlsx', 'parquet', 'pdf'):
+                caminho = os.path.join(diretorio, f"razao.{formato}")
+                inicio = time.perf_counter()
+                if formato == 'pdf':
+                    contabilidade.gerar_livro_razao(inicio_ano, fim_ano, caminho)
+                else:
+                    contabilidade.exportar_relatorio('livro_razao', caminho, inicio_ano, fim_ano)
+                segundos = time.perf_counter() - inicio
+                print(f"{formato:<10}{segundos:>8.2f} s{os.path.getsize(caminho) / 2**20:>9.1f} MB")
+        finally:
+            os.chdir(diretorio_original)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,110 @@
+"""
+Compara o tempo em que a thread da interface fica ocupada a abrir os gráficos
+do dashboard: antes, dados preparados e figuras desenhadas na própria thread;
+agora, pedidos submetidos à thread de desenho (graficos_assincronos), com os
+PNG guardados em cache por impressão dos dados e tamanho.
+
+Uso:
+    python benchmarks/bench_graficos_assincronos.py [numero_linhas] [numero_dias]
+"""
+import os
+import queue
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from agregacoes import comparar_por_periodo
+from dashboard import DashboardAvancado
+from graficos_assincronos import PedidoGrafico, RenderizadorGraficos
+
+LARGURA, ALTURA, DPI = 1180, 720, 100
+
+
+class DashboardSemJanela(DashboardAvancado):
+    """Dashboard só com os dados e as funções de desenho (sem Tk)"""
+
+    def __init__(self, dados_banco, dados_livro):
+        self.dados_banco = dados_banco
+        self.dados_livro = dados_livro
+        self._comparativo_diario = None
+        self._impressao = None
+
+    def graficos(self):
+        totais = (self.dados_banco['valor'].sum(), self.dados_livro['valor'].sum())
+        return [
+            ('dashboard_visao_geral', self.desenhar_visao_geral, lambda: totais),
+            ('dashboard_tendencias', self.desenhar_tendencias, lambda: self.comparativo_diario),
+            ('dashboard_comparativo', self.desenhar_comparativo, lambda: self.comparativo_diario)
+        ]
+
+
+def criar_dados(numero_linhas, numero_dias):
+    rng = np.random.default_rng(42)
+    banco = pd.DataFrame({
+        'data': pd.Timestamp('2024-01-01') + pd.to_timedelta(rng.integers(0, numero_dias, numero_linhas), 'D'),
+        'descricao': 'Movimento',
+        'valor': rng.integers(-100000, 100000, numero_linhas) / 100
+    })
+    livro = banco.sample(frac=0.95, random_state=42)
+    return banco, livro
+
+
+def na_thread_da_interface(banco, livro):
+    """Como antes: tudo na thread que chama (a do Tk)"""
+    dashboard = DashboardSemJanela(banco, livro)
+    dashboard._comparativo_diario = comparar_por_periodo(banco, livro, 'D')
+    for _, desenhar, preparar in dashboard.graficos():
+        figura = Figure(figsize=(LARGURA / DPI, ALTURA / DPI), dpi=DPI)
+        canvas = FigureCanvasAgg(figura)
+        desenhar(figura, preparar())
+        canvas.draw()
+
+
+def em_segundo_plano(renderizador, banco, livro):
+    """
+    Returns:
+        tuple: (tempo na thread que submete, tempo até os gráficos estarem prontos)
+    """
+    dashboard = DashboardSemJanela(banco, livro)
+    respostas = queue.Queue()
+    inicio = time.perf_counter()
+    graficos = dashboard.graficos()
+    for nome, desenhar, preparar in graficos:
+        renderizador.submeter(PedidoGrafico(nome, desenhar, preparar, dashboard.impressao,
+                                            LARGURA, ALTURA, DPI, respostas, lambda: True))
+    tempo_submeter = time.perf_counter() - inicio
+    for _ in graficos:
+        pedido, tipo, valor = respostas.get()
+        assert tipo == 'png', valor
+    return tempo_submeter, time.perf_counter() - inicio
+
+
+def main():
+    numero_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    numero_dias = int(sys.argv[2]) if len(sys.argv) > 2 else 90
+    banco, livro = criar_dados(numero_linhas, numero_dias)
+
+    inicio = time.perf_counter()
+    na_thread_da_interface(banco, livro)
+    tempo_antes = time.perf_counter() - inicio
+
+    renderizador = RenderizadorGraficos(dpi=DPI)
+    submeter_1, prontos_1 = em_segundo_plano(renderizador, banco, livro)
+    submeter_2, prontos_2 = em_segundo_plano(renderizador, banco, livro)
+
+    print(f"{numero_linhas} linhas, {numero_dias} dias, 3 gráficos {LARGURA}x{ALTURA}")
+    print(f"{'':<28}{'thread da interface':>20}{'gráficos prontos':>18}")
+    print(f"{'antes (síncrono)':<28}{tempo_antes:>18.3f} s{tempo_antes:>16.3f} s")
+    print(f"{'thread de desenho':<28}{submeter_1:>18.3f} s{prontos_1:>16.3f} s")
+    print(f"{'thread de desenho (cache)':<28}{submeter_2:>18.3f} s{prontos_2:>16.3f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,99 @@
+"""
+Compara a importação de extratos XLSX com pd.read_excel e com a leitura
+em streaming (LeitorXlsxStreaming).
+
+Uso:
+    python benchmarks/bench_importacao_xlsx.py [numero_linhas]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+import pandas as pd
+from openpyxl import Workbook
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from config import CONFIGURACOES
+from banco_processor import ProcessadorBanco
+
+
+def gerar_planilha(caminho, numero_linhas, banco='BAI'):
+    """Gera um extrato sintético com colunas extra que não são mapeadas"""
+    colunas = CONFIGURACOES['BANCOS'][banco]['colunas']
+    # Modo normal para gravar com sharedStrings, como nas exportações dos bancos
+    livro = Workbook()
+    folha = livro.active
+    folha.append(['Referência', colunas[0], 'Balcão', colunas[1], colunas[2], 'Saldo'])
+
+    descricoes = ["Transferência recebida", "Pagamento fornecedor", "Pagamento salários",
+                  "Recebimento vendas", "Pagamento impostos", "Comissão de manutenção"]
+    data_base = datetime(2023, 1, 1)
+    for i in range(numero_linhas):
+        data = data_base + timedelta(days=i % 365)
+        folha.append([
+            f"REF{i:08d}",
+            data.strftime('%d/%m/%Y'),
+            "0001",
+            descricoes[i % len(descricoes)],
+            f"{(i % 1000) * 125.5:.2f}",
+            0
+        ])
+    livro.save(caminho)
+
+
+def importar_read_excel(caminho, banco='BAI'):
+    """Caminho anterior: workbook inteiro em memória"""
+    config_banco = CONFIGURACOES['BANCOS'][banco]
+    df = pd.read_excel(caminho)
+    df = df.rename(columns={
+        config_banco['colunas'][0]: 'data',
+        config_banco['colunas'][1]: 'descricao',
+        config_banco['colunas'][2]: 'valor'
+    })
+    df['data'] = pd.to_datetime(df['data'], format=config_banco['formato_data'])
+    df['valor'] = pd.to_numeric(df['valor'].astype(str).str.replace(',', '.'))
+    return df[['data', 'descricao', 'valor']]
+
+
+def importar_streaming(caminho, banco='BAI'):
+    return ProcessadorBanco.processar_extrato(caminho, banco)
+
+
+def medir(funcao, *args):
+    """Mede o tempo e, numa segunda execução (o tracemalloc distorce o tempo), o pico de memória"""
+    inicio = time.perf_counter()
+    resultado = funcao(*args)
+    duracao = time.perf_counter() - inicio
+
+    tracemalloc.start()
+    funcao(*args)
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return resultado, duracao, pico / (1024 * 1024)
+
+
+def main():
+    numero_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, 'extrato.xlsx')
+        print(f"Gerando planilha com {numero_linhas} linhas...")
+        gerar_planilha(caminho, numero_linhas)
+
+        df_antigo, tempo_antigo, memoria_antiga = medir(importar_read_excel, caminho)
+        df_novo, tempo_novo, memoria_nova = medir(importar_streaming, caminho)
+
+        assert len(df_antigo) == len(df_novo)
+        assert abs(df_antigo['valor'].sum() - df_novo['valor'].sum()) < 0.01
+
+        print(f"{'Método':<20}{'Tempo (s)':>12}{'Pico (MB)':>12}")
+        print(f"{'pd.read_excel':<20}{tempo_antigo:>12.2f}{memoria_antiga:>12.1f}")
+        print(f"{'streaming':<20}{tempo_novo:>12.2f}{memoria_nova:>12.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Mede o tempo e o pico de memória da composição do livro razão de uma conta
+muito movimentada: uma única tabela ReportLab com todos os movimentos (como
+antes) e LivroRazaoPDF, página a página com saldos a transportar.
+
+Uso:
+    python benchmarks/bench_livro_razao.py [numero_movimentos ...]
+"""
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.platypus import SimpleDocTemplate, Table
+
+from livro_razao_pdf import CABECALHO, LARGURAS, LivroRazaoPDF
+
+
+def movimentos(numero_movimentos):
+    data_base = datetime(2024, 1, 1)
+    for i in range(numero_movimentos):
+        valor = float((i % 1000) + 1)
+        yield {
+            'data': data_base + timedelta(minutes=i),
+            'descricao': f"Transferência {i}",
+            'lancamento_id': f"L{i + 1}",
+            'debito': valor if i % 2 else 0.0,
+            'credito': 0.0 if i % 2 else valor
+        }
+
+
+def tabela_unica(caminho, numero_movimentos):
+    dados = [CABECALHO]
+    saldo = 0
+    for movimento in movimentos(numero_movimentos):
+        saldo += movimento['debito'] - movimento['credito']
+        dados.append([movimento['data'].strftime('%d/%m/%Y'), movimento['descricao'],
+                      movimento['lancamento_id'], f"Kz {movimento['debito']:,.2f}",
+                      f"Kz {movimento['credito']:,.2f}", f"Kz {saldo:,.2f}"])
+    doc = SimpleDocTemplate(caminho, pagesize=A4, leftMargin=1*cm, rightMargin=1*cm)
+    doc.build([Table(dados, colWidths=LARGURAS)])
+
+
+def paginado(caminho, numero_movimentos):
+    livro = LivroRazaoPDF(caminho, datetime(2024, 1, 1), datetime(2024, 12, 31))
+    livro.escrever_conta('43', "Depósitos à Ordem", movimentos(numero_movimentos))
+    livro.fechar()
+
+
+def medir(funcao, caminho, numero_movimentos):
+    tracemalloc.start()
+    inicio = time.perf_counter()
+    funcao(caminho, numero_movimentos)
+    segundos = time.perf_counter() - inicio
+    _, pico = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return segundos, pico / 2**20
+
+
+def main():
+    tamanhos = [int(n) for n in sys.argv[1:]] or [1000, 2000, 4000]
+
+    print(f"{'movimentos':>10}{'tabela única':>24}{'página a página':>24}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for numero_movimentos in tamanhos:
+            resultados = []
+            for nome, funcao in (('unica', tabela_unica), ('paginado', paginado)):
+                caminho = os.path.join(diretorio, f"{nome}_{numero_movimentos}.pdf")
+                resultados.append(medir(funcao, caminho, numero_movimentos))
+            print(f"{numero_movimentos:>10}" +
+                  "".join(f"{segundos:>10.2f} s {pico:>8.1f} MB" for segundos, pico in resultados))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,60 @@
+"""
+Compara o registo de lançamentos manuais um a um (uma gravação por
+lançamento) com o registo dentro de contabilidade.lote() (uma gravação).
+
+Uso:
+    python benchmarks/bench_lote_lancamentos.py [numero_lancamentos]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contabilidade import ContabilidadeAvancada
+
+
+def registrar(contabilidade, numero_lancamentos):
+    data_base = datetime(2023, 1, 1)
+    for i in range(numero_lancamentos):
+        valor = float((i % 1000) + 1)
+        contabilidade.registrar_lancamento(
+            data_base + timedelta(days=i % 365),
+            f"Lançamento manual {i}",
+            [{'conta': '62', 'debito': valor, 'credito': 0},
+             {'conta': '43', 'debito': 0, 'credito': valor}]
+        )
+
+
+def medir(numero_lancamentos, em_lote):
+    diretorio_original = os.getcwd()
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        try:
+            contabilidade = ContabilidadeAvancada()
+            inicio = time.perf_counter()
+            if em_lote:
+                with contabilidade.lote():
+                    registrar(contabilidade, numero_lancamentos)
+            else:
+                registrar(contabilidade, numero_lancamentos)
+            return time.perf_counter() - inicio
+        finally:
+            os.chdir(diretorio_original)
+
+
+def main():
+    numero_lancamentos = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+
+    tempo_individual = medir(numero_lancamentos, em_lote=False)
+    tempo_lote = medir(numero_lancamentos, em_lote=True)
+
+    print(f"{numero_lancamentos} lançamentos")
+    print(f"{'um a um':<12}{tempo_individual:>10.2f} s")
+    print(f"{'lote()':<12}{tempo_lote:>10.2f} s")
+
+
+if __name__ == '__main__':
+    main()
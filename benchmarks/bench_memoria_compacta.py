@@ -0,0 +1,71 @@
+"""
+Compara a memória ocupada por um extrato no formato original (datas completas,
+descrições como objetos str, valores float) e no formato compacto
+(dias int32, centavos int64, descrições categóricas).
+
+Uso:
+    python benchmarks/bench_memoria_compacta.py [numero_linhas]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tipos_compactos import compactar_extrato, expandir_extrato
+
+
+def gerar_extrato(numero_linhas):
+    """Extrato sintético com descrições repetitivas, como ordens permanentes e comissões"""
+    rng = np.random.default_rng(42)
+    descricoes = np.array(
+        [f"Transferência recebida cliente {i:04d}" for i in range(2000)] +
+        ["Comissão de manutenção", "Imposto de selo", "Pagamento salários",
+         "Ordem permanente renda", "Pagamento fornecedor"], dtype=object)
+    return pd.DataFrame({
+        'data': pd.Timestamp('2023-01-01') + pd.to_timedelta(
+            rng.integers(0, 365, numero_linhas), unit='D'),
+        'descricao': pd.Series(descricoes[rng.integers(0, len(descricoes), numero_linhas)],
+                               dtype=object),
+        'valor': np.round(rng.uniform(-500000, 500000, numero_linhas), 2)
+    })
+
+
+def memoria_mb(df):
+    return df.memory_usage(deep=True).sum() / (1024 * 1024)
+
+
+def main():
+    numero_linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+
+    print(f"Gerando extrato com {numero_linhas} linhas...")
+    original = gerar_extrato(numero_linhas)
+
+    inicio = time.perf_counter()
+    compacto = compactar_extrato(original)
+    tempo_compactar = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    vista = expandir_extrato(compacto)
+    tempo_expandir = time.perf_counter() - inicio
+
+    assert (vista['valor'].to_numpy() == original['valor'].to_numpy()).all()
+    assert (vista['data'].to_numpy() == original['data'].to_numpy()).all()
+
+    # A vista só existe enquanto é usada (não fica em cache) e partilha a coluna
+    # categórica: só datas e valores são materializados
+    memoria_vista = (vista['data'].memory_usage(index=False) +
+                     vista['valor'].memory_usage(index=False)) / (1024 * 1024)
+
+    print(f"{'Formato':<28}{'Memória (MB)':>14}")
+    print(f"{'original (object)':<28}{memoria_mb(original):>14.1f}")
+    print(f"{'compacto':<28}{memoria_mb(compacto):>14.1f}")
+    print(f"{'compacto + vista temporária':<28}{memoria_mb(compacto) + memoria_vista:>14.1f}")
+    print(f"Compactar: {tempo_compactar:.2f} s; expandir: {tempo_expandir:.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,67 @@
+"""
+Gera o fecho mensal de um ano (balanço, DRE, livro razão e fluxos de caixa,
+12 meses) para várias entidades com GeradorRelatoriosLote, com um processo e
+com o pool completo, e compara os tempos.
+
+Uso:
+    python benchmarks/bench_relatorios_lote.py [numero_lancamentos] [numero_entidades]
+"""
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from contabilidade import ContabilidadeAvancada
+from relatorios_lote import GeradorRelatoriosLote, especificacoes_mensais
+
+
+def criar_entidade(diretorio, numero_lancamentos):
+    os.makedirs(diretorio)
+    diretorio_original = os.getcwd()
+    os.chdir(diretorio)
+    try:
+        contabilidade = ContabilidadeAvancada()
+        data_base = datetime(2024, 1, 1)
+        with contabilidade.lote():
+            for i in range(numero_lancamentos):
+                valor = float((i % 1000) + 1)
+                contabilidade.registrar_lancamento(
+                    data_base + timedelta(days=i % 366),
+                    f"Venda {i}",
+                    [{'conta': '45', 'debito': valor, 'credito': 0},
+                     {'conta': '71', 'debito': 0, 'credito': valor}])
+    finally:
+        os.chdir(diretorio_original)
+
+
+def medir(especificacoes, diretorio_saida, processos):
+    gerador = GeradorRelatoriosLote(diretorio_saida, processos=processos)
+    inicio = time.perf_counter()
+    itens = gerador.executar(especificacoes)
+    return time.perf_counter() - inicio, sum(item['sucesso'] for item in itens), gerador.processos
+
+
+def main():
+    numero_lancamentos = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    numero_entidades = int(sys.argv[2]) if len(sys.argv) > 2 else 3
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        entidades = [os.path.join(diretorio, f"empresa_{i + 1}") for i in range(numero_entidades)]
+        for entidade in entidades:
+            criar_entidade(entidade, numero_lancamentos)
+        especificacoes = especificacoes_mensais(2024, entidades=entidades)
+
+        resultados = [medir(especificacoes, os.path.join(diretorio, 'saida_1'), 1),
+                      medir(especificacoes, os.path.join(diretorio, 'saida_n'), None)]
+
+    print(f"{len(especificacoes)} relatórios, {numero_entidades} entidades x {numero_lancamentos} lançamentos")
+    print(f"{'processos':<12}{'gerados':>10}{'tempo':>10}")
+    for segundos, gerados, processos in resultados:
+        print(f"{processos:<12}{gerados:>10}{segundos:>8.2f} s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,107 @@
+"""
+Mede o custo de preparar os estilos dos relatórios (folha de estilos de
+parágrafo e estilos de tabela) construídos em cada relatório, como antes,
+e obtidos do tema partilhado (tema_relatorios), e o tempo de um lote de
+demonstrações financeiras (DRE, balanço e RAÇU de cada mês).
+
+Uso:
+    python benchmarks/bench_tema_relatorios.py [numero_lancamentos] [numero_meses]
+"""
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import TableStyle
+
+from tema_relatorios import estilo_secao, estilo_total, estilo_valores, estilos
+
+CONTAS = ['11', '12', '18', '21', '22', '31', '32', '33', '34', '36', '37', '41', '43', '45',
+          '51', '55', '61', '62', '63', '64', '66', '71', '72', '75']
+
+
+def estilos_por_relatorio():
+    """Preparação de estilos como era feita no início de cada relatório"""
+    getSampleStyleSheet()
+    for _ in range(4):
+        TableStyle([
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, 0), 12),
+            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
+            ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -1), 1, colors.black)
+        ])
+
+
+def estilos_partilhados():
+    estilos()
+    for _ in range(4):
+        estilo_secao()
+    estilo_valores()
+    estilo_total()
+
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return time.perf_counter() - inicio
+
+
+def criar_contabilidade(numero_lancamentos):
+    from contabilidade import ContabilidadeAvancada
+
+    random.seed(42)
+    contabilidade = ContabilidadeAvancada()
+    with contabilidade.lote():
+        for i in range(numero_lancamentos):
+            valor = round(random.random() * 1000, 2)
+            data = datetime(2024, 1, 1) + timedelta(days=random.randint(0, 365))
+            contabilidade.registrar_lancamento(data, f"Operação {i}", [
+                {'conta': random.choice(CONTAS), 'debito': valor, 'credito': 0},
+                {'conta': random.choice(CONTAS), 'debito': 0, 'credito': valor}
+            ])
+    return contabilidade
+
+
+def main():
+    numero_lancamentos = int(sys.argv[1]) if len(sys.argv) > 1 else 3000
+    numero_meses = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+    repeticoes = numero_meses * 3
+
+    tempo_antes = medir(estilos_por_relatorio, repeticoes)
+    tempo_depois = medir(estilos_partilhados, repeticoes)
+    print(f"Preparação de estilos para {repeticoes} relatórios")
+    print(f"{'por relatório':<22}{tempo_antes:>8.3f} s")
+    print(f"{'tema partilhado':<22}{tempo_depois:>8.3f} s")
+
+    with tempfile.TemporaryDirectory() as diretorio:
+        os.chdir(diretorio)
+        contabilidade = criar_contabilidade(numero_lancamentos)
+        inicio = time.perf_counter()
+        for mes in range(1, numero_meses + 1):
+            data_inicio = datetime(2024, mes, 1)
+            data_fim = (datetime(2024, mes + 1, 1) if mes < 12 else datetime(2025, 1, 1)) - timedelta(days=1)
+            contabilidade.gerar_dre(data_inicio, data_fim, os.path.join(diretorio, f"dre_{mes}.pdf"))
+            contabilidade.gerar_balanco_patrimonial(data_fim, os.path.join(diretorio, f"balanco_{mes}.pdf"))
+            contabilidade.gerar_racu(2024, os.path.join(diretorio, f"racu_{mes}.pdf"))
+        tempo_lote = time.perf_counter() - inicio
+        os.chdir(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+    print(f"Lote de {repeticoes} PDFs ({numero_lancamentos} lançamentos): {tempo_lote:.3f} s "
+          f"(estilos por relatório seriam {100 * tempo_antes / tempo_lote:.1f}% do lote)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,190 @@
+import hashlib
+import json
+import os
+import shutil
+import time
+from collections import OrderedDict
+
+from config import CONFIGURACOES
+
+
+class CacheRelatorios:
+    """
+    Cache em disco dos PDF gerados. A chave é o SHA-256 do tipo de relatório,
+    dos parâmetros e da impressão da fatia dos dados de que o relatório
+    depende (número de movimentos, maior posição de lançamento e soma de
+    verificação dos movimentos do período): um pedido igual sobre dados
+    iguais devolve o PDF guardado sem o voltar a compor.
+
+    O tamanho total é limitado; quando é ultrapassado são removidos os
+    relatórios usados há mais tempo. Lançamentos com data anterior ao fim de
+    períodos já guardados (lançamentos retroativos) invalidam esses relatórios.
+
+    As leituras (obter) só atualizam a ordem de uso em memória; o índice é
+    gravado por guardar, invalidar_desde, limpar e fechar, e uma leitura
+    nunca escreve no disco.
+    """
+
+    ARQUIVO_INDICE = 'indice.json'
+
+    def __init__(self, diretorio=None, limite_mb=None):
+        """
+        Args:
+            diretorio: Diretório da cache (por omissão o de CONFIGURACOES['CACHE_RELATORIOS']);
+                um caminho relativo é resolvido já, a partir do diretório atual
+            limite_mb: Tamanho máximo da cache em MB
+        """
+        configuracao = CONFIGURACOES['CACHE_RELATORIOS']
+        self.diretorio = os.path.abspath(diretorio or configuracao['diretorio'])
+        self.limite_bytes = int((limite_mb or configuracao['limite_mb']) * 2**20)
+        self.arquivo_indice = os.path.join(self.diretorio, self.ARQUIVO_INDICE)
+        self.entradas = OrderedDict()  # chave -> {'arquivo', 'tamanho', 'tipo', 'data_fim'}, do menos ao mais recente
+        self._data_fim_maxima = None   # 'AAAA-MM-DD' do período mais recente guardado
+        self._indice_alterado = False  # Ordem de uso mudada por leituras e ainda não gravada
+        self.carregar()
+
+    def carregar(self):
+        """Lê o índice da cache, ignorando entradas cujo arquivo já não existe"""
+        self.entradas = OrderedDict()
+        if not os.path.exists(self.arquivo_indice):
+            return
+        try:
+            with open(self.arquivo_indice, 'r', encoding='utf-8') as f:
+                entradas = json.load(f)
+            for chave, entrada in entradas:
+                if os.path.exists(os.path.join(self.diretorio, entrada['arquivo'])):
+                    self.entradas[chave] = entrada
+        except Exception as e:
+            print(f"Erro ao carregar cache de relatórios: {str(e)}")
+        self._atualizar_data_fim_maxima()
+
+    def _atualizar_data_fim_maxima(self):
+        self._data_fim_maxima = max((entrada['data_fim'] for entrada in self.entradas.values()), default=None)
+
+    def salvar(self):
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            temporario = self.arquivo_indice + '.tmp'
+            with open(temporario, 'w', encoding='utf-8') as f:
+                json.dump(list(self.entradas.items()), f, ensure_ascii=False)
+            os.replace(temporario, self.arquivo_indice)
+            self._indice_alterado = False
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar cache de relatórios: {str(e)}")
+            return False
+
+    @staticmethod
+    def chave(tipo, parametros, impressao):
+        """
+        Chave de um relatório
+
+        Args:
+            tipo: Tipo de relatório ('balanco', 'dre', ...)
+            parametros: Parâmetros do relatório (serializáveis; datas em ISO)
+            impressao: Impressão da fatia de dados de que o relatório depende
+
+        Returns:
+            str: SHA-256 em hexadecimal
+        """
+        conteudo = json.dumps([tipo, parametros, impressao], sort_keys=True, default=str)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+
+    def obter(self, chave):
+        """Caminho do PDF guardado com esta chave, ou None (sem gravar o índice)"""
+        entrada = self.entradas.get(chave)
+        if entrada is None:
+            return None
+        caminho = os.path.join(self.diretorio, entrada['arquivo'])
+        if not os.path.exists(caminho):
+            del self.entradas[chave]
+        else:
+            self.entradas.move_to_end(chave)
+            entrada['ultimo_acesso'] = time.time()
+        self._indice_alterado = True
+        return caminho if chave in self.entradas else None
+
+    def fechar(self):
+        """Grava a ordem de uso acumulada pelas leituras, se mudou desde a última gravação"""
+        if not self._indice_alterado:
+            return True
+        return self.salvar()
+
+    def copiar(self, chave, caminho_saida):
+        """Copia o PDF guardado para caminho_saida; devolve False se não estiver na cache"""
+        caminho = self.obter(chave)
+        if caminho is None:
+            return False
+        if os.path.abspath(caminho) != os.path.abspath(caminho_saida):
+            shutil.copyfile(caminho, caminho_saida)
+        return True
+
+    def guardar(self, chave, caminho_gerado, tipo, data_fim):
+        """
+        Guarda uma cópia de um PDF acabado de gerar
+
+        Args:
+            chave: Chave do relatório (ver chave())
+            caminho_gerado: PDF gerado
+            tipo: Tipo de relatório
+            data_fim: Última data do período de que o relatório depende
+        """
+        try:
+            os.makedirs(self.diretorio, exist_ok=True)
+            arquivo = f"{chave}.pdf"
+            shutil.copyfile(caminho_gerado, os.path.join(self.diretorio, arquivo))
+            self.entradas[chave] = {
+                'arquivo': arquivo,
+                'tamanho': os.path.getsize(caminho_gerado),
+                'tipo': tipo,
+                'data_fim': data_fim.strftime('%Y-%m-%d'),
+                'ultimo_acesso': time.time()
+            }
+            self.entradas.move_to_end(chave)
+            self._respeitar_limite()
+            self._atualizar_data_fim_maxima()
+            return self.salvar()
+        except Exception as e:
+            print(f"Erro ao guardar relatório na cache: {str(e)}")
+            return False
+
+    def _respeitar_limite(self):
+        """Remove os relatórios usados há mais tempo até o total caber no limite"""
+        total = sum(entrada['tamanho'] for entrada in self.entradas.values())
+        while total > self.limite_bytes and len(self.entradas) > 1:
+            chave, entrada = self.entradas.popitem(last=False)
+            total -= entrada['tamanho']
+            self._remover_arquivo(entrada)
+
+    def _remover_arquivo(self, entrada):
+        try:
+            os.remove(os.path.join(self.diretorio, entrada['arquivo']))
+        except OSError:
+            pass
+
+    def invalidar_desde(self, data):
+        """
+        Remove os relatórios cujo período termina em `data` ou depois (um
+        lançamento com esta data altera-os)
+
+        Returns:
+            int: Número de relatórios removidos
+        """
+        limite = data.strftime('%Y-%m-%d')
+        if self._data_fim_maxima is None or limite > self._data_fim_maxima:
+            return 0
+        removidas = [chave for chave, entrada in self.entradas.items() if entrada['data_fim'] >= limite]
+        for chave in removidas:
+            self._remover_arquivo(self.entradas.pop(chave))
+        self._atualizar_data_fim_maxima()
+        if removidas:
+            self.salvar()
+        return len(removidas)
+
+    def limpar(self):
+        """Remove todos os relatórios da cache"""
+        for entrada in self.entradas.values():
+            self._remover_arquivo(entrada)
+        self.entradas.clear()
+        self._data_fim_maxima = None
+        return self.salvar()
@@ -0,0 +1,179 @@
+import numpy as np
+
+from razao_colunar import dia_inteiro, limites_periodo
+
+
+def meses_de_dias(dias):
+    """Converte dias desde 1970-01-01 em meses desde 1970-01 (vetorizado)"""
+    return np.asarray(dias).astype('datetime64[D]').astype('datetime64[M]').astype(np.int64)
+
+
+def mes_de_data(data):
+    return (data.year - 1970) * 12 + data.month - 1
+
+
+class CacheSaldosMensais:
+    """
+    Movimento líquido por (mês, conta), mantido de forma incremental a partir
+    do razão colunar. Os saldos até uma data são a soma acumulada dos meses
+    completos (prefixos calculados só quando pedidos) mais o mês parcial, lido
+    diretamente do razão colunar.
+
+    Quando chega um lançamento com data anterior (ou um lançamento é alterado
+    ou removido), só os prefixos a partir desse mês são invalidados.
+    """
+
+    def __init__(self, razao):
+        """
+        Args:
+            razao: RazaoColunar de onde vêm os movimentos
+        """
+        self.razao = razao
+        razao.ouvintes.append(self)
+        self.razao_reorganizada()
+
+    def razao_reorganizada(self):
+        """Chamado pelo razão quando as posições das linhas mudam: reconstruir na próxima consulta"""
+        self.mes_inicial = None
+        self.movimento = np.zeros((0, 0), dtype=np.int64)  # centavos por (mês, conta)
+        self.contagem = np.zeros((0, 0), dtype=np.int64)   # número de movimentos por (mês, conta)
+        self.prefixo_movimento = self.movimento.copy()
+        self.prefixo_contagem = self.contagem.copy()
+        self.prefixos_validos = 0   # número de meses com prefixo atualizado
+        self.linhas_processadas = 0
+
+    def linhas_desativadas(self, linhas):
+        """Chamado pelo razão antes de desativar linhas (lançamentos alterados ou removidos)"""
+        linhas = linhas[linhas < self.linhas_processadas]
+        if len(linhas):
+            self._aplicar(linhas, -1)
+
+    def atualizar(self):
+        """Incorpora as linhas acrescentadas ao razão desde a última atualização"""
+        tamanho = self.razao.tamanho
+        if self.linhas_processadas < tamanho:
+            novas = np.arange(self.linhas_processadas, tamanho)
+            novas = novas[self.razao.ativo[novas]]
+            self.linhas_processadas = tamanho
+            if len(novas):
+                self._aplicar(novas, 1)
+
+    def _aplicar(self, linhas, sinal):
+        meses = meses_de_dias(self.razao.dia[linhas])
+        self._garantir_forma(int(meses.min()), int(meses.max()), len(self.razao.contas))
+
+        posicao_meses = meses - self.mes_inicial
+        contas = self.razao.conta[linhas]
+        liquido = self.razao.debito[linhas] - self.razao.credito[linhas]
+        np.add.at(self.movimento, (posicao_meses, contas), sinal * liquido)
+        np.add.at(self.contagem, (posicao_meses, contas), sinal)
+
+        # Invalidar os prefixos a partir do mês mais antigo alterado
+        self.prefixos_validos = min(self.prefixos_validos, int(posicao_meses.min()))
+
+    def _garantir_forma(self, mes_minimo, mes_maximo, total_contas):
+        if self.mes_inicial is None:
+            self.mes_inicial = mes_minimo
+
+        antes = max(0, self.mes_inicial - mes_minimo)
+        meses_atuais = self.movimento.shape[0]
+        depois = max(0, mes_maximo - (self.mes_inicial + meses_atuais - 1)) if meses_atuais else \
+            mes_maximo - self.mes_inicial + 1
+        colunas = max(0, total_contas - self.movimento.shape[1])
+        if not (antes or depois or colunas):
+            return
+
+        forma = (antes + meses_atuais + depois, self.movimento.shape[1] + colunas)
+        for nome in ('movimento', 'contagem'):
+            antigo = getattr(self, nome)
+            novo = np.zeros(forma, dtype=np.int64)
+            novo[antes:antes + antigo.shape[0], :antigo.shape[1]] = antigo
+            setattr(self, nome, novo)
+
+        self.mes_inicial -= antes
+        self.prefixo_movimento = np.zeros(forma, dtype=np.int64)
+        self.prefixo_contagem = np.zeros(forma, dtype=np.int64)
+        self.prefixos_validos = 0
+
+    def _prefixo_ate(self, posicao):
+        """Somas acumuladas até à posição de mês `posicao` (inclusive), calculando só o que falta"""
+        total_contas = self.movimento.shape[1]
+        if posicao < 0 or self.movimento.shape[0] == 0:
+            return np.zeros(total_contas, dtype=np.int64), np.zeros(total_contas, dtype=np.int64)
+        posicao = min(posicao, self.movimento.shape[0] - 1)
+
+        if self.prefixos_validos <= posicao:
+            inicio = self.prefixos_validos
+            for prefixo, base in ((self.prefixo_movimento, self.movimento),
+                                  (self.prefixo_contagem, self.contagem)):
+                np.cumsum(base[inicio:posicao + 1], axis=0, out=prefixo[inicio:posicao + 1])
+                if inicio > 0:
+                    prefixo[inicio:posicao + 1] += prefixo[inicio - 1]
+            self.prefixos_validos = posicao + 1
+
+        return self.prefixo_movimento[posicao], self.prefixo_contagem[posicao]
+
+    def _acumulado_antes(self, fim):
+        """
+        Saldos e contagens por código de conta desde o início até antes de
+        `fim` (início de um dia, exclusivo; None = até ao fim)
+        """
+        total_contas = len(self.razao.contas)
+        saldos = np.zeros(total_contas, dtype=np.int64)
+        contagens = np.zeros(total_contas, dtype=np.int64)
+        if self.mes_inicial is None:
+            return saldos, contagens
+
+        # Meses completos antes do mês de `fim`, mais os dias desse mês antes de `fim`
+        if fim is None:
+            posicao = self.movimento.shape[0] - 1
+            parcial = None
+        else:
+            posicao = mes_de_data(fim) - self.mes_inicial - 1
+            if fim.day == 1:
+                parcial = None
+            else:
+                # Mês parcial: lido diretamente do razão colunar
+                parcial = (dia_inteiro(fim.replace(day=1)), dia_inteiro(fim))
+
+        prefixo, contagem = self._prefixo_ate(posicao)
+        saldos[:len(prefixo)] += prefixo
+        contagens[:len(contagem)] += contagem
+
+        if parcial is not None:
+            n = self.razao.tamanho
+            dias = self.razao.dia[:n]
+            mascara = self.razao.ativo[:n] & (dias >= parcial[0]) & (dias < parcial[1])
+            codigos = self.razao.conta[:n][mascara]
+            liquido = self.razao.debito[:n][mascara] - self.razao.credito[:n][mascara]
+            saldos += np.rint(np.bincount(codigos, weights=liquido, minlength=total_contas)).astype(np.int64)
+            contagens += np.bincount(codigos, minlength=total_contas)
+
+        return saldos, contagens
+
+    def saldos(self, desde=None, ate=None, contas=None):
+        """
+        Saldo (débitos - créditos) de cada conta com movimentos no período
+
+        Args:
+            desde: Data inicial (inclusive), ou None
+            ate: Data final (inclusive), ou None
+            contas: Contas a considerar, ou None para todas
+
+        Returns:
+            dict: {conta: saldo}
+        """
+        self.atualizar()
+        inicio, fim = limites_periodo(desde, ate)
+        saldos, contagens = self._acumulado_antes(fim)
+        if inicio is not None:
+            saldos_antes, contagens_antes = self._acumulado_antes(inicio)
+            saldos -= saldos_antes
+            contagens -= contagens_antes
+
+        filtro = {str(c) for c in contas} if contas else None
+        return {
+            self.razao.contas[codigo]: int(saldos[codigo]) / 100
+            for codigo in np.flatnonzero(contagens > 0)
+            if filtro is None or self.razao.contas[codigo] in filtro
+        }
@@ -0,0 +1,144 @@
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from config import CONFIGURACOES
+
+# Regras usadas quando não existe arquivo de regras. Por ordem de prioridade:
+# a primeira regra com um termo presente na descrição define as duas contas.
+REGRAS_PADRAO = {
+    'regras': [
+        {'termos': ["VENDA", "RECEITA", "FATURAMENTO"], 'debito': "45", 'credito': "71"},
+        {'termos': ["TRANSFERÊNCIA", "TRANSFERENCIA", "TED", "DOC"], 'debito': "43", 'credito': "37"},
+        {'termos': ["SALÁRIO", "SALARIO", "FOLHA", "PAGAMENTO"], 'debito': "64", 'credito': "36"},
+        {'termos': ["COMPRA", "FORNECEDOR", "MERCADORIA"], 'debito': "21", 'credito': "32"},
+        {'termos': ["IMPOSTO", "TAXA", "TRIBUTO"], 'debito': "63", 'credito': "34"},
+        {'termos': ["ALUGUEL", "ENERGIA", "ÁGUA", "AGUA", "TELEFONE"], 'debito': "62", 'credito': "32"}
+    ],
+    # Depósitos à Ordem / Vendas
+    'padrao': {'debito': "43", 'credito': "71"}
+}
+
+
+class ClassificadorContas:
+    """
+    Classificação automática das contas de débito e crédito pela descrição.
+
+    As regras (termo -> contas) vêm de um arquivo JSON e são compiladas numa
+    única expressão regular com todos os termos, percorrida uma só vez por
+    descrição (em vez de um `termo in descricao` por termo e por conta). O
+    resultado de cada descrição distinta fica em cache.
+    """
+
+    LIMITE_CACHE = 100000
+
+    def __init__(self, arquivo_regras=None):
+        """
+        Args:
+            arquivo_regras: Arquivo JSON com {'regras': [...], 'padrao': {...}};
+                por omissão o indicado em CONFIGURACOES['CLASSIFICACAO']
+        """
+        self.arquivo_regras = arquivo_regras or CONFIGURACOES['CLASSIFICACAO']['arquivo_regras']
+        self.recarregar()
+
+    def recarregar(self):
+        """Lê as regras do arquivo (ou as regras padrão), compila-as e esvazia a cache"""
+        if not os.path.exists(self.arquivo_regras):
+            # Criar o arquivo com as regras padrão, para poder ser editado
+            self.compilar(REGRAS_PADRAO)
+            self.salvar_regras()
+            return
+
+        regras = REGRAS_PADRAO
+        try:
+            with open(self.arquivo_regras, 'r', encoding='utf-8') as f:
+                regras = json.load(f)
+        except Exception as e:
+            print(f"Erro ao carregar regras de classificação: {str(e)}")
+        self.compilar(regras)
+
+    def compilar(self, regras):
+        """
+        Compila as regras numa única expressão com todos os termos
+
+        Args:
+            regras: Dicionário {'regras': [{'termos', 'debito', 'credito'}, ...], 'padrao': {...}}
+        """
+        self.regras = regras
+        self.contas_regras = [(str(r['debito']), str(r['credito'])) for r in regras.get('regras', [])]
+        padrao = regras.get('padrao', REGRAS_PADRAO['padrao'])
+        self.contas_padrao = (str(padrao['debito']), str(padrao['credito']))
+
+        # Termo -> regra de maior prioridade que o contém
+        prioridade_termo = {}
+        for prioridade, regra in enumerate(regras.get('regras', [])):
+            for termo in regra['termos']:
+                prioridade_termo.setdefault(termo.upper(), prioridade)
+        self.prioridade_termo = prioridade_termo
+
+        if prioridade_termo:
+            # Ordenar por prioridade (e comprimento) para que, na mesma posição,
+            # a alternativa escolhida seja a da regra mais prioritária. O
+            # lookahead encontra também termos sobrepostos.
+            termos = sorted(prioridade_termo, key=lambda t: (prioridade_termo[t], -len(t)))
+            self.padrao = re.compile("(?=(" + "|".join(re.escape(t) for t in termos) + "))")
+        else:
+            self.padrao = None
+        self.cache = {}
+
+    def classificar(self, descricao):
+        """
+        Contas de débito e crédito de uma descrição
+
+        Returns:
+            tuple: (conta_debito, conta_credito)
+        """
+        contas = self.cache.get(descricao)
+        if contas is None:
+            contas = self._classificar(descricao)
+            if len(self.cache) >= self.LIMITE_CACHE:
+                self.cache.clear()
+            self.cache[descricao] = contas
+        return contas
+
+    def _classificar(self, descricao):
+        if self.padrao is None or not isinstance(descricao, str):
+            return self.contas_padrao
+        prioridades = [self.prioridade_termo[termo]
+                       for termo in self.padrao.findall(descricao.upper())]
+        if not prioridades:
+            return self.contas_padrao
+        return self.contas_regras[min(prioridades)]
+
+    def classificar_coluna(self, descricoes):
+        """
+        Classifica uma coluna de descrições, calculando cada descrição distinta uma só vez
+
+        Args:
+            descricoes: Series com as descrições
+
+        Returns:
+            DataFrame: Colunas conta_debito e conta_credito, com o índice de `descricoes`
+        """
+        codigos, unicas = pd.factorize(descricoes.astype(object))
+        # Última posição: descrições em falta (código -1 do factorize)
+        contas = [self.classificar(descricao) for descricao in unicas] + [self.contas_padrao]
+        debitos = np.array([c[0] for c in contas], dtype=object)
+        creditos = np.array([c[1] for c in contas], dtype=object)
+        return pd.DataFrame({
+            'conta_debito': debitos[codigos],
+            'conta_credito': creditos[codigos]
+        }, index=descricoes.index)
+
+    def salvar_regras(self):
+        """Grava as regras atuais no arquivo de regras"""
+        try:
+            with open(self.arquivo_regras, 'w', encoding='utf-8') as f:
+                json.dump(self.regras, f, ensure_ascii=False, indent=4)
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar regras de classificação: {str(e)}")
+            return False
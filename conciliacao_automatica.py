@@ -5,6 +5,7 @@ import difflib
 import re
 from fuzzywuzzy import fuzz
 import logging
+from tipos_compactos import chaves_dia_centavos, CHAVE_AUSENTE
 
 class ConciliacaoBancariaAutomatica:
     def __init__(self, contabilidade):
@@ -89,77 +90,102 @@ class ConciliacaoBancariaAutomatica:
         """
         id_conciliacao = 1
         
-        for i, row_banco in banco_df[~banco_df['conciliado']].iterrows():
-            for j, row_livro in livro_df[~livro_df['conciliado']].iterrows():
-                # Verificar se data e valor são iguais
-                if (row_banco['data'].date() == row_livro['data'].date() and 
-                    abs(row_banco['valor'] - row_livro['valor']) < 0.01):
+        # Candidatos do livro agrupados pela chave inteira (dia, centavos)
+        dias_livro, centavos_livro = chaves_dia_centavos(livro_df)
+        candidatos = {}
+        for j, chave in zip(livro_df.index, zip(dias_livro.tolist(), centavos_livro.tolist())):
+            if CHAVE_AUSENTE not in chave:
+                candidatos.setdefault(chave, []).append(j)
+        
+        dias_banco, centavos_banco = chaves_dia_centavos(banco_df)
+        for i, chave in zip(banco_df.index, zip(dias_banco.tolist(), centavos_banco.tolist())):
+            if banco_df.at[i, 'conciliado']:
+                continue
+            row_banco = banco_df.loc[i]
+            
+            # Verificar apenas as linhas com a mesma data e valor
+            for j in candidatos.get(chave, []):
+                if livro_df.at[j, 'conciliado']:
+                    continue
+                row_livro = livro_df.loc[j]
+                # Verificar similaridade de texto
+                similaridade = fuzz.token_sort_ratio(
+                    self._normalizar_texto(row_banco['descricao']), 
+                    self._normalizar_texto(row_livro['descricao'])
+                )
+                
+                if similaridade >= tolerancia_texto:
+                    # Marcar como conciliado
+                    banco_df.at[i, 'conciliado'] = True
+                    livro_df.at[j, 'conciliado'] = True
+                    banco_df.at[i, 'id_conciliacao'] = id_conciliacao
+                    livro_df.at[j, 'id_conciliacao'] = id_conciliacao
                     
-                    # Verificar similaridade de texto
-                    similaridade = fuzz.token_sort_ratio(
-                        self._normalizar_texto(row_banco['descricao']), 
-                        self._normalizar_texto(row_livro['descricao'])
-                    )
+                    # Registrar conciliação
+                    self.transacoes_conciliadas.append({
+                        'id_conciliacao': id_conciliacao,
+                        'data_banco': row_banco['data'],
+                        'descricao_banco': row_banco['descricao'],
+                        'valor_banco': row_banco['valor'],
+                        'data_livro': row_livro['data'],
+                        'descricao_livro': row_livro['descricao'],
+                        'valor_livro': row_livro['valor'],
+                        'metodo': 'matching_exato',
+                        'similaridade': similaridade
+                    })
                     
-                    if similaridade >= tolerancia_texto:
-                        # Marcar como conciliado
-                        banco_df.at[i, 'conciliado'] = True
-                        livro_df.at[j, 'conciliado'] = True
-                        banco_df.at[i, 'id_conciliacao'] = id_conciliacao
-                        livro_df.at[j, 'id_conciliacao'] = id_conciliacao
-                        
-                        # Registrar conciliação
-                        self.transacoes_conciliadas.append({
-                            'id_conciliacao': id_conciliacao,
-                            'data_banco': row_banco['data'],
-                            'descricao_banco': row_banco['descricao'],
-                            'valor_banco': row_banco['valor'],
-                            'data_livro': row_livro['data'],
-                            'descricao_livro': row_livro['descricao'],
-                            'valor_livro': row_livro['valor'],
-                            'metodo': 'matching_exato',
-                            'similaridade': similaridade
-                        })
-                        
-                        id_conciliacao += 1
-                        break
-    
+                    id_conciliacao += 1
+                    break
+
     def _matching_por_valor_data(self, banco_df, livro_df, tolerancia_dias):
         """
         Realiza o matching por valor exato e data próxima
         """
         id_conciliacao = len(self.transacoes_conciliadas) + 1
         
-        for i, row_banco in banco_df[~banco_df['conciliado']].iterrows():
-            for j, row_livro in livro_df[~livro_df['conciliado']].iterrows():
-                # Verificar se o valor é igual
-                if abs(row_banco['valor'] - row_livro['valor']) < 0.01:
-                    # Verificar se a data está dentro da tolerância
-                    dias_diff = abs((row_banco['data'].date() - row_livro['data'].date()).days)
+        # Candidatos do livro agrupados pelo valor em centavos
+        dias_livro, centavos_livro = chaves_dia_centavos(livro_df)
+        candidatos = {}
+        for j, dia, centavos in zip(livro_df.index, dias_livro.tolist(), centavos_livro.tolist()):
+            if CHAVE_AUSENTE not in (dia, centavos):
+                candidatos.setdefault(centavos, []).append((j, dia))
+        
+        dias_banco, centavos_banco = chaves_dia_centavos(banco_df)
+        for i, dia_banco, centavos in zip(banco_df.index, dias_banco.tolist(), centavos_banco.tolist()):
+            if banco_df.at[i, 'conciliado']:
+                continue
+            
+            # Verificar apenas as linhas com o mesmo valor
+            for j, dia_livro in candidatos.get(centavos, []):
+                if livro_df.at[j, 'conciliado']:
+                    continue
+                # Verificar se a data está dentro da tolerância
+                dias_diff = abs(dia_banco - dia_livro)
+                if dias_diff <= tolerancia_dias:
+                    row_banco = banco_df.loc[i]
+                    row_livro = livro_df.loc[j]
+                    # Marcar como conciliado
+                    banco_df.at[i, 'conciliado'] = True
+                    livro_df.at[j, 'conciliado'] = True
+                    banco_df.at[i, 'id_conciliacao'] = id_conciliacao
+                    livro_df.at[j, 'id_conciliacao'] = id_conciliacao
                     
-                    if dias_diff <= tolerancia_dias:
-                        # Marcar como conciliado
-                        banco_df.at[i, 'conciliado'] = True
-                        livro_df.at[j, 'conciliado'] = True
-                        banco_df.at[i, 'id_conciliacao'] = id_conciliacao
-                        livro_df.at[j, 'id_conciliacao'] = id_conciliacao
-                        
-                        # Registrar conciliação
-                        self.transacoes_conciliadas.append({
-                            'id_conciliacao': id_conciliacao,
-                            'data_banco': row_banco['data'],
-                            'descricao_banco': row_banco['descricao'],
-                            'valor_banco': row_banco['valor'],
-                            'data_livro': row_livro['data'],
-                            'descricao_livro': row_livro['descricao'],
-                            'valor_livro': row_livro['valor'],
-                            'metodo': 'matching_por_valor_data',
-                            'dias_diferenca': dias_diff
-                        })
-                        
-                        id_conciliacao += 1
-                        break
-    
+                    # Registrar conciliação
+                    self.transacoes_conciliadas.append({
+                        'id_conciliacao': id_conciliacao,
+                        'data_banco': row_banco['data'],
+                        'descricao_banco': row_banco['descricao'],
+                        'valor_banco': row_banco['valor'],
+                        'data_livro': row_livro['data'],
+                        'descricao_livro': row_livro['descricao'],
+                        'valor_livro': row_livro['valor'],
+                        'metodo': 'matching_por_valor_data',
+                        'dias_diferenca': dias_diff
+                    })
+                    
+                    id_conciliacao += 1
+                    break
+
     def _matching_por_agrupamento(self, banco_df, livro_df, tolerancia_dias):
         """
         Realiza o matching por agrupamento de transações que somam o mesmo valor
@@ -379,18 +405,17 @@ class ConciliacaoBancariaAutomatica:
         Returns:
             bool: True se gerado com sucesso, False caso contrário
         """
-        from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
         from reportlab.lib.units import cm
+        from tema_relatorios import estilo_tabela, estilos as estilos_relatorio
         
         try:
             doc = SimpleDocTemplate(caminho_saida, pagesize=A4)
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
@@ -412,16 +437,7 @@ class ConciliacaoBancariaAutomatica:
             ]
             
             tabela_resumo = Table(dados_resumo, colWidths=[10*cm, 4*cm, 4*cm])
-            tabela_resumo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('ALIGN', (1, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_resumo.setStyle(estilo_tabela((((1, 1), (2, -1), 'RIGHT'),)))
             elementos.append(tabela_resumo)
             elementos.append(Spacer(1, 0.5*cm))
             
@@ -442,19 +458,7 @@ class ConciliacaoBancariaAutomatica:
                     ])
                 
                 tabela_conciliadas = Table(dados_conciliadas, colWidths=[1.5*cm, 3*cm, 3.5*cm, 3*cm, 3.5*cm, 4*cm])
-                tabela_conciliadas.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (0, 1), (0, -1), 'CENTER'),
-                    ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                    ('ALIGN', (4, 1), (4, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
+                tabela_conciliadas.setStyle(estilo_tabela((((0, 1), (0, -1), 'CENTER'), ((2, 1), (2, -1), 'RIGHT'), ((4, 1), (4, -1), 'RIGHT')), tamanho_cabecalho=10, zebrado=True))
                 elementos.append(tabela_conciliadas)
             else:
                 elementos.append(Paragraph("Nenhuma transação conciliada no período.", estilo_normal))
@@ -477,17 +481,7 @@ class ConciliacaoBancariaAutomatica:
                     ])
                 
                 tabela_discrepancias = Table(dados_discrepancias, colWidths=[3*cm, 7*cm, 3*cm, 3*cm, 3*cm])
-                tabela_discrepancias.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
+                tabela_discrepancias.setStyle(estilo_tabela((((2, 1), (2, -1), 'RIGHT'),), tamanho_cabecalho=10, zebrado=True))
                 elementos.append(tabela_discrepancias)
                 
                 # 4. Sugestões de correção
@@ -574,7 +568,7 @@ class ConciliacaoBancariaAutomatica:
                     ]
                 }
                 
-                self.contabilidade.lancamentos.append(lancamento)
+                self.contabilidade.incluir_lancamento(lancamento)
                 self.contabilidade.salvar_dados()
                 
                 # Remover a discrepância da lista
@@ -596,6 +590,7 @@ class ConciliacaoBancariaAutomatica:
                             if movimento['credito'] > 0:
                                 movimento['credito'] = discrepancia['valor']
                         
+                        self.contabilidade.marcar_lancamento_alterado(i)
                         self.contabilidade.salvar_dados()
                         
                         # Remover a discrepância da lista
@@ -621,7 +616,7 @@ class ConciliacaoBancariaAutomatica:
                     ]
                 }
                 
-                self.contabilidade.lancamentos.append(lancamento)
+                self.contabilidade.incluir_lancamento(lancamento)
                 self.contabilidade.salvar_dados()
                 
                 # Remover a discrepância da lista
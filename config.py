@@ -7,6 +7,7 @@ CONFIGURACOES = {
             'nome': 'Banco Angolano de Investimentos',
             'colunas': ['Data Valor', 'Descrição', 'Montante'],
             'formato_data': '%d/%m/%Y'
+            # 'coluna_referencia': 'Referência'  (opcional, usada na deteção de duplicados)
         },
         'BFA': {
             'nome': 'Banco de Fomento Angola',
@@ -18,5 +19,33 @@ CONFIGURACOES = {
             'colunas': ['Data Mov.', 'Descritivo', 'Valor'],
             'formato_data': '%d/%m/%Y'
         }
+    },
+    'LIVRO': {
+        'colunas': ['data', 'descricao', 'valor'],
+        'formato_data': '%d/%m/%Y'
+    },
+    'IMPORTACAO': {
+        # Número de linhas lidas de cada vez nos extratos e livros
+        'tamanho_bloco': 50000
+    },
+    'CLASSIFICACAO': {
+        # Regras termo -> contas de débito/crédito (criado com as regras padrão se não existir)
+        'arquivo_regras': 'regras_classificacao.json'
+    },
+    'RELATORIOS_LOTE': {
+        # Diretório dos PDF e do manifesto gerados em lote
+        'diretorio_saida': 'relatorios_lote',
+        # Processos do pool (None = número de CPUs)
+        'processos': None
+    },
+    'CACHE_RELATORIOS': {
+        # PDF já gerados, reutilizados enquanto os dados do período não mudarem
+        'diretorio': 'cache_relatorios',
+        'limite_mb': 200
+    },
+    'GRAFICOS': {
+        # Gráficos da interface rasterizados fora da thread do Tk e guardados em memória
+        'dpi': 100,
+        'cache_entradas': 48
     }
 }
@@ -45,7 +45,8 @@ class Configuracoes:
             "contabilidade": {
                 "moeda": "Kz",
                 "formato_data": "%d/%m/%Y",
-                "plano_contas": "PGC-Angola"
+                "plano_contas": "PGC-Angola",
+                "armazenamento": "json"
             }
         }
         
@@ -253,11 +254,18 @@ class Configuracoes:
         ttk.Combobox(frame, textvariable=plano_contas_var, 
                     values=["PGC-Angola", "CPC-Brasil", "IFRS"]).grid(row=2, column=1, sticky=tk.W, pady=5)
         
+        # Armazenamento dos lançamentos (aplicado ao reiniciar o sistema)
+        ttk.Label(frame, text="Armazenamento:").grid(row=3, column=0, sticky=tk.W, pady=5)
+        armazenamento_var = tk.StringVar(value=self.obter_config("contabilidade", "armazenamento") or "json")
+        ttk.Combobox(frame, textvariable=armazenamento_var, state="readonly",
+                    values=["json", "sqlite"]).grid(row=3, column=1, sticky=tk.W, pady=5)
+        
         # Armazenar variáveis para acesso posterior
         self.vars_contabilidade = {
             "moeda": moeda_var,
             "formato_data": formato_data_var,
-            "plano_contas": plano_contas_var
+            "plano_contas": plano_contas_var,
+            "armazenamento": armazenamento_var
         }
         
     def salvar_e_fechar(self, janela):
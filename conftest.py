@@ -0,0 +1,14 @@
+import os
+import sys
+
+import pytest
+
+# Os módulos estão na raiz do projeto (sem pacote)
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def diretorio_trabalho(tmp_path, monkeypatch):
+    """Diretório temporário como diretório atual: arquivos de dados, logs e caches ficam lá"""
+    monkeypatch.chdir(tmp_path)
+    return tmp_path
@@ -1,200 +1,720 @@
-import tkinter as tk
-from tkinter import ttk, messagebox, simpledialog
 import pandas as pd
+import numpy as np
 from datetime import datetime
-from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch, cm
+import hashlib
 import json
 import os
+import threading
+import zlib
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from impressoes_digitais import (IndiceImpressoesDigitais, assinatura_lote, calcular_impressoes,
+                                 normalizar_coluna)
+from diario_contabil import (DiarioContabil, gravar_snapshot, ler_arquivo_json, restaurar_lancamento,
+                             restaurar_bem)
+from armazenamento_sqlite import ArmazenamentoSQLite
+from razao_colunar import RazaoColunar
+from cache_saldos_mensais import CacheSaldosMensais
+from indice_contas import IndiceContas
+from indice_datas import IndiceDatas
+from classificador_contas import ClassificadorContas
+from amortizacoes import METODOS as METODOS_AMORTIZACAO, MotorAmortizacoes
+from fechamento import Fechamento, dados_balanco, dados_dre, dados_fluxo_caixa, dados_racu
+from livro_razao_pdf import LivroRazaoPDF
+from cache_relatorios import CacheRelatorios
+from tema_relatorios import (estilo_ficha, estilo_secao, estilo_tabela, estilo_total, estilo_valores,
+                             estilos as estilos_relatorio)
+from exportacao_tabular import TabelaRelatorio, exportar as exportar_tabela
+from config import CONFIGURACOES
+from tipos_compactos import expandir_extrato
+
+
+def armazenamento_configurado(diretorio=None):
+    """
+    Armazenamento da contabilidade escolhido nas configurações da aplicação
+    (configuracoes.json do diretório indicado ou do atual)
+
+    Returns:
+        str: 'json' ou 'sqlite'
+    """
+    arquivo = os.path.join(diretorio, 'configuracoes.json') if diretorio else 'configuracoes.json'
+    try:
+        with open(arquivo, 'r', encoding='utf-8') as f:
+            return json.load(f).get('contabilidade', {}).get('armazenamento') or 'json'
+    except (OSError, ValueError):
+        return 'json'
 
 class ContabilidadeAvancada:
-    def __init__(self):
-        """Inicializa a classe de contabilidade avançada"""
+    def __init__(self, backend='json', carregar_em_segundo_plano=False, diretorio=None, somente_leitura=False):
+        """
+        Inicializa a classe de contabilidade avançada
+
+        Args:
+            backend: 'json' (snapshots + diário) ou 'sqlite' (base contabilidade.db)
+            carregar_em_segundo_plano: Ler os dados salvos numa thread; o primeiro
+                acesso aos lançamentos espera que a leitura termine
+            diretorio: Diretório dos arquivos de dados (por omissão o diretório
+                atual); permite abrir várias entidades sem mudar de diretório
+            somente_leitura: Nunca gravar nos arquivos de dados (processos que
+                só geram relatórios enquanto outro processo é o dono dos dados)
+        """
+        self.diretorio = diretorio
+        self.somente_leitura = somente_leitura
         self.dados_banco = None
         self.dados_livro = None
-        self.lancamentos = []  # Lista para armazenar lançamentos contábeis
-        self.bens_amortizaveis = []  # Lista para armazenar bens amortizáveis
+        self._lancamentos = []  # Lista para armazenar lançamentos contábeis
+        self._bens_amortizaveis = []  # Lista para armazenar bens amortizáveis
+        self._indice_impressoes = None
+        self.indice_contas = IndiceContas()  # Código -> nome, natureza, tipo, classe, caminho
+        self.classificador = ClassificadorContas(  # Regras termo -> contas de débito e crédito
+            self.caminho(CONFIGURACOES['CLASSIFICACAO']['arquivo_regras']))
         self.plano_contas = self.carregar_plano_contas()  # Carregar plano de contas
         
+        # Persistência: snapshots JSON + diário de alterações por acréscimo
+        self.arquivo_lancamentos = self.caminho('lancamentos_contabeis.json')
+        self.arquivo_bens = self.caminho('bens_amortizaveis.json')
+        self.diario = DiarioContabil(self.caminho('diario_contabil.jsonl'))
+        self.backend = backend
+        self.armazenamento_sql = ArmazenamentoSQLite(self.caminho('contabilidade.db')) if backend == 'sqlite' else None
+        self._lancamentos_persistidos = 0
+        self._bens_persistidos = 0
+        self._lancamentos_alterados = set()
+        self._bens_alterados = {}
+        self._profundidade_lote = 0
+        self.razao = RazaoColunar()  # Movimentos em colunas numpy para o cálculo de saldos
+        self.cache_saldos = CacheSaldosMensais(self.razao)  # Movimento líquido por conta e mês
+        self.indice_datas = IndiceDatas()  # Posições dos lançamentos ordenadas por data
+        self.motor_amortizacoes = MotorAmortizacoes()  # Planos de amortização em cache
+        self.fechamento = Fechamento(self)  # Balancetes por período, partilhados pelas demonstrações
+        self._versao_lancamentos = 0  # Incrementada a cada alteração ou reversão de lançamentos
+        self.cache_relatorios = CacheRelatorios(  # PDF já gerados, por tipo, parâmetros e impressão dos dados
+            self.caminho(CONFIGURACOES['CACHE_RELATORIOS']['diretorio']))
+        self._impressao_plano = (None, None)  # (versão do índice de contas, impressão do plano)
+        
+        self.quase_duplicados = []  # Linhas convertidas que se parecem com lançamentos anteriores
+        self._lotes_em_memoria = {}  # Origem -> último DataFrame importado já convertido
+        
         # Carregar dados salvos se existirem
-        self.carregar_dados_salvos()
+        self._carregamento = None  # Só volta a None depois de os dados estarem instalados
+        self._bloqueio_carregamento = threading.RLock()
+        self._a_instalar_dados = False
+        if carregar_em_segundo_plano:
+            executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='carregamento_contabil')
+            self._carregamento = executor.submit(self.ler_dados_salvos)
+            executor.shutdown(wait=False)
+        else:
+            self._concluir_carregamento(self.ler_dados_salvos())
     
-    def carregar_dados_salvos(self):
-        """Carrega dados salvos de arquivos JSON"""
+    def caminho(self, arquivo):
+        """Caminho de um arquivo de dados no diretório da contabilidade"""
+        return os.path.join(self.diretorio, arquivo) if self.diretorio else arquivo
+    
+    @property
+    def lancamentos(self):
+        self.aguardar_dados()
+        return self._lancamentos
+
+    @lancamentos.setter
+    def lancamentos(self, lancamentos):
+        self.aguardar_dados()
+        self._lancamentos = lancamentos
+        self._versao_lancamentos += 1
+
+    @property
+    def bens_amortizaveis(self):
+        self.aguardar_dados()
+        return self._bens_amortizaveis
+
+    @bens_amortizaveis.setter
+    def bens_amortizaveis(self, bens):
+        self.aguardar_dados()
+        self._bens_amortizaveis = bens
+
+    @property
+    def indice_impressoes(self):
+        """Índice persistente das linhas já convertidas em lançamentos"""
+        self.aguardar_dados()
+        return self._indice_impressoes
+
+    def dados_prontos(self):
+        """Indica se os dados salvos já foram carregados (sem bloquear)"""
+        return self._carregamento is None or self._carregamento.done()
+
+    def aguardar_dados(self):
+        """Espera pelo fim do carregamento em segundo plano, se ainda estiver a decorrer"""
+        if self._carregamento is None:
+            return
+        # Outras threads esperam aqui até os dados estarem instalados; a própria
+        # thread que os instala (salvar_dados na migração) passa sem esperar
+        with self._bloqueio_carregamento:
+            carregamento = self._carregamento
+            if carregamento is None or self._a_instalar_dados:
+                return
+            self._a_instalar_dados = True
+            try:
+                try:
+                    dados = carregamento.result()
+                except Exception as e:
+                    print(f"Erro ao carregar dados salvos: {str(e)}")
+                    dados = ([], [], IndiceImpressoesDigitais(self.caminho('impressoes_digitais.json')))
+                self._concluir_carregamento(dados)
+                self._carregamento = None
+            finally:
+                self._a_instalar_dados = False
+
+    @property
+    def plano_contas(self):
+        return self._plano_contas
+
+    @plano_contas.setter
+    def plano_contas(self, plano):
+        """Substitui o plano de contas e reconstrói o índice de contas"""
+        self._plano_contas = plano
+        self.indice_contas.reconstruir(plano)
+
+    def ler_dados_salvos(self):
+        """
+        Lê os snapshots JSON e reproduz o diário de alterações (ou lê a base
+        SQLite). Não altera o estado do objeto, para poder correr numa thread.
+
+        Returns:
+            tuple: (lançamentos, bens amortizáveis, índice de impressões digitais)
+        """
+        lancamentos = []
+        bens_amortizaveis = []
+        if self.armazenamento_sql is not None and not self.armazenamento_sql.vazio():
+            try:
+                bens_amortizaveis = self.armazenamento_sql.carregar_bens()
+                lancamentos = self.armazenamento_sql.carregar_lancamentos()
+            except Exception as e:
+                print(f"Erro ao carregar dados salvos: {str(e)}")
+        else:
+            # Com a base SQLite vazia, os dados JSON existentes são migrados
+            # ao concluir o carregamento
+            try:
+                # Carregar bens amortizáveis
+                if os.path.exists(self.arquivo_bens):
+                    bens_amortizaveis = [restaurar_bem(bem) for bem in ler_arquivo_json(self.arquivo_bens)]
+                
+                # Carregar lançamentos contábeis
+                if os.path.exists(self.arquivo_lancamentos):
+                    lancamentos = [restaurar_lancamento(lanc)
+                                   for lanc in ler_arquivo_json(self.arquivo_lancamentos)]
+                
+                # Aplicar as alterações registadas depois do último snapshot
+                self.diario.aplicar(lancamentos, bens_amortizaveis)
+            except Exception as e:
+                print(f"Erro ao carregar dados salvos: {str(e)}")
+        
+        # Índice persistente das linhas já convertidas em lançamentos
+        indice_impressoes = IndiceImpressoesDigitais(self.caminho('impressoes_digitais.json'))
+        if not indice_impressoes.existia:
+            for lanc in lancamentos:
+                indice_impressoes.registrar_lancamento(lanc)
+            if not self.somente_leitura:
+                indice_impressoes.salvar()
+        
+        return lancamentos, bens_amortizaveis, indice_impressoes
+    
+    def _concluir_carregamento(self, dados):
+        """Instala os dados lidos por ler_dados_salvos (na primeira thread que precisa deles)"""
+        self._lancamentos, self._bens_amortizaveis, self._indice_impressoes = dados
+        
+        if self.armazenamento_sql is not None and self.armazenamento_sql.vazio():
+            self._lancamentos_persistidos = 0
+            self._bens_persistidos = 0
+            if (self._lancamentos or self._bens_amortizaveis) and not self.somente_leitura:
+                self.salvar_dados()
+        else:
+            self._lancamentos_persistidos = len(self._lancamentos)
+            self._bens_persistidos = len(self._bens_amortizaveis)
+    
+    def incluir_lancamento(self, lancamento):
+        """Acrescenta um lançamento; é gravado no diário na próxima chamada a salvar_dados"""
+        self.lancamentos.append(lancamento)
+        # Lançamento retroativo: os relatórios guardados de períodos posteriores ficam desatualizados
+        if self.cache_relatorios is not None:
+            self.cache_relatorios.invalidar_desde(lancamento['data'])
+    
+    def marcar_lancamento_alterado(self, indice):
+        """Indica que o lançamento na posição `indice` foi alterado no próprio objeto"""
+        self._versao_lancamentos += 1
+        self._lancamentos_alterados.add(indice)
+        if self.cache_relatorios is not None:
+            self.cache_relatorios.invalidar_desde(self.lancamentos[indice]['data'])
+        self.razao.marcar_alterado(indice)
+        self.indice_datas.marcar_alterado(indice)
+        # A linha de origem continua convertida, mas com a data, valor e descrição editados
+        lancamento = self.lancamentos[indice]
+        if lancamento.get('impressao'):
+            valor = sum(m['debito'] for m in lancamento['movimentos'])
+            self.indice_impressoes.atualizar(lancamento['impressao'], lancamento['data'], valor,
+                                             lancamento['descricao'])
+    
+    def impressao_dados(self):
+        """
+        Identifica o estado atual dos lançamentos: muda quando são acrescentados,
+        alterados, revertidos ou a lista é substituída
+
+        Returns:
+            tuple: (lista, total de lançamentos, versão das alterações)
+        """
+        return (id(self.lancamentos), len(self.lancamentos), self._versao_lancamentos)
+    
+    def marcar_bem_alterado(self, bem):
+        """Indica que um bem amortizável (ou as suas amortizações) foi alterado"""
+        self._bens_alterados[bem['codigo']] = bem
+    
+    @contextmanager
+    def lote(self):
+        """
+        Agrupa vários registos numa só gravação. Dentro do bloco, salvar_dados
+        não grava; à saída as alterações são gravadas uma única vez. Se ocorrer
+        um erro, os lançamentos, bens e amortizações acrescentados no bloco (e as
+        impressões digitais das linhas convertidas) são descartados e a exceção
+        é propagada. Alterações feitas diretamente em
+        lançamentos já existentes não são revertidas.
+
+        Uso:
+            with contabilidade.lote():
+                for ...:
+                    contabilidade.registrar_lancamento(...)
+        """
+        estado = (
+            len(self.lancamentos),
+            len(self.bens_amortizaveis),
+            {bem['codigo']: len(bem.get('amortizacoes', [])) for bem in self.bens_amortizaveis},
+            set(self._lancamentos_alterados),
+            dict(self._bens_alterados),
+            self.indice_impressoes.ponto_restauro(),
+            dict(self._lotes_em_memoria)
+        )
+        self._profundidade_lote += 1
         try:
-            # Carregar bens amortizáveis
-            if os.path.exists('bens_amortizaveis.json'):
-                with open('bens_amortizaveis.json', 'r', encoding='utf-8') as f:
-                    self.bens_amortizaveis = json.load(f)
-                    # Converter strings de data para objetos datetime
-                    for bem in self.bens_amortizaveis:
-                        bem['data'] = datetime.fromisoformat(bem['data'])
-                        if 'amortizacoes' in bem:
-                            for amort in bem['amortizacoes']:
-                                amort['data'] = datetime.fromisoformat(amort['data'])
-            
-            # Carregar lançamentos contábeis
-            if os.path.exists('lancamentos_contabeis.json'):
-                with open('lancamentos_contabeis.json', 'r', encoding='utf-8') as f:
-                    self.lancamentos = json.load(f)
-                    # Converter strings de data para objetos datetime
-                    for lanc in self.lancamentos:
-                        lanc['data'] = datetime.fromisoformat(lanc['data'])
-        except Exception as e:
-            print(f"Erro ao carregar dados salvos: {str(e)}")
+            yield self
+        except Exception:
+            self._profundidade_lote -= 1
+            self._reverter_lote(estado)
+            if self._profundidade_lote == 0:
+                self.indice_impressoes.concluir_restauro()
+            raise
+        self._profundidade_lote -= 1
+        if self._profundidade_lote == 0:
+            self.indice_impressoes.concluir_restauro()
+            if self._alteracoes_pendentes():
+                self.salvar_dados()
+    
+    def _reverter_lote(self, estado):
+        total_lancamentos, total_bens, amortizacoes, alterados, bens_alterados, ponto_impressoes, lotes = estado
+        del self.lancamentos[total_lancamentos:]
+        self._versao_lancamentos += 1
+        self.razao.truncar(total_lancamentos)
+        self.indice_datas.truncar(total_lancamentos)
+        del self.bens_amortizaveis[total_bens:]
+        for bem in self.bens_amortizaveis:
+            if 'amortizacoes' in bem:
+                del bem['amortizacoes'][amortizacoes.get(bem['codigo'], 0):]
+        self._lancamentos_alterados = alterados
+        self._bens_alterados = bens_alterados
+        # As linhas (e os lotes) dos lançamentos descartados voltam a poder ser convertidas
+        self._lotes_em_memoria = lotes
+        self.indice_impressoes.restaurar(ponto_impressoes)
+        self.indice_impressoes.salvar()
     
     def salvar_dados(self):
-        """Salva dados em arquivos JSON"""
+        """
+        Grava as alterações desde a última gravação (custo proporcional às
+        alterações, não ao total de lançamentos): no diário, compactando quando
+        necessário, ou numa única transação na base SQLite. Dentro de um
+        lote() a gravação é adiada para o fim do bloco. Numa contabilidade
+        somente_leitura nada é gravado e devolve False.
+        """
+        if self.somente_leitura:
+            return False
+        if self._profundidade_lote:
+            return True
+        
         try:
-            # Salvar bens amortizáveis
-            bens_json = []
-            for bem in self.bens_amortizaveis:
-                bem_copy = bem.copy()
-                bem_copy['data'] = bem_copy['data'].isoformat()
-                if 'amortizacoes' in bem_copy:
-                    for amort in bem_copy['amortizacoes']:
-                        amort['data'] = amort['data'].isoformat()
-                bens_json.append(bem_copy)
-                
-            with open('bens_amortizaveis.json', 'w', encoding='utf-8') as f:
-                json.dump(bens_json, f, ensure_ascii=False, indent=2)
-            
-            # Salvar lançamentos contábeis
-            lanc_json = []
-            for lanc in self.lancamentos:
-                lanc_copy = lanc.copy()
-                lanc_copy['data'] = lanc_copy['data'].isoformat()
-                lanc_json.append(lanc_copy)
-                
-            with open('lancamentos_contabeis.json', 'w', encoding='utf-8') as f:
-                json.dump(lanc_json, f, ensure_ascii=False, indent=2)
+            # Lançamentos novos (acrescentados à lista desde a última gravação)
+            novos = list(range(self._lancamentos_persistidos, len(self.lancamentos)))
+            
+            # Lançamentos já gravados e alterados depois
+            alterados = sorted(i for i in self._lancamentos_alterados
+                               if i < self._lancamentos_persistidos)
+            
+            # Bens novos ou alterados
+            for bem in self.bens_amortizaveis[self._bens_persistidos:]:
+                self._bens_alterados[bem['codigo']] = bem
+            bens = list(self._bens_alterados.values())
+            
+            if self.armazenamento_sql is not None:
+                self.armazenamento_sql.gravar_lancamentos(
+                    [(i, self.lancamentos[i]) for i in alterados + novos])
+                self.armazenamento_sql.gravar_bens(bens)
+            else:
+                operacoes = [{'op': 'lancamento', 'indice': i, 'dados': self.lancamentos[i]}
+                             for i in novos]
+                operacoes += [{'op': 'lancamento_alterado', 'indice': i, 'dados': self.lancamentos[i]}
+                              for i in alterados]
+                operacoes += [{'op': 'bem', 'dados': bem} for bem in bens]
+                self.diario.registrar(operacoes)
+            
+            self._lancamentos_persistidos = len(self.lancamentos)
+            self._bens_persistidos = len(self.bens_amortizaveis)
+            self._lancamentos_alterados.clear()
+            self._bens_alterados.clear()
+            self.indice_impressoes.salvar()  # Chaves atualizadas por edições (nada a gravar se não houver)
+            
+            if self.armazenamento_sql is None and self.diario.precisa_compactar():
+                return self.compactar_dados()
                 
             return True
         except Exception as e:
             print(f"Erro ao salvar dados: {str(e)}")
             return False
     
+    def _alteracoes_pendentes(self):
+        return (self._lancamentos_persistidos < len(self.lancamentos) or
+                self._bens_persistidos < len(self.bens_amortizaveis) or
+                bool(self._lancamentos_alterados) or bool(self._bens_alterados))
+    
+    def _consultar_sql(self):
+        """
+        Indica se uma consulta pode ser feita na base SQLite, gravando antes
+        as alterações pendentes. Dentro de um lote() a gravação é adiada, por
+        isso, havendo alterações por gravar, as consultas usam os lançamentos
+        em memória (que já incluem os do bloco), como no armazenamento JSON
+        """
+        if self.armazenamento_sql is None:
+            return False
+        if self._alteracoes_pendentes():
+            if self._profundidade_lote or not self.salvar_dados():
+                return False
+        return True
+    
+    def saldos(self, desde=None, ate=None, contas=None):
+        """
+        Calcula o saldo (débitos - créditos) de cada conta num período de
+        dias inteiros (ver razao_colunar.limites_periodo)
+
+        Args:
+            desde: Dia inicial (inclusive), ou None para desde o início
+            ate: Dia final (inclusive, até às 23:59), ou None para até ao fim
+            contas: Códigos de conta a considerar, ou None para todas
+
+        Returns:
+            dict: {conta: saldo}
+        """
+        if self._consultar_sql():
+            return self.armazenamento_sql.saldos(desde, ate, contas)
+        
+        self.razao.sincronizar(self.lancamentos)
+        return self.cache_saldos.saldos(desde, ate, contas)
+    
+    def lancamentos_entre(self, inicio=None, fim=None):
+        """
+        Percorre os lançamentos com data no período, por ordem de data
+        (dias inteiros, limites inclusivos; None = sem limite). Com o armazenamento JSON, o
+        período é localizado por bisseção no índice de datas, sem cópias.
+
+        Yields:
+            dict: Lançamento
+        """
+        if self._consultar_sql():
+            lancamentos = self.armazenamento_sql.carregar_lancamentos(inicio, fim)
+            lancamentos.sort(key=lambda l: l['data'])
+            return iter(lancamentos)
+        
+        return self.indice_datas.entre(self.lancamentos, inicio, fim)
+    
+    def lancamentos_periodo(self, data_inicio=None, data_fim=None):
+        """
+        Lançamentos com data no período (dias inteiros, limites inclusivos; None = sem limite)
+
+        Returns:
+            list: Lançamentos do período, por ordem de data
+        """
+        return list(self.lancamentos_entre(data_inicio, data_fim))
+    
+    def movimentos_por_conta(self, data_inicio=None, data_fim=None, contas=None):
+        """
+        Movimentos do período agrupados por conta e ordenados por data (livro razão)
+
+        Returns:
+            dict: {conta: [{'data', 'descricao', 'lancamento_id', 'debito', 'credito'}, ...]}
+        """
+        if self._consultar_sql():
+            return self.armazenamento_sql.movimentos_por_conta(data_inicio, data_fim, contas)
+        
+        contas = set(contas) if contas else None
+        contas_movimentos = {}
+        for lancamento in self.lancamentos_entre(data_inicio, data_fim):
+            for movimento in lancamento['movimentos']:
+                conta = movimento['conta']
+                if contas is not None and conta not in contas:
+                    continue
+                contas_movimentos.setdefault(conta, []).append({
+                    'data': lancamento['data'],
+                    'descricao': lancamento['descricao'],
+                    'lancamento_id': lancamento['id'],
+                    'debito': movimento['debito'],
+                    'credito': movimento['credito']
+                })
+        return contas_movimentos
+    
+    def percorrer_razao(self, data_inicio=None, data_fim=None, contas=None):
+        """
+        Percorre o livro razão conta a conta (por ordem de código), com os
+        movimentos de cada conta por ordem de data, sem construir a lista de
+        todos os movimentos do período: a ordem é calculada sobre as colunas da
+        razão e cada movimento é montado só quando é consumido
+
+        Yields:
+            tuple: (conta, iterador de {'data', 'descricao', 'lancamento_id', 'debito', 'credito'})
+        """
+        if self._consultar_sql():
+            yield from self.armazenamento_sql.percorrer_movimentos(data_inicio, data_fim, contas)
+            return
+        
+        lancamentos = self.lancamentos
+        razao = self.razao
+        razao.sincronizar(lancamentos)
+        self.indice_datas.sincronizar(lancamentos)
+        
+        # Posição de cada lançamento na ordem das datas (empates pela ordem de inclusão)
+        ordem_data = np.empty(len(lancamentos), dtype=np.int64)
+        ordem_data[self.indice_datas.posicoes] = np.arange(len(lancamentos))
+        i, j = self.indice_datas.intervalo(data_inicio, data_fim)
+        
+        tamanho = razao.tamanho
+        posicao_data = ordem_data[razao.indice[:tamanho]]
+        selecionadas = razao.ativo[:tamanho] & (posicao_data >= i) & (posicao_data < j)
+        if contas:
+            codigos = [razao._codigo_conta[str(c)] for c in contas if str(c) in razao._codigo_conta]
+            selecionadas &= np.isin(razao.conta[:tamanho], codigos)
+        linhas = np.flatnonzero(selecionadas)
+        
+        # Ordem alfabética dos códigos de conta, como em sorted(contas)
+        ordem_contas = np.empty(len(razao.contas), dtype=np.int64)
+        ordem_contas[sorted(range(len(razao.contas)), key=razao.contas.__getitem__)] = np.arange(len(razao.contas))
+        
+        # Conta, data e, no mesmo lançamento, a ordem dos movimentos (linhas contíguas)
+        linhas = linhas[np.lexsort((linhas, posicao_data[linhas], ordem_contas[razao.conta[linhas]]))]
+        codigos_linhas = razao.conta[linhas]
+        inicios = np.concatenate(([0], np.flatnonzero(np.diff(codigos_linhas)) + 1))
+        fins = np.append(inicios[1:], len(linhas))
+        
+        def movimentos(segmento):
+            for linha in segmento:
+                lancamento = lancamentos[razao.indice[linha]]
+                yield {
+                    'data': lancamento['data'],
+                    'descricao': lancamento['descricao'],
+                    'lancamento_id': lancamento['id'],
+                    'debito': int(razao.debito[linha]) / 100,
+                    'credito': int(razao.credito[linha]) / 100
+                }
+        
+        for inicio, fim in zip(inicios, fins):
+            if fim > inicio:
+                yield razao.contas[codigos_linhas[inicio]], movimentos(linhas[inicio:fim])
+    
+    def impressao_periodo(self, desde=None, ate=None, descricoes=False):
+        """
+        Impressão dos movimentos de um período, para identificar relatórios já
+        gerados sobre os mesmos dados: muda quando um movimento do período é
+        acrescentado, removido ou alterado, e não depende de lançamentos fora dele
+
+        Args:
+            desde: Data inicial (inclusive), ou None
+            ate: Data final (inclusive), ou None
+            descricoes: Incluir os identificadores e descrições dos lançamentos
+                (relatórios que os mostram, como o livro razão)
+
+        Returns:
+            tuple: (número de movimentos, maior posição de lançamento, soma de verificação)
+        """
+        if self._consultar_sql():
+            return self.armazenamento_sql.impressao_periodo(desde, ate, descricoes)
+        
+        razao = self.razao
+        razao.sincronizar(self.lancamentos)
+        mascara = razao.mascara(desde, ate)
+        tamanho = razao.tamanho
+        indice = razao.indice[:tamanho][mascara].astype(np.uint64)
+        
+        # Soma de verificação por movimento (aritmética módulo 2**64), independente
+        # da ordem das linhas na razão; as contas entram pelo CRC do código. A
+        # mistura de cada movimento passa por um finalizador não linear (o do
+        # splitmix64) antes da soma: trocar contas ou valores entre movimentos muda-a
+        hash_contas = np.array([zlib.crc32(conta.encode('utf-8')) for conta in razao.contas], dtype=np.uint64)
+        primo = np.uint64(1000003)
+        with np.errstate(over='ignore'):
+            mistura = indice * primo + razao.dia[:tamanho][mascara].astype(np.uint64)
+            mistura = mistura * primo + hash_contas[razao.conta[:tamanho][mascara]]
+            mistura = mistura * primo + razao.debito[:tamanho][mascara].astype(np.uint64)
+            mistura = mistura * primo + razao.credito[:tamanho][mascara].astype(np.uint64)
+            mistura = (mistura ^ (mistura >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+            mistura = (mistura ^ (mistura >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+            mistura ^= mistura >> np.uint64(31)
+            soma = int(mistura.sum(dtype=np.uint64))
+        
+        if descricoes:
+            crc = 0
+            for lancamento in self.lancamentos_entre(desde, ate):
+                crc = zlib.crc32(f"{lancamento['id']}\x1f{lancamento['descricao']}\x1e".encode('utf-8'), crc)
+            soma = (soma, crc)
+        return int(len(indice)), int(indice.max()) if len(indice) else -1, soma
+    
+    def impressao_plano(self):
+        """Impressão do plano de contas (os nomes das contas aparecem nos relatórios)"""
+        versao, impressao = self._impressao_plano
+        if versao != self.indice_contas.versao:
+            conteudo = json.dumps(self.plano_contas, sort_keys=True, ensure_ascii=False, default=str)
+            impressao = hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+            self._impressao_plano = (self.indice_contas.versao, impressao)
+        return impressao
+    
+    def impressao_bens(self):
+        """
+        Impressão dos bens amortizáveis e das suas amortizações (o RAÇU lista
+        todos os bens, incluindo os adquiridos depois do período)
+        """
+        conteudo = json.dumps(self.bens_amortizaveis, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(conteudo.encode('utf-8')).hexdigest()
+    
+    def compactar_dados(self):
+        """Grava o estado completo nos snapshots JSON e esvazia o diário"""
+        if self.armazenamento_sql is not None:
+            return True
+        try:
+            gravar_snapshot(self.arquivo_bens, self.bens_amortizaveis)
+            gravar_snapshot(self.arquivo_lancamentos, self.lancamentos)
+            self.diario.limpar()
+            return True
+        except Exception as e:
+            print(f"Erro ao compactar dados: {str(e)}")
+            return False
+    
     def converter_dados_para_lancamentos(self):
-        """Converte os dados do banco e livro em lançamentos contábeis estruturados"""
+        """
+        Converte os dados do banco e livro em lançamentos contábeis estruturados.
+        Só as linhas novas são convertidas: os lotes já convertidos são
+        reconhecidos pela assinatura e as linhas pela impressão digital, ambas
+        guardadas no índice persistente. Sem linhas novas, nada é gravado.
+        
+        Returns:
+            bool: True se foram criados lançamentos novos
+        """
         if self.dados_banco is None and self.dados_livro is None:
             return False
         
-        # Não limpar lançamentos existentes, apenas adicionar novos
-        lancamentos_existentes = set()
-        for lanc in self.lancamentos:
-            # Criar uma chave única para cada lançamento
-            chave = (lanc['data'].strftime('%Y-%m-%d'), lanc['descricao'], 
-                    sum(m['debito'] for m in lanc['movimentos']))
-            lancamentos_existentes.add(chave)
-        
+        # Não limpar lançamentos existentes, apenas adicionar novos.
         novos_lancamentos = 0
+        quase_duplicados = []
+        lotes_convertidos = []
         
-        # Converter dados do banco se disponíveis
-        if self.dados_banco is not None:
-            for _, row in self.dados_banco.iterrows():
-                # Verificar se o lançamento já existe
-                chave = (row['data'].strftime('%Y-%m-%d'), row['descricao'], row['valor'])
-                if chave in lancamentos_existentes:
+        with self.lote():
+            for dados, prefixo, origem in [(self.dados_banco, 'B', 'BANCO'),
+                                           (self.dados_livro, 'L', 'LIVRO')]:
+                if dados is None or dados.empty:
                     continue
                 
-                # Determinar contas com base na descrição
-                conta_debito = self.determinar_conta_debito(row['descricao'])
-                conta_credito = self.determinar_conta_credito(row['descricao'])
-                
-                # Criar lançamento
-                lancamento = {
-                    'id': f"B{len(self.lancamentos) + novos_lancamentos + 1}",
-                    'data': row['data'],
-                    'descricao': row['descricao'],
-                    'origem': 'BANCO',
-                    'movimentos': [
-                        {'conta': conta_debito, 'debito': row['valor'], 'credito': 0},
-                        {'conta': conta_credito, 'debito': 0, 'credito': row['valor']}
-                    ]
-                }
-                self.lancamentos.append(lancamento)
-                novos_lancamentos += 1
-                lancamentos_existentes.add(chave)
-        
-        # Converter dados do livro se disponíveis
-        if self.dados_livro is not None:
-            for _, row in self.dados_livro.iterrows():
-                # Verificar se o lançamento já existe
-                chave = (row['data'].strftime('%Y-%m-%d'), row['descricao'], row['valor'])
-                if chave in lancamentos_existentes:
+                # Lote já convertido numa chamada anterior (ou numa sessão anterior)
+                if self._lotes_em_memoria.get(origem) is dados:
+                    continue
+                # Dados compactos (ver tipos_compactos) expandidos só durante a conversão,
+                # com a mesma assinatura que o lote teria no formato expandido
+                vista = expandir_extrato(dados)
+                assinatura = assinatura_lote(vista)
+                if self.indice_impressoes.lote_convertido(assinatura):
+                    self._lotes_em_memoria[origem] = dados
                     continue
                 
-                # Determinar contas com base na descrição
-                conta_debito = self.determinar_conta_debito(row['descricao'])
-                conta_credito = self.determinar_conta_credito(row['descricao'])
-                
-                # Criar lançamento
-                lancamento = {
-                    'id': f"L{len(self.lancamentos) + novos_lancamentos + 1}",
-                    'data': row['data'],
-                    'descricao': row['descricao'],
-                    'origem': 'LIVRO',
-                    'movimentos': [
-                        {'conta': conta_debito, 'debito': row['valor'], 'credito': 0},
-                        {'conta': conta_credito, 'debito': 0, 'credito': row['valor']}
-                    ]
-                }
-                self.lancamentos.append(lancamento)
-                novos_lancamentos += 1
-                lancamentos_existentes.add(chave)
+                novos_lancamentos += self._converter_linhas_novas(vista, prefixo, origem, quase_duplicados)
+                lotes_convertidos.append((origem, dados, assinatura))
         
-        # Salvar os dados atualizados
-        self.salvar_dados()
+        if lotes_convertidos:
+            self.quase_duplicados = quase_duplicados
+        
+        # Marca d'água: os lotes só são registados depois de convertidos com sucesso
+        for origem, dados, assinatura in lotes_convertidos:
+            self.indice_impressoes.registrar_lote(assinatura)
+            self._lotes_em_memoria[origem] = dados
+        self.indice_impressoes.salvar()
         
         return novos_lancamentos > 0
     
+    def _converter_linhas_novas(self, dados, prefixo, origem, quase_duplicados):
+        """
+        Acrescenta os lançamentos das linhas de `dados` ainda não convertidas,
+        juntando a `quase_duplicados` as que se parecem com lançamentos anteriores
+        
+        Returns:
+            int: Número de lançamentos criados
+        """
+        # Impressões únicas no lote: linhas iguais são ocorrências numeradas (ver calcular_impressoes)
+        impressoes = calcular_impressoes(dados)
+        novas = ~impressoes.isin(self.indice_impressoes.impressoes)
+        if not novas.any():
+            return 0
+        
+        linhas = dados[novas.to_numpy()]
+        impressoes = impressoes[novas]
+        
+        # Classificação e normalização calculadas uma vez por descrição distinta
+        descricoes = linhas['descricao'].astype(object)
+        contas = self.classificador.classificar_coluna(descricoes)
+        normalizadas = normalizar_coluna(linhas['descricao'])
+        
+        primeiro_id = len(self.lancamentos) + 1
+        for numero, (data, descricao, descricao_norm, valor, impressao, conta_debito, conta_credito) in enumerate(
+                zip(linhas['data'], descricoes, normalizadas, linhas['valor'], impressoes,
+                    contas['conta_debito'], contas['conta_credito'])):
+            motivo = self.indice_impressoes.quase_duplicado(data, valor, descricao, descricao_norm)
+            if motivo:
+                quase_duplicados.append({
+                    'origem': origem,
+                    'data': data,
+                    'descricao': descricao,
+                    'valor': valor,
+                    'motivo': motivo
+                })
+            
+            self.incluir_lancamento({
+                'id': f"{prefixo}{primeiro_id + numero}",
+                'data': data,
+                'descricao': descricao,
+                'origem': origem,
+                'impressao': impressao,  # Linha de origem no índice de impressões digitais
+                'movimentos': [
+                    {'conta': conta_debito, 'debito': valor, 'credito': 0},
+                    {'conta': conta_credito, 'debito': 0, 'credito': valor}
+                ]
+            })
+            self.indice_impressoes.registrar(data, valor, descricao, impressao=impressao,
+                                             descricao_norm=descricao_norm)
+        
+        return len(linhas)
+    
     def determinar_conta_debito(self, descricao):
         """Determina a conta de débito com base na descrição"""
-        descricao_upper = descricao.upper()
-        
-        # Regras para classificação automática
-        if any(termo in descricao_upper for termo in ["VENDA", "RECEITA", "FATURAMENTO"]):
-            return "45"  # Caixa
-        elif any(termo in descricao_upper for termo in ["TRANSFERÊNCIA", "TRANSFERENCIA", "TED", "DOC"]):
-            return "43"  # Depósitos à Ordem
-        elif any(termo in descricao_upper for termo in ["SALÁRIO", "SALARIO", "FOLHA", "PAGAMENTO"]):
-            return "64"  # Custos com o Pessoal
-        elif any(termo in descricao_upper for termo in ["COMPRA", "FORNECEDOR", "MERCADORIA"]):
-            return "21"  # Compras
-        elif any(termo in descricao_upper for termo in ["IMPOSTO", "TAXA", "TRIBUTO"]):
-            return "63"  # Impostos
-        elif any(termo in descricao_upper for termo in ["ALUGUEL", "ENERGIA", "ÁGUA", "AGUA", "TELEFONE"]):
-            return "62"  # Fornecimentos e Serviços de Terceiros
-        
-        # Conta padrão para débito
-        return "43"  # Depósitos à Ordem
+        return self.classificador.classificar(descricao)[0]
     
     def determinar_conta_credito(self, descricao):
         """Determina a conta de crédito com base na descrição"""
-        descricao_upper = descricao.upper()
-        
-        # Regras para classificação automática
-        if any(termo in descricao_upper for termo in ["VENDA", "RECEITA", "FATURAMENTO"]):
-            return "71"  # Vendas
-        elif any(termo in descricao_upper for termo in ["TRANSFERÊNCIA", "TRANSFERENCIA", "TED", "DOC"]):
-            return "37"  # Outros Valores a Receber e a Pagar
-        elif any(termo in descricao_upper for termo in ["SALÁRIO", "SALARIO", "FOLHA", "PAGAMENTO"]):
-            return "36"  # Pessoal
-        elif any(termo in descricao_upper for termo in ["COMPRA", "FORNECEDOR", "MERCADORIA"]):
-            return "32"  # Fornecedores
-        elif any(termo in descricao_upper for termo in ["IMPOSTO", "TAXA", "TRIBUTO"]):
-            return "34"  # Estado
-        elif any(termo in descricao_upper for termo in ["ALUGUEL", "ENERGIA", "ÁGUA", "AGUA", "TELEFONE"]):
-            return "32"  # Fornecedores
-        
-        # Conta padrão para crédito
-        return "71"  # Vendas
+        return self.classificador.classificar(descricao)[1]
     
     def abrir_classificador_lancamentos(self, root):
         """Abre uma interface para classificar lançamentos em contas contábeis"""
+        # Importado aqui para que a contabilidade funcione sem interface gráfica
+        import tkinter as tk
+        from tkinter import ttk, messagebox
+        
         if self.dados_livro is None and self.dados_banco is None:
             messagebox.showwarning("Aviso", "Importe os dados primeiro!")
             return
@@ -266,11 +786,10 @@ class ContabilidadeAvancada:
         info_text = tk.Text(frame_info, height=6, wrap=tk.WORD)
         info_text.pack(fill=tk.X, padx=5, pady=5)
         info_text.insert(tk.END, "Contas mais comuns:\n")
-        info_text.insert(tk.END, "43 - Depósitos à Ordem (débito para entradas)\n")
-        info_text.insert(tk.END, "45 - Caixa (débito para entradas em dinheiro)\n")
-        info_text.insert(tk.END, "71 - Vendas (crédito para receitas)\n")
-        info_text.insert(tk.END, "62 - Fornecimentos e Serviços (débito para despesas)\n")
-        info_text.insert(tk.END, "32 - Fornecedores (crédito para compras)\n")
+        for codigo, uso in (("43", "débito para entradas"), ("45", "débito para entradas em dinheiro"),
+                            ("71", "crédito para receitas"), ("62", "débito para despesas"),
+                            ("32", "crédito para compras")):
+            info_text.insert(tk.END, f"{codigo} - {self.indice_contas.nome(codigo)} ({uso})\n")
         info_text.configure(state='disabled')
         
         # Função para editar classificação
@@ -297,6 +816,14 @@ class ContabilidadeAvancada:
             ttk.Entry(janela_edit, textvariable=conta_credito_var).grid(row=1, column=1, padx=5, pady=5)
             
             def salvar():
+                # Validar as contas no índice do plano de contas
+                desconhecidas = [c for c in (conta_debito_var.get(), conta_credito_var.get())
+                                 if c not in self.indice_contas]
+                if desconhecidas and not messagebox.askyesno(
+                        "Conta Desconhecida",
+                        f"Conta(s) fora do plano de contas: {', '.join(desconhecidas)}. Continuar?"):
+                    return
+                
                 # Atualizar na tabela
                 tabela.item(item, values=(
                     valores[0], valores[1], valores[2], valores[3], valores[4],
@@ -310,6 +837,7 @@ class ContabilidadeAvancada:
                     {'conta': conta_debito_var.get(), 'debito': valor, 'credito': 0},
                     {'conta': conta_credito_var.get(), 'debito': 0, 'credito': valor}
                 ]
+                self.marcar_lancamento_alterado(idx)
                 
                 janela_edit.destroy()
                 
@@ -359,8 +887,17 @@ class ContabilidadeAvancada:
         
         ttk.Button(frame_botoes, text="Ver Plano de Contas", command=mostrar_plano_contas).pack(side=tk.LEFT, padx=5)
     
-    def registrar_bem_amortizavel(self, codigo, descricao, valor, data, vida_util, valor_residual):
-        """Registra um novo bem amortizável"""
+    def registrar_bem_amortizavel(self, codigo, descricao, valor, data, vida_util, valor_residual,
+                                  metodo='linear'):
+        """
+        Registra um novo bem amortizável
+
+        Args:
+            metodo: Método de amortização ('linear' ou 'degressivo')
+        """
+        if metodo not in METODOS_AMORTIZACAO:
+            raise ValueError(f"Método de amortização desconhecido: {metodo}")
+        
         # Verificar se o código já existe
         for bem in self.bens_amortizaveis:
             if bem['codigo'] == codigo:
@@ -374,24 +911,24 @@ class ContabilidadeAvancada:
             'data': data,
             'vida_util': vida_util,
             'valor_residual': valor_residual,
+            'metodo': metodo,
             'amortizacoes': []
         }
         
-        # Adicionar à lista
-        self.bens_amortizaveis.append(novo_bem)
-        
-        # Registrar lançamento contábil
-        self.registrar_lancamento(
-            data,
-            f"Aquisição de {descricao}",
-            [
-                {'conta': '11', 'debito': valor, 'credito': 0},  # Débito em Imobilizações Corpóreas
-                {'conta': '32', 'debito': 0, 'credito': valor}   # Crédito em Fornecedores
-            ]
-        )
-        
-        # Salvar dados
-        self.salvar_dados()
+        # Bem e lançamento de aquisição gravados juntos
+        with self.lote():
+            # Adicionar à lista
+            self.bens_amortizaveis.append(novo_bem)
+            
+            # Registrar lançamento contábil
+            self.registrar_lancamento(
+                data,
+                f"Aquisição de {descricao}",
+                [
+                    {'conta': '11', 'debito': valor, 'credito': 0},  # Débito em Imobilizações Corpóreas
+                    {'conta': '32', 'debito': 0, 'credito': valor}   # Crédito em Fornecedores
+                ]
+            )
         
         return True
     
@@ -414,51 +951,205 @@ class ContabilidadeAvancada:
         }
         
         # Adicionar à lista
-        self.lancamentos.append(novo_lancamento)
+        self.incluir_lancamento(novo_lancamento)
         
         # Salvar dados
         self.salvar_dados()
         
         return True
     
-    def gerar_balanco_patrimonial(self, data_ref, caminho_saida):
+    def gerar_relatorio(self, tipo, caminho_saida, data_inicio=None, data_fim=None, usar_cache=True):
+        """
+        Gera um relatório contabilístico pelo tipo. Se o mesmo relatório já foi
+        gerado sobre os mesmos dados (mesma impressão do período e do plano de
+        contas), o PDF é copiado da cache de relatórios em vez de composto.
+
+        Args:
+            tipo: 'balanco' (em data_fim), 'dre', 'livro_razao', 'fluxo_caixa'
+                ou 'racu' (do ano de data_fim)
+            caminho_saida: Caminho do arquivo PDF de saída
+            data_inicio: Data de início do período (ignorada no balanço e no RAÇU)
+            data_fim: Data de fim do período ou data de referência
+            usar_cache: Consultar e atualizar a cache de relatórios
+        Returns:
+            bool: True se gerado (ou obtido da cache) com sucesso, False caso contrário
+        """
+        if tipo == 'racu':
+            data_inicio, data_fim = datetime(data_fim.year, 1, 1), datetime(data_fim.year, 12, 31)
+        elif tipo == 'balanco':
+            data_inicio = None
+        
+        geradores = {
+            'balanco': lambda: self.gerar_balanco_patrimonial(data_fim, caminho_saida),
+            'dre': lambda: self.gerar_dre(data_inicio, data_fim, caminho_saida),
+            'livro_razao': lambda: self.gerar_livro_razao(data_inicio, data_fim, caminho_saida),
+            'fluxo_caixa': lambda: self.gerar_fluxo_caixa(data_inicio, data_fim, caminho_saida),
+            'racu': lambda: self.gerar_racu(data_fim.year, caminho_saida)
+        }
+        if tipo not in geradores:
+            raise ValueError(f"Tipo de relatório inválido: {tipo}")
+        
+        chave = None
+        if usar_cache and self.cache_relatorios is not None:
+            try:
+                # Preparar os dados antes da impressão: as conversões (e, no balanço,
+                # as amortizações) registadas pelo próprio relatório fazem parte do período
+                self.fechamento.preparar(data_fim if tipo == 'balanco' else None)
+                impressao = self.impressao_periodo(data_inicio, data_fim,
+                                                   descricoes=tipo in ('livro_razao', 'fluxo_caixa'))
+                impressoes = [impressao, self.impressao_plano()]
+                if tipo == 'racu':
+                    impressoes.append(self.impressao_bens())
+                chave = self.cache_relatorios.chave(tipo, [data_inicio, data_fim], impressoes)
+                if self.cache_relatorios.copiar(chave, caminho_saida):
+                    return True
+            except Exception as e:
+                print(f"Erro ao consultar cache de relatórios: {str(e)}")
+                chave = None
+        
+        gerado = geradores[tipo]()
+        if gerado and chave is not None:
+            self.cache_relatorios.guardar(chave, caminho_saida, tipo, data_fim)
+        return gerado
+
+    def dados_relatorio(self, tipo, data_inicio=None, data_fim=None):
+        """
+        Passo de dados de um relatório em forma tabular, para exportação
+        (mesmos tipos e períodos que gerar_relatorio). Só lê: não regista
+        amortizações, nem no balanço (ver Fechamento.preparar)
+
+        Args:
+            tipo: 'balanco', 'dre', 'livro_razao', 'fluxo_caixa' ou 'racu'
+            data_inicio: Data de início do período (ignorada no balanço e no RAÇU)
+            data_fim: Data de fim do período ou data de referência
+        Returns:
+            TabelaRelatorio: Colunas e linhas do relatório (o livro razão é
+                percorrido à medida que as linhas são consumidas)
+        """
+        colunas_secoes = ["Secção", "Conta", "Descrição", "Valor"]
+        
+        def linhas_secoes(secoes):
+            for secao in secoes:
+                for conta, descricao, valor in secao['linhas']:
+                    yield secao['titulo'], conta, descricao, valor
+                rotulo, total = secao['total']
+                yield secao['titulo'], "", rotulo, total
+        
+        if tipo == 'balanco':
+            dados = dados_balanco(self.fechamento.balancete(None, data_fim), self.indice_contas)
+            linhas = list(linhas_secoes(dados['ativo'] + dados['passivo_capital']))
+            linhas += [("Totais", "", "TOTAL DO ATIVO", dados['total_ativo']),
+                       ("Totais", "", "TOTAL DO PASSIVO", dados['total_passivo']),
+                       ("Totais", "", "TOTAL DO PASSIVO E CAPITAL PRÓPRIO", dados['total_passivo_capital'])]
+            return TabelaRelatorio(colunas_secoes, linhas, {"Valor": 'valor'})
+        
+        if tipo == 'dre':
+            dados = dados_dre(self.fechamento.balancete(data_inicio, data_fim), self.indice_contas)
+            linhas = list(linhas_secoes([dados['receitas'], dados['despesas']]))
+            linhas.append(("Resultado", "", "Resultado Líquido do Exercício", dados['resultado_liquido']))
+            return TabelaRelatorio(colunas_secoes, linhas, {"Valor": 'valor'})
+        
+        if tipo == 'racu':
+            ano = data_fim.year
+            balancete = self.fechamento.balancete(datetime(ano, 1, 1), datetime(ano, 12, 31))
+            dados = dados_racu(balancete, self.plano_contas, self.indice_contas, self.bens_amortizaveis, ano)
+            dre = dados['dre']
+            linhas = list(linhas_secoes([dados['ativo'], dados['passivo_capital'], dre['receitas'], dre['despesas']]))
+            linhas.append(("Resultado", "", "Resultado Líquido do Exercício", dre['resultado_liquido']))
+            linhas += [("Imobilizações", codigo, descricao, valor_liquido)
+                       for codigo, descricao, _, _, valor_liquido in dados['bens']]
+            return TabelaRelatorio(colunas_secoes, linhas, {"Valor": 'valor'})
+        
+        if tipo == 'fluxo_caixa':
+            dados = dados_fluxo_caixa(self.fechamento.balancete(data_inicio, data_fim))
+            secoes = [dados['operacional'], dados['investimento'], dados['financiamento']]
+            linhas = [(secao['titulo'], data, descricao, valor)
+                      for secao in secoes for data, descricao, valor in secao['linhas']]
+            linhas.append(("Variação de Caixa", None, "Variação de Caixa e Equivalentes no Período",
+                           dados['variacao_caixa']))
+            return TabelaRelatorio(["Atividade", "Data", "Descrição", "Valor"], linhas,
+                                   {"Data": 'data', "Valor": 'valor'})
+        
+        if tipo == 'livro_razao':
+            self.fechamento.preparar()
+            
+            def linhas_razao():
+                for conta, movimentos in self.percorrer_razao(data_inicio, data_fim):
+                    nome_conta = self.indice_contas.nome(conta)
+                    saldo = 0
+                    for movimento in movimentos:
+                        saldo += movimento['debito'] - movimento['credito']
+                        yield (conta, nome_conta, movimento['data'], movimento['descricao'],
+                               movimento['lancamento_id'], movimento['debito'], movimento['credito'], saldo)
+            
+            return TabelaRelatorio(
+                ["Conta", "Nome da Conta", "Data", "Descrição", "Lançamento", "Débito", "Crédito", "Saldo"],
+                linhas_razao(), {"Data": 'data', "Débito": 'valor', "Crédito": 'valor', "Saldo": 'valor'})
+        
+        raise ValueError(f"Tipo de relatório inválido: {tipo}")
+
+    def exportar_relatorio(self, tipo, caminho_saida, data_inicio=None, data_fim=None, formato=None):
+        """
+        Exporta um relatório em CSV, XLSX ou Parquet (ver dados_relatorio)
+
+        Args:
+            tipo: Tipo de relatório (como em gerar_relatorio)
+            caminho_saida: Arquivo de saída
+            data_inicio: Data de início do período
+            data_fim: Data de fim do período ou data de referência
+            formato: 'csv', 'xlsx' ou 'parquet' (por omissão, pela extensão do arquivo)
+        Returns:
+            bool: True se exportado com sucesso, False caso contrário
+        """
+        try:
+            exportar_tabela(self.dados_relatorio(tipo, data_inicio, data_fim), caminho_saida, formato)
+            return True
+        except Exception as e:
+            print(f"Erro ao exportar relatório: {str(e)}")
+            return False
+
+    def gerar_balanco_patrimonial(self, data_ref, caminho_saida, balancete=None):
         """
         Gera o Balanço Patrimonial para uma data específica
         Args:
             data_ref: Data de referência
             caminho_saida: Caminho do arquivo PDF de saída
+            balancete: Balancete do fecho com data_fim = data_ref (opcional;
+                calculado se não for indicado)
         Returns:
             bool: True se gerado com sucesso, False caso contrário
         """
         try:
-            # Converter dados para lançamentos contábeis se necessário
-            self.converter_dados_para_lancamentos()
-            
-            # Filtrar lançamentos até a data de referência
-            lancamentos_filtrados = [l for l in self.lancamentos if l['data'] <= data_ref]
-            
-            # Calcular saldos das contas
-            saldos = {}
-            for lancamento in lancamentos_filtrados:
-                for movimento in lancamento['movimentos']:
-                    conta = movimento['conta']
-                    if conta not in saldos:
-                        saldos[conta] = 0
-                    saldos[conta] += movimento['debito'] - movimento['credito']
-            
-            # Calcular amortizações
-            self.calcular_amortizacoes(data_ref)
+            # Saldos das contas até a data de referência, depois de registar as
+            # amortizações em falta até ela (o fecho já as registou no seu balancete)
+            if balancete is None or balancete.data_fim != data_ref:
+                balancete = self.fechamento.balancete(None, data_ref, amortizar=True)
+            dados = dados_balanco(balancete, self.indice_contas)
             
             # Criar documento PDF
             doc = SimpleDocTemplate(caminho_saida, pagesize=A4)
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
             
+            def tabela_secao(secao):
+                linhas = [["Conta", "Descrição", "Valor"]]
+                linhas += [[conta, nome, f"Kz {valor:,.2f}"] for conta, nome, valor in secao['linhas']]
+                rotulo, total = secao['total']
+                linhas.append(["", rotulo, f"Kz {total:,.2f}"])
+                tabela = Table(linhas, colWidths=[2*cm, 12*cm, 4*cm])
+                tabela.setStyle(estilo_secao())
+                return tabela
+            
+            def tabela_total(rotulo, total):
+                tabela = Table([["", rotulo, f"Kz {total:,.2f}"]], colWidths=[2*cm, 12*cm, 4*cm])
+                tabela.setStyle(estilo_total())
+                return tabela
+            
             # Título
             elementos.append(Paragraph("Balanço Patrimonial", estilo_titulo))
             elementos.append(Paragraph(f"Data de Referência: {data_ref.strftime('%d/%m/%Y')}", estilo_normal))
@@ -466,302 +1157,20 @@ class ContabilidadeAvancada:
             
             # Ativo
             elementos.append(Paragraph("ATIVO", estilo_subtitulo))
-            
-            # Ativo Não Corrente
-            dados_ativo_nc = [["Conta", "Descrição", "Valor"]]
-            total_ativo_nc = 0
-            
-            # Adicionar contas do ativo não corrente (classe 1)
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('1'):
-                    # Buscar nome no plano de contas
-                    nome_conta = "Conta Desconhecida"
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            nome_conta = classe_info['contas'][codigo_conta]['nome']
-                            break
-                    
-                    # Ajustar saldo conforme natureza da conta
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            if classe_info['contas'][codigo_conta]['natureza'] == 'credora':
-                                saldo = -saldo
-                            break
-                    
-                    dados_ativo_nc.append([codigo_conta, nome_conta, f"Kz {saldo:,.2f}"])
-                    total_ativo_nc += saldo
-            
-            dados_ativo_nc.append(["", "Total do Ativo Não Corrente", f"Kz {total_ativo_nc:,.2f}"])
-            
-            # Criar tabela
-            tabela_ativo_nc = Table(dados_ativo_nc, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_ativo_nc.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_ativo_nc)
-            elementos.append(Spacer(1, 0.3*cm))
-            
-            # Ativo Corrente
-            dados_ativo_c = [["Conta", "Descrição", "Valor"]]
-            total_ativo_c = 0
-            
-            # Adicionar contas do ativo corrente (classes 2, 3, 4)
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith(('2', '3', '4')):
-                    # Verificar se é conta do ativo
-                    is_ativo = False
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            if classe_info['contas'][codigo_conta]['tipo'] == 'ativo' or (
-                                classe_info['contas'][codigo_conta]['tipo'] == 'misto' and saldo > 0):
-                                is_ativo = True
-                                # Ajustar saldo conforme natureza da conta
-                                if classe_info['contas'][codigo_conta]['natureza'] == 'credora':
-                                    saldo = -saldo
-                            break
-                    
-                    if is_ativo:
-                        # Buscar nome no plano de contas
-                        nome_conta = "Conta Desconhecida"
-                        for classe, classe_info in self.plano_contas.items():
-                            if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                                nome_conta = classe_info['contas'][codigo_conta]['nome']
-                                break
-                        
-                        dados_ativo_c.append([codigo_conta, nome_conta, f"Kz {saldo:,.2f}"])
-                        total_ativo_c += saldo
-            
-            dados_ativo_c.append(["", "Total do Ativo Corrente", f"Kz {total_ativo_c:,.2f}"])
-            
-            # Criar tabela
-            tabela_ativo_c = Table(dados_ativo_c, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_ativo_c.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_ativo_c)
-            elementos.append(Spacer(1, 0.3*cm))
-            
-            # Total do Ativo
-            total_ativo = total_ativo_nc + total_ativo_c
-            dados_total_ativo = [["", "TOTAL DO ATIVO", f"Kz {total_ativo:,.2f}"]]
-            tabela_total_ativo = Table(dados_total_ativo, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_total_ativo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 14),
-                ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_total_ativo)
+            for secao in dados['ativo']:
+                elementos.append(tabela_secao(secao))
+                elementos.append(Spacer(1, 0.3*cm))
+            elementos.append(tabela_total("TOTAL DO ATIVO", dados['total_ativo']))
             elementos.append(Spacer(1, 0.5*cm))
             
             # Passivo e Capital Próprio
             elementos.append(Paragraph("PASSIVO E CAPITAL PRÓPRIO", estilo_subtitulo))
-            
-            # Capital Próprio
-            dados_capital = [["Conta", "Descrição", "Valor"]]
-            total_capital = 0
-            
-            # Adicionar contas de capital (classe 5)
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('5'):
-                    # Buscar nome no plano de contas
-                    nome_conta = "Conta Desconhecida"
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            nome_conta = classe_info['contas'][codigo_conta]['nome']
-                            break
-                    
-                    # Ajustar saldo conforme natureza da conta
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            if classe_info['contas'][codigo_conta]['natureza'] == 'credora':
-                                saldo = -saldo
-                            break
-                    
-                    dados_capital.append([codigo_conta, nome_conta, f"Kz {saldo:,.2f}"])
-                    total_capital += saldo
-            
-            # Calcular resultado do exercício
-            resultado_liquido = 0
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('6'):  # Despesas
-                    resultado_liquido -= saldo
-                elif codigo_conta.startswith('7'):  # Receitas
-                    resultado_liquido += -saldo  # Receitas têm saldo credor (negativo)
-            
-            dados_capital.append(["88", "Resultado Líquido do Exercício", f"Kz {resultado_liquido:,.2f}"])
-            total_capital += resultado_liquido
-            
-            dados_capital.append(["", "Total do Capital Próprio", f"Kz {total_capital:,.2f}"])
-            
-            # Criar tabela
-            tabela_capital = Table(dados_capital, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_capital.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_capital)
-            elementos.append(Spacer(1, 0.3*cm))
-            
-            # Passivo Não Corrente
-            dados_passivo_nc = [["Conta", "Descrição", "Valor"]]
-            total_passivo_nc = 0
-            
-            # Adicionar contas do passivo não corrente (empréstimos de longo prazo)
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('33'):  # Empréstimos
-                    # Verificar se é de longo prazo (simplificação)
-                    # Na prática, seria necessário verificar a natureza do empréstimo
-                    
-                    # Buscar nome no plano de contas
-                    nome_conta = "Conta Desconhecida"
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            nome_conta = classe_info['contas'][codigo_conta]['nome']
-                            break
-                    
-                    # Ajustar saldo conforme natureza da conta
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            if classe_info['contas'][codigo_conta]['natureza'] == 'devedora':
-                                saldo = -saldo
-                            break
-                    
-                    dados_passivo_nc.append([codigo_conta, nome_conta, f"Kz {saldo:,.2f}"])
-                    total_passivo_nc += saldo
-            
-            dados_passivo_nc.append(["", "Total do Passivo Não Corrente", f"Kz {total_passivo_nc:,.2f}"])
-            
-            # Criar tabela
-            tabela_passivo_nc = Table(dados_passivo_nc, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_passivo_nc.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_passivo_nc)
+            for secao in dados['passivo_capital']:
+                elementos.append(tabela_secao(secao))
+                elementos.append(Spacer(1, 0.3*cm))
+            elementos.append(tabela_total("TOTAL DO PASSIVO", dados['total_passivo']))
             elementos.append(Spacer(1, 0.3*cm))
-            
-            # Passivo Corrente
-            dados_passivo_c = [["Conta", "Descrição", "Valor"]]
-            total_passivo_c = 0
-            
-            # Adicionar contas do passivo corrente
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith(('3', '4')) and not codigo_conta.startswith('33'):
-                    # Verificar se é conta do passivo
-                    is_passivo = False
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            if classe_info['contas'][codigo_conta]['tipo'] == 'passivo' or (
-                                classe_info['contas'][codigo_conta]['tipo'] == 'misto' and saldo < 0):
-                                is_passivo = True
-                                # Ajustar saldo conforme natureza da conta
-                                if classe_info['contas'][codigo_conta]['natureza'] == 'devedora':
-                                    saldo = -saldo
-                            break
-                    
-                    if is_passivo:
-                        # Buscar nome no plano de contas
-                        nome_conta = "Conta Desconhecida"
-                        for classe, classe_info in self.plano_contas.items():
-                            if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                                nome_conta = classe_info['contas'][codigo_conta]['nome']
-                                break
-                        
-                        dados_passivo_c.append([codigo_conta, nome_conta, f"Kz {abs(saldo):,.2f}"])
-                        total_passivo_c += abs(saldo)
-            
-            dados_passivo_c.append(["", "Total do Passivo Corrente", f"Kz {total_passivo_c:,.2f}"])
-            
-            # Criar tabela
-            tabela_passivo_c = Table(dados_passivo_c, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_passivo_c.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_passivo_c)
-            elementos.append(Spacer(1, 0.3*cm))
-            
-            # Total do Passivo
-            total_passivo = total_passivo_nc + total_passivo_c
-            dados_total_passivo = [["", "TOTAL DO PASSIVO", f"Kz {total_passivo:,.2f}"]]
-            tabela_total_passivo = Table(dados_total_passivo, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_total_passivo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 14),
-                ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_total_passivo)
-            elementos.append(Spacer(1, 0.3*cm))
-            
-            # Total do Passivo e Capital Próprio
-            total_passivo_capital = total_passivo + total_capital
-            dados_total_geral = [["", "TOTAL DO PASSIVO E CAPITAL PRÓPRIO", f"Kz {total_passivo_capital:,.2f}"]]
-            tabela_total_geral = Table(dados_total_geral, colWidths=[2*cm, 12*cm, 4*cm])
-            tabela_total_geral.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 14),
-                ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
-            
-            elementos.append(tabela_total_geral)
+            elementos.append(tabela_total("TOTAL DO PASSIVO E CAPITAL PRÓPRIO", dados['total_passivo_capital']))
             
             # Gerar PDF
             doc.build(elementos)
@@ -771,39 +1180,29 @@ class ContabilidadeAvancada:
             print(f"Erro ao gerar balanço patrimonial: {str(e)}")
             return False
 
-    def gerar_dre(self, data_inicio, data_fim, caminho_saida):
+    def gerar_dre(self, data_inicio, data_fim, caminho_saida, balancete=None):
         """
         Gera a Demonstração de Resultados do Exercício para um período específico
         Args:
             data_inicio: Data de início do período
             data_fim: Data de fim do período
             caminho_saida: Caminho do arquivo PDF de saída
+            balancete: Balancete do período (opcional; calculado se não for indicado)
         Returns:
             bool: True se gerado com sucesso, False caso contrário
         """
         try:
-            # Converter dados para lançamentos contábeis se necessário
-            self.converter_dados_para_lancamentos()
-            
-            # Filtrar lançamentos do período
-            lancamentos_filtrados = [l for l in self.lancamentos
-                                    if data_inicio <= l['data'] <= data_fim]
-            
-            # Calcular saldos das contas
-            saldos = {}
-            for lancamento in lancamentos_filtrados:
-                for movimento in lancamento['movimentos']:
-                    conta = movimento['conta']
-                    if conta not in saldos:
-                        saldos[conta] = 0
-                    saldos[conta] += movimento['debito'] - movimento['credito']
+            # Saldos das contas no período
+            if balancete is None or not balancete.cobre(data_inicio, data_fim):
+                balancete = self.fechamento.balancete(data_inicio, data_fim)
+            dados = dados_dre(balancete, self.indice_contas)
             
             # Criar documento PDF
             doc = SimpleDocTemplate(caminho_saida, pagesize=A4)
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
@@ -816,39 +1215,14 @@ class ContabilidadeAvancada:
             # Receitas
             elementos.append(Paragraph("RECEITAS", estilo_subtitulo))
             dados_receitas = [["Conta", "Descrição", "Valor"]]
-            total_receitas = 0
-            
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('7'):  # Receitas
-                    # Para receitas, o saldo é crédito (negativo no nosso cálculo)
-                    valor = -saldo
-                    
-                    # Buscar nome no plano de contas
-                    nome_conta = "Conta Desconhecida"
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            nome_conta = classe_info['contas'][codigo_conta]['nome']
-                            break
-                    
-                    dados_receitas.append([codigo_conta, nome_conta, f"Kz {valor:,.2f}"])
-                    total_receitas += valor
+            dados_receitas += [[conta, nome, f"Kz {valor:,.2f}"] for conta, nome, valor in dados['receitas']['linhas']]
+            total_receitas = dados['receitas']['total'][1]
             
             dados_receitas.append(["", "Total de Receitas", f"Kz {total_receitas:,.2f}"])
             
             # Criar tabela
             tabela_receitas = Table(dados_receitas, colWidths=[1.5*cm, 11.5*cm, 4*cm])
-            tabela_receitas.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_receitas.setStyle(estilo_secao())
             
             elementos.append(tabela_receitas)
             elementos.append(Spacer(1, 0.5*cm))
@@ -856,46 +1230,21 @@ class ContabilidadeAvancada:
             # Despesas
             elementos.append(Paragraph("DESPESAS", estilo_subtitulo))
             dados_despesas = [["Conta", "Descrição", "Valor"]]
-            total_despesas = 0
-            
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('6'):  # Despesas
-                    # Para despesas, o saldo é débito (positivo no nosso cálculo)
-                    valor = saldo
-                    
-                    # Buscar nome no plano de contas
-                    nome_conta = "Conta Desconhecida"
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            nome_conta = classe_info['contas'][codigo_conta]['nome']
-                            break
-                    
-                    dados_despesas.append([codigo_conta, nome_conta, f"Kz {valor:,.2f}"])
-                    total_despesas += valor
+            dados_despesas += [[conta, nome, f"Kz {valor:,.2f}"] for conta, nome, valor in dados['despesas']['linhas']]
+            total_despesas = dados['despesas']['total'][1]
             
             dados_despesas.append(["", "Total de Despesas", f"Kz {total_despesas:,.2f}"])
             
             # Criar tabela
             tabela_despesas = Table(dados_despesas, colWidths=[1.5*cm, 11.5*cm, 4*cm])
-            tabela_despesas.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_despesas.setStyle(estilo_secao())
             
             elementos.append(tabela_despesas)
             elementos.append(Spacer(1, 0.5*cm))
             
             # Resultado
             elementos.append(Paragraph("RESULTADO", estilo_subtitulo))
-            resultado_liquido = total_receitas - total_despesas
+            resultado_liquido = dados['resultado_liquido']
             dados_resultado = [
                 ["Descrição", "Valor"],
                 ["Total de Receitas", f"Kz {total_receitas:,.2f}"],
@@ -904,18 +1253,7 @@ class ContabilidadeAvancada:
             ]
             
             tabela_resultado = Table(dados_resultado, colWidths=[13*cm, 4*cm])
-            tabela_resultado.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_resultado.setStyle(estilo_tabela((((1, 0), (1, -1), 'RIGHT'),), linha_total=True))
             
             elementos.append(tabela_resultado)
             
@@ -929,7 +1267,8 @@ class ContabilidadeAvancada:
 
     def gerar_livro_razao(self, data_inicio, data_fim, caminho_saida):
         """
-        Gera o Livro Razão para um período específico
+        Gera o Livro Razão para um período específico, página a página (ver
+        LivroRazaoPDF), com saldos a transportar entre páginas
         Args:
             data_inicio: Data de início do período
             data_fim: Data de fim do período
@@ -939,154 +1278,48 @@ class ContabilidadeAvancada:
         """
         try:
             # Converter dados para lançamentos contábeis se necessário
-            self.converter_dados_para_lancamentos()
-            
-            # Filtrar lançamentos do período
-            lancamentos_filtrados = [l for l in self.lancamentos
-                                    if data_inicio <= l['data'] <= data_fim]
-            
-            # Ordenar por data
-            lancamentos_filtrados.sort(key=lambda x: x['data'])
-            
-            # Agrupar movimentos por conta
-            contas = {}
-            for lancamento in lancamentos_filtrados:
-                for movimento in lancamento['movimentos']:
-                    conta = movimento['conta']
-                    if conta not in contas:
-                        contas[conta] = []
-                    
-                    contas[conta].append({
-                        'data': lancamento['data'],
-                        'descricao': lancamento['descricao'],
-                        'lancamento_id': lancamento['id'],
-                        'debito': movimento['debito'],
-                        'credito': movimento['credito']
-                    })
+            self.fechamento.preparar()
             
-            # Criar documento PDF
-            doc = SimpleDocTemplate(caminho_saida, pagesize=A4)
-            elementos = []
+            livro = LivroRazaoPDF(caminho_saida, data_inicio, data_fim)
             
-            # Estilos
-            estilos = getSampleStyleSheet()
-            estilo_titulo = estilos['Heading1']
-            estilo_subtitulo = estilos['Heading2']
-            estilo_normal = estilos['Normal']
-            
-            # Título
-            elementos.append(Paragraph("Livro Razão", estilo_titulo))
-            elementos.append(Paragraph(f"Período: {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}", estilo_normal))
-            elementos.append(Spacer(1, 0.5*cm))
-            
-            # Gerar razão para cada conta
-            for conta, movimentos in sorted(contas.items()):
-                # Buscar nome no plano de contas
-                nome_conta = "Conta Desconhecida"
-                for classe, classe_info in self.plano_contas.items():
-                    if 'contas' in classe_info and conta in classe_info['contas']:
-                        nome_conta = classe_info['contas'][conta]['nome']
-                        break
-                
-                elementos.append(Paragraph(f"Conta: {conta} - {nome_conta}", estilo_subtitulo))
-                
-                # Tabela de movimentos
-                dados_movimentos = [["Data", "Descrição", "Lançamento", "Débito", "Crédito", "Saldo"]]
-                saldo = 0
-                
-                for movimento in movimentos:
-                    saldo += movimento['debito'] - movimento['credito']
-                    dados_movimentos.append([
-                        movimento['data'].strftime('%d/%m/%Y'),
-                        movimento['descricao'],
-                        movimento['lancamento_id'],
-                        f"Kz {movimento['debito']:,.2f}" if movimento['debito'] > 0 else "",
-                        f"Kz {movimento['credito']:,.2f}" if movimento['credito'] > 0 else "",
-                        f"Kz {saldo:,.2f}"
-                    ])
-                
-                # Adicionar linha de total
-                total_debitos = sum(m['debito'] for m in movimentos)
-                total_creditos = sum(m['credito'] for m in movimentos)
-                dados_movimentos.append([
-                    "",
-                    "TOTAIS",
-                    "",
-                    f"Kz {total_debitos:,.2f}",
-                    f"Kz {total_creditos:,.2f}",
-                    f"Kz {saldo:,.2f}"
-                ])
-                
-                # Criar tabela
-                tabela_movimentos = Table(dados_movimentos, colWidths=[2*cm, 6*cm, 2*cm, 3*cm, 3*cm, 3*cm])
-                tabela_movimentos.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                    ('ALIGN', (3, 1), (5, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
-                
-                elementos.append(tabela_movimentos)
-                elementos.append(Spacer(1, 0.5*cm))
+            # Movimentos do período conta a conta, ordenados por data
+            for conta, movimentos in self.percorrer_razao(data_inicio, data_fim):
+                livro.escrever_conta(conta, self.indice_contas.nome(conta), movimentos)
             
             # Gerar PDF
-            doc.build(elementos)
+            livro.fechar()
             
             return True
         except Exception as e:
             print(f"Erro ao gerar livro razão: {str(e)}")
             return False
 
-    def gerar_racu(self, ano, caminho_saida):
+    def gerar_racu(self, ano, caminho_saida, balancete=None):
         """
         Gera o Relatório Anual de Contas Único (RAÇU) para um ano específico
         Args:
             ano: Ano do relatório
             caminho_saida: Caminho do arquivo PDF de saída
+            balancete: Balancete do ano (opcional; calculado se não for indicado)
         Returns:
             bool: True se gerado com sucesso, False caso contrário
         """
         try:
-            # Converter dados para lançamentos contábeis se necessário
-            self.converter_dados_para_lancamentos()
-            
             # Definir período
             data_inicio = datetime(ano, 1, 1)
             data_fim = datetime(ano, 12, 31)
             
-            # Filtrar lançamentos do período
-            lancamentos_filtrados = [l for l in self.lancamentos
-                                    if data_inicio <= l['data'] <= data_fim]
-            
-            # Calcular saldos das contas
-            saldos = {}
-            for lancamento in lancamentos_filtrados:
-                for movimento in lancamento['movimentos']:
-                    conta = movimento['conta']
-                    if conta not in saldos:
-                        saldos[conta] = 0
-                    saldos[conta] += movimento['debito'] - movimento['credito']
-            
-            # Calcular resultado do exercício
-            resultado_liquido = 0
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('6'):  # Despesas
-                    resultado_liquido -= saldo
-                elif codigo_conta.startswith('7'):  # Receitas
-                    resultado_liquido += -saldo  # Receitas têm saldo credor (negativo)
+            # Saldos das contas no período e resultado do exercício
+            if balancete is None or not balancete.cobre(data_inicio, data_fim):
+                balancete = self.fechamento.balancete(data_inicio, data_fim)
+            dados = dados_racu(balancete, self.plano_contas, self.indice_contas, self.bens_amortizaveis, ano)
             
             # Criar documento PDF
             doc = SimpleDocTemplate(caminho_saida, pagesize=A4)
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
@@ -1110,13 +1343,7 @@ class ContabilidadeAvancada:
             ]
             
             tabela_empresa = Table(dados_empresa, colWidths=[5*cm, 12*cm])
-            tabela_empresa.setStyle(TableStyle([
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
-                ('FONTNAME', (0, 0), (0, -1), 'Helvetica-Bold'),
-                ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
-                ('PADDING', (0, 0), (-1, -1), 6)
-            ]))
+            tabela_empresa.setStyle(estilo_ficha())
             
             elementos.append(tabela_empresa)
             elementos.append(Spacer(1, 0.3*cm))
@@ -1129,77 +1356,23 @@ class ContabilidadeAvancada:
             
             # Ativo
             dados_balanco_ativo = [["ATIVO", ""]]
-            total_ativo = 0
-            
-            # Adicionar contas do ativo
-            for classe in ["1", "2", "3", "4"]:
-                if classe in self.plano_contas:
-                    classe_info = self.plano_contas[classe]
-                    for codigo_conta, conta_info in classe_info.get('contas', {}).items():
-                        if codigo_conta in saldos and (conta_info['tipo'] == 'ativo' or
-                                                     (conta_info['tipo'] == 'misto' and saldos[codigo_conta] > 0)):
-                            saldo = saldos[codigo_conta]
-                            
-                            # Ajustar para contas retificadoras
-                            if conta_info['natureza'] == 'credora':
-                                saldo = -saldo
-                            
-                            dados_balanco_ativo.append([f"{codigo_conta} - {conta_info['nome']}", f"Kz {abs(saldo):,.2f}"])
-                            total_ativo += saldo
-            
-            # Adicionar total
-            dados_balanco_ativo.append(["TOTAL DO ATIVO", f"Kz {total_ativo:,.2f}"])
+            dados_balanco_ativo += [[f"{conta} - {nome}", f"Kz {abs(valor):,.2f}"]
+                                    for conta, nome, valor in dados['ativo']['linhas']]
+            dados_balanco_ativo.append(["TOTAL DO ATIVO", f"Kz {dados['ativo']['total'][1]:,.2f}"])
             
-            # Passivo e Capital Próprio
+            # Passivo e Capital Próprio (com o resultado do exercício)
             dados_balanco_passivo = [["PASSIVO E CAPITAL PRÓPRIO", ""]]
-            total_passivo_cp = 0
-            
-            # Adicionar contas do passivo e capital próprio
-            for classe in ["3", "5"]:
-                if classe in self.plano_contas:
-                    classe_info = self.plano_contas[classe]
-                    for codigo_conta, conta_info in classe_info.get('contas', {}).items():
-                        if codigo_conta in saldos and (conta_info['tipo'] == 'passivo' or
-                                                     (conta_info['tipo'] == 'misto' and saldos[codigo_conta] < 0) or
-                                                     conta_info['tipo'] == 'capital'):
-                            saldo = saldos[codigo_conta]
-                            
-                            # Ajustar para contas do passivo (crédito é positivo)
-                            if conta_info['natureza'] == 'credora':
-                                saldo = -saldo
-                            
-                            dados_balanco_passivo.append([f"{codigo_conta} - {conta_info['nome']}", f"Kz {abs(saldo):,.2f}"])
-                            total_passivo_cp += saldo
-            
-            # Adicionar resultado do exercício
-            dados_balanco_passivo.append(["88 - Resultado Líquido do Exercício", f"Kz {abs(resultado_liquido):,.2f}"])
-            total_passivo_cp += resultado_liquido
-            
-            # Adicionar total
-            dados_balanco_passivo.append(["TOTAL DO PASSIVO E CAPITAL PRÓPRIO", f"Kz {total_passivo_cp:,.2f}"])
+            dados_balanco_passivo += [[f"{conta} - {nome}", f"Kz {abs(valor):,.2f}"]
+                                      for conta, nome, valor in dados['passivo_capital']['linhas']]
+            dados_balanco_passivo.append(["TOTAL DO PASSIVO E CAPITAL PRÓPRIO",
+                                          f"Kz {dados['passivo_capital']['total'][1]:,.2f}"])
             
             # Criar tabelas
             tabela_balanco_ativo = Table(dados_balanco_ativo, colWidths=[13*cm, 4*cm])
-            tabela_balanco_ativo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_balanco_ativo.setStyle(estilo_valores())
             
             tabela_balanco_passivo = Table(dados_balanco_passivo, colWidths=[13*cm, 4*cm])
-            tabela_balanco_passivo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_balanco_passivo.setStyle(estilo_valores())
             
             elementos.append(tabela_balanco_ativo)
             elementos.append(Spacer(1, 0.3*cm))
@@ -1210,59 +1383,18 @@ class ContabilidadeAvancada:
             elementos.append(Paragraph("2.2 Demonstração de Resultados", estilo_normal))
             
             dados_dre = [["DEMONSTRAÇÃO DE RESULTADOS", ""]]
-            
-            # Receitas
-            total_receitas = 0
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('7'):  # Receitas
-                    # Para receitas, o saldo é crédito (negativo no nosso cálculo)
-                    valor = -saldo
-                    
-                    # Buscar nome no plano de contas
-                    nome_conta = "Conta Desconhecida"
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            nome_conta = classe_info['contas'][codigo_conta]['nome']
-                            break
-                    
-                    dados_dre.append([f"{codigo_conta} - {nome_conta}", f"Kz {valor:,.2f}"])
-                    total_receitas += valor
-            
-            dados_dre.append(["Total de Receitas", f"Kz {total_receitas:,.2f}"])
-            
-            # Despesas
-            total_despesas = 0
-            for codigo_conta, saldo in saldos.items():
-                if codigo_conta.startswith('6'):  # Despesas
-                    # Para despesas, o saldo é débito (positivo no nosso cálculo)
-                    valor = saldo
-                    
-                    # Buscar nome no plano de contas
-                    nome_conta = "Conta Desconhecida"
-                    for classe, classe_info in self.plano_contas.items():
-                        if 'contas' in classe_info and codigo_conta in classe_info['contas']:
-                            nome_conta = classe_info['contas'][codigo_conta]['nome']
-                            break
-                    
-                    dados_dre.append([f"{codigo_conta} - {nome_conta}", f"Kz {valor:,.2f}"])
-                    total_despesas += valor
-            
-            dados_dre.append(["Total de Despesas", f"Kz {total_despesas:,.2f}"])
+            dre = dados['dre']
+            for secao in (dre['receitas'], dre['despesas']):
+                dados_dre += [[f"{conta} - {nome}", f"Kz {valor:,.2f}"] for conta, nome, valor in secao['linhas']]
+                rotulo, total = secao['total']
+                dados_dre.append([rotulo, f"Kz {total:,.2f}"])
             
             # Resultado
-            dados_dre.append(["Resultado Líquido do Exercício", f"Kz {resultado_liquido:,.2f}"])
+            dados_dre.append(["Resultado Líquido do Exercício", f"Kz {dre['resultado_liquido']:,.2f}"])
             
             # Criar tabela
             tabela_dre = Table(dados_dre, colWidths=[13*cm, 4*cm])
-            tabela_dre.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_dre.setStyle(estilo_valores())
             
             elementos.append(tabela_dre)
             elementos.append(Spacer(1, 0.5*cm))
@@ -1279,30 +1411,20 @@ class ContabilidadeAvancada:
             elementos.append(Paragraph("3.2 Imobilizações", estilo_normal))
             
             # Tabela de bens amortizáveis
-            if self.bens_amortizaveis:
+            if dados['bens']:
                 dados_bens = [["Código", "Descrição", "Valor Original", "Amortização Acumulada", "Valor Líquido"]]
                 
-                for bem in self.bens_amortizaveis:
-                    amortizacao_acumulada = sum(a['valor'] for a in bem.get('amortizacoes', [])
-                                              if a['data'].year <= ano)
-                    valor_liquido = bem['valor'] - amortizacao_acumulada
-                    
+                for codigo, descricao, valor, amortizacao_acumulada, valor_liquido in dados['bens']:
                     dados_bens.append([
-                        bem['codigo'],
-                        bem['descricao'],
-                        f"Kz {bem['valor']:,.2f}",
+                        codigo,
+                        descricao,
+                        f"Kz {valor:,.2f}",
                         f"Kz {amortizacao_acumulada:,.2f}",
                         f"Kz {valor_liquido:,.2f}"
                     ])
                 
                 tabela_bens = Table(dados_bens, colWidths=[2*cm, 6*cm, 3*cm, 3*cm, 3*cm])
-                tabela_bens.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('ALIGN', (2, 1), (-1, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
+                tabela_bens.setStyle(estilo_tabela((((2, 1), (-1, -1), 'RIGHT'),), tamanho_cabecalho=None))
                 
                 elementos.append(tabela_bens)
             else:
@@ -1330,89 +1452,38 @@ class ContabilidadeAvancada:
             print(f"Erro ao gerar RAÇU: {str(e)}")
             return False
 
-    def gerar_fluxo_caixa(self, data_inicio, data_fim, caminho_saida):
+    def gerar_fluxo_caixa(self, data_inicio, data_fim, caminho_saida, balancete=None):
         """
         Gera a Demonstração dos Fluxos de Caixa para um período específico
         Args:
             data_inicio: Data de início do período
             data_fim: Data de fim do período
             caminho_saida: Caminho do arquivo PDF de saída
+            balancete: Balancete do período (opcional; calculado se não for indicado)
         Returns:
             bool: True se gerado com sucesso, False caso contrário
         """
         try:
-            # Converter dados para lançamentos contábeis se necessário
-            self.converter_dados_para_lancamentos()
-            
-            # Filtrar lançamentos do período
-            lancamentos_filtrados = [l for l in self.lancamentos
-                                    if data_inicio <= l['data'] <= data_fim]
-            
-            # Classificar lançamentos por tipo de atividade
-            atividades_operacionais = []
-            atividades_investimento = []
-            atividades_financiamento = []
-            
-            for lancamento in lancamentos_filtrados:
-                # Classificação simplificada baseada nas contas envolvidas
-                tipo_atividade = None
-                
-                for movimento in lancamento['movimentos']:
-                    conta = movimento['conta']
-                    
-                    # Contas de resultado (6 e 7) e algumas de ativo circulante (2, 3, 4) são operacionais
-                    if conta.startswith(('6', '7', '2', '3', '4')):
-                        tipo_atividade = 'operacional'
-                        break
-                    
-                    # Contas de imobilizado (1) são de investimento
-                    elif conta.startswith('1'):
-                        tipo_atividade = 'investimento'
-                        break
-                    
-                    # Contas de capital (5) e empréstimos (33) são de financiamento
-                    elif conta.startswith('5') or conta.startswith('33'):
-                        tipo_atividade = 'financiamento'
-                        break
-                
-                # Se não foi possível classificar, considerar operacional
-                if tipo_atividade is None:
-                    tipo_atividade = 'operacional'
-                
-                # Calcular valor líquido do lançamento
-                valor_liquido = 0
-                for movimento in lancamento['movimentos']:
-                    if movimento['conta'].startswith(('4')):  # Contas de caixa e bancos
-                        valor_liquido += movimento['debito'] - movimento['credito']
-                
-                # Adicionar à lista correspondente
-                item = {
-                    'data': lancamento['data'],
-                    'descricao': lancamento['descricao'],
-                    'valor': valor_liquido
-                }
-                
-                if tipo_atividade == 'operacional':
-                    atividades_operacionais.append(item)
-                elif tipo_atividade == 'investimento':
-                    atividades_investimento.append(item)
-                elif tipo_atividade == 'financiamento':
-                    atividades_financiamento.append(item)
-            
-            # Calcular totais
-            total_operacional = sum(item['valor'] for item in atividades_operacionais)
-            total_investimento = sum(item['valor'] for item in atividades_investimento)
-            total_financiamento = sum(item['valor'] for item in atividades_financiamento)
-            
-            # Variação de caixa
-            variacao_caixa = total_operacional + total_investimento + total_financiamento
+            # Lançamentos do período classificados por tipo de atividade
+            if balancete is None or not balancete.cobre(data_inicio, data_fim):
+                balancete = self.fechamento.balancete(data_inicio, data_fim)
+            dados = dados_fluxo_caixa(balancete)
+            atividades_operacionais = dados['operacional']['linhas']
+            atividades_investimento = dados['investimento']['linhas']
+            atividades_financiamento = dados['financiamento']['linhas']
+            
+            # Totais e variação de caixa
+            total_operacional = dados['operacional']['total'][1]
+            total_investimento = dados['investimento']['total'][1]
+            total_financiamento = dados['financiamento']['total'][1]
+            variacao_caixa = dados['variacao_caixa']
             
             # Criar documento PDF
             doc = SimpleDocTemplate(caminho_saida, pagesize=A4)
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
@@ -1426,25 +1497,17 @@ class ContabilidadeAvancada:
             elementos.append(Paragraph("1. FLUXOS DE CAIXA DAS ATIVIDADES OPERACIONAIS", estilo_subtitulo))
             
             dados_operacionais = [["Data", "Descrição", "Valor"]]
-            for item in atividades_operacionais:
+            for data, descricao, valor in atividades_operacionais:
                 dados_operacionais.append([
-                    item['data'].strftime('%d/%m/%Y'),
-                    item['descricao'],
-                    f"Kz {item['valor']:,.2f}"
+                    data.strftime('%d/%m/%Y'),
+                    descricao,
+                    f"Kz {valor:,.2f}"
                 ])
             
             dados_operacionais.append(["", "Total das Atividades Operacionais", f"Kz {total_operacional:,.2f}"])
             
             tabela_operacionais = Table(dados_operacionais, colWidths=[2.5*cm, 11.5*cm, 3*cm])
-            tabela_operacionais.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_operacionais.setStyle(estilo_tabela((((2, 1), (2, -1), 'RIGHT'),), tamanho_cabecalho=None, linha_total=True))
             
             elementos.append(tabela_operacionais)
             elementos.append(Spacer(1, 0.5*cm))
@@ -1454,25 +1517,17 @@ class ContabilidadeAvancada:
             
             if atividades_investimento:
                 dados_investimento = [["Data", "Descrição", "Valor"]]
-                for item in atividades_investimento:
+                for data, descricao, valor in atividades_investimento:
                     dados_investimento.append([
-                        item['data'].strftime('%d/%m/%Y'),
-                        item['descricao'],
-                        f"Kz {item['valor']:,.2f}"
+                        data.strftime('%d/%m/%Y'),
+                        descricao,
+                        f"Kz {valor:,.2f}"
                     ])
                 
                 dados_investimento.append(["", "Total das Atividades de Investimento", f"Kz {total_investimento:,.2f}"])
                 
                 tabela_investimento = Table(dados_investimento, colWidths=[2.5*cm, 11.5*cm, 3*cm])
-                tabela_investimento.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                    ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
+                tabela_investimento.setStyle(estilo_tabela((((2, 1), (2, -1), 'RIGHT'),), tamanho_cabecalho=None, linha_total=True))
                 
                 elementos.append(tabela_investimento)
             else:
@@ -1485,25 +1540,17 @@ class ContabilidadeAvancada:
             
             if atividades_financiamento:
                 dados_financiamento = [["Data", "Descrição", "Valor"]]
-                for item in atividades_financiamento:
+                for data, descricao, valor in atividades_financiamento:
                     dados_financiamento.append([
-                        item['data'].strftime('%d/%m/%Y'),
-                        item['descricao'],
-                        f"Kz {item['valor']:,.2f}"
+                        data.strftime('%d/%m/%Y'),
+                        descricao,
+                        f"Kz {valor:,.2f}"
                     ])
                 
                 dados_financiamento.append(["", "Total das Atividades de Financiamento", f"Kz {total_financiamento:,.2f}"])
                 
                 tabela_financiamento = Table(dados_financiamento, colWidths=[2.5*cm, 11.5*cm, 3*cm])
-                tabela_financiamento.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                    ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                    ('ALIGN', (2, 1), (2, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black)
-                ]))
+                tabela_financiamento.setStyle(estilo_tabela((((2, 1), (2, -1), 'RIGHT'),), tamanho_cabecalho=None, linha_total=True))
                 
                 elementos.append(tabela_financiamento)
             else:
@@ -1523,15 +1570,7 @@ class ContabilidadeAvancada:
             ]
             
             tabela_resumo = Table(dados_resumo, colWidths=[14*cm, 3*cm])
-            tabela_resumo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 0), (1, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_resumo.setStyle(estilo_valores())
             
             elementos.append(tabela_resumo)
             
@@ -1545,91 +1584,44 @@ class ContabilidadeAvancada:
 
     def calcular_amortizacoes(self, data_referencia):
         """
-        Calcula as amortizações dos bens até uma data de referência
+        Calcula as amortizações dos bens até uma data de referência e regista
+        as que faltam (anos sem registo ou registados só em parte), num único lote
         Args:
             data_referencia: Data de referência para o cálculo
         Returns:
             list: Lista de amortizações calculadas
         """
         amortizacoes = []
+        em_falta = self.motor_amortizacoes.em_falta(self.bens_amortizaveis, data_referencia)
+        if not em_falta:
+            return amortizacoes
         
-        for bem in self.bens_amortizaveis:
-            # Verificar se o bem foi adquirido antes da data de referência
-            if bem['data'] > data_referencia:
-                continue
-            
-            # Calcular valor amortizável
-            valor_amortizavel = bem['valor'] - bem['valor_residual']
-            
-            # Calcular taxa anual de amortização
-            taxa_anual = 1 / bem['vida_util']
-            
-            # Calcular valor anual de amortização
-            valor_anual = valor_amortizavel * taxa_anual
-            
-            # Calcular amortizações até a data de referência
-            data_inicio = bem['data']
-            anos_completos = (data_referencia.year - data_inicio.year)
-            
-            # Ajustar para anos parciais
-            if data_referencia.month < data_inicio.month or (data_referencia.month == data_inicio.month and data_referencia.day < data_inicio.day):
-                anos_completos -= 1
-            
-            # Limitar ao número de anos da vida útil
-            anos_completos = min(anos_completos, bem['vida_util'])
-            
-            # Verificar amortizações já registradas
-            anos_registrados = set()
-            for amort in bem.get('amortizacoes', []):
-                anos_registrados.add(amort['data'].year)
-            
-            # Registrar amortizações para anos ainda não registrados
-            for ano in range(data_inicio.year, data_inicio.year + anos_completos + 1):
-                if ano not in anos_registrados:
-                    # Para o primeiro ano, calcular proporcionalmente aos meses restantes
-                    if ano == data_inicio.year:
-                        meses_restantes = 12 - data_inicio.month + 1
-                        valor = valor_anual * (meses_restantes / 12)
-                    # Para o último ano (se for o ano da data de referência), calcular proporcionalmente
-                    elif ano == data_referencia.year:
-                        meses_decorridos = data_referencia.month
-                        valor = valor_anual * (meses_decorridos / 12)
-                    # Para anos completos intermediários
-                    else:
-                        valor = valor_anual
-                    
-                    # Criar registro de amortização
-                    amortizacao = {
-                        'bem_codigo': bem['codigo'],
-                        'data': datetime(ano, 12, 31),  # Último dia do ano
-                        'valor': valor,
-                        'acumulada': sum(a['valor'] for a in bem.get('amortizacoes', [])
-                                       if a['data'].year < ano) + valor
-                    }
-                    
-                    amortizacoes.append(amortizacao)
-                    
-                    # Adicionar à lista de amortizações do bem
-                    if 'amortizacoes' not in bem:
-                        bem['amortizacoes'] = []
-                    
-                    bem['amortizacoes'].append({
-                        'data': datetime(ano, 12, 31),
-                        'valor': valor
-                    })
-                    
-                    # Registrar lançamento contábil
-                    self.registrar_lancamento(
-                        datetime(ano, 12, 31),
-                        f"Amortização anual de {bem['descricao']}",
-                        [
-                            {'conta': '66', 'debito': valor, 'credito': 0},  # Débito em Amortizações do Exercício
-                            {'conta': '19', 'debito': 0, 'credito': valor}   # Crédito em Amortizações Acumuladas
-                        ]
-                    )
-        
-        # Salvar dados atualizados
-        self.salvar_dados()
+        # Todas as amortizações são gravadas uma única vez, no fim do lote
+        with self.lote():
+            for posicao, ano, valor, acumulada in em_falta:
+                bem = self.bens_amortizaveis[posicao]
+                data = datetime(ano, 12, 31)  # Último dia do ano
+                
+                amortizacoes.append({
+                    'bem_codigo': bem['codigo'],
+                    'data': data,
+                    'valor': valor,
+                    'acumulada': acumulada
+                })
+                
+                # Adicionar à lista de amortizações do bem
+                bem.setdefault('amortizacoes', []).append({'data': data, 'valor': valor})
+                self.marcar_bem_alterado(bem)
+                
+                # Registrar lançamento contábil
+                self.registrar_lancamento(
+                    data,
+                    f"Amortização anual de {bem['descricao']}",
+                    [
+                        {'conta': '66', 'debito': valor, 'credito': 0},  # Débito em Amortizações do Exercício
+                        {'conta': '19', 'debito': 0, 'credito': valor}   # Crédito em Amortizações Acumuladas
+                    ]
+                )
         
         return amortizacoes
 
@@ -1,13 +1,18 @@
 import tkinter as tk
 from tkinter import ttk
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import numpy as np
+from agregacoes import comparar_por_periodo
+from graficos_assincronos import GraficoAssincrono, impressao_dados
+from tipos_compactos import total_kz
 
 class DashboardAvancado:
     def __init__(self, dados_banco, dados_livro):
+        # Aceita o formato compacto (ver tipos_compactos) ou o expandido
         self.dados_banco = dados_banco
         self.dados_livro = dados_livro
+        # Calculados na thread de desenho dos gráficos, uma vez para todas as abas
+        self._comparativo_diario = None
+        self._impressao = None
         
         self.janela = tk.Toplevel()
         self.janela.title("Dashboard Avançado")
@@ -15,6 +20,20 @@ class DashboardAvancado:
         
         self.criar_dashboard()
         
+    @property
+    def comparativo_diario(self):
+        """Totais diários do banco e do livro"""
+        if self._comparativo_diario is None:
+            self._comparativo_diario = comparar_por_periodo(self.dados_banco, self.dados_livro, 'D')
+        return self._comparativo_diario
+    
+    def impressao(self):
+        """Impressão dos dados do banco e do livro (chave dos gráficos na cache)"""
+        if self._impressao is None:
+            self._impressao = impressao_dados(self.dados_banco[['data', 'valor']],
+                                              self.dados_livro[['data', 'valor']])
+        return self._impressao
+    
     def criar_dashboard(self):
         notebook = ttk.Notebook(self.janela)
         notebook.pack(fill='both', expand=True, padx=10, pady=5)
@@ -37,8 +56,8 @@ class DashboardAvancado:
         frame_superior.pack(fill='x', padx=5, pady=5)
         
         # Estatísticas principais
-        total_banco = self.dados_banco['valor'].sum()
-        total_livro = self.dados_livro['valor'].sum()
+        total_banco = total_kz(self.dados_banco)
+        total_livro = total_kz(self.dados_livro)
         diferenca = total_banco - total_livro
         
         ttk.Label(frame_superior, 
@@ -56,8 +75,13 @@ class DashboardAvancado:
         frame_graficos.pack(fill='both', expand=True, padx=5, pady=5)
         
         # Gráfico de Pizza para valores positivos
-        fig1 = plt.Figure(figsize=(6, 4))
-        ax1 = fig1.add_subplot(111)
+        GraficoAssincrono(frame_graficos, 'dashboard_visao_geral', self.desenhar_visao_geral,
+                          lambda: (total_banco, total_livro),
+                          self.impressao).pack(side='left', fill='both', expand=True)
+        
+    def desenhar_visao_geral(self, fig, totais):
+        total_banco, total_livro = totais
+        ax1 = fig.add_subplot(111)
         
         valores_positivos = [max(0, total_banco), max(0, total_livro)]
         valores_negativos = [abs(min(0, total_banco)), abs(min(0, total_livro))]
@@ -68,20 +92,20 @@ class DashboardAvancado:
                    autopct='%1.1f%%' if sum(valores_positivos) > 0 else None)
             ax1.set_title('Distribuição de Valores Positivos')
         
-        canvas1 = FigureCanvasTkAgg(fig1, frame_graficos)
-        canvas1.draw()
-        canvas1.get_tk_widget().pack(side='left', fill='both', expand=True)
-        
     def criar_tendencias(self, container):
-        fig = plt.Figure(figsize=(10, 6))
+        GraficoAssincrono(container, 'dashboard_tendencias', self.desenhar_tendencias,
+                          lambda: self.comparativo_diario,
+                          self.impressao).pack(fill='both', expand=True)
+        
+    def desenhar_tendencias(self, fig, comparativo):
         ax = fig.add_subplot(111)
         
-        # Evolução temporal
-        ax.plot(self.dados_banco['data'], 
-               self.dados_banco['valor'].cumsum(),
+        # Evolução temporal (totais diários acumulados)
+        ax.plot(comparativo.index, 
+               comparativo['banco'].cumsum(),
                label='Banco')
-        ax.plot(self.dados_livro['data'], 
-               self.dados_livro['valor'].cumsum(),
+        ax.plot(comparativo.index, 
+               comparativo['livro'].cumsum(),
                label='Livro')
         
         ax.set_title('Evolução Temporal dos Valores')
@@ -89,27 +113,18 @@ class DashboardAvancado:
         ax.set_ylabel('Valor Acumulado (Kz)')
         ax.legend()
         
-        canvas = FigureCanvasTkAgg(fig, container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
-        
     def criar_comparativo(self, container):
-        fig = plt.Figure(figsize=(10, 6))
+        GraficoAssincrono(container, 'dashboard_comparativo', self.desenhar_comparativo,
+                          lambda: self.comparativo_diario,
+                          self.impressao).pack(fill='both', expand=True)
+        
+    def desenhar_comparativo(self, fig, comparativo):
         ax = fig.add_subplot(111)
         
         # Análise diária
-        datas_unicas = sorted(set(self.dados_banco['data'].unique()) | 
-                            set(self.dados_livro['data'].unique()))
-        
-        valores_banco = []
-        valores_livro = []
-        
-        for data in datas_unicas:
-            valor_banco = self.dados_banco[self.dados_banco['data'] == data]['valor'].sum()
-            valor_livro = self.dados_livro[self.dados_livro['data'] == data]['valor'].sum()
-            
-            valores_banco.append(valor_banco)
-            valores_livro.append(valor_livro)
+        datas_unicas = comparativo.index
+        valores_banco = comparativo['banco'].to_numpy()
+        valores_livro = comparativo['livro'].to_numpy()
         
         x = np.arange(len(datas_unicas))
         largura = 0.35
@@ -124,7 +139,3 @@ class DashboardAvancado:
         ax.set_xticklabels([data.strftime('%d/%m') for data in datas_unicas], 
                           rotation=45)
         ax.legend()
-        
-        canvas = FigureCanvasTkAgg(fig, container)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill='both', expand=True)
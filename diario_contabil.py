@@ -0,0 +1,214 @@
+import json
+import os
+from datetime import date, datetime
+
+# orjson (opcional) lê JSON várias vezes mais depressa que o módulo json
+try:
+    import orjson
+    ORJSON_DISPONIVEL = True
+except ImportError:
+    ORJSON_DISPONIVEL = False
+
+
+def carregar_json(texto):
+    """Interpreta texto JSON (str ou bytes) com orjson, se disponível"""
+    if ORJSON_DISPONIVEL:
+        return orjson.loads(texto)
+    return json.loads(texto)
+
+
+def ler_arquivo_json(arquivo):
+    """Lê um arquivo JSON completo com o analisador mais rápido disponível"""
+    with open(arquivo, 'rb') as f:
+        return carregar_json(f.read())
+
+
+def serializar_valor(valor):
+    """Conversão para JSON de datas e escalares numpy/pandas"""
+    if isinstance(valor, (datetime, date)):
+        return valor.isoformat()
+    if hasattr(valor, 'item'):
+        return valor.item()
+    raise TypeError(f"Tipo não serializável: {type(valor).__name__}")
+
+
+def restaurar_lancamento(lanc):
+    """Converte as datas de um lançamento lido de JSON"""
+    lanc['data'] = datetime.fromisoformat(lanc['data'])
+    return lanc
+
+
+def restaurar_bem(bem):
+    """Converte as datas de um bem amortizável (e das suas amortizações) lido de JSON"""
+    bem['data'] = datetime.fromisoformat(bem['data'])
+    for amort in bem.get('amortizacoes', []):
+        amort['data'] = datetime.fromisoformat(amort['data'])
+    return bem
+
+
+class DiarioContabil:
+    """
+    Diário de alterações (JSON Lines) gravado apenas por acréscimo. Cada operação
+    custa uma linha de I/O; periodicamente o estado completo é gravado num
+    snapshot e o diário é esvaziado (compactação).
+
+    Operações:
+        {'op': 'lancamento', 'indice': n, 'dados': {...}}           novo lançamento na posição n
+        {'op': 'lancamento_alterado', 'indice': n, 'dados': {...}}  substitui o lançamento n
+        {'op': 'bem', 'dados': {...}}                               inclui ou substitui um bem
+    """
+
+    def __init__(self, arquivo='diario_contabil.jsonl', limite_compactacao=5000):
+        """
+        Args:
+            arquivo: Caminho do arquivo do diário
+            limite_compactacao: Número de operações a partir do qual se deve compactar
+        """
+        self.arquivo = arquivo
+        self.limite_compactacao = limite_compactacao
+        self.total_operacoes = 0
+        # O fim do arquivo só é verificado antes do primeiro acréscimo
+        self._fim_verificado = False
+
+    def registrar(self, operacoes):
+        """
+        Acrescenta operações ao fim do diário. Antes do primeiro acréscimo
+        (ou depois de uma gravação falhada) a última linha é reparada, para
+        que a nova operação não fique colada a uma linha incompleta.
+
+        Args:
+            operacoes: Lista de dicionários de operação
+        """
+        if not operacoes:
+            return
+        linhas = [json.dumps(op, ensure_ascii=False, default=serializar_valor) for op in operacoes]
+        if not self._fim_verificado:
+            self.reparar_fim()
+        self._fim_verificado = False
+        with open(self.arquivo, 'a', encoding='utf-8') as f:
+            f.write("\n".join(linhas) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        self._fim_verificado = True
+        self.total_operacoes += len(operacoes)
+
+    def reparar_fim(self):
+        """
+        Corta a última linha do diário se uma gravação interrompida a deixou
+        incompleta. Uma linha completa a que só falta a quebra de linha é
+        mantida e terminada.
+
+        Returns:
+            bool: True se o arquivo foi alterado
+        """
+        self._fim_verificado = True
+        if not os.path.exists(self.arquivo):
+            return False
+
+        with open(self.arquivo, 'rb+') as f:
+            tamanho = f.seek(0, os.SEEK_END)
+            if tamanho == 0:
+                return False
+            # Procura o início da última linha em blocos, a partir do fim
+            inicio = tamanho
+            while inicio > 0:
+                passo = min(inicio, 65536)
+                f.seek(inicio - passo)
+                bloco = f.read(passo)
+                if inicio == tamanho and bloco.endswith(b"\n"):
+                    return False
+                quebra = bloco.rfind(b"\n")
+                if quebra >= 0:
+                    inicio = inicio - passo + quebra + 1
+                    break
+                inicio -= passo
+
+            f.seek(inicio)
+            ultima = f.read()
+            try:
+                carregar_json(ultima)
+                f.write(b"\n")
+            except ValueError:
+                print(f"Erro no diário contábil: linha final incompleta removida ({len(ultima)} bytes)")
+                f.truncate(inicio)
+            f.flush()
+            os.fsync(f.fileno())
+        return True
+
+    def ler_operacoes(self):
+        """
+        Lê as operações do diário. Uma última linha incompleta (gravação
+        interrompida) é ignorada aqui e cortada por reparar_fim antes do
+        próximo acréscimo. O arquivo não é alterado durante a leitura.
+
+        Yields:
+            dict: Operação
+        """
+        self.total_operacoes = 0
+        if not os.path.exists(self.arquivo):
+            return
+
+        # Em binário: um carácter multibyte cortado não interrompe a leitura
+        with open(self.arquivo, 'rb') as f:
+            for numero, linha in enumerate(f, start=1):
+                linha = linha.strip()
+                if not linha:
+                    continue
+                try:
+                    operacao = carregar_json(linha)
+                except ValueError:
+                    print(f"Erro no diário contábil: linha {numero} inválida ignorada")
+                    continue
+                self.total_operacoes += 1
+                yield operacao
+
+    def aplicar(self, lancamentos, bens_amortizaveis):
+        """
+        Reproduz o diário sobre os dados carregados do snapshot
+
+        Args:
+            lancamentos: Lista de lançamentos (alterada no próprio objeto)
+            bens_amortizaveis: Lista de bens (alterada no próprio objeto)
+        """
+        posicao_bens = {bem['codigo']: i for i, bem in enumerate(bens_amortizaveis)}
+
+        for operacao in self.ler_operacoes():
+            tipo = operacao.get('op')
+            if tipo in ('lancamento', 'lancamento_alterado'):
+                # A posição torna a reprodução idempotente: se a compactação foi
+                # interrompida depois do snapshot, o lançamento já lá está
+                indice = operacao['indice']
+                if 0 <= indice < len(lancamentos):
+                    lancamentos[indice] = restaurar_lancamento(operacao['dados'])
+                elif indice == len(lancamentos):
+                    lancamentos.append(restaurar_lancamento(operacao['dados']))
+                else:
+                    print(f"Erro no diário contábil: operação para a posição {indice} ignorada "
+                          f"(só existem {len(lancamentos)} lançamentos)")
+            elif tipo == 'bem':
+                bem = restaurar_bem(operacao['dados'])
+                if bem['codigo'] in posicao_bens:
+                    bens_amortizaveis[posicao_bens[bem['codigo']]] = bem
+                else:
+                    posicao_bens[bem['codigo']] = len(bens_amortizaveis)
+                    bens_amortizaveis.append(bem)
+
+    def precisa_compactar(self):
+        return self.total_operacoes >= self.limite_compactacao
+
+    def limpar(self):
+        """Esvazia o diário depois de gravado um snapshot"""
+        with open(self.arquivo, 'w', encoding='utf-8'):
+            pass
+        self.total_operacoes = 0
+        self._fim_verificado = True
+
+
+def gravar_snapshot(arquivo, dados):
+    """Grava um arquivo JSON completo de forma atómica (arquivo temporário + os.replace)"""
+    temporario = arquivo + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as f:
+        json.dump(dados, f, ensure_ascii=False, indent=2, default=serializar_valor)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporario, arquivo)
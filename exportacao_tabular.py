@@ -0,0 +1,167 @@
+import csv
+import os
+from datetime import datetime
+from itertools import islice
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_DISPONIVEL = True
+except ImportError:
+    PYARROW_DISPONIVEL = False
+
+try:
+    from openpyxl import Workbook
+    from openpyxl.cell import WriteOnlyCell
+    from openpyxl.styles import Font
+    OPENPYXL_DISPONIVEL = True
+except ImportError:
+    OPENPYXL_DISPONIVEL = False
+
+FORMATOS = ('csv', 'xlsx', 'parquet')
+
+# Tipos das colunas: 'texto', 'data' ou 'valor' (Kz, duas casas decimais)
+TIPOS_ARROW = {}
+if PYARROW_DISPONIVEL:
+    TIPOS_ARROW = {'texto': pa.string(), 'data': pa.date32(), 'valor': pa.float64()}
+
+
+class TabelaRelatorio:
+    """
+    Resultado do passo de dados de um relatório em forma tabular: nomes e
+    tipos das colunas e um iterável de linhas (tuplos na ordem das colunas).
+    As linhas podem ser um gerador: cada exportador consome-as uma só vez,
+    em blocos, sem as guardar todas em memória.
+    """
+
+    def __init__(self, colunas, linhas, tipos=None):
+        """
+        Args:
+            colunas: Nomes das colunas
+            linhas: Iterável de tuplos com um valor por coluna
+            tipos: {coluna: 'texto' | 'data' | 'valor'} (por omissão 'texto')
+        """
+        self.colunas = list(colunas)
+        self.linhas = linhas
+        self.tipos = [(tipos or {}).get(coluna, 'texto') for coluna in self.colunas]
+
+
+def formato_arquivo(caminho):
+    """Formato de exportação pela extensão do arquivo ('csv', 'xlsx' ou 'parquet')"""
+    extensao = os.path.splitext(caminho)[1].lower().lstrip('.')
+    if extensao in ('xls', 'xlsx'):
+        return 'xlsx'
+    if extensao in ('parquet', 'pq'):
+        return 'parquet'
+    return 'csv'
+
+
+def exportar_csv(tabela, caminho_saida, separador=';'):
+    """
+    Exporta para CSV (UTF-8 com BOM, para abrir corretamente no Excel); datas
+    em ISO e valores com ponto decimal
+
+    Returns:
+        int: Número de linhas exportadas
+    """
+    total = 0
+    with open(caminho_saida, 'w', newline='', encoding='utf-8-sig') as f:
+        escritor = csv.writer(f, delimiter=separador)
+        escritor.writerow(tabela.colunas)
+        posicoes_data = [i for i, tipo in enumerate(tabela.tipos) if tipo == 'data']
+        for linha in tabela.linhas:
+            if posicoes_data:
+                linha = list(linha)
+                for i in posicoes_data:
+                    if linha[i] is not None:
+                        linha[i] = linha[i].strftime('%Y-%m-%d')
+            escritor.writerow(linha)
+            total += 1
+    return total
+
+
+def exportar_xlsx(tabela, caminho_saida, nome_folha='Relatório'):
+    """
+    Exporta para XLSX com o openpyxl em modo write-only: cada linha é escrita
+    diretamente no arquivo, sem manter a folha em memória (com o lxml
+    instalado o openpyxl usa-o e a escrita é bastante mais rápida)
+
+    Returns:
+        int: Número de linhas exportadas
+    """
+    if not OPENPYXL_DISPONIVEL:
+        raise ImportError("openpyxl não está instalado: exportação XLSX indisponível")
+
+    livro = Workbook(write_only=True)
+    folha = livro.create_sheet(nome_folha[:31])
+    negrito = Font(bold=True)
+    cabecalho = []
+    for coluna in tabela.colunas:
+        celula = WriteOnlyCell(folha, value=coluna)
+        celula.font = negrito
+        cabecalho.append(celula)
+    folha.append(cabecalho)
+
+    # Valores simples (sem estilo por célula): o openpyxl já formata as datas
+    total = 0
+    for linha in tabela.linhas:
+        folha.append(linha)
+        total += 1
+    livro.save(caminho_saida)
+    return total
+
+
+def _valor_arrow(valor, tipo):
+    if tipo == 'data' and isinstance(valor, datetime):
+        return valor.date()
+    if tipo == 'texto' and valor is not None and not isinstance(valor, str):
+        return str(valor)
+    return valor
+
+
+def exportar_parquet(tabela, caminho_saida, tamanho_bloco=50000):
+    """
+    Exporta para Parquet com o pyarrow, escrevendo um row group por bloco de
+    linhas (esquema fixo pelos tipos das colunas)
+
+    Returns:
+        int: Número de linhas exportadas
+    """
+    if not PYARROW_DISPONIVEL:
+        raise ImportError("pyarrow não está instalado: exportação Parquet indisponível")
+
+    esquema = pa.schema([(coluna, TIPOS_ARROW[tipo]) for coluna, tipo in zip(tabela.colunas, tabela.tipos)])
+    linhas = iter(tabela.linhas)
+    total = 0
+    with pq.ParquetWriter(caminho_saida, esquema) as escritor:
+        while True:
+            bloco = list(islice(linhas, tamanho_bloco))
+            if not bloco and total:
+                break
+            colunas = list(zip(*bloco)) if bloco else [() for _ in tabela.colunas]
+            arrays = [pa.array([_valor_arrow(valor, tipo) for valor in coluna], type=TIPOS_ARROW[tipo])
+                      for coluna, tipo in zip(colunas, tabela.tipos)]
+            escritor.write_table(pa.Table.from_arrays(arrays, schema=esquema))
+            total += len(bloco)
+            if len(bloco) < tamanho_bloco:
+                break
+    return total
+
+
+def exportar(tabela, caminho_saida, formato=None):
+    """
+    Exporta uma tabela de relatório
+
+    Args:
+        tabela: TabelaRelatorio
+        caminho_saida: Arquivo de saída
+        formato: 'csv', 'xlsx' ou 'parquet' (por omissão, pela extensão do arquivo)
+
+    Returns:
+        int: Número de linhas exportadas
+    """
+    formato = formato or formato_arquivo(caminho_saida)
+    exportadores = {'csv': exportar_csv, 'xlsx': exportar_xlsx, 'parquet': exportar_parquet}
+    if formato not in exportadores:
+        raise ValueError(f"Formato de exportação inválido: {formato}")
+    return exportadores[formato](tabela, caminho_saida)
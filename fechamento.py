@@ -0,0 +1,387 @@
+import os
+from datetime import datetime
+
+
+def classificar_fluxos_caixa(lancamentos):
+    """
+    Classifica os lançamentos por tipo de atividade (demonstração dos fluxos de caixa)
+
+    Args:
+        lancamentos: Lançamentos do período (iterável)
+
+    Returns:
+        dict: {'operacional' | 'investimento' | 'financiamento': [{'data', 'descricao', 'valor'}, ...]}
+    """
+    atividades = {'operacional': [], 'investimento': [], 'financiamento': []}
+
+    for lancamento in lancamentos:
+        # Classificação simplificada baseada nas contas envolvidas
+        tipo_atividade = None
+
+        for movimento in lancamento['movimentos']:
+            conta = movimento['conta']
+
+            # Contas de resultado (6 e 7) e algumas de ativo circulante (2, 3, 4) são operacionais
+            if conta.startswith(('6', '7', '2', '3', '4')):
+                tipo_atividade = 'operacional'
+                break
+
+            # Contas de imobilizado (1) são de investimento
+            elif conta.startswith('1'):
+                tipo_atividade = 'investimento'
+                break
+
+            # Contas de capital (5) e empréstimos (33) são de financiamento
+            elif conta.startswith('5') or conta.startswith('33'):
+                tipo_atividade = 'financiamento'
+                break
+
+        # Se não foi possível classificar, considerar operacional
+        if tipo_atividade is None:
+            tipo_atividade = 'operacional'
+
+        # Valor líquido do lançamento nas contas de caixa e bancos
+        valor_liquido = 0
+        for movimento in lancamento['movimentos']:
+            if movimento['conta'].startswith('4'):
+                valor_liquido += movimento['debito'] - movimento['credito']
+
+        atividades[tipo_atividade].append({
+            'data': lancamento['data'],
+            'descricao': lancamento['descricao'],
+            'valor': valor_liquido
+        })
+
+    return atividades
+
+
+def resultado_liquido(saldos):
+    """Resultado (receitas - despesas) a partir dos saldos das contas 6 e 7"""
+    resultado = 0
+    for codigo_conta, saldo in saldos.items():
+        if codigo_conta.startswith('6'):  # Despesas
+            resultado -= saldo
+        elif codigo_conta.startswith('7'):  # Receitas
+            resultado += -saldo  # Receitas têm saldo credor (negativo)
+    return resultado
+
+
+class Balancete:
+    """
+    Balancete de verificação de um período, calculado uma só vez e partilhado
+    pelas demonstrações (balanço, DRE, RAÇU, fluxos de caixa).
+
+    Atributos:
+        data_inicio, data_fim: Período (None = sem limite)
+        impressao: Impressão dos dados contabilísticos usada no cálculo
+        saldos_periodo: {conta: saldo} dos movimentos do período
+        saldos_acumulados: {conta: saldo} desde o início até data_fim
+    """
+
+    def __init__(self, contabilidade, data_inicio, data_fim, impressao):
+        self.data_inicio = data_inicio
+        self.data_fim = data_fim
+        self.impressao = impressao
+        self.saldos_acumulados = contabilidade.saldos(ate=data_fim)
+        if data_inicio is None:
+            self.saldos_periodo = self.saldos_acumulados
+        else:
+            self.saldos_periodo = contabilidade.saldos(data_inicio, data_fim)
+        self._contabilidade = contabilidade
+        self._atividades = None
+
+    @property
+    def resultado_periodo(self):
+        return resultado_liquido(self.saldos_periodo)
+
+    @property
+    def resultado_acumulado(self):
+        return resultado_liquido(self.saldos_acumulados)
+
+    @property
+    def atividades(self):
+        """Lançamentos do período classificados por atividade (calculados no primeiro acesso)"""
+        if self._atividades is None:
+            self._atividades = classificar_fluxos_caixa(
+                self._contabilidade.lancamentos_entre(self.data_inicio, self.data_fim))
+        return self._atividades
+
+    def cobre(self, data_inicio, data_fim):
+        """Indica se o balancete é o do período indicado"""
+        return self.data_inicio == data_inicio and self.data_fim == data_fim
+
+
+class Fechamento:
+    """
+    Fecho de período: prepara os dados (conversão das importações) e calcula
+    o balancete uma vez por (período, impressão dos dados). As demonstrações
+    do mesmo fecho reutilizam o mesmo balancete em vez de voltarem a
+    percorrer os lançamentos.
+
+    O balancete não altera os lançamentos além da conversão das importações:
+    as amortizações em falta só são registadas pelo balanço (até à data de
+    referência) e pelo fecho explícito (gerar_demonstracoes).
+    """
+
+    LIMITE_CACHE = 32
+
+    def __init__(self, contabilidade):
+        """
+        Args:
+            contabilidade: Instância de ContabilidadeAvancada
+        """
+        self.contabilidade = contabilidade
+        self.cache = {}
+        # False quando os dados já foram preparados por outro processo e este só pode ler
+        self.preparar_dados = True
+
+    def preparar(self, data_amortizacoes=None):
+        """
+        Converte as importações pendentes e, se indicada uma data, regista as
+        amortizações em falta até ela (nada é feito se preparar_dados for False)
+
+        Args:
+            data_amortizacoes: Data de referência das amortizações (None = não amortizar)
+        """
+        if self.preparar_dados:
+            self.contabilidade.converter_dados_para_lancamentos()
+            if data_amortizacoes is not None:
+                self.contabilidade.calcular_amortizacoes(data_amortizacoes)
+
+    def balancete(self, data_inicio, data_fim, amortizar=False):
+        """
+        Balancete do período, da cache se os dados não mudaram
+
+        Args:
+            data_inicio: Data de início (None = desde o início)
+            data_fim: Data de fim (inclusive)
+            amortizar: Registar antes as amortizações em falta até data_fim
+                (balanço e fecho; as restantes demonstrações só leem)
+
+        Returns:
+            Balancete
+        """
+        contabilidade = self.contabilidade
+        self.preparar(data_fim if amortizar else None)
+
+        impressao = contabilidade.impressao_dados()
+        chave = (data_inicio, data_fim)
+        balancete = self.cache.get(chave)
+        if balancete is None or balancete.impressao != impressao:
+            # Dados alterados: os balancetes de outros períodos também ficaram obsoletos
+            self.cache = {c: b for c, b in self.cache.items() if b.impressao == impressao}
+            if len(self.cache) >= self.LIMITE_CACHE:
+                self.cache.clear()
+            balancete = Balancete(contabilidade, data_inicio, data_fim, impressao)
+            self.cache[chave] = balancete
+        return balancete
+
+    def gerar_demonstracoes(self, data_inicio, data_fim, diretorio='.'):
+        """
+        Gera as demonstrações do fecho (balanço em data_fim, DRE e fluxos de
+        caixa do período e RAÇU do ano de data_fim) a partir de balancetes
+        calculados uma só vez. As amortizações em falta são registadas até
+        data_fim (como no balanço), antes de qualquer balancete
+
+        Args:
+            data_inicio: Data de início do período
+            data_fim: Data de fim do período
+            diretorio: Diretório dos PDF
+
+        Returns:
+            dict: {demonstração: caminho do PDF, ou None se não foi gerada}
+        """
+        contabilidade = self.contabilidade
+        balancete = self.balancete(data_inicio, data_fim, amortizar=True)
+        ano = data_fim.year
+        inicio_ano, fim_ano = datetime(ano, 1, 1), datetime(ano, 12, 31)
+        if balancete.cobre(inicio_ano, fim_ano):
+            balancete_anual = balancete
+        else:
+            balancete_anual = self.balancete(inicio_ano, fim_ano)
+
+        sufixo = f"{data_inicio.strftime('%Y%m%d')}_{data_fim.strftime('%Y%m%d')}"
+        caminhos = {
+            'balanco': os.path.join(diretorio, f"balanco_patrimonial_{data_fim.strftime('%Y%m%d')}.pdf"),
+            'dre': os.path.join(diretorio, f"dre_{sufixo}.pdf"),
+            'fluxo_caixa': os.path.join(diretorio, f"fluxo_caixa_{sufixo}.pdf"),
+            'racu': os.path.join(diretorio, f"racu_{ano}.pdf")
+        }
+        gerados = {
+            'balanco': contabilidade.gerar_balanco_patrimonial(data_fim, caminhos['balanco'], balancete),
+            'dre': contabilidade.gerar_dre(data_inicio, data_fim, caminhos['dre'], balancete),
+            'fluxo_caixa': contabilidade.gerar_fluxo_caixa(data_inicio, data_fim, caminhos['fluxo_caixa'],
+                                                           balancete),
+            'racu': contabilidade.gerar_racu(ano, caminhos['racu'], balancete_anual)
+        }
+        return {nome: caminhos[nome] if gerado else None for nome, gerado in gerados.items()}
+
+
+# ----------------------------------------------------------------------
+# Passo de dados das demonstrações: secções com linhas (conta, descrição,
+# valor) e totais, apresentadas depois em PDF ou exportadas em tabela
+# ----------------------------------------------------------------------
+def _secao(titulo, linhas, rotulo_total):
+    return {'titulo': titulo, 'linhas': linhas, 'total': (rotulo_total, sum(valor for _, _, valor in linhas))}
+
+
+def dados_balanco(balancete, indice_contas):
+    """
+    Secções do balanço patrimonial em balancete.data_fim
+
+    Returns:
+        dict: 'ativo' e 'passivo_capital' (listas de secções {'titulo', 'linhas', 'total'}),
+              'total_ativo', 'total_passivo', 'total_passivo_capital'
+    """
+    saldos = balancete.saldos_acumulados
+    ativo_nc, ativo_c, capital, passivo_nc, passivo_c = [], [], [], [], []
+
+    for codigo_conta, saldo in saldos.items():
+        conta_info = indice_contas.obter(codigo_conta)
+        natureza = conta_info['natureza'] if conta_info else None
+        tipo = conta_info['tipo'] if conta_info else None
+
+        # Ativo não corrente (classe 1)
+        if codigo_conta.startswith('1'):
+            valor = -saldo if natureza == 'credora' else saldo
+            ativo_nc.append((codigo_conta, indice_contas.nome(codigo_conta), valor))
+
+        # Ativo corrente (classes 2, 3, 4)
+        if codigo_conta.startswith(('2', '3', '4')) and conta_info and (
+                tipo == 'ativo' or (tipo == 'misto' and saldo > 0)):
+            valor = -saldo if natureza == 'credora' else saldo
+            ativo_c.append((codigo_conta, indice_contas.nome(codigo_conta), valor))
+
+        # Capital próprio (classe 5)
+        if codigo_conta.startswith('5'):
+            valor = -saldo if natureza == 'credora' else saldo
+            capital.append((codigo_conta, indice_contas.nome(codigo_conta), valor))
+
+        # Passivo não corrente (empréstimos; simplificação: todos de longo prazo)
+        if codigo_conta.startswith('33'):
+            valor = -saldo if natureza == 'devedora' else saldo
+            passivo_nc.append((codigo_conta, indice_contas.nome(codigo_conta), valor))
+
+        # Passivo corrente
+        if codigo_conta.startswith(('3', '4')) and not codigo_conta.startswith('33') and conta_info and (
+                tipo == 'passivo' or (tipo == 'misto' and saldo < 0)):
+            valor = -saldo if natureza == 'devedora' else saldo
+            passivo_c.append((codigo_conta, indice_contas.nome(codigo_conta), abs(valor)))
+
+    capital.append(("88", "Resultado Líquido do Exercício", balancete.resultado_acumulado))
+
+    ativo = [_secao("Ativo Não Corrente", ativo_nc, "Total do Ativo Não Corrente"),
+             _secao("Ativo Corrente", ativo_c, "Total do Ativo Corrente")]
+    passivo_capital = [_secao("Capital Próprio", capital, "Total do Capital Próprio"),
+                       _secao("Passivo Não Corrente", passivo_nc, "Total do Passivo Não Corrente"),
+                       _secao("Passivo Corrente", passivo_c, "Total do Passivo Corrente")]
+    total_ativo = sum(secao['total'][1] for secao in ativo)
+    total_passivo = passivo_capital[1]['total'][1] + passivo_capital[2]['total'][1]
+    return {
+        'ativo': ativo,
+        'passivo_capital': passivo_capital,
+        'total_ativo': total_ativo,
+        'total_passivo': total_passivo,
+        'total_passivo_capital': total_passivo + passivo_capital[0]['total'][1]
+    }
+
+
+def dados_dre(balancete, indice_contas):
+    """
+    Receitas e despesas do período (demonstração de resultados)
+
+    Returns:
+        dict: 'receitas' e 'despesas' (secções), 'resultado_liquido'
+    """
+    receitas, despesas = [], []
+    for codigo_conta, saldo in balancete.saldos_periodo.items():
+        if codigo_conta.startswith('7'):
+            # Para receitas, o saldo é crédito (negativo no nosso cálculo)
+            receitas.append((codigo_conta, indice_contas.nome(codigo_conta), -saldo))
+        elif codigo_conta.startswith('6'):
+            despesas.append((codigo_conta, indice_contas.nome(codigo_conta), saldo))
+
+    receitas = _secao("Receitas", receitas, "Total de Receitas")
+    despesas = _secao("Despesas", despesas, "Total de Despesas")
+    return {
+        'receitas': receitas,
+        'despesas': despesas,
+        'resultado_liquido': receitas['total'][1] - despesas['total'][1]
+    }
+
+
+def dados_fluxo_caixa(balancete):
+    """
+    Fluxos de caixa do período por atividade
+
+    Returns:
+        dict: 'operacional', 'investimento' e 'financiamento' (secções com
+              linhas (data, descrição, valor)), 'variacao_caixa'
+    """
+    atividades = balancete.atividades
+    secoes = {
+        'operacional': ("Atividades Operacionais", "Total das Atividades Operacionais"),
+        'investimento': ("Atividades de Investimento", "Total das Atividades de Investimento"),
+        'financiamento': ("Atividades de Financiamento", "Total das Atividades de Financiamento")
+    }
+    dados = {
+        chave: _secao(titulo, [(item['data'], item['descricao'], item['valor']) for item in atividades[chave]],
+                      rotulo_total)
+        for chave, (titulo, rotulo_total) in secoes.items()
+    }
+    dados['variacao_caixa'] = sum(dados[chave]['total'][1] for chave in secoes)
+    return dados
+
+
+def dados_racu(balancete, plano_contas, indice_contas, bens_amortizaveis, ano):
+    """
+    Dados do RAÇU do ano: balanço resumido pelo plano de contas, demonstração
+    de resultados e imobilizações
+
+    Returns:
+        dict: 'ativo', 'passivo_capital' (secções com linhas (conta, descrição, valor)),
+              'dre' (ver dados_dre), 'bens' [(código, descrição, valor, amortização acumulada, valor líquido)]
+    """
+    saldos = balancete.saldos_periodo
+    resultado_liquido = balancete.resultado_periodo
+
+    ativo, total_ativo = [], 0
+    for classe in ["1", "2", "3", "4"]:
+        for codigo_conta, conta_info in plano_contas.get(classe, {}).get('contas', {}).items():
+            if codigo_conta in saldos and (conta_info['tipo'] == 'ativo' or
+                                           (conta_info['tipo'] == 'misto' and saldos[codigo_conta] > 0)):
+                saldo = saldos[codigo_conta]
+                # Ajustar para contas retificadoras
+                if conta_info['natureza'] == 'credora':
+                    saldo = -saldo
+                ativo.append((codigo_conta, conta_info['nome'], saldo))
+                total_ativo += saldo
+
+    passivo_capital, total_passivo_cp = [], 0
+    for classe in ["3", "5"]:
+        for codigo_conta, conta_info in plano_contas.get(classe, {}).get('contas', {}).items():
+            if codigo_conta in saldos and (conta_info['tipo'] == 'passivo' or
+                                           (conta_info['tipo'] == 'misto' and saldos[codigo_conta] < 0) or
+                                           conta_info['tipo'] == 'capital'):
+                saldo = saldos[codigo_conta]
+                # Ajustar para contas do passivo (crédito é positivo)
+                if conta_info['natureza'] == 'credora':
+                    saldo = -saldo
+                passivo_capital.append((codigo_conta, conta_info['nome'], saldo))
+                total_passivo_cp += saldo
+    passivo_capital.append(("88", "Resultado Líquido do Exercício", resultado_liquido))
+    total_passivo_cp += resultado_liquido
+
+    bens = []
+    for bem in bens_amortizaveis:
+        amortizacao_acumulada = sum(a['valor'] for a in bem.get('amortizacoes', []) if a['data'].year <= ano)
+        bens.append((bem['codigo'], bem['descricao'], bem['valor'], amortizacao_acumulada,
+                     bem['valor'] - amortizacao_acumulada))
+
+    return {
+        'ativo': {'titulo': "Ativo", 'linhas': ativo, 'total': ("TOTAL DO ATIVO", total_ativo)},
+        'passivo_capital': {'titulo': "Passivo e Capital Próprio", 'linhas': passivo_capital,
+                            'total': ("TOTAL DO PASSIVO E CAPITAL PRÓPRIO", total_passivo_cp)},
+        'dre': dados_dre(balancete, indice_contas),
+        'bens': bens
+    }
@@ -2,6 +2,7 @@ import tkinter as tk
 from tkinter import ttk
 from datetime import datetime
 import pandas as pd
+from tipos_compactos import chaves_dia_centavos, CHAVE_AUSENTE
 
 class FiltrosAvancados:
     """Implementa filtros avançados para a tabela principal"""
@@ -232,11 +233,16 @@ class FiltrosAvancados:
         # Limpar tabela
         self.app.tabela.delete(*self.app.tabela.get_children())
         
+        # Chaves (dia, centavos) de cada lado, lidas das colunas compactas
+        self._chaves = {origem: self._chaves_emparelhaveis(df) for origem, df in
+                        (("BANCO", self.app.dados_banco_compacto), ("LIVRO", self.app.dados_livro_compacto))}
+        
         # Aplicar filtros aos dados do banco
-        if self.app.dados_banco is not None:
+        if self.app.dados_banco_compacto is not None:
             dados_filtrados_banco = self.aplicar_filtros_dataframe(self.app.dados_banco, "BANCO")
-            for _, row in dados_filtrados_banco.iterrows():
-                status = self.obter_status_item(row, "BANCO")
+            dias, centavos = chaves_dia_centavos(dados_filtrados_banco)
+            for (_, row), chave in zip(dados_filtrados_banco.iterrows(), zip(dias.tolist(), centavos.tolist())):
+                status = self.obter_status_item(chave, "BANCO")
                 if 'status' in self.filtros_ativos and status != self.filtros_ativos['status']:
                     continue
                     
@@ -249,10 +255,11 @@ class FiltrosAvancados:
                 ))
         
         # Aplicar filtros aos dados do livro
-        if self.app.dados_livro is not None:
+        if self.app.dados_livro_compacto is not None:
             dados_filtrados_livro = self.aplicar_filtros_dataframe(self.app.dados_livro, "LIVRO")
-            for _, row in dados_filtrados_livro.iterrows():
-                status = self.obter_status_item(row, "LIVRO")
+            dias, centavos = chaves_dia_centavos(dados_filtrados_livro)
+            for (_, row), chave in zip(dados_filtrados_livro.iterrows(), zip(dias.tolist(), centavos.tolist())):
+                status = self.obter_status_item(chave, "LIVRO")
                 if 'status' in self.filtros_ativos and status != self.filtros_ativos['status']:
                     continue
                     
@@ -265,8 +272,8 @@ class FiltrosAvancados:
                 ))
     
     def aplicar_filtros_dataframe(self, df, origem):
-        """Aplica os filtros a um DataFrame"""
-        df_filtrado = df.copy()
+        """Aplica os filtros a um DataFrame (as máscaras devolvem cópias, o original não muda)"""
+        df_filtrado = df
         
         # Filtro de data
         if 'data_inicio' in self.filtros_ativos:
@@ -294,36 +301,44 @@ class FiltrosAvancados:
             
             if self.filtros_ativos['descricao_exata']:
                 if self.filtros_ativos['descricao_case']:
-                    df_filtrado = df_filtrado[df_filtrado['descricao'] == texto]
+                    teste = lambda descricoes: descricoes == texto
                 else:
-                    df_filtrado = df_filtrado[df_filtrado['descricao'].str.lower() == texto.lower()]
+                    teste = lambda descricoes: descricoes.str.lower() == texto.lower()
             else:
                 if self.filtros_ativos['descricao_case']:
-                    df_filtrado = df_filtrado[df_filtrado['descricao'].str.contains(texto, regex=False)]
+                    teste = lambda descricoes: descricoes.str.contains(texto, regex=False)
                 else:
-                    df_filtrado = df_filtrado[df_filtrado['descricao'].str.lower().str.contains(texto.lower(), regex=False)]
+                    teste = lambda descricoes: descricoes.str.lower().str.contains(texto.lower(), regex=False)
+            df_filtrado = df_filtrado[self._mascara_descricao(df_filtrado['descricao'], teste)]
         
         # Filtro de origem já é aplicado na chamada da função
         
         return df_filtrado
     
-    def obter_status_item(self, row, origem):
-        """Determina o status de um item (conciliado ou pendente)"""
-        if origem == "BANCO" and self.app.dados_livro is not None:
-            match = self.app.dados_livro[
-                (self.app.dados_livro['valor'] == row['valor']) &
-                (self.app.dados_livro['data'] == row['data'])
-            ]
-            return "CONCILIADO" if not match.empty else "PENDENTE"
-        
-        elif origem == "LIVRO" and self.app.dados_banco is not None:
-            match = self.app.dados_banco[
-                (self.app.dados_banco['valor'] == row['valor']) &
-                (self.app.dados_banco['data'] == row['data'])
-            ]
-            return "CONCILIADO" if not match.empty else "PENDENTE"
-        
-        return "PENDENTE"
+    def _mascara_descricao(self, descricoes, teste):
+        """
+        Aplica o teste de texto às descrições. Em colunas categóricas o teste é
+        feito uma vez por descrição distinta e propagado pelos códigos.
+        """
+        if isinstance(descricoes.dtype, pd.CategoricalDtype):
+            categorias = pd.Series(descricoes.cat.categories)
+            aceites = teste(categorias).to_numpy(dtype=bool)
+            codigos = descricoes.cat.codes.to_numpy()
+            return (codigos >= 0) & aceites[codigos]
+        return teste(descricoes)
+
+    @staticmethod
+    def _chaves_emparelhaveis(df):
+        """Conjunto das chaves (dia, centavos) das linhas com data e valor"""
+        if df is None:
+            return set()
+        dias, centavos = chaves_dia_centavos(df)
+        return {chave for chave in zip(dias.tolist(), centavos.tolist()) if CHAVE_AUSENTE not in chave}
+
+    def obter_status_item(self, chave, origem):
+        """Determina o status de um item (conciliado ou pendente) pela chave (dia, centavos)"""
+        outro_lado = "LIVRO" if origem == "BANCO" else "BANCO"
+        return "CONCILIADO" if chave in self._chaves[outro_lado] else "PENDENTE"
     
     def limpar_filtros(self):
         """Limpa todos os filtros e restaura a visualização original"""
@@ -1,8 +1,6 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import statsmodels.api as sm
 from statsmodels.tsa.arima.model import ARIMA
 from statsmodels.tsa.seasonal import seasonal_decompose
@@ -10,6 +8,7 @@ import logging
 import json
 import os
 import tkinter as tk
+from graficos_assincronos import GraficoAssincrono
 
 class FluxoCaixaProjetado:
     def __init__(self, contabilidade):
@@ -594,10 +593,9 @@ class FluxoCaixaProjetado:
             return saldo
         
         # Calcular saldo das contas de caixa e bancos (classe 4)
-        for lancamento in self.contabilidade.lancamentos:
-            for movimento in lancamento['movimentos']:
-                if movimento['conta'].startswith('4'):  # Contas de caixa e bancos
-                    saldo += movimento['debito'] - movimento['credito']
+        for conta, saldo_conta in self.contabilidade.saldos().items():
+            if conta.startswith('4'):  # Contas de caixa e bancos
+                saldo += saldo_conta
         
         return saldo
     
@@ -611,18 +609,17 @@ class FluxoCaixaProjetado:
         Returns:
             bool: True se gerado com sucesso, False caso contrário
         """
-        from reportlab.lib import colors
         from reportlab.lib.pagesizes import A4
-        from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-        from reportlab.lib.styles import getSampleStyleSheet
+        from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
         from reportlab.lib.units import cm
+        from tema_relatorios import estilo_tabela, estilos as estilos_relatorio
         
         try:
             doc = SimpleDocTemplate(caminho_saida, pagesize=A4)
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
@@ -667,18 +664,7 @@ class FluxoCaixaProjetado:
             ])
             
             tabela_resumo = Table(dados_resumo, colWidths=[4*cm, 4*cm, 4*cm, 4*cm])
-            tabela_resumo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 1), (3, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_resumo.setStyle(estilo_tabela((((1, 1), (3, -1), 'RIGHT'),), linha_total=True))
             elementos.append(tabela_resumo)
             elementos.append(Spacer(1, 0.5*cm))
             
@@ -711,17 +697,7 @@ class FluxoCaixaProjetado:
                 ])
             
             tabela_diaria = Table(dados_diarios, colWidths=[3*cm, 3.5*cm, 3.5*cm, 3.5*cm, 3.5*cm])
-            tabela_diaria.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 10),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('ALIGN', (1, 1), (4, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-            ]))
+            tabela_diaria.setStyle(estilo_tabela((((1, 1), (4, -1), 'RIGHT'),), tamanho_cabecalho=10, zebrado=True))
             elementos.append(tabela_diaria)
             elementos.append(Spacer(1, 0.5*cm))
             
@@ -744,17 +720,7 @@ class FluxoCaixaProjetado:
                     ])
                 
                 tabela_recorrentes = Table(dados_recorrentes, colWidths=[7*cm, 3*cm, 2*cm, 3*cm, 3*cm])
-                tabela_recorrentes.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (1, 1), (1, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
+                tabela_recorrentes.setStyle(estilo_tabela((((1, 1), (1, -1), 'RIGHT'),), tamanho_cabecalho=10, zebrado=True))
                 elementos.append(tabela_recorrentes)
             else:
                 elementos.append(Paragraph("Nenhum lançamento recorrente cadastrado.", estilo_normal))
@@ -916,92 +882,112 @@ class FluxoCaixaProjetado:
     
     def gerar_grafico_fluxo_caixa(self, canvas, periodo='mensal'):
         """
-        Gera um gráfico de fluxo de caixa projetado
+        Gera um gráfico de fluxo de caixa projetado. Os dados são preparados e
+        o gráfico rasterizado na thread de desenho; a imagem aparece no canvas
+        quando estiver pronta.
         
         Args:
             canvas: Canvas do Tkinter onde o gráfico será exibido
             periodo: Período de agrupamento ('diario', 'semanal', 'mensal')
             
         Returns:
-            FigureCanvasTkAgg: Canvas do matplotlib
+            GraficoAssincrono: Área do gráfico
         """
         try:
             # Verificar se há previsões
             if not self.previsoes['receitas']:
                 return None
             
-            # Criar figura
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Preparar dados com base no período
-            if periodo == 'diario':
-                # Usar os primeiros 30 dias
-                datas_ordenadas = sorted(self.previsoes['receitas'].keys())[:30]
-                datas = [datetime.fromisoformat(d).strftime('%d/%m') for d in datas_ordenadas]
-                receitas = [self.previsoes['receitas'][d] for d in datas_ordenadas]
-                despesas = [self.previsoes['despesas'][d] for d in datas_ordenadas]
-                saldos = [self.previsoes['saldo'][d] for d in datas_ordenadas]
-                
-                titulo = "Fluxo de Caixa Diário (Próximos 30 dias)"
-                
-            elif periodo == 'semanal':
-                # Agrupar por semana
-                dados_semanais = self._agrupar_por_semana()
-                datas = [d for d in sorted(dados_semanais.keys())]
-                receitas = [dados_semanais[d]['receitas'] for d in datas]
-                despesas = [dados_semanais[d]['despesas'] for d in datas]
-                saldos = [dados_semanais[d]['saldo'] for d in datas]
-                
-                titulo = "Fluxo de Caixa Semanal"
-                
-            else:  # mensal
-                # Agrupar por mês
-                dados_mensais = self._agrupar_por_mes()
-                datas = [d for d in sorted(dados_mensais.keys())]
-                receitas = [dados_mensais[d]['receitas'] for d in datas]
-                despesas = [dados_mensais[d]['despesas'] for d in datas]
-                saldos = [dados_mensais[d]['saldo'] for d in datas]
-                
-                titulo = "Fluxo de Caixa Mensal"
-            
-            # Plotar gráfico de barras para receitas e despesas
-            x = np.arange(len(datas))
-            largura = 0.35
-            
-            ax.bar(x - largura/2, receitas, largura, label='Receitas', color='green', alpha=0.7)
-            ax.bar(x + largura/2, despesas, largura, label='Despesas', color='red', alpha=0.7)
+            grafico = GraficoAssincrono(canvas, f'fluxo_caixa_{periodo}', self.desenhar_grafico_fluxo_caixa,
+                                        lambda: self.dados_grafico_fluxo_caixa(periodo))
+            grafico.pack(fill=tk.BOTH, expand=True)
             
-            # Plotar linha para saldo
-            ax2 = ax.twinx()
-            ax2.plot(x, saldos, 'b-', label='Saldo', linewidth=2)
+            return grafico
             
-            # Configurar eixos e legendas
-            ax.set_xlabel('Período')
-            ax.set_ylabel('Valor (Kz)')
-            ax2.set_ylabel('Saldo (Kz)')
+        except Exception as e:
+            self.logger.error(f"Erro ao gerar gráfico de fluxo de caixa: {str(e)}")
+            return None
+    
+    def dados_grafico_fluxo_caixa(self, periodo='mensal'):
+        """
+        Prepara os dados do gráfico de fluxo de caixa projetado
+        
+        Args:
+            periodo: Período de agrupamento ('diario', 'semanal', 'mensal')
             
-            ax.set_title(titulo)
-            ax.set_xticks(x)
-            ax.set_xticklabels(datas, rotation=45)
+        Returns:
+            dict: Título, rótulos dos períodos, receitas, despesas e saldos
+                (None se não houver previsões)
+        """
+        if not self.previsoes['receitas']:
+            return None
+        
+        # Preparar dados com base no período
+        if periodo == 'diario':
+            # Usar os primeiros 30 dias
+            datas_ordenadas = sorted(self.previsoes['receitas'].keys())[:30]
+            datas = [datetime.fromisoformat(d).strftime('%d/%m') for d in datas_ordenadas]
+            receitas = [self.previsoes['receitas'][d] for d in datas_ordenadas]
+            despesas = [self.previsoes['despesas'][d] for d in datas_ordenadas]
+            saldos = [self.previsoes['saldo'][d] for d in datas_ordenadas]
             
-            # Adicionar legendas
-            lines1, labels1 = ax.get_legend_handles_labels()
-            lines2, labels2 = ax2.get_legend_handles_labels()
-            ax.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+            titulo = "Fluxo de Caixa Diário (Próximos 30 dias)"
             
-            # Ajustar layout
-            plt.tight_layout()
+        elif periodo == 'semanal':
+            # Agrupar por semana
+            dados_semanais = self._agrupar_por_semana()
+            datas = [d for d in sorted(dados_semanais.keys())]
+            receitas = [dados_semanais[d]['receitas'] for d in datas]
+            despesas = [dados_semanais[d]['despesas'] for d in datas]
+            saldos = [dados_semanais[d]['saldo'] for d in datas]
             
-            # Criar canvas para Tkinter
-            canvas_fig = FigureCanvasTkAgg(fig, master=canvas)
-            canvas_fig.draw()
-            canvas_fig.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+            titulo = "Fluxo de Caixa Semanal"
             
-            return canvas_fig
+        else:  # mensal
+            # Agrupar por mês
+            dados_mensais = self._agrupar_por_mes()
+            datas = [d for d in sorted(dados_mensais.keys())]
+            receitas = [dados_mensais[d]['receitas'] for d in datas]
+            despesas = [dados_mensais[d]['despesas'] for d in datas]
+            saldos = [dados_mensais[d]['saldo'] for d in datas]
             
-        except Exception as e:
-            self.logger.error(f"Erro ao gerar gráfico de fluxo de caixa: {str(e)}")
-            return None
+            titulo = "Fluxo de Caixa Mensal"
+        
+        return {'titulo': titulo, 'datas': datas, 'receitas': receitas,
+                'despesas': despesas, 'saldos': saldos}
+    
+    @staticmethod
+    def desenhar_grafico_fluxo_caixa(fig, dados):
+        """Desenha o gráfico de fluxo de caixa numa figura do matplotlib"""
+        ax = fig.add_subplot(111)
+        
+        # Plotar gráfico de barras para receitas e despesas
+        x = np.arange(len(dados['datas']))
+        largura = 0.35
+        
+        ax.bar(x - largura/2, dados['receitas'], largura, label='Receitas', color='green', alpha=0.7)
+        ax.bar(x + largura/2, dados['despesas'], largura, label='Despesas', color='red', alpha=0.7)
+        
+        # Plotar linha para saldo
+        ax2 = ax.twinx()
+        ax2.plot(x, dados['saldos'], 'b-', label='Saldo', linewidth=2)
+        
+        # Configurar eixos e legendas
+        ax.set_xlabel('Período')
+        ax.set_ylabel('Valor (Kz)')
+        ax2.set_ylabel('Saldo (Kz)')
+        
+        ax.set_title(dados['titulo'])
+        ax.set_xticks(x)
+        ax.set_xticklabels(dados['datas'], rotation=45)
+        
+        # Adicionar legendas
+        lines1, labels1 = ax.get_legend_handles_labels()
+        lines2, labels2 = ax2.get_legend_handles_labels()
+        ax.legend(lines1 + lines2, labels1 + labels2, loc='upper left')
+        
+        # Ajustar layout
+        fig.tight_layout()
     
     def _agrupar_por_semana(self):
         """
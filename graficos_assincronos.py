@@ -0,0 +1,266 @@
+import base64
+import hashlib
+import io
+import json
+import queue
+import threading
+import tkinter as tk
+from collections import OrderedDict
+
+import pandas as pd
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from config import CONFIGURACOES
+
+INTERVALO_ACOMPANHAMENTO_MS = 50  # Verificação dos gráficos prontos na thread do Tk
+ESPERA_REDIMENSIONAMENTO_MS = 200  # Só volta a desenhar depois de o redimensionamento parar
+
+
+def impressao_dados(*objetos):
+    """
+    Impressão dos dados de um gráfico: DataFrames e Series pelo hash vetorizado
+    do pandas, os restantes objetos (dicionários, listas, parâmetros) pelo JSON
+
+    Returns:
+        str: Hash hexadecimal de 16 caracteres
+    """
+    resumo = hashlib.sha1()
+    for objeto in objetos:
+        if isinstance(objeto, (pd.DataFrame, pd.Series)):
+            resumo.update(pd.util.hash_pandas_object(objeto, index=True).to_numpy().tobytes())
+            nomes = list(objeto.columns) if isinstance(objeto, pd.DataFrame) else [objeto.name]
+            resumo.update(repr(nomes).encode('utf-8'))
+        else:
+            resumo.update(json.dumps(objeto, sort_keys=True, default=str).encode('utf-8'))
+        resumo.update(b'|')
+    return resumo.hexdigest()[:16]
+
+
+def renderizar_png(desenhar, dados, largura, altura, dpi):
+    """
+    Desenha um gráfico numa Figure do matplotlib com o backend Agg (sem pyplot
+    nem Tk, pelo que pode correr fora da thread da interface) e devolve o PNG
+
+    Args:
+        desenhar: Função desenhar(figura, dados) que cria os eixos e plota
+        dados: Dados já preparados para o gráfico
+        largura, altura: Tamanho da imagem em píxeis
+        dpi: Resolução da figura
+
+    Returns:
+        bytes: Imagem PNG
+    """
+    figura = Figure(figsize=(largura / dpi, altura / dpi), dpi=dpi)
+    FigureCanvasAgg(figura)
+    desenhar(figura, dados)
+    buffer = io.BytesIO()
+    figura.savefig(buffer, format='png', dpi=dpi)
+    return buffer.getvalue()
+
+
+class PedidoGrafico:
+    """Gráfico a preparar e rasterizar pela thread de desenho"""
+
+    def __init__(self, nome, desenhar, preparar, impressao, largura, altura, dpi, respostas, ativo):
+        self.nome = nome
+        self.desenhar = desenhar
+        self.preparar = preparar
+        self.impressao = impressao
+        self.largura = largura
+        self.altura = altura
+        self.dpi = dpi
+        self.respostas = respostas  # queue.Queue onde é entregue (pedido, tipo, valor)
+        self.ativo = ativo  # Função: False quando o pedido já foi substituído por outro
+
+
+class RenderizadorGraficos:
+    """
+    Prepara os dados e rasteriza os gráficos numa única thread de trabalho
+    (o matplotlib não suporta desenho concorrente) e guarda os PNG numa cache
+    em memória, por nome do gráfico, impressão dos dados e tamanho: reabrir
+    uma janela sobre os mesmos dados mostra o gráfico sem o voltar a desenhar.
+
+    A thread do Tk só submete pedidos e recebe os PNG prontos; nunca espera.
+    """
+
+    def __init__(self, dpi=None, cache_entradas=None):
+        configuracao = CONFIGURACOES['GRAFICOS']
+        self.dpi = dpi or configuracao['dpi']
+        self.cache_entradas = cache_entradas or configuracao['cache_entradas']
+        self.cache = OrderedDict()  # chave -> PNG, do menos ao mais recente
+        self._bloqueio = threading.Lock()
+        self._pedidos = queue.Queue()
+        self._thread = None
+
+    def submeter(self, pedido):
+        """Coloca um pedido na fila da thread de desenho (criada no primeiro pedido)"""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._executar, name='desenho_graficos', daemon=True)
+            self._thread.start()
+        self._pedidos.put(pedido)
+
+    def obter(self, chave):
+        with self._bloqueio:
+            png = self.cache.get(chave)
+            if png is not None:
+                self.cache.move_to_end(chave)
+            return png
+
+    def guardar(self, chave, png):
+        with self._bloqueio:
+            self.cache[chave] = png
+            self.cache.move_to_end(chave)
+            while len(self.cache) > self.cache_entradas:
+                self.cache.popitem(last=False)
+
+    def limpar(self):
+        with self._bloqueio:
+            self.cache.clear()
+
+    def processar(self, pedido):
+        """
+        Prepara e rasteriza um pedido (ou devolve o PNG da cache)
+
+        Returns:
+            tuple: ('png', bytes), ('vazio', None) se não houver dados para o
+                gráfico, ou ('erro', mensagem)
+        """
+        try:
+            impressao = pedido.impressao() if callable(pedido.impressao) else pedido.impressao
+            dados = None
+            if impressao is None:
+                # Sem impressão dos dados de origem: identifica-se pelos dados preparados
+                dados = pedido.preparar()
+                if dados is None:
+                    return ('vazio', None)
+                impressao = impressao_dados(dados)
+
+            chave = (pedido.nome, impressao, pedido.largura, pedido.altura, pedido.dpi)
+            png = self.obter(chave)
+            if png is None:
+                if dados is None:
+                    dados = pedido.preparar()
+                    if dados is None:
+                        return ('vazio', None)
+                png = renderizar_png(pedido.desenhar, dados, pedido.largura, pedido.altura, pedido.dpi)
+                self.guardar(chave, png)
+            return ('png', png)
+        except Exception as e:
+            print(f"Erro ao gerar gráfico {pedido.nome}: {str(e)}")
+            return ('erro', str(e))
+
+    def _executar(self):
+        while True:
+            pedido = self._pedidos.get()
+            # Pedidos substituídos entretanto (ex.: redimensionamento) não são desenhados
+            if pedido.ativo():
+                pedido.respostas.put((pedido,) + self.processar(pedido))
+
+
+_renderizador = None
+
+
+def renderizador():
+    """Renderizador partilhado por todos os gráficos da aplicação"""
+    global _renderizador
+    if _renderizador is None:
+        _renderizador = RenderizadorGraficos()
+    return _renderizador
+
+
+class GraficoAssincrono(tk.Canvas):
+    """
+    Área de gráfico para a interface: mostra uma mensagem enquanto o gráfico
+    é preparado e rasterizado pela thread de desenho, e troca-a pela imagem
+    quando fica pronta. Ao ser redimensionada volta a pedir o gráfico no novo
+    tamanho (depois de o redimensionamento parar).
+    """
+
+    def __init__(self, master, nome, desenhar, preparar, impressao=None, **opcoes):
+        """
+        Args:
+            master: Widget onde o gráfico é colocado
+            nome: Identifica o tipo de gráfico na cache
+            desenhar: Função desenhar(figura, dados), chamada na thread de desenho
+            preparar: Função sem argumentos que devolve os dados do gráfico (ou
+                None se não houver dados), chamada na thread de desenho
+            impressao: Impressão dos dados de origem (ou função que a calcula na
+                thread de desenho); por omissão calcula-se sobre os dados preparados
+        """
+        opcoes.setdefault('highlightthickness', 0)
+        opcoes.setdefault('width', 640)
+        opcoes.setdefault('height', 400)
+        super().__init__(master, **opcoes)
+        self.nome = nome
+        self.desenhar = desenhar
+        self.preparar = preparar
+        self.impressao = impressao
+        self.imagem = None
+        self._respostas = queue.Queue()
+        self._geracao = 0
+        self._tamanho = None
+        self._agendado = None
+        self._a_acompanhar = False
+        self.bind('<Configure>', self._ao_redimensionar)
+
+    def _mensagem(self, texto):
+        self.delete('all')
+        self.imagem = None
+        self.create_text(self.winfo_width() // 2, self.winfo_height() // 2, text=texto, fill='grey40')
+
+    def _ao_redimensionar(self, evento):
+        tamanho = (evento.width, evento.height)
+        if tamanho == self._tamanho or min(tamanho) < 2:
+            return
+        if self._agendado is not None:
+            self.after_cancel(self._agendado)
+        espera = ESPERA_REDIMENSIONAMENTO_MS if self._tamanho is not None else 0
+        self._agendado = self.after(espera, self.atualizar)
+
+    def atualizar(self):
+        """Pede o gráfico no tamanho atual do widget (substituindo pedidos anteriores)"""
+        self._agendado = None
+        largura, altura = self.winfo_width(), self.winfo_height()
+        if min(largura, altura) < 2:
+            return
+        self._tamanho = (largura, altura)
+        self._geracao += 1
+        geracao = self._geracao
+        if self.imagem is None:
+            self._mensagem("A gerar gráfico...")
+
+        renderizador().submeter(PedidoGrafico(
+            self.nome, self.desenhar, self.preparar, self.impressao, largura, altura,
+            renderizador().dpi, self._respostas, lambda: geracao == self._geracao
+        ))
+        if not self._a_acompanhar:
+            self._a_acompanhar = True
+            self.after(INTERVALO_ACOMPANHAMENTO_MS, self._acompanhar)
+
+    def _acompanhar(self):
+        try:
+            if not self.winfo_exists():
+                return
+            while True:
+                pedido, tipo, valor = self._respostas.get_nowait()
+                # Só interessa a resposta ao pedido mais recente
+                if pedido.ativo():
+                    self._a_acompanhar = False
+                    self._mostrar(tipo, valor)
+                    return
+        except queue.Empty:
+            pass
+        except tk.TclError:
+            return
+        self.after(INTERVALO_ACOMPANHAMENTO_MS, self._acompanhar)
+
+    def _mostrar(self, tipo, valor):
+        if tipo == 'png':
+            self.delete('all')
+            self.imagem = tk.PhotoImage(master=self, data=base64.b64encode(valor))
+            self.create_image(0, 0, image=self.imagem, anchor='nw')
+        elif tipo == 'vazio':
+            self._mensagem("Sem dados para o gráfico")
+        else:
+            self._mensagem(f"Erro ao gerar gráfico: {valor}")
@@ -0,0 +1,358 @@
+import hashlib
+import json
+import os
+import re
+import unicodedata
+
+import numpy as np
+import pandas as pd
+
+
+def normalizar_descricao(texto):
+    """Remove acentos, pontuação e espaços repetidos e converte para minúsculas"""
+    if texto is None or (isinstance(texto, float) and pd.isna(texto)):
+        return ""
+    texto = unicodedata.normalize('NFKD', str(texto))
+    texto = ''.join(c for c in texto if not unicodedata.combining(c))
+    texto = re.sub(r'[^\w\s]', ' ', texto.lower())
+    return re.sub(r'\s+', ' ', texto).strip()
+
+
+def valor_em_centavos(valor):
+    """Converte um valor monetário para centavos inteiros"""
+    return int(round(float(valor) * 100))
+
+
+def calcular_impressao(data, valor, descricao, referencia="", ocorrencia=0):
+    """
+    Calcula a impressão digital de uma linha de extrato ou livro
+
+    Args:
+        data: Data da transação (datetime, date ou Timestamp)
+        valor: Valor da transação
+        descricao: Descrição da transação
+        referencia: Referência bancária, quando existir
+        ocorrencia: Quantas linhas iguais a esta a precedem no mesmo extrato
+            (dois pagamentos iguais no mesmo dia são linhas distintas); a
+            primeira ocorrência tem a impressão de sempre
+
+    Returns:
+        str: Hash hexadecimal de 16 caracteres
+    """
+    chave = "|".join([
+        data.strftime('%Y-%m-%d'),
+        str(valor_em_centavos(valor)),
+        normalizar_descricao(descricao),
+        normalizar_descricao(referencia)
+    ])
+    if ocorrencia:
+        chave += f"|#{ocorrencia}"
+    return hashlib.sha1(chave.encode('utf-8')).hexdigest()[:16]
+
+
+def normalizar_coluna(serie):
+    """Normaliza uma coluna de texto calculando cada valor distinto uma só vez"""
+    valores = serie.astype(object)
+    valores = valores.where(serie.notna(), "")
+    normalizados = {valor: normalizar_descricao(valor) for valor in pd.unique(valores)}
+    return valores.map(normalizados)
+
+
+def calcular_impressoes(df):
+    """
+    Calcula as impressões digitais de todas as linhas de um DataFrame. As
+    chaves são montadas por colunas (datas, centavos e textos normalizados por
+    valor distinto); só o hash é calculado linha a linha. Linhas iguais do
+    mesmo DataFrame são numeradas pela ordem em que aparecem (ver
+    calcular_impressao), pelo que as impressões de um DataFrame são únicas.
+    """
+    if df.empty:
+        return pd.Series([], index=df.index, dtype=object)
+
+    datas = pd.to_datetime(df['data']).dt.strftime('%Y-%m-%d')
+    centavos = pd.Series(np.round(df['valor'].to_numpy(dtype=float) * 100).astype(np.int64),
+                         index=df.index).astype(str)
+    descricoes = normalizar_coluna(df['descricao'])
+    referencias = normalizar_coluna(df['referencia']) if 'referencia' in df.columns else ""
+    chaves = datas + "|" + centavos + "|" + descricoes + "|" + referencias
+    ocorrencias = chaves.groupby(chaves, sort=False).cumcount()
+    chaves = chaves.where(ocorrencias == 0, chaves + "|#" + ocorrencias.astype(str))
+    return pd.Series(
+        [hashlib.sha1(chave.encode('utf-8')).hexdigest()[:16] for chave in chaves],
+        index=df.index
+    )
+
+
+def assinatura_lote(df):
+    """
+    Assinatura de um lote importado (extrato ou livro), calculada de forma
+    vetorizada, para reconhecer lotes já convertidos sem percorrer as linhas
+    """
+    colunas = [c for c in ('data', 'valor', 'descricao', 'referencia') if c in df.columns]
+    hashes = pd.util.hash_pandas_object(df[colunas], index=False).to_numpy()
+    return hashlib.sha1(hashes.tobytes()).hexdigest()[:16]
+
+
+def remover_duplicados(novos, existentes=None):
+    """
+    Junta um extrato novo aos dados já importados sem repetir as linhas que
+    os extratos com períodos sobrepostos têm em comum: uma linha nova só é
+    ignorada se já existir nos dados anteriores (mesma impressão digital,
+    contando as linhas iguais de cada lado). Linhas iguais dentro do mesmo
+    extrato, como dois pagamentos iguais no mesmo dia, são todas mantidas.
+    Aponta também as quase duplicadas (mesma data e valor com descrição ou
+    referência diferente).
+
+    Args:
+        novos: Linhas do extrato importado
+        existentes: Dados já importados (opcional)
+
+    Returns:
+        tuple: (DataFrame junto, número de duplicados removidos, DataFrame de quase duplicados)
+    """
+    removidos = 0
+    if existentes is not None and not existentes.empty and not novos.empty:
+        repetidas = calcular_impressoes(novos).isin(set(calcular_impressoes(existentes))).to_numpy()
+        removidos = int(repetidas.sum())
+        df = pd.concat([existentes, novos[~repetidas]], ignore_index=True)
+    elif existentes is not None and not existentes.empty:
+        df = existentes
+    else:
+        df = novos
+
+    if df.empty:
+        return df, removidos, df
+
+    # Mesma data e valor, mas não a mesma linha (linhas iguais não são quase duplicadas)
+    chave = df['data'].dt.strftime('%Y-%m-%d') + "|" + df['valor'].map(valor_em_centavos).astype(str)
+    textos = normalizar_coluna(df['descricao'])
+    if 'referencia' in df.columns:
+        textos = textos + "|" + normalizar_coluna(df['referencia'])
+    variantes = textos.groupby(chave).transform('nunique')
+    quase_duplicados = df[(variantes > 1).to_numpy()]
+
+    return df, removidos, quase_duplicados
+
+
+class IndiceImpressoesDigitais:
+    """
+    Índice persistente das linhas já convertidas em lançamentos. Cada verificação
+    é uma consulta O(1) a um conjunto em memória; o índice é gravado em JSON.
+
+    Para cada impressão são guardadas as chaves secundárias com que foi
+    registada, para que a edição do lançamento correspondente (data, valor ou
+    descrição) as possa substituir (ver atualizar).
+    """
+
+    def __init__(self, arquivo='impressoes_digitais.json', tolerancia_dias=1):
+        """
+        Args:
+            arquivo: Caminho do arquivo JSON onde o índice é persistido
+            tolerancia_dias: Diferença de datas aceita para apontar quase duplicados
+        """
+        self.arquivo = arquivo
+        self.tolerancia_dias = tolerancia_dias
+        self.impressoes = set()
+        # Chaves secundárias para quase duplicados
+        self.por_data_valor = {}       # "AAAA-MM-DD|centavos" -> descrição normalizada
+        self.por_valor_descricao = {}  # "centavos|descrição" -> lista de ordinais de datas
+        self.lotes = set()             # Assinaturas dos lotes importados já convertidos
+        self.chaves = {}               # impressão -> [chave data|valor, chave valor|descrição, ordinal]
+        self.alterado = False
+        self._desfazer = None          # Registos a desfazer se o lote em curso falhar (ver ponto_restauro)
+        self.existia = self.carregar()
+
+    def carregar(self):
+        """Carrega o índice do arquivo. Retorna False se o arquivo ainda não existir"""
+        if not os.path.exists(self.arquivo):
+            return False
+        try:
+            with open(self.arquivo, 'r', encoding='utf-8') as f:
+                dados = json.load(f)
+            self.impressoes = set(dados.get('impressoes', []))
+            self.por_data_valor = dados.get('por_data_valor', {})
+            self.por_valor_descricao = dados.get('por_valor_descricao', {})
+            self.lotes = set(dados.get('lotes', []))
+            self.chaves = dados.get('chaves', {})
+            return True
+        except Exception as e:
+            print(f"Erro ao carregar índice de impressões digitais: {str(e)}")
+            return False
+
+    def salvar(self):
+        """Grava o índice se houver alterações desde a última gravação"""
+        if not self.alterado:
+            return True
+        try:
+            with open(self.arquivo, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'impressoes': sorted(self.impressoes),
+                    'por_data_valor': self.por_data_valor,
+                    'por_valor_descricao': self.por_valor_descricao,
+                    'lotes': sorted(self.lotes),
+                    'chaves': self.chaves
+                }, f, ensure_ascii=False)
+            self.alterado = False
+            return True
+        except Exception as e:
+            print(f"Erro ao salvar índice de impressões digitais: {str(e)}")
+            return False
+
+    def contem(self, impressao):
+        return impressao in self.impressoes
+
+    def lote_convertido(self, assinatura):
+        """Indica se um lote importado (pela sua assinatura) já foi convertido"""
+        return assinatura in self.lotes
+
+    def registrar_lote(self, assinatura):
+        if assinatura not in self.lotes:
+            self.lotes.add(assinatura)
+            self.alterado = True
+            if self._desfazer is not None:
+                self._desfazer.append(('lote', assinatura, None, []))
+
+    def registrar(self, data, valor, descricao, referencia="", impressao=None, descricao_norm=None):
+        """Adiciona uma linha ao índice (a descrição normalizada pode ser passada já calculada)"""
+        if impressao is None:
+            impressao = calcular_impressao(data, valor, descricao, referencia)
+        if impressao in self.impressoes:
+            return impressao
+
+        chaves = self._chaves_linha(data, valor, descricao, descricao_norm)
+        if self._desfazer is not None:
+            self._desfazer.append(('registo', impressao, None, self._valores_anteriores([chaves[0]])))
+        self.impressoes.add(impressao)
+        self._acrescentar_chaves(impressao, chaves, data.toordinal())
+        return impressao
+
+    @staticmethod
+    def _chaves_linha(data, valor, descricao, descricao_norm=None):
+        """Chaves secundárias (data|valor, valor|descrição) e descrição normalizada de uma linha"""
+        centavos = valor_em_centavos(valor)
+        if descricao_norm is None:
+            descricao_norm = normalizar_descricao(descricao)
+        return f"{data.strftime('%Y-%m-%d')}|{centavos}", f"{centavos}|{descricao_norm}", descricao_norm
+
+    def _valores_anteriores(self, chaves_data_valor):
+        return [(chave, self.por_data_valor.get(chave)) for chave in chaves_data_valor]
+
+    def _acrescentar_chaves(self, impressao, chaves, ordinal):
+        chave_data_valor, chave_valor_descricao, descricao_norm = chaves
+        self.por_data_valor[chave_data_valor] = descricao_norm
+        self.por_valor_descricao.setdefault(chave_valor_descricao, []).append(ordinal)
+        self.chaves[impressao] = [chave_data_valor, chave_valor_descricao, ordinal]
+        self.alterado = True
+
+    def _retirar_chaves(self, impressao):
+        chaves = self.chaves.pop(impressao, None)
+        if chaves is None:
+            return
+        chave_data_valor, chave_valor_descricao, ordinal = chaves
+        if self.por_data_valor.get(chave_data_valor) == chave_valor_descricao.split('|', 1)[1]:
+            del self.por_data_valor[chave_data_valor]
+        ordinais = self.por_valor_descricao.get(chave_valor_descricao, [])
+        if ordinal in ordinais:
+            ordinais.remove(ordinal)
+            if not ordinais:
+                del self.por_valor_descricao[chave_valor_descricao]
+        self.alterado = True
+
+    def atualizar(self, impressao, data, valor, descricao):
+        """
+        Substitui as chaves secundárias de uma linha já convertida depois de o
+        lançamento ter sido editado (a linha continua convertida: a impressão
+        mantém-se, para não voltar a ser importada)
+
+        Returns:
+            bool: True se a impressão estava no índice com as suas chaves
+        """
+        anteriores = self.chaves.get(impressao)
+        if anteriores is None:
+            return False
+        chaves = self._chaves_linha(data, valor, descricao)
+        if self._desfazer is not None:
+            self._desfazer.append(('edicao', impressao, list(anteriores),
+                                   self._valores_anteriores([anteriores[0], chaves[0]])))
+        self._retirar_chaves(impressao)
+        self._acrescentar_chaves(impressao, chaves, data.toordinal())
+        return True
+
+    def ponto_restauro(self):
+        """
+        Começa (ou continua) a guardar os registos feitos a partir deste ponto,
+        para os poder desfazer com restaurar() se o lote de lançamentos falhar
+
+        Returns:
+            int: Ponto a passar a restaurar()
+        """
+        if self._desfazer is None:
+            self._desfazer = []
+        return len(self._desfazer)
+
+    def restaurar(self, ponto):
+        """Desfaz, do mais recente para o mais antigo, os registos, edições e lotes feitos depois do ponto"""
+        while len(self._desfazer) > ponto:
+            tipo, impressao, chaves_anteriores, valores_anteriores = self._desfazer.pop()
+            self.alterado = True
+            if tipo == 'lote':
+                # Lote dado como convertido: volta a poder ser convertido
+                self.lotes.discard(impressao)
+                continue
+            self._retirar_chaves(impressao)
+            if tipo == 'registo':
+                self.impressoes.discard(impressao)
+            else:
+                # Chaves de antes da edição
+                chave_data_valor, chave_valor_descricao, ordinal = chaves_anteriores
+                self.por_valor_descricao.setdefault(chave_valor_descricao, []).append(ordinal)
+                self.chaves[impressao] = chaves_anteriores
+            for chave, valor in reversed(valores_anteriores):
+                if valor is None:
+                    self.por_data_valor.pop(chave, None)
+                else:
+                    self.por_data_valor[chave] = valor
+
+    def concluir_restauro(self):
+        """Deixa de guardar os registos (o lote mais exterior terminou)"""
+        self._desfazer = None
+
+    def registrar_lancamento(self, lancamento):
+        """
+        Adiciona ao índice um lançamento contábil já existente (pela impressão da
+        linha de origem, se a tiver; lançamentos iguais contam como ocorrências distintas)
+        """
+        valor = sum(m['debito'] for m in lancamento['movimentos'])
+        impressao = lancamento.get('impressao')
+        if impressao is None:
+            ocorrencia = 0
+            impressao = calcular_impressao(lancamento['data'], valor, lancamento['descricao'])
+            while impressao in self.impressoes:
+                ocorrencia += 1
+                impressao = calcular_impressao(lancamento['data'], valor, lancamento['descricao'],
+                                               ocorrencia=ocorrencia)
+        return self.registrar(lancamento['data'], valor, lancamento['descricao'], impressao=impressao)
+
+    def quase_duplicado(self, data, valor, descricao, descricao_norm=None):
+        """
+        Verifica se a linha se parece com outra já indexada: mesmo valor e data com
+        outra descrição, ou mesmo valor e descrição com data próxima
+
+        Returns:
+            str ou None: Motivo da suspeita
+        """
+        centavos = valor_em_centavos(valor)
+        if descricao_norm is None:
+            descricao_norm = normalizar_descricao(descricao)
+
+        outra_descricao = self.por_data_valor.get(f"{data.strftime('%Y-%m-%d')}|{centavos}")
+        if outra_descricao is not None and outra_descricao != descricao_norm:
+            return 'mesma_data_valor'
+
+        ordinais = self.por_valor_descricao.get(f"{centavos}|{descricao_norm}")
+        if ordinais:
+            ordinal = data.toordinal()
+            if any(0 < abs(ordinal - o) <= self.tolerancia_dias for o in ordinais):
+                return 'data_proxima'
+
+        return None
@@ -0,0 +1,76 @@
+class IndiceContas:
+    """
+    Índice plano do plano de contas: código -> informação da conta, para
+    consultas O(1) em vez de percorrer as classes (ou a árvore de subcontas)
+    a cada linha de relatório.
+
+    Aceita os dois formatos de plano usados na aplicação: classes com 'contas'
+    (ContabilidadeAvancada) e árvores com 'subcontas' (PlanoContasAngolano).
+    As subcontas herdam o tipo e a natureza da conta mãe quando não os têm.
+    """
+
+    CONTA_DESCONHECIDA = "Conta Desconhecida"
+
+    def __init__(self, plano=None):
+        """
+        Args:
+            plano: Dicionário do plano de contas (opcional)
+        """
+        self.contas = {}
+        self.versao = 0  # incrementada a cada reconstrução
+        if plano is not None:
+            self.reconstruir(plano)
+
+    def reconstruir(self, plano):
+        """
+        Reconstrói o índice a partir do plano de contas (chamar sempre que o plano mudar)
+
+        Args:
+            plano: Dicionário {classe: {'nome', 'contas' | 'subcontas'}}
+        """
+        contas = {}
+        pendentes = [(codigo, info, codigo, [codigo], None) for codigo, info in plano.items()]
+        while pendentes:
+            codigo, info, classe, caminho, pai = pendentes.pop()
+            codigo = str(codigo)
+            contas[codigo] = {
+                'nome': info.get('nome', ''),
+                'natureza': info.get('natureza', pai['natureza'] if pai else None),
+                'tipo': info.get('tipo', pai['tipo'] if pai else None),
+                'classe': classe,
+                'caminho': caminho
+            }
+            filhas = info.get('contas') or info.get('subcontas') or {}
+            for codigo_filha, info_filha in filhas.items():
+                pendentes.append((codigo_filha, info_filha, classe,
+                                  caminho + [str(codigo_filha)], contas[codigo]))
+
+        self.contas = contas
+        self.versao += 1
+
+    def obter(self, codigo):
+        """Informação da conta ({'nome', 'natureza', 'tipo', 'classe', 'caminho'}) ou None"""
+        return self.contas.get(str(codigo))
+
+    def nome(self, codigo, padrao=CONTA_DESCONHECIDA):
+        conta = self.contas.get(str(codigo))
+        return conta['nome'] if conta else padrao
+
+    def natureza(self, codigo):
+        conta = self.contas.get(str(codigo))
+        return conta['natureza'] if conta else None
+
+    def tipo(self, codigo):
+        conta = self.contas.get(str(codigo))
+        return conta['tipo'] if conta else None
+
+    def caminho(self, codigo):
+        """Lista de códigos desde a classe até à conta, ou None se não existir"""
+        conta = self.contas.get(str(codigo))
+        return list(conta['caminho']) if conta else None
+
+    def __contains__(self, codigo):
+        return str(codigo) in self.contas
+
+    def __len__(self):
+        return len(self.contas)
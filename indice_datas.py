@@ -0,0 +1,88 @@
+from bisect import bisect_left, bisect_right
+
+from razao_colunar import limites_periodo
+
+
+class IndiceDatas:
+    """
+    Índice secundário dos lançamentos ordenado por data: listas paralelas com
+    as datas ordenadas e as posições correspondentes na lista de lançamentos.
+    A lista de lançamentos mantém a ordem de inclusão (as posições são usadas
+    pelo diário e pela base SQLite); só o índice está ordenado.
+
+    Os intervalos de datas são localizados por bisseção (O(log n)). Lançamentos
+    novos são inseridos na posição certa; alterações, remoções ou a troca da
+    lista provocam uma reordenação completa na próxima consulta.
+    """
+
+    # Acima desta fração de lançamentos novos, reordenar tudo sai mais barato
+    # do que inserir um a um
+    FRACAO_REORDENAR = 0.1
+
+    def __init__(self):
+        self.datas = []       # datas por ordem crescente
+        self.posicoes = []    # posição na lista de lançamentos de cada data
+        self.total_lancamentos = 0
+        self._lista = None
+        self._reordenar = True
+
+    def marcar_alterado(self, indice):
+        """Indica que o lançamento na posição `indice` foi alterado (a data pode ter mudado)"""
+        self._reordenar = True
+
+    def truncar(self, total_lancamentos):
+        """Descarta os lançamentos a partir da posição `total_lancamentos`"""
+        if total_lancamentos < self.total_lancamentos:
+            self._reordenar = True
+
+    def sincronizar(self, lancamentos):
+        """
+        Atualiza o índice com os lançamentos acrescentados desde a última consulta
+
+        Args:
+            lancamentos: Lista de lançamentos da contabilidade
+        """
+        if lancamentos is not self._lista or len(lancamentos) < self.total_lancamentos:
+            self._lista = lancamentos
+            self._reordenar = True
+
+        novos = len(lancamentos) - self.total_lancamentos
+        if self._reordenar or novos > self.FRACAO_REORDENAR * max(self.total_lancamentos, 1):
+            ordem = sorted(range(len(lancamentos)), key=lambda i: lancamentos[i]['data'])
+            self.posicoes = ordem
+            self.datas = [lancamentos[i]['data'] for i in ordem]
+            self._reordenar = False
+        else:
+            for posicao in range(self.total_lancamentos, len(lancamentos)):
+                data = lancamentos[posicao]['data']
+                # bisect_right: datas iguais ficam pela ordem de inclusão
+                i = bisect_right(self.datas, data)
+                self.datas.insert(i, data)
+                self.posicoes.insert(i, posicao)
+        self.total_lancamentos = len(lancamentos)
+
+    def intervalo(self, inicio=None, fim=None):
+        """
+        Limites [i, j) no índice das datas entre os dias `inicio` e `fim`
+        (inclusivos, dias inteiros como nos saldos: ver limites_periodo)
+
+        Returns:
+            tuple: (i, j)
+        """
+        inicio, fim = limites_periodo(inicio, fim)
+        i = 0 if inicio is None else bisect_left(self.datas, inicio)
+        j = len(self.datas) if fim is None else bisect_left(self.datas, fim)
+        return i, max(i, j)
+
+    def entre(self, lancamentos, inicio=None, fim=None):
+        """
+        Percorre os lançamentos do período por ordem de data, sem copiar listas
+
+        Yields:
+            dict: Lançamento
+        """
+        self.sincronizar(lancamentos)
+        i, j = self.intervalo(inicio, fim)
+        posicoes = self.posicoes
+        for k in range(i, j):
+            yield lancamentos[posicoes[k]]
@@ -119,7 +119,7 @@ class IntegradorFuncionalidades:
     def abrir_conciliacao_automatica(self):
         """Abre a interface para conciliação bancária automática"""
         # Verificar se há dados carregados
-        if self.app.dados_banco is None or self.app.dados_livro is None:
+        if self.app.dados_banco_compacto is None or self.app.dados_livro_compacto is None:
             messagebox.showwarning("Aviso", "Importe os dados bancários e contábeis primeiro!")
             return
         
@@ -115,6 +115,58 @@ class GerenciadorLancamentosRecorrentes:
                 
         return lancamentos_processados
         
+    def lancar_no_razao(self, data_inicio, data_fim, conta_banco="43"):
+        """
+        Regista na contabilidade os lançamentos recorrentes de um período, numa
+        única gravação. Ocorrências já lançadas anteriormente são ignoradas.
+        
+        Returns:
+            int: Número de lançamentos registados
+        """
+        contabilidade = self.app_principal.contabilidade
+        ja_lancados = {l['recorrente'] for l in contabilidade.lancamentos if 'recorrente' in l}
+        
+        registados = 0
+        with contabilidade.lote():
+            for item in self.processar_lancamentos(data_inicio, data_fim):
+                chave = f"{item['id_lancamento']}:{item['data'].strftime('%Y-%m-%d')}"
+                if chave in ja_lancados or not item["conta"]:
+                    continue
+                
+                valor = abs(float(item["valor"]))
+                conta = str(item["conta"])
+                # Receitas (classe 7) entram no banco; as restantes contas saem do banco
+                if conta.startswith('7'):
+                    movimentos = [{'conta': conta_banco, 'debito': valor, 'credito': 0},
+                                  {'conta': conta, 'debito': 0, 'credito': valor}]
+                else:
+                    movimentos = [{'conta': conta, 'debito': valor, 'credito': 0},
+                                  {'conta': conta_banco, 'debito': 0, 'credito': valor}]
+                
+                contabilidade.registrar_lancamento(item["data"], item["descricao"], movimentos,
+                                                   origem="RECORRENTE")
+                contabilidade.lancamentos[-1]['recorrente'] = chave
+                ja_lancados.add(chave)
+                registados += 1
+        
+        return registados
+        
+    def lancar_no_razao_interativo(self, janela_pai):
+        """Pede o período e regista os lançamentos recorrentes na contabilidade"""
+        data_inicio = simpledialog.askstring("Lançar no Razão", "Data inicial (AAAA-MM-DD):", parent=janela_pai)
+        if not data_inicio:
+            return
+        data_fim = simpledialog.askstring("Lançar no Razão", "Data final (AAAA-MM-DD):", parent=janela_pai)
+        if not data_fim:
+            return
+        
+        try:
+            registados = self.lancar_no_razao(data_inicio, data_fim)
+            messagebox.showinfo("Sucesso", f"{registados} lançamentos recorrentes registados na contabilidade.",
+                                parent=janela_pai)
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao lançar no razão: {str(e)}", parent=janela_pai)
+            
     def gerar_datas_lancamento(self, periodicidade, data_inicio, data_fim, periodo_inicio, periodo_fim):
         """Gera as datas de lançamento com base na periodicidade"""
         datas = []
@@ -206,6 +258,8 @@ class GerenciadorLancamentosRecorrentes:
                   command=lambda: self.remover_lancamento_selecionado(janela, tabela)).pack(side=tk.LEFT, padx=5)
         ttk.Button(frame_botoes, text="Atualizar", 
                   command=lambda: self.atualizar_tabela_lancamentos(tabela)).pack(side=tk.LEFT, padx=5)
+        ttk.Button(frame_botoes, text="Lançar no Razão", 
+                  command=lambda: self.lancar_no_razao_interativo(janela)).pack(side=tk.LEFT, padx=5)
         
         # Frame da tabela
         frame_tabela = ttk.Frame(frame_principal)
@@ -0,0 +1,197 @@
+import numpy as np
+import pandas as pd
+from datetime import datetime
+
+try:
+    from openpyxl import load_workbook
+    OPENPYXL_DISPONIVEL = True
+except ImportError:
+    OPENPYXL_DISPONIVEL = False
+
+# Origem das datas seriais do Excel (sistema 1900, com o bug do ano bissexto)
+ORIGEM_DATAS_EXCEL = datetime(1899, 12, 30)
+
+
+def _textos(serie):
+    """Células de texto sem espaços nas pontas (NaN nas restantes), pelo acessor .str"""
+    try:
+        return serie.str.strip()
+    except AttributeError:
+        # Coluna sem nenhuma célula de texto (só números ou datas)
+        return pd.Series(None, index=serie.index, dtype=object)
+
+
+def converter_datas(serie, formato_data='%d/%m/%Y'):
+    """
+    Converte uma coluna de datas com valores mistos (datetime, número serial do
+    Excel ou texto). Valores que não são datas ficam como NaT.
+
+    A coluna é convertida de uma vez com pd.to_datetime/pd.to_numeric; as
+    células que ficam NaT num passo são as únicas tentadas no seguinte.
+    """
+    if pd.api.types.is_datetime64_any_dtype(serie):
+        return pd.to_datetime(serie).astype('datetime64[ns]')
+
+    # Datetimes e textos no formato do banco, de uma vez sobre a coluna
+    resultado = pd.to_datetime(serie, format=formato_data, errors='coerce').astype('datetime64[ns]')
+
+    pendentes = resultado.isna() & serie.notna()
+    if not pendentes.any():
+        return resultado
+    # Posições (e não rótulos) das células por converter: o índice pode ter repetidos
+    posicoes = np.flatnonzero(pendentes.to_numpy())
+    restantes = serie.iloc[posicoes]
+    textos = _textos(restantes)
+    e_texto = textos.notna().to_numpy()
+
+    # Textos com espaços nas pontas ou noutro formato (ISO 8601)
+    if e_texto.any():
+        textos = textos[e_texto]
+        convertidas = pd.to_datetime(textos, format=formato_data, errors='coerce')
+        falhadas = convertidas.isna()
+        if falhadas.any():
+            convertidas[falhadas] = pd.to_datetime(textos[falhadas], format='ISO8601', errors='coerce')
+        resultado.iloc[posicoes[e_texto]] = convertidas.to_numpy()
+
+    # Datas seriais do Excel (células numéricas sem formato de data; não booleanas)
+    e_numero = ~e_texto & ~restantes.isin([True, False]).to_numpy()
+    if e_numero.any():
+        numeros = pd.to_numeric(restantes.iloc[e_numero], errors='coerce').to_numpy(dtype=float)
+        resultado.iloc[posicoes[e_numero]] = ORIGEM_DATAS_EXCEL + pd.to_timedelta(numeros, unit='D')
+
+    return resultado
+
+
+def converter_valores(serie):
+    """Converte uma coluna de valores (números ou texto com vírgula decimal). Texto inválido fica NaN"""
+    numeros = pd.to_numeric(serie, errors='coerce')
+    # Só as células que não converteram são tratadas como texto com vírgula decimal
+    pendentes = (numeros.isna() & serie.notna()).to_numpy()
+    if pendentes.any():
+        textos = _textos(serie[pendentes])
+        if textos.notna().any():
+            numeros[pendentes] = pd.to_numeric(textos.str.replace(',', '.', regex=False),
+                                               errors='coerce').to_numpy()
+    return numeros.astype(float)
+
+
+def converter_bloco(df, formato_data='%d/%m/%Y'):
+    """Converte as colunas padronizadas de um bloco bruto, sem alterar o original"""
+    df = df.copy()
+    if 'data' in df.columns:
+        df['data'] = converter_datas(df['data'], formato_data)
+    if 'valor' in df.columns:
+        df['valor'] = converter_valores(df['valor'])
+    if 'descricao' in df.columns:
+        df['descricao'] = df['descricao'].fillna('').astype(str)
+    if 'referencia' in df.columns:
+        df['referencia'] = df['referencia'].fillna('').astype(str)
+    return df
+
+
+class LeitorXlsxStreaming:
+    """
+    Lê planilhas XLSX em modo somente leitura, linha a linha, sem carregar
+    o livro inteiro em memória. Apenas as colunas mapeadas são lidas e os
+    valores são convertidos à medida que cada bloco é montado.
+    """
+
+    def __init__(self, arquivo, mapeamento_colunas, tamanho_bloco=50000,
+                 formato_data='%d/%m/%Y', folha=None):
+        """
+        Args:
+            arquivo: Caminho do arquivo XLSX
+            mapeamento_colunas: Dicionário {cabeçalho na planilha: nome padronizado}
+            tamanho_bloco: Número de linhas por bloco devolvido
+            formato_data: Formato usado para datas armazenadas como texto
+            folha: Nome da folha a ler (por omissão, a folha ativa)
+        """
+        if not OPENPYXL_DISPONIVEL:
+            raise ImportError("O pacote openpyxl é necessário para a leitura em streaming de XLSX.")
+
+        self.arquivo = arquivo
+        self.mapeamento_colunas = mapeamento_colunas
+        self.tamanho_bloco = tamanho_bloco
+        self.formato_data = formato_data
+        self.folha = folha
+
+    def ler_blocos(self):
+        """
+        Percorre a planilha e devolve DataFrames com no máximo `tamanho_bloco` linhas
+
+        Yields:
+            DataFrame: Bloco com as colunas padronizadas (data, descricao, valor, ...)
+        """
+        for bloco in self.ler_blocos_brutos():
+            yield self.converter_bloco(bloco).drop(columns='linha')
+
+    def ler_blocos_brutos(self):
+        """
+        Percorre a planilha sem converter os valores das células
+
+        Yields:
+            DataFrame: Bloco com as colunas padronizadas e a coluna `linha`
+                       (número da linha na planilha)
+        """
+        livro = load_workbook(self.arquivo, read_only=True, data_only=True)
+        try:
+            folha = livro[self.folha] if self.folha else livro.active
+            linhas = folha.iter_rows(values_only=True)
+
+            cabecalho = next(linhas, None)
+            if cabecalho is None:
+                return
+
+            posicoes = self._resolver_posicoes(cabecalho)
+            coluna_inicial = min(posicoes.values())
+            coluna_final = max(posicoes.values())
+
+            # Reabrir o iterador apenas sobre o intervalo de colunas mapeadas
+            linhas = folha.iter_rows(min_row=2, min_col=coluna_inicial + 1,
+                                     max_col=coluna_final + 1, values_only=True)
+            deslocadas = {destino: pos - coluna_inicial for destino, pos in posicoes.items()}
+
+            bloco = {destino: [] for destino in deslocadas}
+            numeros_linha = []
+            for numero, linha in enumerate(linhas, start=2):
+                if linha is None or all(celula is None for celula in linha):
+                    continue
+
+                for destino, pos in deslocadas.items():
+                    bloco[destino].append(linha[pos] if pos < len(linha) else None)
+                numeros_linha.append(numero)
+
+                if len(numeros_linha) >= self.tamanho_bloco:
+                    yield pd.DataFrame({**bloco, 'linha': numeros_linha})
+                    bloco = {destino: [] for destino in deslocadas}
+                    numeros_linha = []
+
+            if numeros_linha:
+                yield pd.DataFrame({**bloco, 'linha': numeros_linha})
+        finally:
+            livro.close()
+
+    def _resolver_posicoes(self, cabecalho):
+        """Localiza a posição de cada coluna mapeada no cabeçalho (sem distinguir maiúsculas)"""
+        normalizado = {}
+        for pos, nome in enumerate(cabecalho):
+            if nome is not None:
+                normalizado.setdefault(str(nome).strip().lower(), pos)
+
+        posicoes = {}
+        faltantes = []
+        for origem, destino in self.mapeamento_colunas.items():
+            pos = normalizado.get(str(origem).strip().lower())
+            if pos is None:
+                faltantes.append(origem)
+            else:
+                posicoes[destino] = pos
+
+        if faltantes:
+            raise ValueError(f"O arquivo não contém as colunas necessárias: {', '.join(faltantes)}")
+
+        return posicoes
+
+    def converter_bloco(self, df):
+        """Converte as colunas de um bloco bruto de uma só vez para os tipos esperados"""
+        return converter_bloco(df, self.formato_data)
@@ -0,0 +1,287 @@
+"""
+Execução sem interface gráfica: importação de extratos e livros, conciliação
+automática e geração de relatórios, para correr em servidores e no cron.
+
+Uso:
+    python -m linha_comando importar-banco extrato.xlsx --banco BAI [--acrescentar]
+    python -m linha_comando importar-livro livro.xlsx
+    python -m linha_comando conciliar [--relatorio conciliacao.pdf] [--ignorar-discrepancias]
+    python -m linha_comando relatorio dre --inicio 01/01/2024 --fim 31/12/2024 [--saida dre.xlsx]
+
+Códigos de saída:
+    0  sucesso
+    1  erro inesperado
+    2  argumentos inválidos
+    3  dados em falta ou inválidos (nada importado, arquivo inexistente, ...)
+    4  conciliação concluída com discrepâncias
+    5  relatório não gerado
+
+Nenhum módulo importado aqui depende do tkinter.
+"""
+import argparse
+import os
+import sys
+from datetime import datetime
+
+from config import CONFIGURACOES
+
+SAIDA_OK = 0
+SAIDA_ERRO = 1
+SAIDA_ARGUMENTOS = 2
+SAIDA_DADOS = 3
+SAIDA_DISCREPANCIAS = 4
+SAIDA_RELATORIO = 5
+
+TIPOS_CONTABILISTICOS = ('balanco', 'dre', 'livro_razao', 'fluxo_caixa', 'racu')
+TIPOS_CONCILIACAO = ('diario', 'mensal')
+EXTENSOES_TABULARES = ('.csv', '.xlsx', '.parquet')
+
+
+def _data(texto):
+    """Data em DD/MM/AAAA (como na interface) ou AAAA-MM-DD"""
+    for formato in ('%d/%m/%Y', '%Y-%m-%d'):
+        try:
+            return datetime.strptime(texto, formato)
+        except ValueError:
+            pass
+    raise argparse.ArgumentTypeError(f"Data inválida: {texto} (use DD/MM/AAAA)")
+
+
+def _carregar_dados(nome):
+    """Extrato ou livro importado (vista com datas e valores decimais), ou None"""
+    from armazenamento_arrow import ArmazenamentoArrow
+    from tipos_compactos import expandir_extrato
+    return expandir_extrato(ArmazenamentoArrow().carregar(nome))
+
+
+def _guardar_dados(nome, df):
+    from armazenamento_arrow import ArmazenamentoArrow
+    from tipos_compactos import compactar_extrato
+    return ArmazenamentoArrow().salvar(nome, compactar_extrato(df))
+
+
+def _contabilidade(args):
+    from contabilidade import ContabilidadeAvancada, armazenamento_configurado
+    contabilidade = ContabilidadeAvancada(backend=args.armazenamento or armazenamento_configurado())
+    contabilidade.dados_banco = _carregar_dados('banco')
+    contabilidade.dados_livro = _carregar_dados('livro')
+    return contabilidade
+
+
+def _resumo_validacao(validador):
+    if validador.total_quarentena:
+        print(validador.texto_resumo(), file=sys.stderr)
+
+
+# ----------------------------------------------------------------------
+# Comandos
+# ----------------------------------------------------------------------
+def comando_importar_banco(args):
+    from banco_processor import ProcessadorBanco
+    from impressoes_digitais import remover_duplicados
+    from validacao_importacao import ValidadorImportacao
+
+    if not os.path.exists(args.arquivo):
+        print(f"Erro: arquivo não encontrado: {args.arquivo}", file=sys.stderr)
+        return SAIDA_DADOS
+
+    validador = ValidadorImportacao(ValidadorImportacao.arquivo_quarentena_para(args.arquivo))
+    try:
+        novos_dados = ProcessadorBanco.processar_extrato(args.arquivo, args.banco, validador=validador)
+    except ValueError as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return SAIDA_DADOS
+    _resumo_validacao(validador)
+    if novos_dados.empty:
+        print("Erro: nenhuma linha válida no extrato", file=sys.stderr)
+        return SAIDA_DADOS
+
+    existentes = _carregar_dados('banco') if args.acrescentar else None
+
+    # Extratos com períodos sobrepostos repetem as mesmas linhas
+    dados, duplicados, quase_duplicados = remover_duplicados(novos_dados, existentes)
+    if not _guardar_dados('banco', dados.reset_index(drop=True)):
+        print("Erro: não foi possível guardar o extrato importado", file=sys.stderr)
+        return SAIDA_ERRO
+
+    print(f"Extrato importado: {len(dados)} linhas ({duplicados} duplicadas ignoradas, "
+          f"{len(quase_duplicados)} a verificar)")
+    return SAIDA_OK
+
+
+def comando_importar_livro(args):
+    from banco_processor import ProcessadorBanco
+    from validacao_importacao import ValidadorImportacao
+
+    if not os.path.exists(args.arquivo):
+        print(f"Erro: arquivo não encontrado: {args.arquivo}", file=sys.stderr)
+        return SAIDA_DADOS
+
+    validador = ValidadorImportacao(ValidadorImportacao.arquivo_quarentena_para(args.arquivo))
+    try:
+        dados = ProcessadorBanco.processar_livro(args.arquivo, validador=validador)
+    except ValueError as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return SAIDA_DADOS
+    _resumo_validacao(validador)
+    if dados.empty:
+        print("Erro: nenhuma linha válida no livro", file=sys.stderr)
+        return SAIDA_DADOS
+
+    if not _guardar_dados('livro', dados):
+        print("Erro: não foi possível guardar o livro importado", file=sys.stderr)
+        return SAIDA_ERRO
+
+    print(f"Livro importado: {len(dados)} linhas")
+    return SAIDA_OK
+
+
+def comando_conciliar(args):
+    from conciliacao_automatica import ConciliacaoBancariaAutomatica
+
+    contabilidade = _contabilidade(args)
+    if contabilidade.dados_banco is None or contabilidade.dados_livro is None:
+        print("Erro: importe o extrato e o livro antes de conciliar", file=sys.stderr)
+        return SAIDA_DADOS
+
+    conciliacao = ConciliacaoBancariaAutomatica(contabilidade)
+    conciliadas, discrepancias = conciliacao.conciliar_automaticamente(
+        contabilidade.dados_banco,
+        contabilidade.dados_livro,
+        tolerancia_dias=args.tolerancia_dias,
+        tolerancia_valor=args.tolerancia_valor,
+        tolerancia_texto=args.tolerancia_texto
+    )
+    print(f"Conciliação concluída: {len(conciliadas)} transações conciliadas, "
+          f"{len(discrepancias)} discrepâncias")
+
+    if args.relatorio and not conciliacao.gerar_relatorio_conciliacao(args.relatorio):
+        return SAIDA_RELATORIO
+
+    if discrepancias and not args.ignorar_discrepancias:
+        return SAIDA_DISCREPANCIAS
+    return SAIDA_OK
+
+
+def comando_relatorio(args):
+    data_inicio = args.inicio
+    data_fim = args.fim or data_inicio
+    if data_fim is None:
+        print("Erro: indique --fim (ou --inicio) do relatório", file=sys.stderr)
+        return SAIDA_ARGUMENTOS
+    if data_inicio is None:
+        data_inicio = datetime(data_fim.year, 1, 1)
+
+    caminho = args.saida or f"{args.tipo}_{data_inicio.strftime('%Y%m%d')}_{data_fim.strftime('%Y%m%d')}.pdf"
+    tabular = os.path.splitext(caminho)[1].lower() in EXTENSOES_TABULARES
+
+    if args.tipo in TIPOS_CONCILIACAO:
+        from agregacoes import comparar_por_periodo
+        from exportacao_tabular import exportar
+        from relatorios import GeradorRelatorios, dados_relatorio_diario, dados_relatorio_mensal
+
+        dados_banco, dados_livro = _carregar_dados('banco'), _carregar_dados('livro')
+        if dados_banco is None or dados_livro is None:
+            print("Erro: importe o extrato e o livro antes de gerar o relatório", file=sys.stderr)
+            return SAIDA_DADOS
+        try:
+            if tabular and args.tipo == 'diario':
+                exportar(dados_relatorio_diario(dados_banco, dados_livro, data_fim), caminho)
+            elif tabular:
+                exportar(dados_relatorio_mensal(comparar_por_periodo(dados_banco, dados_livro, 'M'), data_fim),
+                         caminho)
+            elif args.tipo == 'diario':
+                GeradorRelatorios().gerar_relatorio_diario(dados_banco, dados_livro, caminho, data_fim)
+            else:
+                GeradorRelatorios().gerar_relatorio_mensal(comparar_por_periodo(dados_banco, dados_livro, 'M'),
+                                                           caminho, data_fim)
+        except Exception as e:
+            print(f"Erro ao gerar relatório: {str(e)}", file=sys.stderr)
+            return SAIDA_RELATORIO
+        print(f"Relatório gerado: {caminho}")
+        return SAIDA_OK
+
+    contabilidade = _contabilidade(args)
+    if tabular:
+        gerado = contabilidade.exportar_relatorio(args.tipo, caminho, data_inicio, data_fim)
+    else:
+        gerado = contabilidade.gerar_relatorio(args.tipo, caminho, data_inicio, data_fim,
+                                               usar_cache=not args.sem_cache)
+        if contabilidade.cache_relatorios is not None:
+            contabilidade.cache_relatorios.fechar()
+    if not gerado:
+        return SAIDA_RELATORIO
+    print(f"Relatório gerado: {caminho}")
+    return SAIDA_OK
+
+
+# ----------------------------------------------------------------------
+# Argumentos
+# ----------------------------------------------------------------------
+def criar_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m linha_comando',
+        description="Reconciliação bancária e relatórios contabilísticos sem interface gráfica")
+    parser.add_argument('--diretorio', help="Diretório dos dados da entidade (por omissão o atual)")
+    parser.add_argument('--armazenamento', choices=('json', 'sqlite'),
+                        help="Armazenamento da contabilidade (por omissão o das configurações)")
+    comandos = parser.add_subparsers(dest='comando', required=True)
+
+    importar_banco = comandos.add_parser('importar-banco', help="Importa um extrato bancário")
+    importar_banco.add_argument('arquivo')
+    importar_banco.add_argument('--banco', required=True, choices=sorted(CONFIGURACOES['BANCOS']))
+    importar_banco.add_argument('--acrescentar', action='store_true',
+                                help="Acrescenta aos dados bancários já importados")
+    importar_banco.set_defaults(funcao=comando_importar_banco)
+
+    importar_livro = comandos.add_parser('importar-livro', help="Importa o livro contábil")
+    importar_livro.add_argument('arquivo')
+    importar_livro.set_defaults(funcao=comando_importar_livro)
+
+    conciliar = comandos.add_parser('conciliar', help="Conciliação automática do extrato com o livro")
+    conciliar.add_argument('--tolerancia-dias', type=int, default=3)
+    conciliar.add_argument('--tolerancia-valor', type=float, default=0.01)
+    conciliar.add_argument('--tolerancia-texto', type=int, default=80)
+    conciliar.add_argument('--relatorio', help="Gera o relatório de conciliação em PDF")
+    conciliar.add_argument('--ignorar-discrepancias', action='store_true',
+                           help=f"Sai com {SAIDA_OK} mesmo havendo discrepâncias (por omissão {SAIDA_DISCREPANCIAS})")
+    conciliar.set_defaults(funcao=comando_conciliar)
+
+    relatorio = comandos.add_parser('relatorio', help="Gera um relatório")
+    relatorio.add_argument('tipo', choices=TIPOS_CONTABILISTICOS + TIPOS_CONCILIACAO)
+    relatorio.add_argument('--inicio', type=_data, help="Data inicial (DD/MM/AAAA)")
+    relatorio.add_argument('--fim', type=_data, help="Data final ou de referência (DD/MM/AAAA)")
+    relatorio.add_argument('--saida', help="Arquivo de saída (.pdf, ou .csv/.xlsx/.parquet para exportar)")
+    relatorio.add_argument('--sem-cache', action='store_true', help="Não usar a cache de relatórios")
+    relatorio.set_defaults(funcao=comando_relatorio)
+
+    return parser
+
+
+def main(argv=None):
+    """
+    Args:
+        argv: Argumentos (por omissão os da linha de comando)
+
+    Returns:
+        int: Código de saída
+    """
+    parser = criar_parser()
+    try:
+        args = parser.parse_args(argv)
+    except SystemExit as e:
+        return SAIDA_OK if e.code == 0 else SAIDA_ARGUMENTOS
+
+    try:
+        if args.diretorio:
+            os.chdir(args.diretorio)
+        return args.funcao(args)
+    except KeyboardInterrupt:
+        return SAIDA_ERRO
+    except Exception as e:
+        print(f"Erro: {str(e)}", file=sys.stderr)
+        return SAIDA_ERRO
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,179 @@
+from reportlab.lib import colors
+from reportlab.lib.pagesizes import A4
+from reportlab.lib.units import cm
+from reportlab.pdfbase.pdfmetrics import stringWidth
+from reportlab.pdfgen import canvas
+from reportlab.platypus import Table, TableStyle
+
+CABECALHO = ["Data", "Descrição", "Lançamento", "Débito", "Crédito", "Saldo"]
+LARGURAS = [2*cm, 6*cm, 2*cm, 3*cm, 3*cm, 3*cm]
+
+
+def formatar_valor(valor):
+    return f"Kz {valor:,.2f}"
+
+
+class LivroRazaoPDF:
+    """
+    Livro razão escrito página a página diretamente no canvas. Os movimentos
+    de cada conta são partidos em tabelas do tamanho de uma página (linhas de
+    altura fixa), com "Saldo transportado" no topo e "A transportar" no fim de
+    cada página em que a conta continua. Cada tabela é desenhada e descartada
+    antes da seguinte, pelo que o tempo cresce linearmente com o número de
+    movimentos e a memória usada na composição não depende dele.
+
+    Uso:
+        livro = LivroRazaoPDF(caminho, data_inicio, data_fim)
+        for conta, movimentos in contabilidade.percorrer_razao(data_inicio, data_fim):
+            livro.escrever_conta(conta, nome, movimentos)
+        livro.fechar()
+    """
+
+    ALTURA_LINHA = 14
+    MARGEM_HORIZONTAL = 1*cm
+    MARGEM_VERTICAL = 1.5*cm
+    TAMANHO_FONTE = 8
+
+    def __init__(self, caminho_saida, data_inicio, data_fim):
+        """
+        Args:
+            caminho_saida: Caminho do arquivo PDF de saída
+            data_inicio: Data de início do período
+            data_fim: Data de fim do período
+        """
+        self.canvas = canvas.Canvas(caminho_saida, pagesize=A4)
+        self.largura, self.altura = A4
+        self.periodo = f"Período: {data_inicio.strftime('%d/%m/%Y')} a {data_fim.strftime('%d/%m/%Y')}"
+        self.largura_descricao = LARGURAS[1] - 12
+        self.pagina = 0
+        self._nova_pagina(primeira=True)
+
+    # ------------------------------------------------------------------
+    # Páginas
+    # ------------------------------------------------------------------
+    def _nova_pagina(self, primeira=False):
+        if not primeira:
+            self.canvas.showPage()
+        self.pagina += 1
+        c = self.canvas
+        topo = self.altura - self.MARGEM_VERTICAL
+        if primeira:
+            c.setFont('Helvetica-Bold', 18)
+            c.drawString(self.MARGEM_HORIZONTAL, topo - 18, "Livro Razão")
+            c.setFont('Helvetica', 10)
+            c.drawString(self.MARGEM_HORIZONTAL, topo - 36, self.periodo)
+            self.y = topo - 36 - 0.5*cm
+        else:
+            c.setFont('Helvetica', 8)
+            c.drawString(self.MARGEM_HORIZONTAL, topo - 8, f"Livro Razão - {self.periodo}")
+            self.y = topo - 8 - 0.3*cm
+        c.setFont('Helvetica', 8)
+        c.drawRightString(self.largura - self.MARGEM_HORIZONTAL, self.MARGEM_VERTICAL / 2,
+                          f"Página {self.pagina}")
+
+    def _linhas_disponiveis(self):
+        """Linhas de tabela que cabem no resto da página"""
+        return int((self.y - self.MARGEM_VERTICAL) // self.ALTURA_LINHA)
+
+    def _titulo_conta(self, texto):
+        self.canvas.setFont('Helvetica-Bold', 12)
+        self.canvas.drawString(self.MARGEM_HORIZONTAL, self.y - 14, texto)
+        self.y -= 20
+
+    def _desenhar_tabela(self, linhas, transportado, rodape):
+        """Desenha uma tabela (cabeçalho + linhas) na posição atual e avança"""
+        dados = [CABECALHO] + linhas
+        estilo = [
+            ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+            ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
+            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+            ('FONTSIZE', (0, 0), (-1, -1), self.TAMANHO_FONTE),
+            ('VALIGN', (0, 0), (-1, -1), 'MIDDLE'),
+            ('TOPPADDING', (0, 0), (-1, -1), 1),
+            ('BOTTOMPADDING', (0, 0), (-1, -1), 2),
+            ('ALIGN', (3, 1), (5, -1), 'RIGHT'),
+            ('GRID', (0, 0), (-1, -1), 0.5, colors.black),
+            ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+            ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold')
+        ]
+        if transportado:
+            estilo += [('BACKGROUND', (0, 1), (-1, 1), colors.lightgrey),
+                       ('FONTNAME', (0, 1), (-1, 1), 'Helvetica-Oblique')]
+        if rodape == 'transportar':
+            estilo[-1] = ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Oblique')
+
+        tabela = Table(dados, colWidths=LARGURAS, rowHeights=self.ALTURA_LINHA)
+        tabela.setStyle(TableStyle(estilo))
+        _, altura = tabela.wrapOn(self.canvas, self.largura, self.altura)
+        tabela.drawOn(self.canvas, self.MARGEM_HORIZONTAL, self.y - altura)
+        self.y -= altura + 0.4*cm
+
+    def _descricao(self, texto):
+        """Descrição cortada à largura da coluna (linhas de altura fixa)"""
+        texto = str(texto) if texto is not None else ""
+        if stringWidth(texto, 'Helvetica', self.TAMANHO_FONTE) <= self.largura_descricao:
+            return texto
+        while texto and stringWidth(texto + "...", 'Helvetica', self.TAMANHO_FONTE) > self.largura_descricao:
+            texto = texto[:-1]
+        return texto + "..."
+
+    # ------------------------------------------------------------------
+    # Contas
+    # ------------------------------------------------------------------
+    def escrever_conta(self, conta, nome_conta, movimentos):
+        """
+        Escreve os movimentos de uma conta, partidos por páginas
+
+        Args:
+            conta: Código da conta
+            nome_conta: Nome da conta
+            movimentos: Iterável de {'data', 'descricao', 'lancamento_id', 'debito', 'credito'}
+                por ordem de data (consumido uma só vez)
+        """
+        titulo = f"Conta: {conta} - {nome_conta}"
+
+        # Título + cabeçalho + pelo menos um movimento e o rodapé
+        if self._linhas_disponiveis() < 5:
+            self._nova_pagina()
+        self._titulo_conta(titulo)
+
+        saldo = total_debitos = total_creditos = 0
+        linhas = []
+        transportado = False
+        capacidade = self._linhas_disponiveis() - 2  # cabeçalho e rodapé
+
+        for movimento in movimentos:
+            if len(linhas) >= capacidade:
+                # Página cheia: fechar com "A transportar" e continuar na seguinte
+                linhas.append(["", "A transportar", "", formatar_valor(total_debitos),
+                               formatar_valor(total_creditos), formatar_valor(saldo)])
+                self._desenhar_tabela(linhas, transportado, 'transportar')
+                self._nova_pagina()
+                self._titulo_conta(f"{titulo} (continuação)")
+                linhas = [["", "Saldo transportado", "", formatar_valor(total_debitos),
+                           formatar_valor(total_creditos), formatar_valor(saldo)]]
+                transportado = True
+                capacidade = self._linhas_disponiveis() - 2
+
+            debito = movimento['debito']
+            credito = movimento['credito']
+            saldo += debito - credito
+            total_debitos += debito
+            total_creditos += credito
+            linhas.append([
+                movimento['data'].strftime('%d/%m/%Y'),
+                self._descricao(movimento['descricao']),
+                movimento['lancamento_id'],
+                formatar_valor(debito) if debito > 0 else "",
+                formatar_valor(credito) if credito > 0 else "",
+                formatar_valor(saldo)
+            ])
+
+        linhas.append(["", "TOTAIS", "", formatar_valor(total_debitos),
+                       formatar_valor(total_creditos), formatar_valor(saldo)])
+        self._desenhar_tabela(linhas, transportado, 'totais')
+
+    def fechar(self):
+        """Grava o PDF"""
+        self.canvas.save()
@@ -1,17 +1,15 @@
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 import json
 import os
 import logging
-from reportlab.lib import colors
 from reportlab.lib.pagesizes import A4, landscape
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer
-from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer
 from reportlab.lib.units import cm
+from tema_relatorios import estilo_tabela, estilos as estilos_relatorio
 import tkinter as tk
+from graficos_assincronos import GraficoAssincrono
 
 class OrcamentoRealizado:
     def __init__(self, contabilidade):
@@ -451,7 +449,7 @@ class OrcamentoRealizado:
             elementos = []
             
             # Estilos
-            estilos = getSampleStyleSheet()
+            estilos = estilos_relatorio()
             estilo_titulo = estilos['Heading1']
             estilo_subtitulo = estilos['Heading2']
             estilo_normal = estilos['Normal']
@@ -482,18 +480,7 @@ class OrcamentoRealizado:
             ]
             
             tabela_resumo = Table(dados_resumo, colWidths=[4*cm, 5*cm, 5*cm, 5*cm, 3*cm])
-            tabela_resumo.setStyle(TableStyle([
-                ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                ('FONTSIZE', (0, 0), (-1, 0), 12),
-                ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                ('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
-                ('FONTNAME', (0, -1), (-1, -1), 'Helvetica-Bold'),
-                ('ALIGN', (1, 1), (4, -1), 'RIGHT'),
-                ('GRID', (0, 0), (-1, -1), 1, colors.black)
-            ]))
+            tabela_resumo.setStyle(estilo_tabela((((1, 1), (4, -1), 'RIGHT'),), linha_total=True))
             elementos.append(tabela_resumo)
             elementos.append(Spacer(1, 0.5*cm))
             
@@ -513,17 +500,7 @@ class OrcamentoRealizado:
                     ])
                 
                 tabela_receitas = Table(dados_receitas, colWidths=[6*cm, 5*cm, 5*cm, 5*cm, 3*cm])
-                tabela_receitas.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (1, 1), (4, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
+                tabela_receitas.setStyle(estilo_tabela((((1, 1), (4, -1), 'RIGHT'),), tamanho_cabecalho=10, zebrado=True))
                 elementos.append(tabela_receitas)
             else:
                 elementos.append(Paragraph("Nenhuma receita orçada ou realizada no período.", estilo_normal))
@@ -546,17 +523,7 @@ class OrcamentoRealizado:
                     ])
                 
                 tabela_despesas = Table(dados_despesas, colWidths=[6*cm, 5*cm, 5*cm, 5*cm, 3*cm])
-                tabela_despesas.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (1, 1), (4, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
+                tabela_despesas.setStyle(estilo_tabela((((1, 1), (4, -1), 'RIGHT'),), tamanho_cabecalho=10, zebrado=True))
                 elementos.append(tabela_despesas)
             else:
                 elementos.append(Paragraph("Nenhuma despesa orçada ou realizada no período.", estilo_normal))
@@ -581,17 +548,7 @@ class OrcamentoRealizado:
                     ])
                 
                 tabela_desvios = Table(dados_desvios, colWidths=[2*cm, 5*cm, 4*cm, 4*cm, 4*cm, 2.5*cm, 2.5*cm])
-                tabela_desvios.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-                    ('ALIGN', (0, 0), (-1, 0), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 10),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-                    ('ALIGN', (2, 1), (5, -1), 'RIGHT'),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.black),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
-                ]))
+                tabela_desvios.setStyle(estilo_tabela((((2, 1), (5, -1), 'RIGHT'),), tamanho_cabecalho=10, zebrado=True))
                 elementos.append(tabela_desvios)
                 
                 # 5. Recomendações
@@ -638,7 +595,9 @@ class OrcamentoRealizado:
     
     def gerar_grafico_orcado_realizado(self, canvas, ano, mes=None, tipo='ambos'):
         """
-        Gera um gráfico comparativo entre orçado e realizado
+        Gera um gráfico comparativo entre orçado e realizado. A comparação é
+        calculada e o gráfico rasterizado na thread de desenho; a imagem
+        aparece no canvas quando estiver pronta.
         
         Args:
             canvas: Canvas do Tkinter onde o gráfico será exibido
@@ -647,89 +606,96 @@ class OrcamentoRealizado:
             tipo: Tipo de dados a exibir ('receitas', 'despesas', 'ambos')
             
         Returns:
-            FigureCanvasTkAgg: Canvas do matplotlib
+            GraficoAssincrono: Área do gráfico
         """
         try:
-            # Obter comparação
-            comparacao = self.comparar_orcado_realizado(ano, mes)
-            
-            # Verificar se há dados
-            if not comparacao:
-                return None
-            
-            # Criar figura
-            fig, ax = plt.subplots(figsize=(10, 6))
-            
-            # Configurar dados com base no tipo
-            if tipo == 'receitas' or tipo == 'ambos':
-                # Preparar dados de receitas
-                categorias_receitas = list(comparacao['receitas'].keys())
-                orcado_receitas = [comparacao['receitas'][cat]['orcado'] for cat in categorias_receitas]
-                realizado_receitas = [comparacao['receitas'][cat]['realizado'] for cat in categorias_receitas]
-                
-                # Limitar a 10 categorias para melhor visualização
-                if len(categorias_receitas) > 10:
-                    # Ordenar por valor realizado (decrescente)
-                    indices_ordenados = sorted(range(len(realizado_receitas)), key=lambda i: realizado_receitas[i], reverse=True)
-                    categorias_receitas = [categorias_receitas[i] for i in indices_ordenados[:10]]
-                    orcado_receitas = [orcado_receitas[i] for i in indices_ordenados[:10]]
-                    realizado_receitas = [realizado_receitas[i] for i in indices_ordenados[:10]]
-            
-            if tipo == 'despesas' or tipo == 'ambos':
-                # Preparar dados de despesas
-                categorias_despesas = list(comparacao['despesas'].keys())
-                orcado_despesas = [comparacao['despesas'][cat]['orcado'] for cat in categorias_despesas]
-                realizado_despesas = [comparacao['despesas'][cat]['realizado'] for cat in categorias_despesas]
-                
-                # Limitar a 10 categorias para melhor visualização
-                if len(categorias_despesas) > 10:
-                    # Ordenar por valor realizado (decrescente)
-                    indices_ordenados = sorted(range(len(realizado_despesas)), key=lambda i: realizado_despesas[i], reverse=True)
-                    categorias_despesas = [categorias_despesas[i] for i in indices_ordenados[:10]]
-                    orcado_despesas = [orcado_despesas[i] for i in indices_ordenados[:10]]
-                    realizado_despesas = [realizado_despesas[i] for i in indices_ordenados[:10]]
-            
-            # Plotar gráficos
-            if tipo == 'receitas':
-                self._plotar_grafico_barras(ax, categorias_receitas, orcado_receitas, realizado_receitas, "Receitas")
-                titulo = "Orçado vs. Realizado - Receitas"
-            elif tipo == 'despesas':
-                self._plotar_grafico_barras(ax, categorias_despesas, orcado_despesas, realizado_despesas, "Despesas")
-                titulo = "Orçado vs. Realizado - Despesas"
-            else:  # ambos
-                # Criar subplots
-                fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(10, 10))
-                
-                # Plotar receitas
-                if categorias_receitas:
-                    self._plotar_grafico_barras(ax1, categorias_receitas, orcado_receitas, realizado_receitas, "Receitas")
-                    ax1.set_title("Receitas")
-                
-                # Plotar despesas
-                if categorias_despesas:
-                    self._plotar_grafico_barras(ax2, categorias_despesas, orcado_despesas, realizado_despesas, "Despesas")
-                    ax2.set_title("Despesas")
-                
-                titulo = "Orçado vs. Realizado"
-            
-            # Configurar título
-            periodo = f"{mes}/{ano}" if mes else str(ano)
-            plt.suptitle(f"{titulo} - {periodo}", fontsize=16)
-            
-            # Ajustar layout
-            plt.tight_layout()
+            grafico = GraficoAssincrono(canvas, f'orcado_realizado_{tipo}', self.desenhar_grafico_orcado_realizado,
+                                        lambda: self.dados_grafico_orcado_realizado(ano, mes, tipo))
+            grafico.pack(fill=tk.BOTH, expand=True)
             
-            # Criar canvas para Tkinter
-            canvas_fig = FigureCanvasTkAgg(fig, master=canvas)
-            canvas_fig.draw()
-            canvas_fig.get_tk_widget().pack(fill=tk.BOTH, expand=True)
-            
-            return canvas_fig
+            return grafico
             
         except Exception as e:
             self.logger.error(f"Erro ao gerar gráfico de orçado vs. realizado: {str(e)}")
             return None
     
+    def dados_grafico_orcado_realizado(self, ano, mes=None, tipo='ambos'):
+        """
+        Prepara os dados do gráfico orçado vs. realizado (no máximo as 10
+        categorias com maior valor realizado de receitas e de despesas)
+        
+        Args:
+            ano: Ano para o gráfico
+            mes: Mês para o gráfico (opcional)
+            tipo: Tipo de dados a exibir ('receitas', 'despesas', 'ambos')
+            
+        Returns:
+            dict: Tipo, título e (categorias, orçado, realizado) de receitas e
+                despesas (None se não houver dados)
+        """
+        # Obter comparação
+        comparacao = self.comparar_orcado_realizado(ano, mes)
+        
+        # Verificar se há dados
+        if not comparacao:
+            return None
+        
+        dados = {'tipo': tipo}
+        for grupo in ('receitas', 'despesas'):
+            if tipo != grupo and tipo != 'ambos':
+                continue
+            categorias = list(comparacao[grupo].keys())
+            orcado = [comparacao[grupo][cat]['orcado'] for cat in categorias]
+            realizado = [comparacao[grupo][cat]['realizado'] for cat in categorias]
+            
+            # Limitar a 10 categorias para melhor visualização
+            if len(categorias) > 10:
+                # Ordenar por valor realizado (decrescente)
+                indices_ordenados = sorted(range(len(realizado)), key=lambda i: realizado[i], reverse=True)
+                categorias = [categorias[i] for i in indices_ordenados[:10]]
+                orcado = [orcado[i] for i in indices_ordenados[:10]]
+                realizado = [realizado[i] for i in indices_ordenados[:10]]
+            
+            dados[grupo] = (categorias, orcado, realizado)
+        
+        if tipo == 'receitas':
+            titulo = "Orçado vs. Realizado - Receitas"
+        elif tipo == 'despesas':
+            titulo = "Orçado vs. Realizado - Despesas"
+        else:
+            titulo = "Orçado vs. Realizado"
+        periodo = f"{mes}/{ano}" if mes else str(ano)
+        dados['titulo'] = f"{titulo} - {periodo}"
+        
+        return dados
+    
+    def desenhar_grafico_orcado_realizado(self, fig, dados):
+        """Desenha o gráfico orçado vs. realizado numa figura do matplotlib"""
+        # Plotar gráficos
+        if dados['tipo'] == 'receitas':
+            self._plotar_grafico_barras(fig.add_subplot(111), *dados['receitas'], "Receitas")
+        elif dados['tipo'] == 'despesas':
+            self._plotar_grafico_barras(fig.add_subplot(111), *dados['despesas'], "Despesas")
+        else:  # ambos
+            ax1 = fig.add_subplot(211)
+            ax2 = fig.add_subplot(212)
+            
+            # Plotar receitas
+            if dados['receitas'][0]:
+                self._plotar_grafico_barras(ax1, *dados['receitas'], "Receitas")
+                ax1.set_title("Receitas")
+            
+            # Plotar despesas
+            if dados['despesas'][0]:
+                self._plotar_grafico_barras(ax2, *dados['despesas'], "Despesas")
+                ax2.set_title("Despesas")
+        
+        # Configurar título
+        fig.suptitle(dados['titulo'], fontsize=16)
+        
+        # Ajustar layout
+        fig.tight_layout()
+    
     def _plotar_grafico_barras(self, ax, categorias, valores_orcados, valores_realizados, titulo):
         """
         Plota um gráfico de barras comparando orçado e realizado
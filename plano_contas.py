@@ -3,6 +3,7 @@ from tkinter import ttk, messagebox, simpledialog
 import pandas as pd
 import json
 import os
+from indice_contas import IndiceContas
 
 class PlanoContasAngolano:
     """Implementa o plano de contas conforme PGCA (Plano Geral de Contabilidade Angolano)"""
@@ -10,6 +11,7 @@ class PlanoContasAngolano:
     def __init__(self, app):
         self.app = app
         self.contas = {}
+        self.indice = IndiceContas()  # Código -> conta, reconstruído sempre que o plano muda
         self.arquivo_contas = "plano_contas_pgca.json"
         self.carregar_plano_contas()
     
@@ -19,13 +21,15 @@ class PlanoContasAngolano:
             try:
                 with open(self.arquivo_contas, 'r', encoding='utf-8') as f:
                     self.contas = json.load(f)
+                self.indice.reconstruir(self.contas)
             except:
                 self.criar_plano_padrao()
         else:
             self.criar_plano_padrao()
     
     def salvar_plano_contas(self):
-        """Salva o plano de contas no arquivo"""
+        """Salva o plano de contas no arquivo e reconstrói o índice de contas"""
+        self.indice.reconstruir(self.contas)
         with open(self.arquivo_contas, 'w', encoding='utf-8') as f:
             json.dump(self.contas, f, ensure_ascii=False, indent=4)
     
@@ -368,18 +372,8 @@ class PlanoContasAngolano:
         self.carregar_contas_na_arvore()
     
     def obter_caminho_conta(self, codigo):
-        """Obtém o caminho completo para uma conta pelo seu código"""
-        # Verificar se é uma conta principal
-        if codigo in self.contas:
-            return [codigo]
-            
-        # Buscar nas subcontas
-        for classe_codigo, classe in self.contas.items():
-            caminho = self.buscar_subconta(classe_codigo, classe['subcontas'], codigo)
-            if caminho:
-                return caminho
-                
-        return None
+        """Obtém o caminho completo para uma conta pelo seu código (consulta ao índice)"""
+        return self.indice.caminho(codigo)
     
     def buscar_subconta(self, parent_codigo, subcontas, codigo_busca):
         """Busca recursivamente uma subconta pelo código"""
@@ -476,6 +470,7 @@ class PlanoContasAngolano:
                 
             # Criar novo plano de contas
             novo_plano = {}
+            caminhos = {}  # Código -> caminho das contas já importadas
             
             # Processar linhas
             for _, row in df.iterrows():
@@ -489,12 +484,13 @@ class PlanoContasAngolano:
                         "nome": nome,
                         "subcontas": {}
                     }
+                    caminhos[codigo] = [codigo]
                 else:
                     # Subconta - encontrar pai
                     partes_codigo = codigo.split('.')
                     if len(partes_codigo) >= 2:
                         codigo_pai = '.'.join(partes_codigo[:-1])
-                        caminho_pai = self.obter_caminho_conta_em_plano(novo_plano, codigo_pai)
+                        caminho_pai = caminhos.get(codigo_pai)
                         
                         if caminho_pai:
                             conta_pai = self.obter_conta_por_caminho_em_plano(novo_plano, caminho_pai)
@@ -502,6 +498,7 @@ class PlanoContasAngolano:
                                 "nome": nome,
                                 "subcontas": {}
                             }
+                            caminhos[codigo] = caminho_pai + [codigo]
             
             # Substituir plano atual
             self.contas = novo_plano
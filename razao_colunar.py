@@ -0,0 +1,226 @@
+import numpy as np
+from datetime import datetime, timedelta
+
+# Dias contados a partir de 1970-01-01
+ORDINAL_EPOCA = datetime(1970, 1, 1).toordinal()
+
+
+def dia_inteiro(data):
+    """Converte uma data (datetime, date ou Timestamp) em dias desde 1970-01-01"""
+    return data.toordinal() - ORDINAL_EPOCA
+
+
+def limites_periodo(desde=None, ate=None):
+    """
+    Limites de um período de dias inteiros, comuns a todas as consultas por
+    data (saldos, índice de datas, SQLite): [início do dia `desde`, início do
+    dia seguinte a `ate`). Um lançamento de 31/12 às 10:00 pertence assim a
+    qualquer período que termine em 31/12, seja qual for a hora de `ate`.
+
+    Returns:
+        tuple: (inicio, fim) como datetime à meia-noite (fim exclusivo; None = sem limite)
+    """
+    inicio = None if desde is None else datetime(desde.year, desde.month, desde.day)
+    fim = None if ate is None else datetime(ate.year, ate.month, ate.day) + timedelta(days=1)
+    return inicio, fim
+
+
+def em_centavos(valor):
+    return int(round(float(valor) * 100))
+
+
+class RazaoColunar:
+    """
+    Tabela colunar dos movimentos contábeis (um registo por movimento), mantida
+    em sincronia com a lista de lançamentos. Os saldos por conta e período são
+    reduções numpy (bincount) em vez de ciclos sobre os dicionários.
+
+    Colunas: posição do lançamento, dia (int32), código da conta (int32, com
+    dicionário de contas), débito e crédito em centavos (int64).
+    """
+
+    CAPACIDADE_INICIAL = 1024
+
+    def __init__(self):
+        self.contas = []          # código numérico -> conta
+        self._codigo_conta = {}   # conta -> código numérico
+        self.ouvintes = []        # Caches derivados, avisados das remoções e reorganizações
+        self._reiniciar()
+
+    def _reiniciar(self):
+        capacidade = self.CAPACIDADE_INICIAL
+        self.indice = np.empty(capacidade, dtype=np.int64)
+        self.dia = np.empty(capacidade, dtype=np.int32)
+        self.conta = np.empty(capacidade, dtype=np.int32)
+        self.debito = np.empty(capacidade, dtype=np.int64)
+        self.credito = np.empty(capacidade, dtype=np.int64)
+        self.ativo = np.empty(capacidade, dtype=bool)
+        self.tamanho = 0
+        self.inativos = 0
+        self.total_lancamentos = 0   # lançamentos da lista já incorporados
+        self._lista = None
+        self._alterados = set()
+        self.versao = 0              # incrementada a cada alteração dos movimentos
+        for ouvinte in self.ouvintes:
+            ouvinte.razao_reorganizada()
+
+    # ------------------------------------------------------------------
+    # Sincronização com a lista de lançamentos
+    # ------------------------------------------------------------------
+    def marcar_alterado(self, indice):
+        """Indica que o lançamento na posição `indice` foi alterado"""
+        self._alterados.add(indice)
+
+    def truncar(self, total_lancamentos):
+        """Descarta os movimentos dos lançamentos a partir da posição `total_lancamentos`"""
+        if total_lancamentos >= self.total_lancamentos:
+            return
+        removidos = self.ativo[:self.tamanho] & (self.indice[:self.tamanho] >= total_lancamentos)
+        self._desativar(np.flatnonzero(removidos))
+        self.total_lancamentos = total_lancamentos
+        self._alterados = {i for i in self._alterados if i < total_lancamentos}
+        self.versao += 1
+
+    def sincronizar(self, lancamentos):
+        """
+        Incorpora os lançamentos novos e alterados desde a última sincronização
+
+        Args:
+            lancamentos: Lista de lançamentos da contabilidade
+        """
+        if lancamentos is not self._lista:
+            # A lista foi substituída (por exemplo, recarregada): reconstruir
+            self._reiniciar()
+            self._lista = lancamentos
+
+        if len(lancamentos) < self.total_lancamentos:
+            self.truncar(len(lancamentos))
+
+        alterados = sorted(i for i in self._alterados if i < self.total_lancamentos)
+        self._alterados.clear()
+        if alterados:
+            afetados = np.isin(self.indice[:self.tamanho], alterados) & self.ativo[:self.tamanho]
+            self._desativar(np.flatnonzero(afetados))
+
+        posicoes = alterados + list(range(self.total_lancamentos, len(lancamentos)))
+        if posicoes:
+            self._acrescentar(lancamentos, posicoes)
+            self.total_lancamentos = len(lancamentos)
+            self.versao += 1
+
+        # Compactar quando mais de metade dos registos estiver inativa
+        if self.inativos and self.inativos * 2 > self.tamanho:
+            self._compactar()
+
+    def _desativar(self, linhas):
+        if not len(linhas):
+            return
+        for ouvinte in self.ouvintes:
+            ouvinte.linhas_desativadas(linhas)
+        self.ativo[linhas] = False
+        self.inativos += len(linhas)
+
+    def _acrescentar(self, lancamentos, posicoes):
+        indices, dias, contas, debitos, creditos = [], [], [], [], []
+        for posicao in posicoes:
+            lanc = lancamentos[posicao]
+            dia = dia_inteiro(lanc['data'])
+            for movimento in lanc['movimentos']:
+                indices.append(posicao)
+                dias.append(dia)
+                contas.append(self._codigo(movimento['conta']))
+                debitos.append(em_centavos(movimento['debito']))
+                creditos.append(em_centavos(movimento['credito']))
+
+        novos = len(indices)
+        if not novos:
+            return
+        self._garantir_capacidade(self.tamanho + novos)
+        fatia = slice(self.tamanho, self.tamanho + novos)
+        self.indice[fatia] = indices
+        self.dia[fatia] = dias
+        self.conta[fatia] = contas
+        self.debito[fatia] = debitos
+        self.credito[fatia] = creditos
+        self.ativo[fatia] = True
+        self.tamanho += novos
+
+    def _codigo(self, conta):
+        conta = str(conta)
+        codigo = self._codigo_conta.get(conta)
+        if codigo is None:
+            codigo = len(self.contas)
+            self._codigo_conta[conta] = codigo
+            self.contas.append(conta)
+        return codigo
+
+    def _garantir_capacidade(self, necessario):
+        capacidade = len(self.indice)
+        if necessario <= capacidade:
+            return
+        while capacidade < necessario:
+            capacidade *= 2
+        for nome in ('indice', 'dia', 'conta', 'debito', 'credito', 'ativo'):
+            antigo = getattr(self, nome)
+            novo = np.empty(capacidade, dtype=antigo.dtype)
+            novo[:self.tamanho] = antigo[:self.tamanho]
+            setattr(self, nome, novo)
+
+    def _compactar(self):
+        manter = self.ativo[:self.tamanho]
+        total = int(manter.sum())
+        for nome in ('indice', 'dia', 'conta', 'debito', 'credito'):
+            coluna = getattr(self, nome)
+            coluna[:total] = coluna[:self.tamanho][manter]
+        self.ativo[:total] = True
+        self.tamanho = total
+        self.inativos = 0
+        for ouvinte in self.ouvintes:
+            ouvinte.razao_reorganizada()
+
+    # ------------------------------------------------------------------
+    # Consultas
+    # ------------------------------------------------------------------
+    def mascara(self, desde=None, ate=None):
+        """Máscara dos movimentos ativos com data no período (dias inteiros, ver limites_periodo)"""
+        inicio, fim = limites_periodo(desde, ate)
+        mascara = self.ativo[:self.tamanho].copy()
+        if inicio is not None:
+            mascara &= self.dia[:self.tamanho] >= dia_inteiro(inicio)
+        if fim is not None:
+            mascara &= self.dia[:self.tamanho] < dia_inteiro(fim)
+        return mascara
+
+    def saldos_centavos(self, desde=None, ate=None):
+        """
+        Saldo em centavos de cada código de conta no período
+
+        Returns:
+            tuple: (saldos indexados pelo código da conta, número de movimentos de cada conta)
+        """
+        mascara = self.mascara(desde, ate)
+        liquido = self.debito[:self.tamanho][mascara] - self.credito[:self.tamanho][mascara]
+        codigos = self.conta[:self.tamanho][mascara]
+        presentes = np.bincount(codigos, minlength=len(self.contas))
+        saldos = np.bincount(codigos, weights=liquido, minlength=len(self.contas))
+        return np.rint(saldos).astype(np.int64), presentes
+
+    def saldos(self, desde=None, ate=None, contas=None):
+        """
+        Saldo (débitos - créditos) de cada conta com movimentos no período
+
+        Args:
+            desde: Data inicial (inclusive), ou None
+            ate: Data final (inclusive), ou None
+            contas: Contas a considerar, ou None para todas
+
+        Returns:
+            dict: {conta: saldo}
+        """
+        saldos, presentes = self.saldos_centavos(desde, ate)
+        filtro = {str(c) for c in contas} if contas else None
+        return {
+            self.contas[codigo]: int(saldos[codigo]) / 100
+            for codigo in np.flatnonzero(presentes)
+            if filtro is None or self.contas[codigo] in filtro
+        }
@@ -13,32 +13,50 @@ import zipfile
 import tempfile
 import shutil
 import glob
+import queue
+import threading
 from banco_processor import ProcessadorBanco
-from relatorios import GeradorRelatorios
+from impressoes_digitais import remover_duplicados
+from armazenamento_arrow import ArmazenamentoArrow
+from validacao_importacao import ValidadorImportacao
+from tipos_compactos import (compactar_extrato, expandir_extrato, chaves_dia_centavos,
+                             total_kz, CHAVE_AUSENTE)
+from relatorios import (GeradorRelatorios, dados_relatorio_diario, dados_relatorio_mensal,
+                        dados_relatorio_divergencias)
+from exportacao_tabular import exportar as exportar_tabela
+from agregacoes import comparar_por_periodo
 from config import CONFIGURACOES
 from dashboard import DashboardAvancado
+from graficos_assincronos import GraficoAssincrono, impressao_dados
 from contabilidade import ContabilidadeAvancada
 from lancamentos_recorrentes import GerenciadorLancamentosRecorrentes
 from gerenciador_temas import GerenciadorTemas
 from configuracoes import Configuracoes
 from integracao_funcionalidades import IntegradorFuncionalidades
+from relatorios_lote import GeradorRelatoriosLote, especificacoes_mensais
 
 class ReconciliacaoApp:
     def __init__(self):
+        # Extrato e livro guardados em formato compacto (ver tipos_compactos)
+        self._dados_compactos = {'banco': None, 'livro': None}
         try:
             self.root = tk.Tk()
             self.root.title("Sistema de Reconciliação Contábil - Angola")
             self.root.geometry("1200x800")
 
-            # Inicializações
-            self.dados_banco = None
-            self.dados_livro = None
+            # Inicializações: recuperar os dados importados na sessão anterior
+            self.armazenamento = ArmazenamentoArrow()
+            self.dados_banco = self.armazenamento.carregar('banco')
+            self.dados_livro = self.armazenamento.carregar('livro')
             self.gerador_relatorios = GeradorRelatorios()
-            self.contabilidade = ContabilidadeAvancada()
+            self.configuracoes = Configuracoes(self)
+            # Os lançamentos são lidos em segundo plano enquanto a janela abre
+            self.contabilidade = ContabilidadeAvancada(
+                backend=self.configuracoes.obter_config("contabilidade", "armazenamento") or 'json',
+                carregar_em_segundo_plano=True)
 
             # Novos módulos
             self.gerenciador_temas = GerenciadorTemas(self)
-            self.configuracoes = Configuracoes(self)
             self.lancamentos_recorrentes = GerenciadorLancamentosRecorrentes(self)
 
             # Aplicar tema inicial
@@ -48,19 +66,53 @@ class ReconciliacaoApp:
 
             self.setup_interface()
             self.integrador = IntegradorFuncionalidades(self)
+
+            if self.dados_banco_compacto is not None or self.dados_livro_compacto is not None:
+                self.atualizar_interface()
         except Exception as e:
             messagebox.showerror("Erro na Inicialização", f"Ocorreu um erro ao iniciar o sistema: {str(e)}")
             import traceback
             traceback.print_exc()
 
+    @property
+    def dados_banco(self):
+        """Extrato bancário com datas e valores decimais, expandido a cada acesso"""
+        return expandir_extrato(self._dados_compactos['banco'])
+
+    @dados_banco.setter
+    def dados_banco(self, df):
+        self._definir_dados('banco', df)
+
+    @property
+    def dados_livro(self):
+        """Livro contábil com datas e valores decimais, expandido a cada acesso"""
+        return expandir_extrato(self._dados_compactos['livro'])
+
+    @dados_livro.setter
+    def dados_livro(self, df):
+        self._definir_dados('livro', df)
+
+    @property
+    def dados_banco_compacto(self):
+        """Extrato bancário no formato compacto (dias, centavos e categorias)"""
+        return self._dados_compactos['banco']
+
+    @property
+    def dados_livro_compacto(self):
+        """Livro contábil no formato compacto (dias, centavos e categorias)"""
+        return self._dados_compactos['livro']
+
+    def _definir_dados(self, nome, df):
+        self._dados_compactos[nome] = compactar_extrato(df)
+
     def classificar_lancamentos_contabeis(self):
         """Abre a interface para classificar lançamentos em contas contábeis"""
-        if self.dados_banco is None and self.dados_livro is None:
+        if self.dados_banco_compacto is None and self.dados_livro_compacto is None:
             messagebox.showwarning("Aviso", "Importe os dados primeiro!")
             return
 
-        self.contabilidade.dados_banco = self.dados_banco
-        self.contabilidade.dados_livro = self.dados_livro
+        self.contabilidade.dados_banco = self.dados_banco_compacto
+        self.contabilidade.dados_livro = self.dados_livro_compacto
         # Abrir o classificador de lançamentos
         self.contabilidade.abrir_classificador_lancamentos(self.root)
 
@@ -94,7 +146,7 @@ class ReconciliacaoApp:
 
     def abrir_dashboard(self):
         if self.validar_dados():
-            DashboardAvancado(self.dados_banco, self.dados_livro)
+            DashboardAvancado(self.dados_banco_compacto, self.dados_livro_compacto)
 
     def criar_area_botoes(self):
         frame_botoes = ttk.Frame(self.frame_principal)
@@ -211,6 +263,10 @@ class ReconciliacaoApp:
         menu_contabilidade.add_command(label="Livro Razão", command=self.gerar_livro_razao)
         menu_contabilidade.add_command(label="RAÇU", command=self.gerar_racu)
         menu_contabilidade.add_command(label="Fluxo de Caixa", command=self.gerar_fluxo_caixa)
+        menu_contabilidade.add_command(label="Fechamento do Período", command=self.gerar_fechamento)
+        menu_contabilidade.add_command(label="Relatórios Mensais em Lote", command=self.gerar_relatorios_lote)
+        menu_contabilidade.add_command(label="Exportar Relatório (CSV/XLSX/Parquet)",
+                                       command=self.exportar_relatorio_tabular)
         menu_contabilidade.add_separator()
         menu_contabilidade.add_command(label="Registrar Bem Amortizável",
                                      command=self.registrar_bem_amortizavel)
@@ -358,7 +414,7 @@ class ReconciliacaoApp:
 
     def preencher_tabela_conciliacao(self, tabela):
         """Preenche a tabela de conciliação com dados comparativos"""
-        if not self.dados_banco is None and not self.dados_livro is None:
+        if self.dados_banco_compacto is not None and self.dados_livro_compacto is not None:
             # Limpar tabela
             tabela.delete(*tabela.get_children())
             
@@ -416,25 +472,27 @@ class ReconciliacaoApp:
             # Contadores
             conciliados = 0
             
-            # Criar dicionário para facilitar a busca
-            dict_banco = {}
-            for _, row in self.dados_banco.iterrows():
-                chave = (row['data'], row['valor'])
-                dict_banco[chave] = row
-            
+            # Chaves inteiras (dia, centavos) do formato compacto
+            dias_banco, centavos_banco = chaves_dia_centavos(self.dados_banco_compacto)
+            chaves_banco = set(zip(dias_banco.tolist(), centavos_banco.tolist()))
+
+            # Itens da tabela indexados por (data, valor) formatados
+            itens_tabela = {}
+            for item in self.tabela.get_children():
+                valores = self.tabela.item(item)['values']
+                itens_tabela.setdefault((valores[0], valores[2]), []).append(item)
+
             # Comparar com livro contábil
-            for _, row_livro in self.dados_livro.iterrows():
-                chave = (row_livro['data'], row_livro['valor'])
-                if chave in dict_banco:
+            dias_livro, centavos_livro = chaves_dia_centavos(self.dados_livro_compacto)
+            for (_, row_livro), chave in zip(self.dados_livro.iterrows(),
+                                             zip(dias_livro.tolist(), centavos_livro.tolist())):
+                if CHAVE_AUSENTE not in chave and chave in chaves_banco:
                     # Marcar como conciliado na tabela
-                    for item in self.tabela.get_children():
-                        valores = self.tabela.item(item)['values']
-                        data_str = row_livro['data'].strftime('%d/%m/%Y')
-                        valor_str = f"Kz {row_livro['valor']:,.2f}"
-                        
-                        if valores[0] == data_str and valores[2] == valor_str:
-                            self.tabela.set(item, 'status', 'CONCILIADO')
-                            conciliados += 1
+                    data_str = row_livro['data'].strftime('%d/%m/%Y')
+                    valor_str = f"Kz {row_livro['valor']:,.2f}"
+                    for item in itens_tabela.get((data_str, valor_str), []):
+                        self.tabela.set(item, 'status', 'CONCILIADO')
+                        conciliados += 1
             
             messagebox.showinfo("Conciliação Automática", 
                               f"{conciliados} lançamentos foram conciliados automaticamente.")
@@ -529,7 +587,7 @@ class ReconciliacaoApp:
 
     def preencher_tabela_banco(self, tabela):
         """Preenche a tabela de lançamentos bancários"""
-        if self.dados_banco is not None:
+        if self.dados_banco_compacto is not None:
             tabela.delete(*tabela.get_children())
             for _, row in self.dados_banco.iterrows():
                 tabela.insert('', 'end', values=(
@@ -541,7 +599,7 @@ class ReconciliacaoApp:
 
     def preencher_tabela_livro(self, tabela):
         """Preenche a tabela de lançamentos contábeis"""
-        if self.dados_livro is not None:
+        if self.dados_livro_compacto is not None:
             tabela.delete(*tabela.get_children())
             for _, row in self.dados_livro.iterrows():
                 tabela.insert('', 'end', values=(
@@ -809,7 +867,7 @@ class ReconciliacaoApp:
 
     def preencher_tabela_auditoria(self, tabela):
         """Preenche a tabela de auditoria com dados"""
-        if self.dados_banco is not None and self.dados_livro is not None:
+        if self.dados_banco_compacto is not None and self.dados_livro_compacto is not None:
             tabela.delete(*tabela.get_children())
             
             # Adicionar lançamentos do banco
@@ -1539,7 +1597,7 @@ class ReconciliacaoApp:
         # Gerar livro razão
         caminho = f"livro_razao_{data_inicio.strftime('%Y%m%d')}_{data_fim.strftime('%Y%m%d')}.pdf"
         try:
-            if self.contabilidade.gerar_livro_razao(data_inicio, data_fim, caminho):
+            if self.contabilidade.gerar_relatorio('livro_razao', caminho, data_inicio, data_fim):
                 messagebox.showinfo("Sucesso", f"Livro Razão gerado: {caminho}")
                 self.abrir_arquivo(caminho)
             else:
@@ -1581,7 +1639,7 @@ class ReconciliacaoApp:
         # Gerar RAÇU
         caminho = f"racu_{ano}.pdf"
         try:
-            if self.contabilidade.gerar_racu(ano, caminho):
+            if self.contabilidade.gerar_relatorio('racu', caminho, data_fim=datetime(ano, 12, 31)):
                 messagebox.showinfo("Sucesso", f"RAÇU gerado: {caminho}")
                 self.abrir_arquivo(caminho)
             else:
@@ -1612,7 +1670,7 @@ class ReconciliacaoApp:
         # Gerar fluxo de caixa
         caminho = f"fluxo_caixa_{data_inicio.strftime('%Y%m%d')}_{data_fim.strftime('%Y%m%d')}.pdf"
         try:
-            if self.contabilidade.gerar_fluxo_caixa(data_inicio, data_fim, caminho):
+            if self.contabilidade.gerar_relatorio('fluxo_caixa', caminho, data_inicio, data_fim):
                 messagebox.showinfo("Sucesso", f"Fluxo de Caixa gerado: {caminho}")
                 self.abrir_arquivo(caminho)
             else:
@@ -1620,6 +1678,195 @@ class ReconciliacaoApp:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar Fluxo de Caixa: {str(e)}")
 
+    def gerar_fechamento(self):
+        if not self.validar_dados():
+            return
+
+        # Solicitar período
+        data_inicio_str = simpledialog.askstring("Data Inicial", "Informe a data inicial (DD/MM/AAAA):")
+        if not data_inicio_str:
+            return
+            
+        data_fim_str = simpledialog.askstring("Data Final", "Informe a data final (DD/MM/AAAA):")
+        if not data_fim_str:
+            return
+
+        try:
+            data_inicio = datetime.strptime(data_inicio_str, "%d/%m/%Y")
+            data_fim = datetime.strptime(data_fim_str, "%d/%m/%Y")
+        except:
+            messagebox.showerror("Erro", "Data inválida!")
+            return
+
+        # Gerar as demonstrações do fecho a partir do mesmo balancete
+        try:
+            caminhos = self.contabilidade.fechamento.gerar_demonstracoes(data_inicio, data_fim)
+            gerados = [caminho for caminho in caminhos.values() if caminho]
+            if len(gerados) == len(caminhos):
+                messagebox.showinfo("Sucesso", "Demonstrações geradas:\n" + "\n".join(gerados))
+            else:
+                messagebox.showwarning("Aviso", "Algumas demonstrações não foram geradas:\n" +
+                                       "\n".join(nome for nome, caminho in caminhos.items() if not caminho))
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao gerar o fechamento: {str(e)}")
+
+    def exportar_relatorio_tabular(self):
+        if not self.validar_dados():
+            return
+
+        tipos = "balanco, dre, livro_razao, fluxo_caixa, racu, diario, mensal, divergencias"
+        tipo = simpledialog.askstring("Relatório", f"Informe o tipo de relatório ({tipos}):")
+        if not tipo:
+            return
+        tipo = tipo.strip().lower()
+        if tipo not in [t.strip() for t in tipos.split(',')]:
+            messagebox.showerror("Erro", "Tipo de relatório inválido!")
+            return
+
+        data_inicio_str = simpledialog.askstring("Data Inicial", "Informe a data inicial (DD/MM/AAAA):")
+        if not data_inicio_str:
+            return
+            
+        data_fim_str = simpledialog.askstring("Data Final", "Informe a data final (DD/MM/AAAA):")
+        if not data_fim_str:
+            return
+
+        try:
+            data_inicio = datetime.strptime(data_inicio_str, "%d/%m/%Y")
+            data_fim = datetime.strptime(data_fim_str, "%d/%m/%Y")
+        except:
+            messagebox.showerror("Erro", "Data inválida!")
+            return
+
+        arquivo = filedialog.asksaveasfilename(
+            defaultextension=".xlsx",
+            initialfile=f"{tipo}_{data_inicio.strftime('%Y%m%d')}_{data_fim.strftime('%Y%m%d')}",
+            filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv"), ("Parquet files", "*.parquet")]
+        )
+        if not arquivo:
+            return
+
+        try:
+            # Relatórios de conciliação: data final como dia/mês de referência
+            banco, livro = self.dados_banco_compacto, self.dados_livro_compacto
+            if tipo == 'diario':
+                exportado = self.exportar_tabela_conciliacao(
+                    lambda: dados_relatorio_diario(banco, livro, data_fim), arquivo)
+            elif tipo == 'mensal':
+                exportado = self.exportar_tabela_conciliacao(
+                    lambda: dados_relatorio_mensal(comparar_por_periodo(banco, livro, 'M'), data_fim), arquivo)
+            elif tipo == 'divergencias':
+                exportado = self.exportar_tabela_conciliacao(
+                    lambda: dados_relatorio_divergencias(self.calcular_divergencias()), arquivo)
+            else:
+                exportado = self.contabilidade.exportar_relatorio(tipo, arquivo, data_inicio, data_fim)
+            if exportado:
+                messagebox.showinfo("Sucesso", f"Relatório exportado: {arquivo}")
+            else:
+                messagebox.showwarning("Aviso", "Não foi possível exportar o relatório.")
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao exportar relatório: {str(e)}")
+
+    def exportar_tabela_conciliacao(self, dados, arquivo):
+        """
+        Exporta o passo de dados de um relatório de conciliação
+
+        Args:
+            dados: Função que devolve a TabelaRelatorio
+            arquivo: Arquivo de saída (formato pela extensão)
+        Returns:
+            bool: True se exportado com sucesso, False caso contrário
+        """
+        try:
+            exportar_tabela(dados(), arquivo)
+            return True
+        except Exception as e:
+            print(f"Erro ao exportar relatório: {str(e)}")
+            return False
+
+    def gerar_relatorios_lote(self):
+        if not self.validar_dados():
+            return
+
+        ano_str = simpledialog.askstring("Ano", "Informe o ano do fecho mensal:")
+        if not ano_str:
+            return
+            
+        try:
+            ano = int(ano_str)
+            if ano < 2000 or ano > 2100:
+                raise ValueError("Ano inválido")
+        except:
+            messagebox.showerror("Erro", "Ano inválido!")
+            return
+
+        especificacoes = especificacoes_mensais(ano)
+        for especificacao in especificacoes:
+            especificacao['armazenamento'] = self.contabilidade.backend
+        gerador = GeradorRelatoriosLote()
+
+        # Conversões e amortizações em falta gravadas aqui, na thread do Tk: a
+        # thread do lote não altera a contabilidade da janela
+        self.contabilidade.dados_banco = self.dados_banco_compacto
+        self.contabilidade.dados_livro = self.dados_livro_compacto
+        try:
+            gerador.preparar_entidades(especificacoes, contabilidades={'.': self.contabilidade})
+        except Exception as e:
+            messagebox.showerror("Erro", f"Erro ao preparar os dados do lote: {str(e)}")
+            return
+
+        # Janela de progresso (modal enquanto o lote decorre)
+        janela = tk.Toplevel(self.root)
+        janela.title("Relatórios em Lote")
+        janela.geometry("420x120")
+        janela.transient(self.root)
+        janela.grab_set()
+        rotulo = ttk.Label(janela, text=f"A gerar {len(especificacoes)} relatórios...")
+        rotulo.pack(pady=10)
+        barra = ttk.Progressbar(janela, orient="horizontal", length=380, mode="determinate",
+                                maximum=len(especificacoes))
+        barra.pack(pady=10)
+
+        # O lote corre numa thread; o progresso chega à interface por uma fila
+        mensagens = queue.Queue()
+
+        def executar():
+            try:
+                itens = gerador.executar(
+                    especificacoes,
+                    progresso=lambda concluidos, total, item: mensagens.put(('progresso', concluidos, item)),
+                    preparar=False)
+                mensagens.put(('fim', itens, None))
+            except Exception as e:
+                mensagens.put(('erro', str(e), None))
+
+        def acompanhar():
+            try:
+                while True:
+                    tipo, valor, item = mensagens.get_nowait()
+                    if tipo == 'progresso':
+                        barra['value'] = valor
+                        rotulo.config(text=f"{valor}/{len(especificacoes)}: {os.path.basename(item['arquivo'])}")
+                    else:
+                        janela.destroy()
+                        if tipo == 'erro':
+                            messagebox.showerror("Erro", f"Erro ao gerar relatórios em lote: {valor}")
+                        else:
+                            falhados = [item for item in valor if not item['sucesso']]
+                            mensagem = (f"{len(valor) - len(falhados)} relatórios gerados em "
+                                        f"{gerador.diretorio_saida}\nManifesto: {gerador.arquivo_manifesto}")
+                            if falhados:
+                                messagebox.showwarning("Aviso", mensagem + f"\n{len(falhados)} relatórios falharam.")
+                            else:
+                                messagebox.showinfo("Sucesso", mensagem)
+                        return
+            except queue.Empty:
+                pass
+            self.root.after(200, acompanhar)
+
+        threading.Thread(target=executar, daemon=True).start()
+        self.root.after(200, acompanhar)
+
     def importar_banco(self):
         arquivo = filedialog.askopenfilename(
             filetypes=[("Excel files", "*.xlsx"), ("CSV files", "*.csv")]
@@ -1644,9 +1891,28 @@ class ReconciliacaoApp:
         def processar():
             banco = banco_var.get()
             try:
-                self.dados_banco = ProcessadorBanco.processar_extrato(arquivo, banco)
+                validador = ValidadorImportacao(ValidadorImportacao.arquivo_quarentena_para(arquivo))
+                novos_dados = ProcessadorBanco.processar_extrato(arquivo, banco, validador=validador)
+                existentes = None
+                if self.dados_banco_compacto is not None and messagebox.askyesno(
+                        "Importar Extrato",
+                        "Já existem dados bancários importados. Deseja acrescentar este extrato aos existentes?"):
+                    existentes = self.dados_banco
+
+                # Extratos com períodos sobrepostos repetem as mesmas linhas
+                juntos, duplicados, quase_duplicados = remover_duplicados(novos_dados, existentes)
+                self.dados_banco = juntos.reset_index(drop=True)
+                self.guardar_dados_importados('banco')
                 self.atualizar_interface()
-                messagebox.showinfo("Sucesso", "Dados bancários importados com sucesso!")
+
+                mensagem = "Dados bancários importados com sucesso!"
+                if duplicados:
+                    mensagem += f"\n\n{duplicados} linha(s) duplicada(s) foram ignoradas."
+                if len(quase_duplicados):
+                    mensagem += (f"\n{len(quase_duplicados)} linha(s) com a mesma data e valor "
+                                 "mas descrição diferente devem ser verificadas.")
+                messagebox.showinfo("Sucesso", mensagem)
+                self.mostrar_resumo_validacao(validador)
                 janela.destroy()
             except Exception as e:
                 messagebox.showerror("Erro", str(e))
@@ -1659,38 +1925,45 @@ class ReconciliacaoApp:
         )
         if arquivo:
             try:
-                self.dados_livro = pd.read_excel(arquivo) if arquivo.endswith('.xlsx') \
-                    else pd.read_csv(arquivo)
+                validador = ValidadorImportacao(ValidadorImportacao.arquivo_quarentena_para(arquivo))
+                self.dados_livro = ProcessadorBanco.processar_livro(arquivo, validador=validador)
+                self.guardar_dados_importados('livro')
                 self.atualizar_interface()
                 messagebox.showinfo("Sucesso", "Livro contábil importado com sucesso!")
+                self.mostrar_resumo_validacao(validador)
             except Exception as e:
                 messagebox.showerror("Erro", f"Erro ao importar arquivo: {str(e)}")
 
+    def mostrar_resumo_validacao(self, validador):
+        """Mostra o resumo de qualidade dos dados quando houve linhas em quarentena"""
+        if validador.total_quarentena:
+            messagebox.showwarning("Qualidade dos Dados", validador.texto_resumo())
+
     def atualizar_interface(self):
         self.atualizar_estatisticas()
         self.atualizar_tabela()
-        # Atualiza a contabilidade com os dados mais recentes
-        if self.dados_banco is not None and self.dados_livro is not None:
-            self.contabilidade.dados_banco = self.dados_banco
-            self.contabilidade.dados_livro = self.dados_livro
+        # Atualiza a contabilidade com os dados mais recentes (formato compacto)
+        if self.dados_banco_compacto is not None and self.dados_livro_compacto is not None:
+            self.contabilidade.dados_banco = self.dados_banco_compacto
+            self.contabilidade.dados_livro = self.dados_livro_compacto
 
     def atualizar_estatisticas(self):
-        if self.dados_banco is not None:
-            total_banco = self.dados_banco['valor'].sum()
+        if self.dados_banco_compacto is not None:
+            total_banco = total_kz(self.dados_banco_compacto)
             self.label_total_banco.config(
                 text=f"Total Banco: Kz {total_banco:,.2f}")
-        if self.dados_livro is not None:
-            total_livro = self.dados_livro['valor'].sum()
+        if self.dados_livro_compacto is not None:
+            total_livro = total_kz(self.dados_livro_compacto)
             self.label_total_livro.config(
                 text=f"Total Livro: Kz {total_livro:,.2f}")
-        if self.dados_banco is not None and self.dados_livro is not None:
+        if self.dados_banco_compacto is not None and self.dados_livro_compacto is not None:
             diferenca = total_banco - total_livro
             self.label_diferenca.config(
                 text=f"Diferença: Kz {diferenca:,.2f}")
 
     def atualizar_tabela(self):
         self.tabela.delete(*self.tabela.get_children())
-        if self.dados_banco is not None:
+        if self.dados_banco_compacto is not None:
             for _, row in self.dados_banco.iterrows():
                 self.tabela.insert('', 'end', values=(
                     row['data'].strftime('%d/%m/%Y'),
@@ -1700,7 +1973,7 @@ class ReconciliacaoApp:
                     'PENDENTE'
                 ))
 
-        if self.dados_livro is not None:
+        if self.dados_livro_compacto is not None:
             for _, row in self.dados_livro.iterrows():
                 self.tabela.insert('', 'end', values=(
                     row['data'].strftime('%d/%m/%Y'),
@@ -1714,12 +1987,11 @@ class ReconciliacaoApp:
         if not self.validar_dados():
             return
 
-        for _, row_banco in self.dados_banco.iterrows():
-            match = self.dados_livro[
-                (self.dados_livro['valor'] == row_banco['valor']) &
-                (self.dados_livro['data'] == row_banco['data'])
-            ]
-            if not match.empty:
+        chaves_livro = self._chaves_emparelhaveis(self.dados_livro_compacto)
+        dias_banco, centavos_banco = chaves_dia_centavos(self.dados_banco_compacto)
+        for (_, row_banco), chave in zip(self.dados_banco.iterrows(),
+                                         zip(dias_banco.tolist(), centavos_banco.tolist())):
+            if chave in chaves_livro:
                 # Atualizar status na tabela
                 for item in self.tabela.get_children():
                     valores = self.tabela.item(item)['values']
@@ -1735,26 +2007,29 @@ class ReconciliacaoApp:
         janela.title("Análise Gráfica")
         janela.geometry("1000x600")
 
-        fig = plt.Figure(figsize=(12, 6))
+        # Dados preparados e gráfico rasterizado na thread de desenho
+        dados_banco, dados_livro = self.dados_banco_compacto, self.dados_livro_compacto
+        GraficoAssincrono(
+            janela, 'analise_grafica', self.desenhar_graficos,
+            lambda: comparar_por_periodo(dados_banco, dados_livro, 'D'),
+            lambda: impressao_dados(dados_banco[['data', 'valor']], dados_livro[['data', 'valor']])
+        ).pack(fill=tk.BOTH, expand=True)
+
+    @staticmethod
+    def desenhar_graficos(fig, comparativo):
         # Gráfico de barras
         ax1 = fig.add_subplot(121)
-        totais = [self.dados_banco['valor'].sum(), self.dados_livro['valor'].sum()]
+        totais = [comparativo['banco'].sum(), comparativo['livro'].sum()]
         ax1.bar(['Banco', 'Livro'], totais)
         ax1.set_title('Comparativo de Totais')
 
-        # Gráfico de evolução temporal
+        # Gráfico de evolução temporal (totais diários acumulados)
         ax2 = fig.add_subplot(122)
-        ax2.plot(self.dados_banco['data'], self.dados_banco['valor'].cumsum(),
-                label='Banco')
-        ax2.plot(self.dados_livro['data'], self.dados_livro['valor'].cumsum(),
-                label='Livro')
+        ax2.plot(comparativo.index, comparativo['banco'].cumsum(), label='Banco')
+        ax2.plot(comparativo.index, comparativo['livro'].cumsum(), label='Livro')
         ax2.set_title('Evolução Temporal')
         ax2.legend()
-        plt.xticks(rotation=45)
-
-        canvas = FigureCanvasTkAgg(fig, master=janela)
-        canvas.draw()
-        canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True)
+        ax2.tick_params(axis='x', labelrotation=45)
 
     def gerar_relatorio_diario(self):
         if not self.validar_dados():
@@ -1774,8 +2049,8 @@ class ReconciliacaoApp:
         caminho = f"relatorio_diario_{data_ref.strftime('%Y%m%d')}.pdf"
         try:
             self.gerador_relatorios.gerar_relatorio_diario(
-                self.dados_banco,
-                self.dados_livro,
+                self.dados_banco_compacto,
+                self.dados_livro_compacto,
                 caminho,
                 data_ref
             )
@@ -1799,12 +2074,7 @@ class ReconciliacaoApp:
             messagebox.showerror("Erro", "Formato inválido! Use MM/AAAA")
             return
 
-        dados_mensais = {
-            'banco': self.dados_banco.groupby(
-                self.dados_banco['data'].dt.strftime('%Y-%m'))['valor'].sum(),
-            'livro': self.dados_livro.groupby(
-                self.dados_livro['data'].dt.strftime('%Y-%m'))['valor'].sum()
-        }
+        dados_mensais = comparar_por_periodo(self.dados_banco_compacto, self.dados_livro_compacto, 'M')
 
         caminho = f"relatorio_mensal_{mes_ano.strftime('%Y%m')}.pdf"
         try:
@@ -1818,19 +2088,7 @@ class ReconciliacaoApp:
         if not self.validar_dados():
             return
 
-        divergencias = []
-        for _, row_banco in self.dados_banco.iterrows():
-            match = self.dados_livro[
-                (self.dados_livro['valor'] == row_banco['valor']) &
-                (self.dados_livro['data'] == row_banco['data'])
-            ]
-            if match.empty:
-                divergencias.append({
-                    'data': row_banco['data'],
-                    'descricao': row_banco['descricao'],
-                    'valor': row_banco['valor'],
-                    'origem': 'BANCO'
-                })
+        divergencias = self.calcular_divergencias()
 
         caminho = f"relatorio_divergencias_{datetime.now().strftime('%Y%m%d')}.pdf"
         try:
@@ -1840,8 +2098,44 @@ class ReconciliacaoApp:
         except Exception as e:
             messagebox.showerror("Erro", f"Erro ao gerar relatório: {str(e)}")
 
+    @staticmethod
+    def _chaves_emparelhaveis(df):
+        """Conjunto das chaves (dia, centavos) das linhas com data e valor"""
+        dias, centavos = chaves_dia_centavos(df)
+        return {chave for chave in zip(dias.tolist(), centavos.tolist()) if CHAVE_AUSENTE not in chave}
+
+    def calcular_divergencias(self):
+        """Movimentos do banco sem lançamento no livro com a mesma data e valor"""
+        divergencias = []
+        chaves_livro = self._chaves_emparelhaveis(self.dados_livro_compacto)
+        dias_banco, centavos_banco = chaves_dia_centavos(self.dados_banco_compacto)
+        for (_, row_banco), chave in zip(self.dados_banco.iterrows(),
+                                         zip(dias_banco.tolist(), centavos_banco.tolist())):
+            if chave not in chaves_livro:
+                divergencias.append({
+                    'data': row_banco['data'],
+                    'descricao': row_banco['descricao'],
+                    'valor': row_banco['valor'],
+                    'origem': 'BANCO'
+                })
+        return divergencias
+
+    def guardar_dados_importados(self, nome):
+        """
+        Grava o extrato ('banco') ou o livro ('livro') para a próxima sessão,
+        avisando se a gravação falhar
+
+        Returns:
+            bool: True se os dados foram gravados
+        """
+        if self.armazenamento.salvar(nome, self._dados_compactos[nome]):
+            return True
+        messagebox.showwarning("Aviso", "Não foi possível guardar os dados importados em disco. "
+                                        "Eles não serão recuperados na próxima sessão.")
+        return False
+
     def validar_dados(self):
-        if self.dados_banco is None or self.dados_livro is None:
+        if self.dados_banco_compacto is None or self.dados_livro_compacto is None:
             messagebox.showwarning("Aviso", "Importe todos os dados primeiro!")
             return False
         return True
@@ -1849,6 +2143,8 @@ class ReconciliacaoApp:
     def limpar_dados(self):
         self.dados_banco = None
         self.dados_livro = None
+        self.guardar_dados_importados('banco')
+        self.guardar_dados_importados('livro')
         self.tabela.delete(*self.tabela.get_children())
         self.atualizar_estatisticas()
         messagebox.showinfo("Sucesso", "Dados limpos com sucesso!")
@@ -1858,8 +2154,8 @@ class ReconciliacaoApp:
             return
 
         # Atualiza os dados da contabilidade
-        self.contabilidade.dados_banco = self.dados_banco
-        self.contabilidade.dados_livro = self.dados_livro
+        self.contabilidade.dados_banco = self.dados_banco_compacto
+        self.contabilidade.dados_livro = self.dados_livro_compacto
 
         # Solicita a data de referência
         data_str = simpledialog.askstring("Data", "Informe a data de referência (DD/MM/AAAA):")
@@ -1888,7 +2184,7 @@ class ReconciliacaoApp:
         # Gera o balanço
         caminho = f"balanco_patrimonial_{data_ref.strftime('%Y%m%d')}.pdf"
         try:
-            if self.contabilidade.gerar_balanco_patrimonial(data_ref, caminho):
+            if self.contabilidade.gerar_relatorio('balanco', caminho, data_fim=data_ref):
                 messagebox.showinfo("Sucesso", f"Balanço gerado: {caminho}")
                 self.abrir_arquivo(caminho)
             else:
@@ -1901,8 +2197,8 @@ class ReconciliacaoApp:
             return
 
         # Atualiza os dados da contabilidade
-        self.contabilidade.dados_banco = self.dados_banco
-        self.contabilidade.dados_livro = self.dados_livro
+        self.contabilidade.dados_banco = self.dados_banco_compacto
+        self.contabilidade.dados_livro = self.dados_livro_compacto
 
         # Solicita o período
         data_inicio_str = simpledialog.askstring("Data Inicial", "Informe a data inicial (DD/MM/AAAA):")
@@ -1937,7 +2233,7 @@ class ReconciliacaoApp:
         # Gera a DRE
         caminho = f"dre_{data_inicio.strftime('%Y%m%d')}_{data_fim.strftime('%Y%m%d')}.pdf"
         try:
-            if self.contabilidade.gerar_dre(data_inicio, data_fim, caminho):
+            if self.contabilidade.gerar_relatorio('dre', caminho, data_inicio, data_fim):
                 messagebox.showinfo("Sucesso", f"DRE gerada: {caminho}")
                 self.abrir_arquivo(caminho)
             else:
@@ -2034,14 +2330,15 @@ class ReconciliacaoApp:
                 lancamentos['status'] = 'PENDENTE'
 
             # Atualizar os dados do livro
-            if self.dados_livro is None:
+            if self.dados_livro_compacto is None:
                 self.dados_livro = lancamentos
                 messagebox.showinfo("Sucesso", f"{len(lancamentos)} lançamentos importados com sucesso!")
             else:
                 # Verificar se há lançamentos duplicados
                 chaves_existentes = set()
-                if not self.dados_livro.empty:
-                    for _, row in self.dados_livro.iterrows():
+                dados_livro = self.dados_livro
+                if not dados_livro.empty:
+                    for _, row in dados_livro.iterrows():
                         chaves_existentes.add((row['data'], row['descricao'], row['valor']))
                     
                 lancamentos_novos = lancamentos[~lancamentos.apply(
@@ -2053,16 +2350,18 @@ class ReconciliacaoApp:
                     messagebox.showinfo("Informação", "Todos os lançamentos já existem no sistema.")
                     return
 
-                self.dados_livro = pd.concat([self.dados_livro, lancamentos_novos], ignore_index=True)
+                self.dados_livro = pd.concat([dados_livro, lancamentos_novos], ignore_index=True)
                 # Informar quantos lançamentos foram importados
                 messagebox.showinfo("Sucesso", f"{len(lancamentos_novos)} novos lançamentos importados com sucesso!")
 
+            self.guardar_dados_importados('livro')
+
             # Atualizar a interface
             self.atualizar_interface()
 
             # Atualizar a contabilidade com os novos dados
             if hasattr(self, 'contabilidade'):
-                self.contabilidade.dados_livro = self.dados_livro
+                self.contabilidade.dados_livro = self.dados_livro_compacto
 
         except Exception as e:
             messagebox.showerror("Erro", f"Falha ao importar lançamentos: {str(e)}")
@@ -2250,6 +2549,8 @@ class ReconciliacaoApp:
     def executar(self):
         """Inicia a execução do aplicativo"""
         self.root.mainloop()
+        if self.contabilidade.cache_relatorios is not None:
+            self.contabilidade.cache_relatorios.fechar()
 
 if __name__ == "__main__":
     try:
@@ -1,15 +1,88 @@
 from reportlab.lib import colors
 from reportlab.lib.pagesizes import letter, landscape, A4
-from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph, Spacer, Image
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Table, Paragraph, Spacer, Image
+from reportlab.lib.styles import ParagraphStyle
 from reportlab.lib.units import inch, cm
 from datetime import datetime
 import pandas as pd
 import os
+from agregacoes import comparar_por_periodo, juntar_totais
+from exportacao_tabular import TabelaRelatorio
+from tema_relatorios import estilo_destaque, estilos as estilos_relatorio
+
+
+def dados_relatorio_diario(dados_banco, dados_livro, data_ref=None):
+    """
+    Passo de dados do relatório diário: totais por dia do banco e do livro
+
+    Args:
+        dados_banco: Extrato bancário
+        dados_livro: Livro contábil
+        data_ref: Dia do relatório (opcional; por omissão todos os dias)
+    Returns:
+        TabelaRelatorio: Data, totais, diferença e estado de cada dia
+    """
+    comparativo = comparar_por_periodo(dados_banco, dados_livro, 'D')
+    if data_ref is not None:
+        comparativo = comparativo[comparativo.index == pd.Timestamp(data_ref).normalize()]
+    
+    linhas = [(data.to_pydatetime(), float(linha.banco), float(linha.livro), float(linha.diferenca),
+               "OK" if linha.conciliado else "Divergência")
+              for data, linha in zip(comparativo.index, comparativo.itertuples(index=False))]
+    return TabelaRelatorio(['Data', 'Total Banco', 'Total Livro', 'Diferença', 'Status'], linhas,
+                           {'Data': 'data', 'Total Banco': 'valor', 'Total Livro': 'valor', 'Diferença': 'valor'})
+
+
+def dados_relatorio_mensal(dados_mensais, mes_ref=None):
+    """
+    Passo de dados do relatório mensal: totais por mês e linha de total
+
+    Args:
+        dados_mensais: Comparativo mensal (ver agregacoes.comparar_por_periodo)
+            ou {'banco': totais por mês, 'livro': totais por mês}
+        mes_ref: Mês de referência (opcional): o relatório vai de janeiro
+            desse ano até ele
+    Returns:
+        TabelaRelatorio: Mês (AAAA-MM), totais, diferença e estado; a última
+            linha é o TOTAL
+    """
+    if isinstance(dados_mensais, dict):
+        comparativo = juntar_totais(dados_mensais['banco'], dados_mensais['livro'])
+    else:
+        comparativo = dados_mensais
+    meses = [mes.strftime('%Y-%m') if hasattr(mes, 'strftime') else str(mes) for mes in comparativo.index]
+    if mes_ref is not None:
+        selecionados = [f"{mes_ref.year}-01" <= mes <= mes_ref.strftime('%Y-%m') for mes in meses]
+        comparativo = comparativo[selecionados]
+        meses = [mes for mes, selecionado in zip(meses, selecionados) if selecionado]
+    
+    linhas = [(mes, float(linha.banco), float(linha.livro), float(linha.diferenca),
+               "OK" if linha.conciliado else "Divergência")
+              for mes, linha in zip(meses, comparativo.itertuples(index=False))]
+    total_banco = float(comparativo['banco'].sum())
+    total_livro = float(comparativo['livro'].sum())
+    linhas.append(('TOTAL', total_banco, total_livro, total_banco - total_livro, ''))
+    return TabelaRelatorio(['Mês', 'Total Banco', 'Total Livro', 'Diferença', 'Status'], linhas,
+                           {'Total Banco': 'valor', 'Total Livro': 'valor', 'Diferença': 'valor'})
+
+
+def dados_relatorio_divergencias(divergencias):
+    """
+    Passo de dados do relatório de divergências
+
+    Args:
+        divergencias: Lista de {'data', 'descricao', 'valor', 'origem'}
+    Returns:
+        TabelaRelatorio: Uma linha por divergência
+    """
+    linhas = [(div['data'], div['descricao'], float(div['valor']), div['origem']) for div in divergencias]
+    return TabelaRelatorio(['Data', 'Descrição', 'Valor', 'Origem'], linhas,
+                           {'Data': 'data', 'Valor': 'valor'})
+
 
 class GeradorRelatorios:
     def __init__(self):
-        self.styles = getSampleStyleSheet()
+        self.styles = estilos_relatorio()
         self.configurar_estilos()
         
     def configurar_estilos(self):
@@ -48,22 +121,35 @@ class GeradorRelatorios:
 
     def estilo_tabela_padrao(self):
         """Retorna o estilo padrão para tabelas"""
-        return TableStyle([
-            ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E5090')),
-            ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
-            ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-            ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-            ('FONTSIZE', (0, 0), (-1, 0), 12),
-            ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
-            ('GRID', (0, 0), (-1, -1), 1, colors.black),
-            ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey]),
-            ('FONTSIZE', (0, 1), (-1, -1), 10),
-            ('TOPPADDING', (0, 1), (-1, -1), 8),
-            ('BOTTOMPADDING', (0, 1), (-1, -1), 8)
-        ])
-
-    def gerar_relatorio_diario(self, dados_banco, dados_livro, caminho_saida):
-        """Gera relatório detalhado das movimentações diárias"""
+        return estilo_destaque()
+
+    def tabela_pdf(self, dados):
+        """
+        Passo de apresentação comum: converte uma TabelaRelatorio numa tabela
+        do PDF (datas em DD/MM/AAAA e valores em Kz)
+        """
+        def formatar(valor, tipo):
+            if tipo == 'data':
+                return valor.strftime('%d/%m/%Y')
+            if tipo == 'valor':
+                return f"Kz {valor:,.2f}"
+            return valor
+        
+        linhas = [[formatar(valor, tipo) for valor, tipo in zip(linha, dados.tipos)] for linha in dados.linhas]
+        tabela = Table([dados.colunas] + linhas)
+        tabela.setStyle(self.estilo_tabela_padrao())
+        return tabela
+
+    def gerar_relatorio_diario(self, dados_banco, dados_livro, caminho_saida, data_ref=None):
+        """
+        Gera relatório detalhado das movimentações diárias
+
+        Args:
+            dados_banco: Extrato bancário
+            dados_livro: Livro contábil
+            caminho_saida: Caminho do arquivo PDF de saída
+            data_ref: Dia do relatório (opcional; por omissão todos os dias)
+        """
         doc = SimpleDocTemplate(
             caminho_saida,
             pagesize=landscape(A4),
@@ -75,30 +161,22 @@ class GeradorRelatorios:
         
         elementos = self.criar_cabecalho("Relatório Diário de Reconciliação Contábil")
         
-        # Resumo diário
-        dados_diarios = []
-        for data in sorted(set(dados_banco['data'].dt.date)):
-            banco_dia = dados_banco[dados_banco['data'].dt.date == data]['valor'].sum()
-            livro_dia = dados_livro[dados_livro['data'].dt.date == data]['valor'].sum()
-            diferenca = banco_dia - livro_dia
-            status = "OK" if abs(diferenca) < 0.01 else "Divergência"
-            
-            dados_diarios.append([
-                data.strftime('%d/%m/%Y'),
-                f"Kz {banco_dia:,.2f}",
-                f"Kz {livro_dia:,.2f}",
-                f"Kz {diferenca:,.2f}",
-                status
-            ])
-        
-        tabela = Table([['Data', 'Total Banco', 'Total Livro', 'Diferença', 'Status']] + dados_diarios)
-        tabela.setStyle(self.estilo_tabela_padrao())
-        elementos.append(tabela)
+        # Resumo diário: totais por dia do banco e do livro, lado a lado
+        elementos.append(self.tabela_pdf(dados_relatorio_diario(dados_banco, dados_livro, data_ref)))
         
         doc.build(elementos)
 
-    def gerar_relatorio_mensal(self, dados_mensais, caminho_saida):
-        """Gera relatório consolidado mensal"""
+    def gerar_relatorio_mensal(self, dados_mensais, caminho_saida, mes_ref=None):
+        """
+        Gera relatório consolidado mensal
+
+        Args:
+            dados_mensais: Comparativo mensal (ver agregacoes.comparar_por_periodo)
+                ou {'banco': totais por mês, 'livro': totais por mês}
+            caminho_saida: Caminho do arquivo PDF de saída
+            mes_ref: Mês de referência (opcional): o relatório vai de janeiro
+                desse ano até ele
+        """
         doc = SimpleDocTemplate(
             caminho_saida,
             pagesize=landscape(A4),
@@ -110,40 +188,8 @@ class GeradorRelatorios:
         
         elementos = self.criar_cabecalho("Relatório Mensal de Reconciliação")
         
-        # Dados mensais
-        dados_tabela = []
-        total_banco = 0
-        total_livro = 0
-        
-        for mes in sorted(dados_mensais['banco'].index):
-            banco_mes = dados_mensais['banco'][mes]
-            livro_mes = dados_mensais['livro'][mes]
-            diferenca = banco_mes - livro_mes
-            status = "OK" if abs(diferenca) < 0.01 else "Divergência"
-            
-            total_banco += banco_mes
-            total_livro += livro_mes
-            
-            dados_tabela.append([
-                mes,
-                f"Kz {banco_mes:,.2f}",
-                f"Kz {livro_mes:,.2f}",
-                f"Kz {diferenca:,.2f}",
-                status
-            ])
-        
-        # Adicionar totais
-        dados_tabela.append([
-            'TOTAL',
-            f"Kz {total_banco:,.2f}",
-            f"Kz {total_livro:,.2f}",
-            f"Kz {(total_banco - total_livro):,.2f}",
-            ''
-        ])
-        
-        tabela = Table([['Mês', 'Total Banco', 'Total Livro', 'Diferença', 'Status']] + dados_tabela)
-        tabela.setStyle(self.estilo_tabela_padrao())
-        elementos.append(tabela)
+        # Dados mensais, com a linha de totais
+        elementos.append(self.tabela_pdf(dados_relatorio_mensal(dados_mensais, mes_ref)))
         
         doc.build(elementos)
 
@@ -169,18 +215,7 @@ class GeradorRelatorios:
         
         # Tabela de divergências
         if divergencias:
-            dados_tabela = []
-            for div in divergencias:
-                dados_tabela.append([
-                    div['data'].strftime('%d/%m/%Y'),
-                    div['descricao'],
-                    f"Kz {div['valor']:,.2f}",
-                    div['origem']
-                ])
-            
-            tabela = Table([['Data', 'Descrição', 'Valor', 'Origem']] + dados_tabela)
-            tabela.setStyle(self.estilo_tabela_padrao())
-            elementos.append(tabela)
+            elementos.append(self.tabela_pdf(dados_relatorio_divergencias(divergencias)))
         else:
             elementos.append(Paragraph(
                 "Não foram encontradas divergências no período analisado.",
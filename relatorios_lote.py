@@ -0,0 +1,248 @@
+import hashlib
+import json
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+
+from config import CONFIGURACOES
+
+TIPOS_RELATORIO = ('balanco', 'dre', 'livro_razao', 'fluxo_caixa', 'racu')
+
+# Contabilidade de cada entidade já carregada neste processo (processos do pool)
+_contabilidades = {}
+
+
+def _contabilidade_entidade(entidade, armazenamento):
+    """Carrega (uma vez por processo) a contabilidade guardada no diretório da entidade"""
+    contabilidade = _contabilidades.get((entidade, armazenamento))
+    if contabilidade is None:
+        from contabilidade import ContabilidadeAvancada
+        # Os dados são preparados pelo processo principal antes do lote: os
+        # processos do pool só leem, nunca gravam
+        contabilidade = ContabilidadeAvancada(backend=armazenamento, diretorio=entidade, somente_leitura=True)
+        contabilidade.fechamento.preparar_dados = False
+        _contabilidades[(entidade, armazenamento)] = contabilidade
+    return contabilidade
+
+
+def diretorio_entidade(entidade):
+    """
+    Subdiretório de saída de uma entidade: o nome da pasta mais um resumo do
+    caminho absoluto, para que entidades em pastas com o mesmo nome (por
+    exemplo 'a/2024' e 'b/2024') não partilhem o diretório
+    """
+    caminho = os.path.abspath(entidade)
+    resumo = hashlib.sha1(caminho.encode('utf-8')).hexdigest()[:8]
+    return f"{os.path.basename(caminho) or 'entidade'}_{resumo}"
+
+
+def nome_arquivo(especificacao):
+    """Nome do PDF de uma especificação ({'tipo', 'data_inicio', 'data_fim', 'entidade'})"""
+    tipo = especificacao['tipo']
+    data_fim = especificacao['data_fim']
+    if tipo == 'racu':
+        return f"racu_{data_fim.year}.pdf"
+    if tipo == 'balanco':
+        return f"balanco_patrimonial_{data_fim.strftime('%Y%m%d')}.pdf"
+    data_inicio = especificacao['data_inicio']
+    return f"{tipo}_{data_inicio.strftime('%Y%m%d')}_{data_fim.strftime('%Y%m%d')}.pdf"
+
+
+def gerar_relatorio(especificacao, caminho_saida):
+    """
+    Gera um relatório (executado num processo do pool)
+
+    Args:
+        especificacao: {'tipo', 'data_inicio', 'data_fim', 'entidade', 'armazenamento'}
+        caminho_saida: Caminho absoluto do PDF
+
+    Returns:
+        dict: {'sucesso', 'segundos', 'erro'}
+    """
+    inicio = time.perf_counter()
+    try:
+        contabilidade = _contabilidade_entidade(especificacao['entidade'], especificacao['armazenamento'])
+        # Sem cache de relatórios: o índice da cache não é partilhado entre processos
+        sucesso = contabilidade.gerar_relatorio(especificacao['tipo'], caminho_saida,
+                                                especificacao['data_inicio'], especificacao['data_fim'],
+                                                usar_cache=False)
+        erro = None if sucesso else "O relatório não foi gerado"
+    except Exception as e:
+        sucesso, erro = False, str(e)
+    return {'sucesso': bool(sucesso), 'segundos': round(time.perf_counter() - inicio, 3), 'erro': erro}
+
+
+def especificacoes_mensais(ano, tipos=('balanco', 'dre', 'livro_razao', 'fluxo_caixa'), entidades=('.',)):
+    """
+    Especificações do fecho mensal de um ano: cada tipo, para cada mês e entidade
+
+    Returns:
+        list: Especificações {'tipo', 'data_inicio', 'data_fim', 'entidade'}
+    """
+    especificacoes = []
+    for entidade in entidades:
+        for mes in range(1, 13):
+            data_inicio = datetime(ano, mes, 1)
+            data_fim = datetime(ano + (mes == 12), mes % 12 + 1, 1) - timedelta(days=1)
+            for tipo in tipos:
+                especificacoes.append({'tipo': tipo, 'data_inicio': data_inicio,
+                                       'data_fim': data_fim, 'entidade': entidade})
+    return especificacoes
+
+
+class GeradorRelatoriosLote:
+    """
+    Geração de muitos relatórios contabilísticos (tipo x período x entidade)
+    num pool de processos: a composição dos PDF pelo ReportLab ocupa o CPU,
+    por isso cada processo gera relatórios em paralelo com os outros.
+
+    Cada entidade é um diretório com os seus arquivos de dados (lançamentos,
+    bens, plano de contas) e o armazenamento escolhido nas suas configurações
+    (JSON ou SQLite). Os dados de cada entidade são preparados uma vez no
+    processo principal (conversões e amortizações em falta até ao último
+    balanço) e os processos do pool apenas os leem. No fim é gravado um
+    manifesto JSON com os arquivos gerados e os tempos de geração.
+    """
+
+    def __init__(self, diretorio_saida=None, processos=None):
+        """
+        Args:
+            diretorio_saida: Diretório dos PDF e do manifesto (por omissão o de
+                CONFIGURACOES['RELATORIOS_LOTE'])
+            processos: Número de processos (por omissão o da configuração, ou
+                o número de CPUs)
+        """
+        configuracao = CONFIGURACOES['RELATORIOS_LOTE']
+        self.diretorio_saida = diretorio_saida or configuracao['diretorio_saida']
+        self.processos = processos or configuracao['processos'] or os.cpu_count() or 1
+        self.arquivo_manifesto = os.path.join(self.diretorio_saida, 'manifesto.json')
+
+    def validar(self, especificacoes):
+        """
+        Normaliza as especificações (entidade absoluta, armazenamento configurado
+        na entidade, data_inicio do RAÇU e balanço)
+        """
+        from contabilidade import armazenamento_configurado
+        normalizadas = []
+        for especificacao in especificacoes:
+            if especificacao['tipo'] not in TIPOS_RELATORIO:
+                raise ValueError(f"Tipo de relatório inválido: {especificacao['tipo']}")
+            normalizada = dict(especificacao)
+            normalizada['entidade'] = os.path.abspath(especificacao.get('entidade') or '.')
+            if not normalizada.get('armazenamento'):
+                normalizada['armazenamento'] = armazenamento_configurado(normalizada['entidade'])
+            normalizada.setdefault('data_inicio', None)
+            if normalizada['data_inicio'] is None and normalizada['tipo'] not in ('balanco', 'racu'):
+                raise ValueError(f"O relatório {normalizada['tipo']} precisa de data_inicio")
+            normalizadas.append(normalizada)
+        return normalizadas
+
+    def preparar_entidades(self, especificacoes, contabilidades=None):
+        """
+        Converte as importações pendentes e regista, em cada entidade, as
+        amortizações em falta até à data do último balanço pedido (como o
+        balanço faria; as outras demonstrações não amortizam), gravando os dados.
+        Deve correr na thread dona das contabilidades passadas (na interface,
+        a thread do Tk), antes de executar(..., preparar=False) noutra thread.
+
+        Args:
+            especificacoes: Especificações (validadas ou não)
+            contabilidades: {diretório: ContabilidadeAvancada} já abertas neste
+                processo (por exemplo a da janela principal), usadas em vez de
+                carregar outra instância sobre os mesmos arquivos. As outras
+                entidades são abertas com o extrato e o livro importados
+                guardados em Arrow no seu diretório.
+        """
+        especificacoes = self.validar(especificacoes)
+        contabilidades = {os.path.abspath(d): c for d, c in (contabilidades or {}).items()}
+        ultima_data = {}
+        for especificacao in especificacoes:
+            chave = (especificacao['entidade'], especificacao['armazenamento'])
+            ultima_data.setdefault(chave, None)
+            if especificacao['tipo'] == 'balanco':
+                ultima_data[chave] = max(ultima_data[chave] or especificacao['data_fim'],
+                                         especificacao['data_fim'])
+
+        from armazenamento_arrow import ArmazenamentoArrow, DIRETORIO_PADRAO
+        from contabilidade import ContabilidadeAvancada
+        for (entidade, armazenamento), data_fim in ultima_data.items():
+            contabilidade = contabilidades.get(entidade)
+            if contabilidade is None:
+                contabilidade = ContabilidadeAvancada(backend=armazenamento, diretorio=entidade)
+                importados = ArmazenamentoArrow(os.path.join(entidade, DIRETORIO_PADRAO))
+                contabilidade.dados_banco = importados.carregar('banco')
+                contabilidade.dados_livro = importados.carregar('livro')
+            with contabilidade.lote():
+                contabilidade.converter_dados_para_lancamentos()
+                if data_fim is not None:
+                    contabilidade.calcular_amortizacoes(data_fim)
+
+    def executar(self, especificacoes, progresso=None, preparar=True):
+        """
+        Gera os relatórios em paralelo
+
+        Args:
+            especificacoes: Lista de {'tipo', 'data_inicio', 'data_fim', 'entidade'}
+                (tipo em TIPOS_RELATORIO; entidade = diretório dos dados, '.' por
+                omissão; 'armazenamento' opcional, por omissão o configurado na entidade)
+            progresso: Função opcional progresso(concluidos, total, item_manifesto),
+                chamada no processo principal à medida que cada relatório termina
+            preparar: Preparar os dados das entidades antes do lote; False se
+                preparar_entidades já foi chamado pelo dono das contabilidades
+
+        Returns:
+            list: Itens do manifesto, pela ordem das especificações
+        """
+        especificacoes = self.validar(especificacoes)
+        inicio = time.perf_counter()
+        if preparar:
+            self.preparar_entidades(especificacoes)
+
+        itens = []
+        for especificacao in especificacoes:
+            diretorio = os.path.join(os.path.abspath(self.diretorio_saida),
+                                     diretorio_entidade(especificacao['entidade']))
+            os.makedirs(diretorio, exist_ok=True)
+            itens.append({
+                'tipo': especificacao['tipo'],
+                'entidade': especificacao['entidade'],
+                'data_inicio': especificacao['data_inicio'].strftime('%Y-%m-%d') if especificacao['data_inicio'] else None,
+                'data_fim': especificacao['data_fim'].strftime('%Y-%m-%d'),
+                'arquivo': os.path.join(diretorio, nome_arquivo(especificacao))
+            })
+
+        # spawn: os processos não herdam o estado da interface gráfica nem threads
+        contexto = multiprocessing.get_context('spawn')
+        processos = max(1, min(self.processos, len(especificacoes)))
+        with ProcessPoolExecutor(max_workers=processos, mp_context=contexto) as executor:
+            futuros = {executor.submit(gerar_relatorio, especificacao, item['arquivo']): item
+                       for especificacao, item in zip(especificacoes, itens)}
+            for concluidos, futuro in enumerate(as_completed(futuros), 1):
+                item = futuros[futuro]
+                try:
+                    item.update(futuro.result())
+                except Exception as e:
+                    item.update({'sucesso': False, 'segundos': None, 'erro': str(e)})
+                if progresso:
+                    progresso(concluidos, len(itens), item)
+
+        self.gravar_manifesto(itens, time.perf_counter() - inicio)
+        return itens
+
+    def gravar_manifesto(self, itens, segundos):
+        """Grava o manifesto do lote (relatórios, sucesso, tempos de geração)"""
+        try:
+            os.makedirs(self.diretorio_saida, exist_ok=True)
+            with open(self.arquivo_manifesto, 'w', encoding='utf-8') as f:
+                json.dump({
+                    'gerado_em': datetime.now().isoformat(timespec='seconds'),
+                    'segundos': round(segundos, 3),
+                    'processos': self.processos,
+                    'relatorios': itens
+                }, f, ensure_ascii=False, indent=4)
+            return True
+        except Exception as e:
+            print(f"Erro ao gravar manifesto do lote: {str(e)}")
+            return False
@@ -0,0 +1,127 @@
+from functools import lru_cache
+
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet
+from reportlab.pdfbase import pdfmetrics
+from reportlab.platypus import TableStyle
+
+# Fontes usadas nos relatórios (Type 1 padrão do PDF, sem arquivos a embeber)
+FONTE = 'Helvetica'
+FONTE_NEGRITO = 'Helvetica-Bold'
+FONTE_ITALICO = 'Helvetica-Oblique'
+FONTES = (FONTE, FONTE_NEGRITO, FONTE_ITALICO)
+
+ZEBRADO = ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.lightgrey])
+
+
+@lru_cache(maxsize=None)
+def registar_fontes():
+    """
+    Regista as fontes dos relatórios uma vez por processo, para que as
+    métricas (larguras dos caracteres) já estejam carregadas quando o
+    primeiro relatório é composto
+    """
+    for fonte in FONTES:
+        pdfmetrics.getFont(fonte)
+
+
+@lru_cache(maxsize=None)
+def estilos():
+    """
+    Folha de estilos de parágrafo partilhada por todos os relatórios do
+    processo. Os estilos não devem ser alterados: para variações, criar um
+    ParagraphStyle com parent=estilos()['...'].
+    """
+    registar_fontes()
+    return getSampleStyleSheet()
+
+
+@lru_cache(maxsize=None)
+def estilo_tabela(alinhamentos=(), tamanho_cabecalho=12, linha_total=False, zebrado=False):
+    """
+    Estilo de tabela com cabeçalho cinzento, construído uma vez por
+    combinação de parâmetros e partilhado entre tabelas e relatórios
+
+    Args:
+        alinhamentos: Tuplo de (início, fim, alinhamento) das células de dados,
+            por exemplo (((2, 1), (2, -1), 'RIGHT'),)
+        tamanho_cabecalho: Tamanho da letra do cabeçalho, centrado e com margem
+            inferior (None = tamanho do corpo, sem centrar)
+        linha_total: Última linha de totais a negrito sobre cinzento claro
+        zebrado: Linhas de dados alternadas branco/cinzento claro
+
+    Returns:
+        TableStyle
+    """
+    comandos = [
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke)
+    ]
+    if tamanho_cabecalho:
+        comandos.append(('ALIGN', (0, 0), (-1, 0), 'CENTER'))
+    comandos.append(('FONTNAME', (0, 0), (-1, 0), FONTE_NEGRITO))
+    if tamanho_cabecalho:
+        comandos += [('FONTSIZE', (0, 0), (-1, 0), tamanho_cabecalho),
+                     ('BOTTOMPADDING', (0, 0), (-1, 0), 12)]
+    if linha_total:
+        comandos += [('BACKGROUND', (0, -1), (-1, -1), colors.lightgrey),
+                     ('FONTNAME', (0, -1), (-1, -1), FONTE_NEGRITO)]
+    comandos += [('ALIGN', inicio, fim, alinhamento) for inicio, fim, alinhamento in alinhamentos]
+    comandos.append(('GRID', (0, 0), (-1, -1), 1, colors.black))
+    if zebrado:
+        comandos.append(ZEBRADO)
+    return TableStyle(comandos)
+
+
+# Estilos das demonstrações financeiras (contabilidade.py)
+def estilo_secao():
+    """Secção conta/descrição/valor com total (balanço, DRE)"""
+    return estilo_tabela((((2, 1), (2, -1), 'RIGHT'),), linha_total=True)
+
+
+def estilo_valores():
+    """Descrição/valor com total e cabeçalho simples (RAÇU, resumo dos fluxos)"""
+    return estilo_tabela((((1, 0), (1, -1), 'RIGHT'),), tamanho_cabecalho=None, linha_total=True)
+
+
+@lru_cache(maxsize=None)
+def estilo_total():
+    """Linha única de total geral em destaque"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.grey),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('FONTNAME', (0, 0), (-1, 0), FONTE_NEGRITO),
+        ('FONTSIZE', (0, 0), (-1, 0), 14),
+        ('ALIGN', (2, 0), (2, 0), 'RIGHT'),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black)
+    ])
+
+
+@lru_cache(maxsize=None)
+def estilo_ficha():
+    """Tabela rótulo/valor (identificação da empresa)"""
+    return TableStyle([
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ('BACKGROUND', (0, 0), (0, -1), colors.lightgrey),
+        ('FONTNAME', (0, 0), (0, -1), FONTE_NEGRITO),
+        ('ALIGN', (0, 0), (0, -1), 'RIGHT'),
+        ('PADDING', (0, 0), (-1, -1), 6)
+    ])
+
+
+@lru_cache(maxsize=None)
+def estilo_destaque():
+    """Tabela centrada com cabeçalho azul e linhas alternadas (relatórios de reconciliação)"""
+    return TableStyle([
+        ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#2E5090')),
+        ('TEXTCOLOR', (0, 0), (-1, 0), colors.whitesmoke),
+        ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+        ('FONTNAME', (0, 0), (-1, 0), FONTE_NEGRITO),
+        ('FONTSIZE', (0, 0), (-1, 0), 12),
+        ('BOTTOMPADDING', (0, 0), (-1, 0), 12),
+        ('GRID', (0, 0), (-1, -1), 1, colors.black),
+        ZEBRADO,
+        ('FONTSIZE', (0, 1), (-1, -1), 10),
+        ('TOPPADDING', (0, 1), (-1, -1), 8),
+        ('BOTTOMPADDING', (0, 1), (-1, -1), 8)
+    ])
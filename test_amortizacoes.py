@@ -0,0 +1,150 @@
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from amortizacoes import MotorAmortizacoes, coeficiente_degressivo
+from contabilidade import ContabilidadeAvancada
+
+
+def _bem(codigo, valor, data, vida_util, valor_residual=0.0, metodo='linear', amortizacoes=None):
+    return {'codigo': codigo, 'descricao': f"Bem {codigo}", 'valor': valor, 'data': data,
+            'vida_util': vida_util, 'valor_residual': valor_residual, 'metodo': metodo,
+            'amortizacoes': amortizacoes or []}
+
+
+def _plano_escalar(bem):
+    """Plano de um bem calculado ano a ano, sem numpy, como referência"""
+    amortizavel = bem['valor'] - bem['valor_residual']
+    meses_totais = round(bem['vida_util'] * 12)
+    meses, restantes = [], meses_totais
+    primeiro = min(13 - bem['data'].month, restantes)
+    while restantes > 0:
+        usados = primeiro if not meses else min(12, restantes)
+        meses.append(usados)
+        restantes -= usados
+
+    valores = []
+    if bem['metodo'] == 'linear':
+        valores = [amortizavel / meses_totais * usados for usados in meses]
+    else:
+        taxa = coeficiente_degressivo(bem['vida_util']) / max(bem['vida_util'], 1)
+        valor_liquido, por_usar = amortizavel, meses_totais
+        for usados in meses:
+            quota = max(valor_liquido * taxa * usados / 12, valor_liquido * usados / por_usar)
+            quota = min(quota, valor_liquido)
+            valores.append(quota)
+            valor_liquido -= quota
+            por_usar -= usados
+    return meses, valores
+
+
+def _bens_aleatorios(total, semente=5):
+    aleatorio = random.Random(semente)
+    return [_bem(f"B{n}", round(aleatorio.uniform(100, 50000), 2),
+                 datetime(aleatorio.randrange(2015, 2024), aleatorio.randrange(1, 13), 1),
+                 aleatorio.choice([1, 3, 4, 5, 6, 8, 10, 2.5]),
+                 valor_residual=aleatorio.choice([0.0, 50.0]),
+                 metodo=aleatorio.choice(['linear', 'degressivo']))
+            for n in range(total)]
+
+
+def test_coeficientes_degressivos():
+    assert [coeficiente_degressivo(v) for v in (3, 4, 5, 6, 7, 10)] == [1.5, 1.5, 2.0, 2.0, 2.5, 2.5]
+
+
+def test_plano_igual_ao_calculo_bem_a_bem():
+    bens = _bens_aleatorios(200)
+
+    plano = MotorAmortizacoes().plano(bens)
+
+    for i, bem in enumerate(bens):
+        meses, valores = _plano_escalar(bem)
+        colunas = len(meses)
+        assert list(plano['meses'][i, :colunas]) == meses
+        assert not plano['meses'][i, colunas:].any()
+        assert plano['valores'][i, :colunas] == pytest.approx(valores, abs=0.006)
+        assert plano['ano_inicial'][i] == bem['data'].year
+
+
+def test_cada_plano_esgota_o_valor_amortizavel():
+    bens = _bens_aleatorios(200, semente=9)
+
+    valores = MotorAmortizacoes().plano(bens)['valores']
+
+    amortizavel = np.array([bem['valor'] - bem['valor_residual'] for bem in bens])
+    assert np.abs(valores.sum(axis=1) - amortizavel).max() <= 0.01 * valores.shape[1]
+
+
+def test_linear_proporcional_aos_meses_do_primeiro_e_ultimo_ano():
+    plano = MotorAmortizacoes().plano([_bem('V1', 12000.0, datetime(2020, 10, 15), 4)])
+
+    assert list(plano['meses'][0]) == [3, 12, 12, 12, 9]
+    assert list(plano['valores'][0]) == [750.0, 3000.0, 3000.0, 3000.0, 2250.0]
+
+
+def test_devido_ate_e_proporcional_aos_meses_decorridos():
+    bens = [_bem('V1', 12000.0, datetime(2020, 10, 15), 4)]
+
+    _, devido = MotorAmortizacoes().devido_ate(bens, datetime(2021, 6, 30))
+
+    assert list(devido[0]) == [750.0, 1500.0, 0.0, 0.0, 0.0]
+
+
+def test_em_falta_completa_anos_registados_em_parte():
+    bens = [_bem('V1', 12000.0, datetime(2020, 10, 15), 4,
+                 amortizacoes=[{'data': datetime(2020, 12, 31), 'valor': 500.0}])]
+
+    em_falta = MotorAmortizacoes().em_falta(bens, datetime(2021, 12, 31))
+
+    assert em_falta == [(0, 2020, 250.0, 750.0), (0, 2021, 3000.0, 3750.0)]
+
+
+def test_plano_recalculado_quando_os_bens_mudam():
+    motor = MotorAmortizacoes()
+    bens = [_bem('V1', 12000.0, datetime(2020, 1, 1), 4)]
+    assert motor.plano(bens)['valores'][0, 0] == 3000.0
+
+    bens[0]['valor'] = 24000.0
+
+    assert motor.plano(bens)['valores'][0, 0] == 6000.0
+
+
+@pytest.fixture
+def contabilidade(diretorio_trabalho):
+    contabilidade = ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+    contabilidade.registrar_bem_amortizavel('V1', "Viatura", 12000.0, datetime(2020, 10, 15), 4, 0.0)
+    contabilidade.registrar_bem_amortizavel('E1', "Equipamento", 7000.0, datetime(2021, 3, 1), 5, 0.0,
+                                            metodo='degressivo')
+    return contabilidade
+
+
+def test_calcular_amortizacoes_regista_o_devido_uma_unica_vez(contabilidade):
+    calculadas = contabilidade.calcular_amortizacoes(datetime(2022, 12, 31))
+
+    assert [(a['bem_codigo'], a['data'].year) for a in calculadas] == [
+        ('V1', 2020), ('V1', 2021), ('V1', 2022), ('E1', 2021), ('E1', 2022)]
+    assert all(a['data'] == datetime(a['data'].year, 12, 31) for a in calculadas)
+    total = sum(a['valor'] for a in calculadas)
+    assert contabilidade.saldos()['66'] == pytest.approx(total)
+    assert contabilidade.saldos()['19'] == pytest.approx(-total)
+
+    lancamentos = len(contabilidade.lancamentos)
+    assert contabilidade.calcular_amortizacoes(datetime(2022, 12, 31)) == []
+    assert len(contabilidade.lancamentos) == lancamentos
+
+    recarregada = ContabilidadeAvancada(diretorio=contabilidade.diretorio)
+    assert recarregada.calcular_amortizacoes(datetime(2022, 12, 31)) == []
+
+
+def test_balancete_so_amortiza_quando_pedido(contabilidade):
+    lancamentos = len(contabilidade.lancamentos)
+
+    contabilidade.fechamento.balancete(datetime(2022, 1, 1), datetime(2022, 12, 31))
+    assert len(contabilidade.lancamentos) == lancamentos
+    assert '66' not in contabilidade.saldos()
+
+    balancete = contabilidade.fechamento.balancete(None, datetime(2022, 12, 31), amortizar=True)
+    assert len(contabilidade.lancamentos) > lancamentos
+    assert balancete.saldos_acumulados['19'] == pytest.approx(contabilidade.saldos()['19'])
@@ -0,0 +1,72 @@
+import os
+
+import pandas as pd
+import pytest
+
+from armazenamento_arrow import PYARROW_DISPONIVEL, ArmazenamentoArrow
+from tipos_compactos import compactar_extrato
+
+pytestmark = pytest.mark.skipif(not PYARROW_DISPONIVEL, reason="pyarrow não instalado")
+
+EXTRATO = compactar_extrato(pd.DataFrame({
+    'data': pd.to_datetime(['2024-01-05', '2024-01-20']),
+    'descricao': ['Salário Ana', 'Venda loja'],
+    'valor': [-1500.00, 320.50],
+}))
+
+
+@pytest.fixture
+def armazenamento(tmp_path):
+    return ArmazenamentoArrow(str(tmp_path / 'dados'))
+
+
+def test_guardar_e_carregar(armazenamento):
+    assert armazenamento.carregar('banco') is None
+    assert armazenamento.salvar('banco', EXTRATO)
+
+    carregado = armazenamento.carregar('banco')
+
+    assert list(carregado['valor']) == [-150000, 32050]
+    assert list(carregado['descricao']) == ['Salário Ana', 'Venda loja']
+    assert carregado['data'].dtype == EXTRATO['data'].dtype
+
+
+def test_cada_gravacao_e_uma_versao_nova(armazenamento):
+    armazenamento.salvar('banco', EXTRATO)
+    mapeado = armazenamento.carregar('banco')
+
+    assert armazenamento.salvar('banco', EXTRATO.iloc[:1])
+
+    assert [versao for versao, _ in armazenamento.versoes('banco')] == [2]
+    assert len(ArmazenamentoArrow(armazenamento.diretorio).carregar('banco')) == 1
+    # O DataFrame da versão anterior continua utilizável
+    assert list(mapeado['valor']) == [-150000, 32050]
+
+
+def test_dados_removidos_carregam_como_none(armazenamento):
+    armazenamento.salvar('banco', EXTRATO)
+
+    assert armazenamento.salvar('banco', None)
+
+    assert armazenamento.carregar('banco') is None
+    assert ArmazenamentoArrow(armazenamento.diretorio).carregar('banco') is None
+
+
+def test_arquivo_de_versoes_anteriores_do_programa(armazenamento):
+    os.makedirs(armazenamento.diretorio)
+    legado = ArmazenamentoArrow(armazenamento.diretorio)
+    legado.salvar('livro', EXTRATO)
+    os.rename(legado.caminho('livro'), os.path.join(armazenamento.diretorio, 'livro.arrow'))
+
+    assert len(armazenamento.carregar('livro')) == 2
+    armazenamento.salvar('livro', EXTRATO.iloc[:1])
+
+    assert sorted(os.listdir(armazenamento.diretorio)) == ['livro.1.arrow']
+
+
+def test_nomes_distintos_nao_se_misturam(armazenamento):
+    armazenamento.salvar('banco', EXTRATO)
+    armazenamento.salvar('banco_teste', EXTRATO.iloc[:1])
+
+    assert [versao for versao, _ in armazenamento.versoes('banco')] == [1]
+    assert len(armazenamento.carregar('banco')) == 2
@@ -0,0 +1,120 @@
+import random
+from datetime import datetime, timedelta
+
+import pytest
+
+from contabilidade import ContabilidadeAvancada
+
+CONTAS = ['11', '12', '22', '32', '43', '62', '71']
+
+
+def _lancamentos_aleatorios(total, semente=7):
+    aleatorio = random.Random(semente)
+    lancamentos = []
+    for _ in range(total):
+        data = datetime(2024, 1, 1) + timedelta(days=aleatorio.randrange(366),
+                                                minutes=aleatorio.randrange(24 * 60))
+        debito, credito = aleatorio.sample(CONTAS, 2)
+        valor = round(aleatorio.uniform(0.01, 5000), 2)
+        lancamentos.append((data, f"Operação {len(lancamentos)}", [
+            {'conta': debito, 'debito': valor, 'credito': 0},
+            {'conta': credito, 'debito': 0, 'credito': valor}]))
+    return lancamentos
+
+
+@pytest.fixture
+def contabilidades(diretorio_trabalho):
+    """A mesma contabilidade em JSON e em SQLite"""
+    resultado = {}
+    for backend in ('json', 'sqlite'):
+        diretorio = diretorio_trabalho / backend
+        diretorio.mkdir()
+        contabilidade = ContabilidadeAvancada(backend=backend, diretorio=str(diretorio))
+        with contabilidade.lote():
+            for data, descricao, movimentos in _lancamentos_aleatorios(300):
+                contabilidade.registrar_lancamento(data, descricao, movimentos)
+        resultado[backend] = contabilidade
+    return resultado
+
+
+def _periodos():
+    aleatorio = random.Random(3)
+    periodos = [(None, None), (None, datetime(2024, 6, 30)), (datetime(2024, 7, 1), None),
+                (datetime(2024, 12, 31), datetime(2024, 12, 31))]
+    for _ in range(20):
+        inicio = datetime(2024, 1, 1) + timedelta(days=aleatorio.randrange(366),
+                                                  hours=aleatorio.randrange(24))
+        fim = inicio + timedelta(days=aleatorio.randrange(60), hours=aleatorio.randrange(24))
+        periodos.append((inicio, fim))
+    return periodos
+
+
+def _arredondar(saldos):
+    return {conta: round(saldo, 2) for conta, saldo in saldos.items() if round(saldo, 2)}
+
+
+@pytest.mark.parametrize('desde, ate', _periodos())
+def test_saldos_iguais_em_json_e_sqlite(contabilidades, desde, ate):
+    json_, sqlite = contabilidades['json'], contabilidades['sqlite']
+
+    assert _arredondar(sqlite.saldos(desde, ate)) == _arredondar(json_.saldos(desde, ate))
+    assert _arredondar(sqlite.saldos(desde, ate, contas=['43', '71'])) == \
+        _arredondar(json_.saldos(desde, ate, contas=['43', '71']))
+
+
+@pytest.mark.parametrize('desde, ate', _periodos()[:8])
+def test_lancamentos_e_razao_iguais_em_json_e_sqlite(contabilidades, desde, ate):
+    json_, sqlite = contabilidades['json'], contabilidades['sqlite']
+
+    assert [l['id'] for l in sqlite.lancamentos_periodo(desde, ate)] == \
+        [l['id'] for l in json_.lancamentos_periodo(desde, ate)]
+    razao_json = json_.movimentos_por_conta(desde, ate)
+    razao_sqlite = sqlite.movimentos_por_conta(desde, ate)
+    assert sorted(razao_sqlite) == sorted(razao_json)
+    for conta, movimentos in razao_json.items():
+        assert [(m['lancamento_id'], m['debito'], m['credito']) for m in razao_sqlite[conta]] == \
+            [(m['lancamento_id'], m['debito'], m['credito']) for m in movimentos]
+
+
+def test_sqlite_recarregado_tem_os_mesmos_saldos(contabilidades):
+    sqlite = contabilidades['sqlite']
+    recarregada = ContabilidadeAvancada(backend='sqlite', diretorio=sqlite.diretorio)
+
+    assert len(recarregada.lancamentos) == 300
+    assert _arredondar(recarregada.saldos()) == _arredondar(sqlite.saldos())
+
+
+def test_valores_guardados_em_centavos_sem_erro_de_arredondamento(diretorio_trabalho):
+    contabilidade = ContabilidadeAvancada(backend='sqlite', diretorio=str(diretorio_trabalho))
+    with contabilidade.lote():
+        for _ in range(10):
+            contabilidade.registrar_lancamento(datetime(2024, 1, 1), "Dez cêntimos", [
+                {'conta': '43', 'debito': 0.1, 'credito': 0},
+                {'conta': '71', 'debito': 0, 'credito': 0.1}])
+
+    recarregada = ContabilidadeAvancada(backend='sqlite', diretorio=str(diretorio_trabalho))
+    assert recarregada.saldos() == {'43': 1.0, '71': -1.0}
+
+
+def test_consultas_dentro_do_lote_veem_lancamentos_por_gravar(diretorio_trabalho):
+    contabilidade = ContabilidadeAvancada(backend='sqlite', diretorio=str(diretorio_trabalho))
+    contabilidade.registrar_lancamento(datetime(2024, 1, 1), "Gravado", [
+        {'conta': '43', 'debito': 100.0, 'credito': 0},
+        {'conta': '71', 'debito': 0, 'credito': 100.0}])
+
+    with contabilidade.lote():
+        contabilidade.registrar_lancamento(datetime(2024, 1, 2, 15, 0), "Por gravar", [
+            {'conta': '43', 'debito': 50.0, 'credito': 0},
+            {'conta': '71', 'debito': 0, 'credito': 50.0}])
+        assert contabilidade.saldos(ate=datetime(2024, 1, 2)) == {'43': 150.0, '71': -150.0}
+        assert [l['descricao'] for l in contabilidade.lancamentos_periodo(datetime(2024, 1, 2),
+                                                                          datetime(2024, 1, 2))] == ["Por gravar"]
+
+
+def test_dados_json_sao_migrados_para_sqlite(contabilidades):
+    json_ = contabilidades['json']
+
+    migrada = ContabilidadeAvancada(backend='sqlite', diretorio=json_.diretorio)
+
+    assert not migrada.armazenamento_sql.vazio()
+    assert _arredondar(migrada.armazenamento_sql.saldos()) == _arredondar(json_.saldos())
@@ -0,0 +1,148 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from cache_relatorios import CacheRelatorios
+from contabilidade import ContabilidadeAvancada
+
+
+def _pdf(diretorio, nome, tamanho=1000):
+    caminho = diretorio / nome
+    caminho.write_bytes(b'%PDF' + b'x' * (tamanho - 4))
+    return str(caminho)
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CacheRelatorios(str(tmp_path / 'cache'), limite_mb=1)
+
+
+def test_guardar_e_obter(cache, tmp_path):
+    chave = CacheRelatorios.chave('dre', ['2024-01-01', '2024-01-31'], ['abc'])
+    assert cache.obter(chave) is None
+
+    assert cache.guardar(chave, _pdf(tmp_path, 'dre.pdf'), 'dre', datetime(2024, 1, 31))
+
+    saida = str(tmp_path / 'copia.pdf')
+    assert cache.copiar(chave, saida)
+    with open(saida, 'rb') as f:
+        assert f.read(4) == b'%PDF'
+
+
+def test_chave_muda_com_parametros_e_impressao():
+    chave = CacheRelatorios.chave('dre', ['2024-01-01', '2024-01-31'], ['abc'])
+
+    assert chave == CacheRelatorios.chave('dre', ['2024-01-01', '2024-01-31'], ['abc'])
+    assert chave != CacheRelatorios.chave('dre', ['2024-01-01', '2024-02-29'], ['abc'])
+    assert chave != CacheRelatorios.chave('dre', ['2024-01-01', '2024-01-31'], ['abd'])
+    assert chave != CacheRelatorios.chave('balanco', ['2024-01-01', '2024-01-31'], ['abc'])
+
+
+def test_invalidar_desde_remove_periodos_que_terminam_depois(cache, tmp_path):
+    for mes in (1, 2, 3):
+        cache.guardar(f"m{mes}", _pdf(tmp_path, f"m{mes}.pdf"), 'dre', datetime(2024, mes, 28))
+
+    assert cache.invalidar_desde(datetime(2024, 4, 1)) == 0
+    assert cache.invalidar_desde(datetime(2024, 2, 28)) == 2
+
+    assert list(cache.entradas) == ['m1']
+    assert not os.path.exists(os.path.join(cache.diretorio, 'm2.pdf'))
+    assert list(CacheRelatorios(cache.diretorio).entradas) == ['m1']
+
+
+def test_limite_remove_os_usados_ha_mais_tempo(tmp_path):
+    cache = CacheRelatorios(str(tmp_path / 'cache'), limite_mb=2500 / 2**20)
+    cache.guardar('a', _pdf(tmp_path, 'a.pdf'), 'dre', datetime(2024, 1, 31))
+    cache.guardar('b', _pdf(tmp_path, 'b.pdf'), 'dre', datetime(2024, 1, 31))
+    cache.obter('a')
+
+    cache.guardar('c', _pdf(tmp_path, 'c.pdf'), 'dre', datetime(2024, 1, 31))
+
+    assert list(cache.entradas) == ['a', 'c']
+    assert sorted(os.listdir(cache.diretorio)) == ['a.pdf', 'c.pdf', 'indice.json']
+
+
+def test_leitura_nao_grava_o_indice_ate_fechar(cache, tmp_path):
+    cache.guardar('a', _pdf(tmp_path, 'a.pdf'), 'dre', datetime(2024, 1, 31))
+    cache.guardar('b', _pdf(tmp_path, 'b.pdf'), 'dre', datetime(2024, 1, 31))
+    modificado = os.stat(cache.arquivo_indice).st_mtime_ns
+    with open(cache.arquivo_indice, 'rb') as f:
+        conteudo = f.read()
+
+    assert cache.obter('a') is not None
+
+    with open(cache.arquivo_indice, 'rb') as f:
+        assert f.read() == conteudo
+    assert os.stat(cache.arquivo_indice).st_mtime_ns == modificado
+    assert cache.fechar()
+    assert list(CacheRelatorios(cache.diretorio).entradas) == ['b', 'a']
+
+
+def test_arquivo_apagado_conta_como_falha(cache, tmp_path):
+    cache.guardar('a', _pdf(tmp_path, 'a.pdf'), 'dre', datetime(2024, 1, 31))
+    os.remove(os.path.join(cache.diretorio, 'a.pdf'))
+
+    assert cache.obter('a') is None
+    assert not cache.copiar('a', str(tmp_path / 'saida.pdf'))
+    assert 'a' not in cache.entradas
+
+
+@pytest.fixture
+def contabilidade(diretorio_trabalho):
+    contabilidade = ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+    with contabilidade.lote():
+        for dia in (5, 20):
+            contabilidade.registrar_lancamento(datetime(2024, 1, dia), f"Venda {dia}", [
+                {'conta': '43', 'debito': 100.0, 'credito': 0},
+                {'conta': '71', 'debito': 0, 'credito': 100.0}])
+    return contabilidade
+
+
+def _gerar_dre(contabilidade, caminho, monkeypatch):
+    """Gera a DRE de janeiro e indica se o PDF foi composto (False se veio da cache)"""
+    composicoes = []
+    gerar_dre = contabilidade.gerar_dre
+
+    def espiao(*args):
+        composicoes.append(args)
+        return gerar_dre(*args)
+    monkeypatch.setattr(contabilidade, 'gerar_dre', espiao)
+    assert contabilidade.gerar_relatorio('dre', str(caminho), datetime(2024, 1, 1), datetime(2024, 1, 31))
+    monkeypatch.setattr(contabilidade, 'gerar_dre', gerar_dre)
+    return bool(composicoes)
+
+
+def test_relatorio_repetido_vem_da_cache(contabilidade, diretorio_trabalho, monkeypatch):
+    assert _gerar_dre(contabilidade, diretorio_trabalho / 'dre1.pdf', monkeypatch)
+    assert not _gerar_dre(contabilidade, diretorio_trabalho / 'dre2.pdf', monkeypatch)
+
+    assert (diretorio_trabalho / 'dre2.pdf').read_bytes() == (diretorio_trabalho / 'dre1.pdf').read_bytes()
+
+
+def test_lancamento_retroativo_invalida_o_relatorio(contabilidade, diretorio_trabalho, monkeypatch):
+    _gerar_dre(contabilidade, diretorio_trabalho / 'dre1.pdf', monkeypatch)
+
+    contabilidade.registrar_lancamento(datetime(2024, 1, 10), "Venda retroativa", [
+        {'conta': '43', 'debito': 50.0, 'credito': 0},
+        {'conta': '71', 'debito': 0, 'credito': 50.0}])
+
+    assert contabilidade.cache_relatorios.entradas == {}
+    assert _gerar_dre(contabilidade, diretorio_trabalho / 'dre2.pdf', monkeypatch)
+
+
+def test_lancamento_posterior_ao_periodo_mantem_o_relatorio(contabilidade, diretorio_trabalho, monkeypatch):
+    _gerar_dre(contabilidade, diretorio_trabalho / 'dre1.pdf', monkeypatch)
+
+    contabilidade.registrar_lancamento(datetime(2024, 2, 3), "Venda de fevereiro", [
+        {'conta': '43', 'debito': 50.0, 'credito': 0},
+        {'conta': '71', 'debito': 0, 'credito': 50.0}])
+
+    assert not _gerar_dre(contabilidade, diretorio_trabalho / 'dre2.pdf', monkeypatch)
+
+
+def test_sem_cache_compoe_sempre(contabilidade, diretorio_trabalho):
+    assert contabilidade.gerar_relatorio('dre', str(diretorio_trabalho / 'dre.pdf'),
+                                         datetime(2024, 1, 1), datetime(2024, 1, 31), usar_cache=False)
+
+    assert contabilidade.cache_relatorios.entradas == {}
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pytest
+
+from contabilidade import ContabilidadeAvancada
+
+
+def _venda(contabilidade, dia, valor):
+    contabilidade.registrar_lancamento(datetime(2024, 1, dia), f"Venda {dia}", [
+        {'conta': '43', 'debito': valor, 'credito': 0},
+        {'conta': '71', 'debito': 0, 'credito': valor}])
+
+
+@pytest.fixture
+def contabilidade(diretorio_trabalho):
+    return ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+
+
+def _espiar_gravacoes(contabilidade, monkeypatch):
+    gravacoes = []
+    registrar = contabilidade.diario.registrar
+
+    def espiao(operacoes):
+        gravacoes.append(len(operacoes))
+        return registrar(operacoes)
+    monkeypatch.setattr(contabilidade.diario, 'registrar', espiao)
+    return gravacoes
+
+
+def test_lote_grava_uma_unica_vez(contabilidade, monkeypatch):
+    gravacoes = _espiar_gravacoes(contabilidade, monkeypatch)
+
+    with contabilidade.lote():
+        for dia in range(1, 6):
+            _venda(contabilidade, dia, 100.0)
+        assert gravacoes == []
+
+    assert gravacoes == [5]
+    recuperada = ContabilidadeAvancada(diretorio=contabilidade.diretorio)
+    assert len(recuperada.lancamentos) == 5
+
+
+def test_erro_no_lote_descarta_os_lancamentos(contabilidade):
+    _venda(contabilidade, 1, 100.0)
+
+    with pytest.raises(RuntimeError):
+        with contabilidade.lote():
+            _venda(contabilidade, 2, 200.0)
+            _venda(contabilidade, 3, 300.0)
+            raise RuntimeError("falha a meio do lote")
+
+    assert [l['descricao'] for l in contabilidade.lancamentos] == ["Venda 1"]
+    assert contabilidade.saldos() == {'43': 100.0, '71': -100.0}
+    assert contabilidade.lancamentos_periodo(datetime(2024, 1, 2), datetime(2024, 1, 31)) == []
+
+    recuperada = ContabilidadeAvancada(diretorio=contabilidade.diretorio)
+    assert [l['descricao'] for l in recuperada.lancamentos] == ["Venda 1"]
+
+
+def test_lancamento_invalido_reverte_o_lote_inteiro(contabilidade):
+    with pytest.raises(ValueError):
+        with contabilidade.lote():
+            _venda(contabilidade, 1, 100.0)
+            contabilidade.registrar_lancamento(datetime(2024, 1, 2), "Desequilibrado", [
+                {'conta': '43', 'debito': 10.0, 'credito': 0},
+                {'conta': '71', 'debito': 0, 'credito': 9.0}])
+
+    assert contabilidade.lancamentos == []
+
+
+def test_erro_num_lote_interior_reverte_so_o_que_lhe_pertence(contabilidade, monkeypatch):
+    gravacoes = _espiar_gravacoes(contabilidade, monkeypatch)
+
+    with contabilidade.lote():
+        _venda(contabilidade, 1, 100.0)
+        with pytest.raises(RuntimeError):
+            with contabilidade.lote():
+                _venda(contabilidade, 2, 200.0)
+                raise RuntimeError("falha no lote interior")
+        _venda(contabilidade, 3, 300.0)
+
+    assert [l['descricao'] for l in contabilidade.lancamentos] == ["Venda 1", "Venda 3"]
+    assert gravacoes == [2]
+
+
+def test_erro_no_lote_reverte_bens_e_amortizacoes(contabilidade):
+    contabilidade.registrar_bem_amortizavel('V1', "Viatura", 12000.0, datetime(2023, 1, 1), 4, 0.0)
+
+    with pytest.raises(RuntimeError):
+        with contabilidade.lote():
+            contabilidade.registrar_bem_amortizavel('M1', "Mobiliário", 800.0, datetime(2023, 6, 1), 8, 0.0)
+            contabilidade.calcular_amortizacoes(datetime(2023, 12, 31))
+            raise RuntimeError("falha depois das amortizações")
+
+    assert [bem['codigo'] for bem in contabilidade.bens_amortizaveis] == ['V1']
+    assert contabilidade.bens_amortizaveis[0]['amortizacoes'] == []
+    assert contabilidade.saldos() == {'11': 12000.0, '32': -12000.0}
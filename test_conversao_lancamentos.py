@@ -0,0 +1,96 @@
+import pandas as pd
+import pytest
+
+from contabilidade import ContabilidadeAvancada
+from tipos_compactos import compactar_extrato
+
+
+def _extrato(linhas):
+    return pd.DataFrame(linhas, columns=['data', 'descricao', 'valor']).assign(
+        data=lambda df: pd.to_datetime(df['data'], dayfirst=True))
+
+
+JANEIRO = _extrato([
+    ('05/01/2024', 'Salário Ana', 1500.00),
+    ('05/01/2024', 'Salário Ana', 1500.00),
+    ('20/01/2024', 'Venda loja', 320.50),
+])
+
+JANEIRO_FEVEREIRO = _extrato([
+    ('20/01/2024', 'Venda loja', 320.50),
+    ('05/02/2024', 'Salário Ana', 1500.00),
+])
+
+
+@pytest.fixture
+def contabilidade(diretorio_trabalho):
+    return ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+
+
+def test_converte_cada_linha_uma_unica_vez(contabilidade):
+    contabilidade.dados_banco = JANEIRO
+
+    assert contabilidade.converter_dados_para_lancamentos()
+    assert len(contabilidade.lancamentos) == 3
+    assert not contabilidade.converter_dados_para_lancamentos()
+    assert len(contabilidade.lancamentos) == 3
+
+
+def test_linhas_ja_convertidas_sao_reconhecidas_noutra_sessao(contabilidade):
+    contabilidade.dados_banco = JANEIRO
+    contabilidade.converter_dados_para_lancamentos()
+
+    nova_sessao = ContabilidadeAvancada(diretorio=contabilidade.diretorio)
+    nova_sessao.dados_banco = JANEIRO.copy()
+
+    assert not nova_sessao.converter_dados_para_lancamentos()
+    assert len(nova_sessao.lancamentos) == 3
+
+
+def test_extrato_sobreposto_so_converte_linhas_novas(contabilidade):
+    contabilidade.dados_banco = JANEIRO
+    contabilidade.converter_dados_para_lancamentos()
+
+    contabilidade.dados_banco = JANEIRO_FEVEREIRO
+    assert contabilidade.converter_dados_para_lancamentos()
+
+    datas = sorted(l['data'].strftime('%Y-%m-%d') for l in contabilidade.lancamentos)
+    assert datas == ['2024-01-05', '2024-01-05', '2024-01-20', '2024-02-05']
+
+
+def test_dados_compactos_convertem_como_os_expandidos(contabilidade):
+    contabilidade.dados_banco = compactar_extrato(JANEIRO)
+    contabilidade.converter_dados_para_lancamentos()
+
+    lancamento = contabilidade.lancamentos[2]
+    assert lancamento['data'] == pd.Timestamp('2024-01-20')
+    assert [m['debito'] + m['credito'] for m in lancamento['movimentos']] == [320.5, 320.5]
+
+    # As mesmas linhas no formato expandido já estão convertidas
+    contabilidade.dados_banco = JANEIRO.copy()
+    assert not contabilidade.converter_dados_para_lancamentos()
+
+
+def test_conversao_revertida_pode_ser_repetida(contabilidade):
+    contabilidade.dados_banco = JANEIRO
+
+    with pytest.raises(RuntimeError):
+        with contabilidade.lote():
+            contabilidade.converter_dados_para_lancamentos()
+            raise RuntimeError("falha depois da conversão")
+
+    assert contabilidade.lancamentos == []
+    assert contabilidade.converter_dados_para_lancamentos()
+    assert len(contabilidade.lancamentos) == 3
+
+
+def test_aponta_quase_duplicados_de_lancamentos_anteriores(contabilidade):
+    contabilidade.dados_banco = JANEIRO
+    contabilidade.converter_dados_para_lancamentos()
+
+    contabilidade.dados_banco = _extrato([('20/01/2024', 'Venda balcão', 320.50)])
+    contabilidade.converter_dados_para_lancamentos()
+
+    assert len(contabilidade.lancamentos) == 4
+    assert [(q['descricao'], q['motivo']) for q in contabilidade.quase_duplicados] == [
+        ('Venda balcão', 'mesma_data_valor')]
@@ -0,0 +1,136 @@
+from datetime import datetime
+
+from diario_contabil import DiarioContabil
+
+
+def _operacao(indice):
+    return {'op': 'lancamento', 'indice': indice,
+            'dados': {'id': f"M{indice + 1}", 'data': datetime(2024, 1, indice + 1),
+                      'descricao': f"Lançamento {indice}", 'movimentos': []}}
+
+
+def _reproduzir(arquivo):
+    lancamentos, bens = [], []
+    diario = DiarioContabil(arquivo)
+    diario.aplicar(lancamentos, bens)
+    return [lanc['id'] for lanc in lancamentos], diario
+
+
+def test_reproduz_operacoes_por_ordem(tmp_path):
+    arquivo = str(tmp_path / 'diario.jsonl')
+    diario = DiarioContabil(arquivo)
+    diario.registrar([_operacao(0), _operacao(1)])
+    diario.registrar([_operacao(2)])
+
+    ids, reproduzido = _reproduzir(arquivo)
+
+    assert ids == ['M1', 'M2', 'M3']
+    assert reproduzido.total_operacoes == 3
+
+
+def test_reproducao_idempotente_sobre_snapshot(tmp_path):
+    arquivo = str(tmp_path / 'diario.jsonl')
+    DiarioContabil(arquivo).registrar([_operacao(0), _operacao(1)])
+
+    # Compactação interrompida depois do snapshot: o lançamento 0 já lá está
+    lancamentos = [{'id': 'M1', 'data': datetime(2024, 1, 1), 'movimentos': []}]
+    DiarioContabil(arquivo).aplicar(lancamentos, [])
+
+    assert [lanc['id'] for lanc in lancamentos] == ['M1', 'M2']
+
+
+def test_lancamento_alterado_substitui_a_posicao(tmp_path):
+    arquivo = str(tmp_path / 'diario.jsonl')
+    alterado = _operacao(0)
+    alterado['op'] = 'lancamento_alterado'
+    alterado['dados']['descricao'] = 'Corrigido'
+    DiarioContabil(arquivo).registrar([_operacao(0), alterado])
+
+    lancamentos = []
+    DiarioContabil(arquivo).aplicar(lancamentos, [])
+
+    assert len(lancamentos) == 1
+    assert lancamentos[0]['descricao'] == 'Corrigido'
+
+
+def test_linha_final_cortada_e_ignorada_sem_alterar_o_arquivo(tmp_path):
+    arquivo = tmp_path / 'diario.jsonl'
+    DiarioContabil(str(arquivo)).registrar([_operacao(0), _operacao(1)])
+    with open(arquivo, 'ab') as f:
+        f.write('{"op": "lancamento", "indice": 2, "dados": {"descrição'.encode('utf-8')[:-1])
+    tamanho = arquivo.stat().st_size
+
+    ids, _ = _reproduzir(str(arquivo))
+
+    assert ids == ['M1', 'M2']
+    assert arquivo.stat().st_size == tamanho
+
+
+def test_acrescimo_depois_de_linha_cortada_nao_perde_operacoes(tmp_path):
+    arquivo = tmp_path / 'diario.jsonl'
+    DiarioContabil(str(arquivo)).registrar([_operacao(0), _operacao(1)])
+    with open(arquivo, 'ab') as f:
+        f.write(b'{"op": "lancamento", "indice": 2, "da')
+
+    # Nova sessão: o acréscimo não pode ficar colado à linha incompleta
+    DiarioContabil(str(arquivo)).registrar([_operacao(2), _operacao(3)])
+
+    ids, reproduzido = _reproduzir(str(arquivo))
+    assert ids == ['M1', 'M2', 'M3', 'M4']
+    assert reproduzido.total_operacoes == 4
+    assert arquivo.read_bytes().endswith(b"\n")
+
+
+def test_linha_completa_sem_quebra_de_linha_e_mantida(tmp_path):
+    arquivo = tmp_path / 'diario.jsonl'
+    DiarioContabil(str(arquivo)).registrar([_operacao(0), _operacao(1)])
+    with open(arquivo, 'rb+') as f:
+        f.seek(-1, 2)
+        f.truncate()
+
+    DiarioContabil(str(arquivo)).registrar([_operacao(2)])
+
+    ids, _ = _reproduzir(str(arquivo))
+    assert ids == ['M1', 'M2', 'M3']
+
+
+def test_reparar_fim_sem_alteracoes_em_arquivo_integro(tmp_path):
+    arquivo = tmp_path / 'diario.jsonl'
+    diario = DiarioContabil(str(arquivo))
+    assert diario.reparar_fim() is False  # Arquivo ainda não existe
+
+    diario.registrar([_operacao(0)])
+    conteudo = arquivo.read_bytes()
+
+    assert DiarioContabil(str(arquivo)).reparar_fim() is False
+    assert arquivo.read_bytes() == conteudo
+
+
+def test_limpar_esvazia_o_diario(tmp_path):
+    arquivo = str(tmp_path / 'diario.jsonl')
+    diario = DiarioContabil(arquivo, limite_compactacao=2)
+    diario.registrar([_operacao(0), _operacao(1)])
+    assert diario.precisa_compactar()
+
+    diario.limpar()
+
+    ids, reproduzido = _reproduzir(arquivo)
+    assert ids == []
+    assert not reproduzido.precisa_compactar()
+
+
+def test_contabilidade_recupera_lancamentos_do_diario(diretorio_trabalho):
+    from contabilidade import ContabilidadeAvancada
+
+    contabilidade = ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+    contabilidade.registrar_lancamento(datetime(2024, 3, 1, 9, 30), "Venda", [
+        {'conta': '43', 'debito': 150.0, 'credito': 0},
+        {'conta': '71', 'debito': 0, 'credito': 150.0}])
+    # Um snapshot não é regravado por cada lançamento: só o diário cresce
+    assert not (diretorio_trabalho / 'lancamentos_contabeis.json').exists()
+
+    recuperada = ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+
+    assert [l['descricao'] for l in recuperada.lancamentos] == ["Venda"]
+    assert recuperada.lancamentos[0]['data'] == datetime(2024, 3, 1, 9, 30)
+    assert recuperada.saldos() == {'43': 150.0, '71': -150.0}
@@ -0,0 +1,111 @@
+from datetime import datetime
+
+import pandas as pd
+
+from impressoes_digitais import (IndiceImpressoesDigitais, calcular_impressao, calcular_impressoes,
+                                 remover_duplicados)
+
+
+def _extrato(linhas):
+    return pd.DataFrame(linhas, columns=['data', 'descricao', 'valor']).assign(
+        data=lambda df: pd.to_datetime(df['data'], dayfirst=True))
+
+
+JANEIRO = _extrato([
+    ('05/01/2024', 'Salário Ana', -1500.00),
+    ('05/01/2024', 'Salário Ana', -1500.00),
+    ('20/01/2024', 'Venda loja', 320.50),
+    ('31/01/2024', 'Comissão bancária', -12.00),
+])
+
+# Extrato que repete a segunda metade de janeiro e acrescenta fevereiro
+JANEIRO_FEVEREIRO = _extrato([
+    ('20/01/2024', 'Venda loja', 320.50),
+    ('31/01/2024', 'Comissão bancária', -12.00),
+    ('05/02/2024', 'Salário Ana', -1500.00),
+    ('10/02/2024', 'Venda loja', 99.90),
+])
+
+
+def test_impressao_ignora_acentos_maiusculas_e_pontuacao():
+    data = datetime(2024, 1, 20)
+    assert calcular_impressao(data, 320.5, "Venda  LOJA.") == calcular_impressao(data, 320.50, "venda loja")
+    assert calcular_impressao(data, 320.5, "Comissão") == calcular_impressao(data, 320.5, "comissao")
+    assert calcular_impressao(data, 320.5, "Venda loja") != calcular_impressao(data, 320.51, "Venda loja")
+
+
+def test_linhas_iguais_no_mesmo_extrato_tem_impressoes_distintas():
+    impressoes = calcular_impressoes(JANEIRO)
+
+    assert impressoes.is_unique
+    assert impressoes.iloc[0] == calcular_impressao(datetime(2024, 1, 5), -1500, 'Salário Ana')
+    assert impressoes.iloc[1] == calcular_impressao(datetime(2024, 1, 5), -1500, 'Salário Ana', ocorrencia=1)
+
+
+def test_impressoes_nao_dependem_da_posicao_no_extrato():
+    invertido = JANEIRO.iloc[::-1].reset_index(drop=True)
+    assert set(calcular_impressoes(invertido)) == set(calcular_impressoes(JANEIRO))
+
+
+def test_remover_duplicados_mantem_linhas_iguais_do_mesmo_extrato():
+    juntos, removidos, quase = remover_duplicados(JANEIRO)
+
+    assert len(juntos) == 4
+    assert removidos == 0
+    assert quase.empty
+
+
+def test_remover_duplicados_ignora_so_a_sobreposicao():
+    juntos, removidos, _ = remover_duplicados(JANEIRO_FEVEREIRO, JANEIRO)
+
+    assert removidos == 2
+    assert len(juntos) == 6
+    assert (juntos['descricao'] == 'Salário Ana').sum() == 3
+
+
+def test_remover_duplicados_conta_ocorrencias_de_cada_lado():
+    # Um terceiro salário igual no mesmo dia é uma linha nova
+    novos = _extrato([('05/01/2024', 'Salário Ana', -1500.00)] * 3)
+
+    juntos, removidos, _ = remover_duplicados(novos, JANEIRO)
+
+    assert removidos == 2
+    assert (juntos['descricao'] == 'Salário Ana').sum() == 3
+
+
+def test_remover_duplicados_aponta_quase_duplicados():
+    novos = _extrato([('20/01/2024', 'Venda balcão', 320.50)])
+
+    juntos, removidos, quase = remover_duplicados(novos, JANEIRO)
+
+    assert removidos == 0
+    assert len(juntos) == 5
+    assert sorted(quase['descricao']) == ['Venda balcão', 'Venda loja']
+
+
+def test_indice_persiste_impressoes_e_chaves(tmp_path):
+    arquivo = str(tmp_path / 'impressoes.json')
+    indice = IndiceImpressoesDigitais(arquivo)
+    assert not indice.existia
+    impressao = calcular_impressao(datetime(2024, 1, 20), 320.5, 'Venda loja')
+    indice.registrar(datetime(2024, 1, 20), 320.5, 'Venda loja', impressao=impressao)
+    indice.salvar()
+
+    recarregado = IndiceImpressoesDigitais(arquivo)
+
+    assert recarregado.existia
+    assert recarregado.contem(impressao)
+    assert recarregado.quase_duplicado(datetime(2024, 1, 20), 320.5, 'Venda balcão') == 'mesma_data_valor'
+    assert recarregado.quase_duplicado(datetime(2024, 1, 20), 320.5, 'Venda loja') is None
+
+
+def test_edicao_substitui_as_chaves_secundarias(tmp_path):
+    indice = IndiceImpressoesDigitais(str(tmp_path / 'impressoes.json'))
+    impressao = calcular_impressao(datetime(2024, 1, 20), 320.5, 'Venda loja')
+    indice.registrar(datetime(2024, 1, 20), 320.5, 'Venda loja', impressao=impressao)
+
+    assert indice.atualizar(impressao, datetime(2024, 1, 21), 330.0, 'Venda loja')
+
+    assert indice.contem(impressao)
+    assert indice.quase_duplicado(datetime(2024, 1, 20), 320.5, 'Outra venda') is None
+    assert indice.quase_duplicado(datetime(2024, 1, 21), 330.0, 'Outra venda') == 'mesma_data_valor'
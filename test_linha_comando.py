@@ -0,0 +1,112 @@
+import pytest
+
+from linha_comando import (SAIDA_ARGUMENTOS, SAIDA_DADOS, SAIDA_DISCREPANCIAS, SAIDA_OK, SAIDA_RELATORIO,
+                           main)
+
+EXTRATO = """Data Valor,Descrição,Montante
+05/01/2024,Salário Ana,-1500.00
+20/01/2024,Venda loja,320.50
+31/01/2024,Comissão bancária,-12.00
+"""
+
+LIVRO_CONCILIADO = """data,descricao,valor
+05/01/2024,Salário Ana,-1500.00
+20/01/2024,Venda loja,320.50
+31/01/2024,Comissão bancária,-12.00
+"""
+
+LIVRO_COM_DISCREPANCIA = """data,descricao,valor
+05/01/2024,Salário Ana,-1500.00
+20/01/2024,Venda loja,320.50
+"""
+
+
+@pytest.fixture
+def diretorio(diretorio_trabalho):
+    (diretorio_trabalho / 'extrato.csv').write_text(EXTRATO, encoding='utf-8')
+    (diretorio_trabalho / 'livro.csv').write_text(LIVRO_CONCILIADO, encoding='utf-8')
+    (diretorio_trabalho / 'livro_incompleto.csv').write_text(LIVRO_COM_DISCREPANCIA, encoding='utf-8')
+    return diretorio_trabalho
+
+
+def _importar(livro='livro.csv'):
+    assert main(['importar-banco', 'extrato.csv', '--banco', 'BAI']) == SAIDA_OK
+    assert main(['importar-livro', livro]) == SAIDA_OK
+
+
+@pytest.mark.parametrize('argv', [[], ['desconhecido'], ['importar-banco', 'extrato.csv'],
+                                  ['importar-banco', 'extrato.csv', '--banco', 'XYZ'],
+                                  ['relatorio', 'dre', '--fim', '31-13-2024']])
+def test_argumentos_invalidos(diretorio, argv):
+    assert main(argv) == SAIDA_ARGUMENTOS
+
+
+def test_ajuda_sai_com_sucesso(diretorio, capsys):
+    assert main(['--help']) == SAIDA_OK
+    assert 'importar-banco' in capsys.readouterr().out
+
+
+def test_arquivo_inexistente(diretorio):
+    assert main(['importar-banco', 'nao_existe.csv', '--banco', 'BAI']) == SAIDA_DADOS
+    assert main(['importar-livro', 'nao_existe.csv']) == SAIDA_DADOS
+
+
+def test_conciliar_sem_dados_importados(diretorio):
+    assert main(['conciliar']) == SAIDA_DADOS
+    assert main(['relatorio', 'diario', '--fim', '31/01/2024']) == SAIDA_DADOS
+
+
+def test_conciliar_sem_discrepancias(diretorio):
+    _importar()
+
+    assert main(['conciliar']) == SAIDA_OK
+
+
+def test_conciliar_com_discrepancias(diretorio):
+    _importar('livro_incompleto.csv')
+
+    assert main(['conciliar']) == SAIDA_DISCREPANCIAS
+    assert main(['conciliar', '--ignorar-discrepancias']) == SAIDA_OK
+
+
+def test_importacao_acrescentada_ignora_linhas_repetidas(diretorio, capsys):
+    _importar()
+    capsys.readouterr()
+
+    assert main(['importar-banco', 'extrato.csv', '--banco', 'BAI', '--acrescentar']) == SAIDA_OK
+    assert 'Extrato importado: 3 linhas (3 duplicadas ignoradas' in capsys.readouterr().out
+
+
+def test_relatorio_sem_datas(diretorio):
+    assert main(['relatorio', 'dre']) == SAIDA_ARGUMENTOS
+
+
+def test_relatorio_contabilistico(diretorio):
+    _importar()
+
+    assert main(['relatorio', 'dre', '--inicio', '01/01/2024', '--fim', '31/01/2024',
+                 '--saida', 'dre.pdf']) == SAIDA_OK
+    assert (diretorio / 'dre.pdf').read_bytes().startswith(b'%PDF')
+    assert main(['relatorio', 'balanco', '--fim', '2024-01-31', '--saida', 'balanco.csv']) == SAIDA_OK
+    assert (diretorio / 'balanco.csv').exists()
+
+
+def test_relatorio_de_conciliacao(diretorio):
+    _importar()
+
+    assert main(['relatorio', 'diario', '--fim', '31/01/2024', '--saida', 'diario.pdf']) == SAIDA_OK
+    assert (diretorio / 'diario.pdf').exists()
+
+
+def test_relatorio_nao_gerado(diretorio):
+    assert main(['relatorio', 'dre', '--fim', '31/01/2024',
+                 '--saida', str(diretorio / 'nao_existe' / 'dre.pdf')]) == SAIDA_RELATORIO
+
+
+def test_diretorio_da_entidade(diretorio, monkeypatch, tmp_path_factory):
+    outro = tmp_path_factory.mktemp('outro')
+    monkeypatch.chdir(outro)
+
+    assert main(['--diretorio', str(diretorio), 'importar-banco', 'extrato.csv', '--banco', 'BAI']) == SAIDA_OK
+    assert (diretorio / 'dados_importados').is_dir()
+    assert not (outro / 'dados_importados').exists()
@@ -0,0 +1,100 @@
+import random
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from contabilidade import ContabilidadeAvancada
+from indice_datas import IndiceDatas
+from razao_colunar import limites_periodo
+
+
+def _lancamento(numero, data, valor, debito='43', credito='71'):
+    return {'id': f"M{numero}", 'data': data, 'descricao': f"Lançamento {numero}", 'origem': 'MANUAL',
+            'movimentos': [{'conta': debito, 'debito': valor, 'credito': 0},
+                           {'conta': credito, 'debito': 0, 'credito': valor}]}
+
+
+def test_limites_periodo_sao_dias_inteiros_com_fim_exclusivo():
+    inicio, fim = limites_periodo(datetime(2024, 3, 1, 17, 45), datetime(2024, 3, 31, 8, 0))
+
+    assert inicio == datetime(2024, 3, 1)
+    assert fim == datetime(2024, 4, 1)
+    assert limites_periodo(date(2024, 12, 31), None) == (datetime(2024, 12, 31), None)
+    assert limites_periodo(None, date(2024, 12, 31)) == (None, datetime(2025, 1, 1))
+
+
+@pytest.fixture
+def contabilidade(diretorio_trabalho):
+    contabilidade = ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+    contabilidade.lancamentos = [
+        _lancamento(1, datetime(2024, 1, 31, 0, 0), 10.0),
+        _lancamento(2, datetime(2024, 1, 31, 23, 59, 59), 20.0),
+        _lancamento(3, datetime(2024, 2, 1, 0, 0), 40.0),
+        _lancamento(4, datetime(2024, 2, 29, 12, 0), 80.0),
+        _lancamento(5, datetime(2024, 3, 1, 0, 0, 1), 160.0),
+    ]
+    return contabilidade
+
+
+@pytest.mark.parametrize('hora_ate', [datetime(2024, 1, 31), datetime(2024, 1, 31, 8, 30),
+                                      datetime(2024, 1, 31, 23, 59, 59)])
+def test_ultimo_dia_inclui_todo_o_dia_qualquer_que_seja_a_hora(contabilidade, hora_ate):
+    assert contabilidade.saldos(ate=hora_ate)['43'] == 30.0
+    assert [l['id'] for l in contabilidade.lancamentos_periodo(None, hora_ate)] == ['M1', 'M2']
+
+
+def test_primeiro_dia_inclui_as_horas_anteriores_a_desde(contabilidade):
+    desde = datetime(2024, 1, 31, 18, 0)
+
+    assert contabilidade.saldos(desde=desde, ate=datetime(2024, 2, 1))['43'] == 70.0
+    assert [l['id'] for l in contabilidade.lancamentos_periodo(desde, datetime(2024, 2, 1))] == \
+        ['M1', 'M2', 'M3']
+
+
+def test_meses_contiguos_somam_o_total(contabilidade):
+    janeiro = contabilidade.saldos(datetime(2024, 1, 1), datetime(2024, 1, 31))['43']
+    fevereiro = contabilidade.saldos(datetime(2024, 2, 1), datetime(2024, 2, 29))['43']
+    marco = contabilidade.saldos(datetime(2024, 3, 1), datetime(2024, 3, 31))['43']
+
+    assert (janeiro, fevereiro, marco) == (30.0, 120.0, 160.0)
+    assert janeiro + fevereiro + marco == contabilidade.saldos()['43']
+
+
+def test_saldos_razao_e_lancamentos_usam_os_mesmos_limites(diretorio_trabalho):
+    aleatorio = random.Random(11)
+    contabilidade = ContabilidadeAvancada(diretorio=str(diretorio_trabalho))
+    contabilidade.lancamentos = [
+        _lancamento(n, datetime(2024, 1, 1) + timedelta(days=aleatorio.randrange(200),
+                                                        seconds=aleatorio.randrange(86400)),
+                    float(aleatorio.randrange(1, 1000)), *aleatorio.sample(['11', '22', '43', '71'], 2))
+        for n in range(1, 400)]
+
+    for _ in range(25):
+        desde = datetime(2024, 1, 1) + timedelta(days=aleatorio.randrange(200), hours=aleatorio.randrange(24))
+        ate = desde + timedelta(days=aleatorio.randrange(40), hours=aleatorio.randrange(24))
+        inicio, fim = limites_periodo(desde, ate)
+        esperados = [l for l in contabilidade.lancamentos if inicio <= l['data'] < fim]
+
+        saldos_esperados = {}
+        for lancamento in esperados:
+            for movimento in lancamento['movimentos']:
+                conta = movimento['conta']
+                saldos_esperados[conta] = saldos_esperados.get(conta, 0) + movimento['debito'] - movimento['credito']
+
+        assert {c: s for c, s in contabilidade.saldos(desde, ate).items() if s} == \
+            {c: s for c, s in saldos_esperados.items() if s}
+        assert sorted(l['id'] for l in contabilidade.lancamentos_periodo(desde, ate)) == \
+            sorted(l['id'] for l in esperados)
+        movimentos_razao = sum(len(list(movimentos)) for _, movimentos in contabilidade.percorrer_razao(desde, ate))
+        assert movimentos_razao == 2 * len(esperados)
+
+
+def test_indice_de_datas_localiza_o_periodo_por_dias_inteiros():
+    lancamentos = [_lancamento(1, datetime(2024, 5, 2, 9), 1.0),
+                   _lancamento(2, datetime(2024, 5, 1, 23, 30), 1.0),
+                   _lancamento(3, datetime(2024, 5, 3), 1.0)]
+    indice = IndiceDatas()
+
+    assert [l['id'] for l in indice.entre(lancamentos, datetime(2024, 5, 1, 23, 59),
+                                          datetime(2024, 5, 2))] == ['M2', 'M1']
+    assert [l['id'] for l in indice.entre(lancamentos, date(2024, 5, 3), None)] == ['M3']
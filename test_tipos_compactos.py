@@ -0,0 +1,71 @@
+import numpy as np
+import pandas as pd
+
+from tipos_compactos import CHAVE_AUSENTE, chaves_dia_centavos, compactar_extrato, expandir_extrato, total_kz
+
+
+def _extrato(linhas):
+    return pd.DataFrame(linhas, columns=['data', 'descricao', 'valor']).assign(
+        data=lambda df: pd.to_datetime(df['data'], dayfirst=True))
+
+
+EXTRATO = _extrato([
+    ('05/01/2024', 'Salário Ana', -1500.00),
+    ('20/01/2024', 'Venda loja', 320.51),
+    ('31/01/2024', 'Venda loja', 0.1),
+])
+
+COM_FALTAS = _extrato([
+    ('05/01/2024', 'Salário Ana', -1500.00),
+    (None, 'Sem data', 10.0),
+    ('31/01/2024', 'Sem valor', np.nan),
+])
+
+
+def test_formato_compacto():
+    compacto = compactar_extrato(EXTRATO)
+
+    assert compacto['data'].dtype == np.int32
+    assert compacto['valor'].dtype == np.int64
+    assert isinstance(compacto['descricao'].dtype, pd.CategoricalDtype)
+    assert list(compacto['valor']) == [-150000, 32051, 10]
+    assert compactar_extrato(compacto) is compacto
+
+
+def test_ida_e_volta_sem_perdas():
+    vista = expandir_extrato(compactar_extrato(EXTRATO))
+
+    assert list(vista['data']) == list(EXTRATO['data'])
+    assert list(vista['valor']) == list(EXTRATO['valor'])
+    assert list(vista['descricao']) == list(EXTRATO['descricao'])
+
+
+def test_datas_e_valores_em_falta_ficam_nulos():
+    compacto = compactar_extrato(COM_FALTAS)
+
+    assert str(compacto['data'].dtype) == 'Int32'
+    assert str(compacto['valor'].dtype) == 'Int64'
+    assert compacto['data'].isna().tolist() == [False, True, False]
+    assert compacto['valor'].isna().tolist() == [False, False, True]
+
+    vista = expandir_extrato(compacto)
+    assert vista['data'].isna().tolist() == [False, True, False]
+    assert vista['valor'].isna().tolist() == [False, False, True]
+    assert vista['data'].iloc[2] == pd.Timestamp('2024-01-31')
+
+
+def test_total_em_kz_igual_nos_dois_formatos():
+    assert total_kz(compactar_extrato(EXTRATO)) == total_kz(EXTRATO) == -1179.39
+    assert total_kz(compactar_extrato(COM_FALTAS)) == total_kz(COM_FALTAS) == -1490.0
+
+
+def test_chaves_iguais_nos_dois_formatos_e_ausentes_marcadas():
+    for extrato in (EXTRATO, COM_FALTAS):
+        dias, centavos = chaves_dia_centavos(extrato)
+        dias_compactos, centavos_compactos = chaves_dia_centavos(compactar_extrato(extrato))
+        assert list(dias) == list(dias_compactos)
+        assert list(centavos) == list(centavos_compactos)
+
+    dias, centavos = chaves_dia_centavos(COM_FALTAS)
+    assert dias[1] == CHAVE_AUSENTE and centavos[2] == CHAVE_AUSENTE
+    assert dias[0] == (pd.Timestamp('2024-01-05') - pd.Timestamp('1970-01-01')).days
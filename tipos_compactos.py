@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+# Colunas de texto repetitivo guardadas como categorias
+COLUNAS_CATEGORICAS = ['descricao', 'referencia', 'origem', 'status']
+
+# Chave devolvida por chaves_dia_centavos para linhas sem data ou sem valor
+CHAVE_AUSENTE = np.iinfo(np.int64).min
+
+
+def _inteiros(valores, ausentes, tipo, tipo_anulavel):
+    """Inteiros numpy, ou o tipo anulável do pandas se houver valores em falta"""
+    if ausentes.any():
+        valores = np.where(ausentes, 0, valores).astype(tipo)
+        return pd.arrays.IntegerArray(valores, ausentes) if tipo_anulavel else valores
+    return valores.astype(tipo)
+
+
+def e_compacto(df):
+    """Indica se o DataFrame já está no formato compacto (datas como dias inteiros)"""
+    return df is not None and 'data' in df.columns and df['data'].dtype.kind == 'i'
+
+
+def compactar_extrato(df):
+    """
+    Converte um extrato ou livro para o formato compacto:
+    - data: dias desde 1970-01-01 (int32)
+    - valor: centavos (int64)
+    - descricao e outras colunas de texto repetitivo: categorias
+
+    Datas (NaT) ou valores (NaN) em falta ficam como <NA> nos tipos anuláveis
+    Int32/Int64 em vez de virarem números sem sentido.
+
+    Args:
+        df: DataFrame com as colunas data, descricao e valor
+
+    Returns:
+        DataFrame: Cópia compacta (o próprio df se já estiver compacto)
+    """
+    if df is None or e_compacto(df):
+        return df
+
+    compacto = pd.DataFrame(index=df.index)
+    for coluna in df.columns:
+        if coluna == 'data':
+            datas = pd.to_datetime(df['data']).to_numpy().astype('datetime64[D]')
+            compacto['data'] = _inteiros(datas.astype(np.int64), np.isnat(datas),
+                                         np.int32, True)
+        elif coluna == 'valor':
+            valores = pd.to_numeric(df['valor']).to_numpy(dtype=float, na_value=np.nan)
+            centavos = np.round(valores * 100)
+            compacto['valor'] = _inteiros(np.nan_to_num(centavos), np.isnan(centavos),
+                                          np.int64, True)
+        elif coluna in COLUNAS_CATEGORICAS:
+            compacto[coluna] = df[coluna].astype('category')
+        else:
+            compacto[coluna] = df[coluna]
+    return compacto
+
+
+def expandir_extrato(df):
+    """
+    Devolve a vista com datas (datetime64) e valores decimais esperada pelos
+    relatórios e ecrãs. As colunas categóricas são partilhadas, não copiadas.
+    """
+    if df is None or not e_compacto(df):
+        return df
+
+    vista = df.copy(deep=False)
+    vista['data'] = pd.to_datetime(df['data'].astype('Int64'), unit='D').astype('datetime64[ns]')
+    vista['valor'] = df['valor'].to_numpy(dtype=float, na_value=np.nan) / 100.0
+    return vista
+
+
+def total_kz(df):
+    """Soma dos valores em Kz, no formato compacto ou no expandido (ignora valores em falta)"""
+    if e_compacto(df):
+        return int(df['valor'].sum()) / 100.0
+    return float(df['valor'].sum())
+
+
+def chaves_dia_centavos(df):
+    """
+    Chaves inteiras (dia, centavos) de cada linha, para comparações exatas sem
+    erros de vírgula flutuante. Aceita o formato compacto ou o expandido.
+    Linhas sem data ou sem valor recebem CHAVE_AUSENTE e não devem ser
+    emparelhadas.
+
+    Returns:
+        tuple: (array de dias, array de centavos)
+    """
+    if e_compacto(df):
+        return (df['data'].to_numpy(dtype=np.int64, na_value=CHAVE_AUSENTE),
+                df['valor'].to_numpy(dtype=np.int64, na_value=CHAVE_AUSENTE))
+
+    datas = pd.to_datetime(df['data']).to_numpy().astype('datetime64[D]')
+    dias = np.where(np.isnat(datas), CHAVE_AUSENTE, datas.astype(np.int64))
+    centavos = np.round(pd.to_numeric(df['valor']).to_numpy(dtype=float, na_value=np.nan) * 100)
+    centavos = np.where(np.isnan(centavos), CHAVE_AUSENTE,
+                        np.nan_to_num(centavos)).astype(np.int64)
+    return dias, centavos
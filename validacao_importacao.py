@@ -0,0 +1,123 @@
+import os
+import numpy as np
+import pandas as pd
+
+
+class ValidadorImportacao:
+    """
+    Valida cada bloco importado de uma só vez (operações vetorizadas), separa as
+    linhas inválidas para um arquivo de quarentena e acumula o resumo de qualidade.
+    """
+
+    PROBLEMAS = {
+        'data_invalida': 'Data inválida',
+        'valor_invalido': 'Valor não numérico',
+        'descricao_vazia': 'Descrição vazia'
+    }
+
+    def __init__(self, arquivo_quarentena=None):
+        """
+        Args:
+            arquivo_quarentena: Arquivo CSV onde as linhas inválidas são gravadas
+                                (None para não gravar)
+        """
+        self.arquivo_quarentena = arquivo_quarentena
+        self.total_linhas = 0
+        self.total_quarentena = 0
+        self.contagens = {problema: 0 for problema in self.PROBLEMAS}
+        self.linhas_afetadas = {problema: [] for problema in self.PROBLEMAS}
+
+        # Cada importação começa com um arquivo de quarentena novo
+        if arquivo_quarentena and os.path.exists(arquivo_quarentena):
+            os.remove(arquivo_quarentena)
+
+    @staticmethod
+    def arquivo_quarentena_para(arquivo):
+        """Caminho do arquivo de quarentena ao lado do arquivo importado"""
+        return os.path.splitext(arquivo)[0] + '_quarentena.csv'
+
+    def validar(self, bruto, convertido):
+        """
+        Valida um bloco e devolve apenas as linhas válidas
+
+        Args:
+            bruto: Bloco com os valores originais e a coluna `linha`
+            convertido: O mesmo bloco depois da conversão (NaT/NaN nos valores inválidos)
+
+        Returns:
+            DataFrame: Linhas válidas do bloco convertido
+        """
+        mascaras = {
+            'data_invalida': convertido['data'].isna().to_numpy(),
+            'valor_invalido': convertido['valor'].isna().to_numpy(),
+            'descricao_vazia': (convertido['descricao'].str.strip() == '').to_numpy()
+        }
+
+        invalidas = np.zeros(len(convertido), dtype=bool)
+        for problema, mascara in mascaras.items():
+            invalidas |= mascara
+            self.contagens[problema] += int(mascara.sum())
+            if 'linha' in bruto.columns:
+                self.linhas_afetadas[problema].extend(bruto['linha'].to_numpy()[mascara].tolist())
+
+        self.total_linhas += len(convertido)
+        total_invalidas = int(invalidas.sum())
+        if total_invalidas:
+            self.total_quarentena += total_invalidas
+            self._gravar_quarentena(bruto[invalidas], {p: m[invalidas] for p, m in mascaras.items()})
+
+        return convertido[~invalidas]
+
+    def _gravar_quarentena(self, linhas, mascaras):
+        if not self.arquivo_quarentena:
+            return
+
+        linhas = linhas.copy()
+        # Descrição dos problemas de cada linha, montada coluna a coluna
+        problemas = np.full(len(linhas), '', dtype=object)
+        for problema, mascara in mascaras.items():
+            problemas = problemas + np.where(mascara, self.PROBLEMAS[problema] + '; ', '')
+        linhas['problemas'] = pd.Series(problemas, index=linhas.index).str.rstrip('; ')
+
+        try:
+            linhas.to_csv(self.arquivo_quarentena, mode='a', index=False, encoding='utf-8',
+                          header=not os.path.exists(self.arquivo_quarentena))
+        except Exception as e:
+            print(f"Erro ao gravar linhas em quarentena: {str(e)}")
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Totais de linhas lidas, válidas e em quarentena, e contagens e
+                  números de linha por tipo de problema
+        """
+        return {
+            'total_linhas': self.total_linhas,
+            'linhas_validas': self.total_linhas - self.total_quarentena,
+            'linhas_quarentena': self.total_quarentena,
+            'arquivo_quarentena': self.arquivo_quarentena if self.total_quarentena else None,
+            'problemas': {
+                problema: {
+                    'descricao': self.PROBLEMAS[problema],
+                    'quantidade': self.contagens[problema],
+                    'linhas': self.linhas_afetadas[problema]
+                }
+                for problema in self.PROBLEMAS
+            }
+        }
+
+    def texto_resumo(self, max_linhas=10):
+        """Resumo de qualidade em texto, para mostrar ao utilizador"""
+        if not self.total_quarentena:
+            return f"{self.total_linhas} linhas lidas, todas válidas."
+
+        partes = [f"{self.total_linhas} linhas lidas, {self.total_quarentena} em quarentena:"]
+        for problema, descricao in self.PROBLEMAS.items():
+            if self.contagens[problema]:
+                linhas = self.linhas_afetadas[problema]
+                amostra = ', '.join(str(n) for n in linhas[:max_linhas])
+                if len(linhas) > max_linhas:
+                    amostra += ', ...'
+                partes.append(f"- {descricao}: {self.contagens[problema]} (linhas {amostra})")
+        partes.append(f"Linhas guardadas em: {self.arquivo_quarentena}")
+        return "\n".join(partes)